@@ -61,6 +61,7 @@ from config.system_prompts import ENGLISH_SYSTEM_PROMPT, TAGALOG_SYSTEM_PROMPT
 
 # Import chat history service
 from services.chat_history_service import ChatHistoryService, get_chat_history_service
+from services.conversation_cache import get_conversation_cache
 
 # Import content moderation and violation tracking
 from services.content_moderation_service import get_moderation_service
@@ -1613,8 +1614,7 @@ async def save_chat_interaction(
         session_exists = False
         if session_id:
             try:
-                existing_session = await chat_service.get_session(UUID(session_id))
-                session_exists = existing_session is not None
+                session_exists = await chat_service.session_exists(UUID(session_id))
                 if session_exists:
                     print(f"   ✅ Using existing session: {session_id}")
                 else:
@@ -1630,37 +1630,40 @@ async def save_chat_interaction(
             print(f"   Creating new session: {title}")
             # Map language to database format ('en' or 'fil')
             db_language = 'en' if language in ['english', 'en'] else 'fil'
-            session = await chat_service.create_session(
+            session_id = await chat_service.create_session_deferred(
                 user_id=UUID(effective_user_id),
                 title=title,
                 language=db_language
             )
-            session_id = str(session.id)
+            get_conversation_cache().start_session(session_id)
             print(f"   ✅ Session created: {session_id}")
         
         # Save user message
         print(f"   Saving user message...")
-        user_msg = await chat_service.add_message(
+        user_message_id = await chat_service.add_message_deferred(
             session_id=UUID(session_id),
             user_id=UUID(effective_user_id),
             role="user",
             content=question,
             metadata={}
         )
-        user_message_id = str(user_msg.id)
         print(f"   ✅ User message saved: {user_message_id}")
         
         # Save assistant message
         print(f"   Saving assistant message...")
-        assistant_msg = await chat_service.add_message(
+        assistant_message_id = await chat_service.add_message_deferred(
             session_id=UUID(session_id),
             user_id=UUID(effective_user_id),
             role="assistant",
             content=answer,
             metadata=metadata or {}
         )
-        assistant_message_id = str(assistant_msg.id)
         print(f"   ✅ Assistant message saved: {assistant_message_id}")
+        
+        # Keep the in-memory conversation buffer in step with the database
+        conversation_cache = get_conversation_cache()
+        conversation_cache.append(session_id, "user", question)
+        conversation_cache.append(session_id, "assistant", answer)
         print(f"💾 Chat history saved successfully!")
         
         return (session_id, user_message_id, assistant_message_id)
@@ -1678,8 +1681,11 @@ async def get_conversation_history_from_db(
     limit: int = 16  # 8 exchanges = 16 messages (user + assistant pairs)
 ) -> List[Dict[str, str]]:
     """
-    Retrieve conversation history from database for enhanced professional context continuity.
+    Retrieve conversation history for enhanced professional context continuity.
     Returns messages in OpenAI format: [{"role": "user", "content": "..."}, ...]
+    
+    Served from the per-session conversation cache; the database is only queried
+    the first time a session is seen by this process.
     """
     if not session_id:
         return []
@@ -1687,25 +1693,20 @@ async def get_conversation_history_from_db(
     try:
         print(f"🔍 Retrieving conversation history from session: {session_id}")
         
-        # Get recent messages from the session (excluding the current question)
-        messages = await chat_service.get_session_messages(
-            session_id=UUID(session_id),
-            limit=limit
+        # The current question is saved after the answer is generated,
+        # so every cached turn is previous conversation
+        conversation_history = await get_conversation_cache().get_history(
+            chat_service,
+            session_id,
+            limit=limit,
+            max_chars=800  # Higher limit for lawyer context (800 chars)
         )
         
-        if not messages:
+        if not conversation_history:
             print(f"   ℹ️ No previous messages found in session")
             return []
         
-        # Convert to OpenAI format and exclude the very last message (current question)
-        conversation_history = []
-        for msg in messages[:-1]:  # Exclude last message (current question)
-            conversation_history.append({
-                "role": msg.role,
-                "content": msg.content[:800]  # Higher limit for lawyer context (800 chars)
-            })
-        
-        print(f"   ✅ Retrieved {len(conversation_history)} messages from database")
+        print(f"   ✅ Retrieved {len(conversation_history)} messages from conversation cache")
         return conversation_history
         
     except Exception as e:
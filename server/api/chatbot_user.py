@@ -65,6 +65,7 @@ from config.system_prompts import ENGLISH_SYSTEM_PROMPT, TAGALOG_SYSTEM_PROMPT
 
 # Import chat history service
 from services.chat_history_service import ChatHistoryService, get_chat_history_service
+from services.conversation_cache import get_conversation_cache
 
 # Import content moderation and violation tracking
 from services.content_moderation_service import get_moderation_service
@@ -75,6 +76,9 @@ from models.violation_types import ViolationType
 # Import RAG utilities with web search
 from utils.rag_utils import retrieve_relevant_context_with_web_search
 
+# Import direct citation lookup (prebuilt article index)
+from services.article_lookup import article_heading, get_article_lookup, is_verbatim_request, to_source
+
 # Import guest rate limiting (OpenAI/Anthropic security pattern)
 from middleware.guest_rate_limiter import GuestRateLimiter
 
@@ -2275,8 +2279,7 @@ async def save_chat_interaction(
         session_exists = False
         if session_id:
             try:
-                existing_session = await chat_service.get_session(UUID(session_id))
-                session_exists = existing_session is not None
+                session_exists = await chat_service.session_exists(UUID(session_id))
                 if session_exists:
                     print(f"   ✅ Using existing session: {session_id}")
                 else:
@@ -2292,37 +2295,40 @@ async def save_chat_interaction(
             print(f"   Creating new session: {title}")
             # Map language to database format ('en' or 'fil')
             db_language = 'en' if language in ['english', 'en'] else 'fil'
-            session = await chat_service.create_session(
+            session_id = await chat_service.create_session_deferred(
                 user_id=UUID(effective_user_id),
                 title=title,
                 language=db_language
             )
-            session_id = str(session.id)
+            get_conversation_cache().start_session(session_id)
             print(f"   ✅ Session created: {session_id}")
         
         # Save user message
         print(f"   Saving user message...")
-        user_msg = await chat_service.add_message(
+        user_message_id = await chat_service.add_message_deferred(
             session_id=UUID(session_id),
             user_id=UUID(effective_user_id),
             role="user",
             content=question,
             metadata={}
         )
-        user_message_id = str(user_msg.id)
         print(f"   ✅ User message saved: {user_message_id}")
         
         # Save assistant message
         print(f"   Saving assistant message...")
-        assistant_msg = await chat_service.add_message(
+        assistant_message_id = await chat_service.add_message_deferred(
             session_id=UUID(session_id),
             user_id=UUID(effective_user_id),
             role="assistant",
             content=answer,
             metadata=metadata or {}
         )
-        assistant_message_id = str(assistant_msg.id)
         print(f"   ✅ Assistant message saved: {assistant_message_id}")
+        
+        # Keep the in-memory conversation buffer in step with the database
+        conversation_cache = get_conversation_cache()
+        conversation_cache.append(session_id, "user", question)
+        conversation_cache.append(session_id, "assistant", answer)
         print(f"💾 Chat history saved successfully!")
         
         return (session_id, user_message_id, assistant_message_id)
@@ -2334,6 +2340,42 @@ async def save_chat_interaction(
         return (session_id, None, None)
 
 
+def build_article_lookup_answer(articles: List[Dict], language: str) -> tuple[str, List[str]]:
+    """
+    Verbatim answer for a direct citation question ("Art. 36 FC", "RA 9262 Sec 5")
+    straight from the article index, with no retrieval or completion call.
+    Returns: (answer, follow_up_questions)
+    """
+    if language == "tagalog":
+        intro = "Narito po ang eksaktong teksto ng " + (
+            "artikulong hinanap ninyo:" if len(articles) == 1 else "mga artikulong hinanap ninyo:"
+        )
+    else:
+        intro = "Here is the exact text of the " + (
+            "provision you asked about:" if len(articles) == 1 else "provisions you asked about:"
+        )
+
+    parts = [intro]
+    for article in articles:
+        parts.append(f"**{article_heading(article)}**\n\n{article['text']}")
+        if article.get("source_url"):
+            parts.append(f"(Source: {article['source_url']})")
+
+    first = articles[0]
+    citation = f"{first['label']} {first['number']} of the {first['law_name']}"
+    if language == "tagalog":
+        follow_up_questions = [
+            f"Ano ang ibig sabihin ng {citation} sa simpleng salita?",
+            f"Paano ginagamit ang {citation} sa totoong sitwasyon?",
+        ]
+    else:
+        follow_up_questions = [
+            f"What does {citation} mean in plain terms?",
+            f"How is {citation} applied in practice?",
+        ]
+    return "\n\n".join(parts), follow_up_questions
+
+
 def extract_conversation_reference(question: str) -> tuple[bool, str]:
     """
     Check if the user is referencing a past conversation or topic.
@@ -2378,8 +2420,12 @@ def extract_conversation_reference(question: str) -> tuple[bool, str]:
 
 async def get_conversation_history_from_db(chat_service, session_id: str, limit: int = 12) -> List[Dict[str, str]]:
     """
-    Retrieve conversation history from database for better context continuity.
+    Retrieve conversation history for better context continuity.
     Returns messages in OpenAI format: [{"role": "user", "content": "..."}, ...]
+    
+    Served from the per-session conversation cache; the database is only queried
+    the first time a session is seen by this process. Turns older than the cached
+    window come back as a single summary message so the prompt stays bounded.
     """
     if not session_id:
         return []
@@ -2387,25 +2433,20 @@ async def get_conversation_history_from_db(chat_service, session_id: str, limit:
     try:
         print(f"🔍 Retrieving conversation history from session: {session_id}")
         
-        # Get recent messages from the session (excluding the current question)
-        messages = await chat_service.get_session_messages(
-            session_id=UUID(session_id),
-            limit=limit
+        # The current question is saved after the answer is generated,
+        # so every cached turn is previous conversation
+        conversation_history = await get_conversation_cache().get_history(
+            chat_service,
+            session_id,
+            limit=limit,
+            max_chars=500  # Limit content length for efficiency
         )
         
-        if not messages:
+        if not conversation_history:
             print(f"   ℹ️ No previous messages found in session")
             return []
         
-        # Convert to OpenAI format and exclude the very last message (current question)
-        conversation_history = []
-        for msg in messages[:-1]:  # Exclude last message (current question)
-            conversation_history.append({
-                "role": msg.role,
-                "content": msg.content[:500]  # Limit content length for efficiency
-            })
-        
-        print(f"   ✅ Retrieved {len(conversation_history)} messages from database")
+        print(f"   ✅ Retrieved {len(conversation_history)} messages from conversation cache")
         return conversation_history
         
     except Exception as e:
@@ -3045,6 +3086,40 @@ async def ask_legal_question(
                 # Fail-open: Continue without moderation if service fails
                 print(f"⚠️  Content moderation failed, continuing without moderation: {e}")
         
+        # STEP 4.6: Direct citations ("Art. 36 FC", "RA 9262 Sec 5") from the prebuilt article index
+        cited_articles, _ = get_article_lookup().resolve(request.question)
+        if cited_articles:
+            print(f"\n📖 [STEP 4.6] Cited articles: {', '.join(a['law_name'] + ' ' + a['number'] for a in cited_articles)}")
+
+            # Asking for the wording itself: answer verbatim, no retrieval or completion
+            if is_verbatim_request(request.question):
+                lookup_answer, lookup_followups = build_article_lookup_answer(cited_articles, language)
+                lookup_sources = [to_source(article) for article in cited_articles]
+
+                session_id, user_msg_id, assistant_msg_id = await save_chat_interaction(
+                    chat_service=chat_history_service,
+                    effective_user_id=effective_user_id,
+                    session_id=request.session_id,
+                    question=request.question,
+                    answer=lookup_answer,
+                    language=language,
+                    metadata={"type": "article_lookup", "sources": lookup_sources, "confidence": "high"}
+                )
+
+                print(f"⏱️  TOTAL TIME: {time.time() - perf_start:.2f}s (article lookup)")
+                return create_chat_response(
+                    answer=lookup_answer,
+                    sources=[SourceCitation(**src) for src in lookup_sources],
+                    confidence="high",
+                    simplified_summary="Verbatim text from the article index",
+                    legal_disclaimer=get_legal_disclaimer(language, request.question, lookup_answer),
+                    follow_up_questions=lookup_followups,
+                    session_id=session_id,
+                    message_id=assistant_msg_id,
+                    user_message_id=user_msg_id,
+                    guest_session_token=guest_session_token
+                )
+
         # Check if this is a conversation context question (handle specially)
         if is_conversation_context_question(request.question):
             print(f"\n💬 [CONVERSATION CONTEXT] Detected conversation context question")
@@ -3071,15 +3146,18 @@ async def ask_legal_question(
                         detailed_context = []
                         
                         for i, session in enumerate(user_sessions.sessions[:4]):  # Show last 4 conversations
-                            # Get more messages from each session for better context
-                            session_with_messages = await chat_history_service.get_session_with_messages(
-                                session_id=session.id,
-                                message_limit=8  # Get first 4 exchanges for better context
-                            )
+                            # Opening turns come from the conversation cache when this process
+                            # saw the session from its first message; otherwise hit the database
+                            messages = get_conversation_cache().peek_opening(session.id)
+                            if messages is None:
+                                session_with_messages = await chat_history_service.get_session_with_messages(
+                                    session_id=session.id,
+                                    message_limit=8  # Get first 4 exchanges for better context
+                                )
+                                if session_with_messages:
+                                    messages = session_with_messages.messages
                             
-                            if session_with_messages and session_with_messages.messages:
-                                messages = session_with_messages.messages
-                                
+                            if messages:
                                 # Get user questions and assistant responses
                                 user_questions = [msg for msg in messages if msg.role == 'user']
                                 assistant_responses = [msg for msg in messages if msg.role == 'assistant']
@@ -3395,6 +3473,22 @@ async def ask_legal_question(
             print(f"   🌐 Web search triggered: {rag_metadata['search_strategy']}")
             print(f"   📊 Qdrant: {rag_metadata['qdrant_results']}, Web: {rag_metadata['web_results']}")
         
+        # Pin the articles the question cites ahead of whatever retrieval found
+        if cited_articles:
+            pinned_sources = [to_source(article) for article in cited_articles]
+            pinned_context = "\n\n".join(
+                f"[Cited {i}: {article_heading(article)}]"
+                + (f"\n[URL: {article['source_url']}]" if article.get('source_url') else "")
+                + f"\n{article['text']}\n"
+                for i, article in enumerate(cited_articles, 1)
+            )
+            pinned_keys = {(src['source'], src['article_number']) for src in pinned_sources}
+            sources = pinned_sources + [
+                src for src in sources if (src.get('source'), str(src.get('article_number'))) not in pinned_keys
+            ]
+            context = f"{pinned_context}\n\n{context}" if context else pinned_context
+            print(f"   📌 Pinned {len(pinned_sources)} cited article(s) into the context")
+        
         # Check if we have sufficient context
         if not sources or len(sources) == 0:
             # No relevant sources found
@@ -0,0 +1,170 @@
+"""
+Local Supabase JWT verification for AI.ttorney
+Validates access tokens in-process instead of calling /auth/v1/user
+
+HS256 tokens are checked against the project JWT secret (SUPABASE_JWT_SECRET).
+Asymmetric tokens (RS256/ES256) are checked against the project's JWKS, which
+is cached and refetched when it expires or when a token arrives signed with a
+key id we have not seen yet (key rotation). Refetches on unknown key ids are
+rate limited so forged kids cannot be used to hammer the JWKS endpoint.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+import jwt
+
+logger = logging.getLogger(__name__)
+
+ASYMMETRIC_ALGORITHMS = {"RS256", "ES256"}
+
+
+class SupabaseJWTVerifier:
+    """Verifies Supabase access tokens with the project secret or JWKS"""
+
+    JWKS_TTL_SECONDS = 600
+    JWKS_REFRESH_COOLDOWN_SECONDS = 30
+    LEEWAY_SECONDS = 30
+
+    def __init__(
+        self,
+        supabase_url: Optional[str] = None,
+        jwt_secret: Optional[str] = None,
+        audience: str = "authenticated"
+    ):
+        supabase_url = (supabase_url or os.getenv("SUPABASE_URL") or "").rstrip("/")
+        self.jwt_secret = jwt_secret or os.getenv("SUPABASE_JWT_SECRET")
+        self.audience = audience
+        self.issuer = f"{supabase_url}/auth/v1" if supabase_url else None
+        self.jwks_url = f"{supabase_url}/auth/v1/.well-known/jwks.json" if supabase_url else None
+
+        self._keys: Dict[str, Any] = {}
+        self._keys_fetched_at: Optional[float] = None
+        self._last_refresh_attempt = float("-inf")  # monotonic() can start near 0 after boot
+        self._refresh_lock = asyncio.Lock()
+
+        # Stats
+        self.verified = 0
+        self.rejected = 0
+        self.jwks_fetches = 0
+
+    async def verify(self, token: str) -> Dict[str, Any]:
+        """
+        Return the token's claims.
+
+        Raises:
+            jwt.InvalidTokenError: bad signature, expired, wrong audience or
+                issuer, unsupported algorithm, or unknown signing key
+        """
+        try:
+            header = jwt.get_unverified_header(token)
+            algorithm = header.get("alg")
+
+            if algorithm == "HS256":
+                if not self.jwt_secret:
+                    raise jwt.InvalidTokenError("HS256 token but SUPABASE_JWT_SECRET is not set")
+                key = self.jwt_secret
+            elif algorithm in ASYMMETRIC_ALGORITHMS:
+                key = await self._get_signing_key(header.get("kid"))
+            else:
+                raise jwt.InvalidAlgorithmError(f"Unsupported token algorithm: {algorithm}")
+
+            claims = jwt.decode(
+                token,
+                key,
+                algorithms=[algorithm],
+                audience=self.audience,
+                issuer=self.issuer,
+                leeway=self.LEEWAY_SECONDS,
+                options={"require": ["exp", "sub"]}
+            )
+            self.verified += 1
+            return claims
+        except jwt.InvalidTokenError:
+            self.rejected += 1
+            raise
+
+    # ============================================
+    # JWKS
+    # ============================================
+
+    async def _get_signing_key(self, kid: Optional[str]):
+        if not kid:
+            raise jwt.InvalidTokenError("Token has no key id")
+
+        expired = (
+            self._keys_fetched_at is None
+            or time.monotonic() - self._keys_fetched_at > self.JWKS_TTL_SECONDS
+        )
+        if expired or kid not in self._keys:
+            await self._refresh_jwks()
+
+        key = self._keys.get(kid)
+        if key is None:
+            raise jwt.InvalidTokenError(f"Unknown signing key: {kid}")
+        return key
+
+    async def _refresh_jwks(self):
+        """Fetch the JWKS; previously fetched keys stay usable if this fails"""
+        if not self.jwks_url:
+            raise jwt.InvalidTokenError("SUPABASE_URL is not set; cannot fetch JWKS")
+
+        async with self._refresh_lock:
+            now = time.monotonic()
+            if now - self._last_refresh_attempt < self.JWKS_REFRESH_COOLDOWN_SECONDS:
+                return
+            self._last_refresh_attempt = now
+
+            try:
+                async with httpx.AsyncClient(timeout=5.0) as client:
+                    response = await client.get(self.jwks_url)
+                    response.raise_for_status()
+                jwk_set = jwt.PyJWKSet.from_dict(response.json())
+            except Exception as e:
+                logger.warning(f"🔐 JWKS refresh failed, keeping {len(self._keys)} cached keys: {e}")
+                return
+
+            self._keys = {k.key_id: k.key for k in jwk_set.keys if k.key_id}
+            self._keys_fetched_at = now
+            self.jwks_fetches += 1
+            logger.info(f"🔐 Loaded {len(self._keys)} JWKS signing keys")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "verified": self.verified,
+            "rejected": self.rejected,
+            "jwks_keys": len(self._keys),
+            "jwks_fetches": self.jwks_fetches,
+            "hs256_enabled": bool(self.jwt_secret),
+        }
+
+
+def claims_to_user(claims: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape verified claims like the /auth/v1/user response the routes expect"""
+    return {
+        "id": claims["sub"],
+        "aud": claims.get("aud"),
+        "role": claims.get("role"),
+        "email": claims.get("email"),
+        "phone": claims.get("phone"),
+        "app_metadata": claims.get("app_metadata") or {},
+        "user_metadata": claims.get("user_metadata") or {},
+        "is_anonymous": claims.get("is_anonymous", False),
+        "session_id": claims.get("session_id"),
+    }
+
+
+# Singleton instance
+_jwt_verifier: Optional[SupabaseJWTVerifier] = None
+
+
+def get_jwt_verifier() -> SupabaseJWTVerifier:
+    """Get or create SupabaseJWTVerifier singleton"""
+    global _jwt_verifier
+    if _jwt_verifier is None:
+        _jwt_verifier = SupabaseJWTVerifier()
+    return _jwt_verifier
@@ -1,28 +1,59 @@
 from services.supabase_service import SupabaseService
 from auth.models import UserSignUp, UserSignIn, UserResponse
+from auth.jwt_verifier import get_jwt_verifier, claims_to_user
 from typing import Optional, Dict, Any
+from cachetools import TTLCache
 import logging
 import hashlib
-import time
+import os
+import jwt
 
 logger = logging.getLogger(__name__)
 
+# "remote" asks Supabase Auth (/auth/v1/user) about every uncached token;
+# "local" verifies the JWT signature in-process (see auth/jwt_verifier.py)
+AUTH_VERIFICATION_MODE = os.getenv("AUTH_VERIFICATION_MODE", "remote").lower()
+
 # Authentication cache to prevent repetitive user lookups
-_auth_cache = {}  # token_hash -> (user_data, timestamp)
 AUTH_CACHE_DURATION = 30  # 30 seconds cache for auth data
+_auth_cache = TTLCache(maxsize=10000, ttl=AUTH_CACHE_DURATION)  # token_hash -> auth user
+
+# Profiles (role, account_status, ...) are cached per user and dropped through
+# invalidate_user_profile (services.user_status_service.invalidate_user_status
+# for account status changes)
+PROFILE_CACHE_DURATION = 60
+_profile_cache = TTLCache(maxsize=10000, ttl=PROFILE_CACHE_DURATION)  # user_id -> profile
+
+# Signed-out tokens stay cryptographically valid until they expire, so local
+# mode remembers them here (Supabase access tokens live for an hour)
+_revoked_tokens = TTLCache(maxsize=10000, ttl=3600)
+
+def _hash_token(access_token: str) -> str:
+    return hashlib.sha256(access_token.encode()).hexdigest()[:16]
 
 def clear_auth_cache(access_token: str = None):
     """Clear authentication cache for a specific token or all tokens"""
-    global _auth_cache
     if access_token:
-        token_hash = hashlib.sha256(access_token.encode()).hexdigest()[:16]
-        if token_hash in _auth_cache:
-            del _auth_cache[token_hash]
+        token_hash = _hash_token(access_token)
+        if _auth_cache.pop(token_hash, None) is not None:
             logger.debug(f"Auth cache cleared for token {token_hash}")
     else:
         _auth_cache.clear()
+        _profile_cache.clear()
         logger.debug("All auth cache cleared")
 
+def revoke_token(access_token: str):
+    """Reject a signed-out token for the rest of its lifetime"""
+    token_hash = _hash_token(access_token)
+    _revoked_tokens[token_hash] = True
+    _auth_cache.pop(token_hash, None)
+
+def invalidate_user_profile(user_id: str):
+    """Drop a user's cached profile after a role or account status change"""
+    if user_id:
+        _profile_cache.pop(str(user_id), None)
+        logger.debug(f"Profile cache cleared for user {str(user_id)[:8]}...")
+
 class AuthService:
     def __init__(self):
         self.supabase = SupabaseService()
@@ -225,7 +256,7 @@ class AuthService:
         try:
             response = await self.supabase.sign_out(access_token)
             # Clear auth cache for this token
-            clear_auth_cache(access_token)
+            revoke_token(access_token)
             return response
         except Exception as e:
             logger.error(f"Sign out error: {str(e)}")
@@ -235,47 +266,57 @@ class AuthService:
     async def get_user(access_token: str) -> Optional[Dict[str, Any]]:
         """Get current user from token with caching"""
         try:
-            # Create cache key from token hash
-            token_hash = hashlib.sha256(access_token.encode()).hexdigest()[:16]
-            current_time = time.time()
-            
-            # Check cache first
-            if token_hash in _auth_cache:
-                user_data, timestamp = _auth_cache[token_hash]
-                age = current_time - timestamp
-                if age < AUTH_CACHE_DURATION:
-                    if __debug__:
-                        logger.info(f"🔐 USING CACHED AUTH for user {user_data.get('user', {}).get('id', 'unknown')[:8]}... (age: {age:.1f}s)")
-                    return user_data
-            
-            # Fetch from Supabase
-            supabase_service = SupabaseService()
-            user_response = await supabase_service.get_user(access_token)
-            
-            if not user_response["success"]:
-                return None
-            
-            user = user_response["data"]
+            token_hash = _hash_token(access_token)
             
-            # Get profile from public.users table
-            profile_response = await supabase_service.get_user_profile(user["id"])
+            user = _auth_cache.get(token_hash)
+            if user is None:
+                user = await AuthService._verify_token(access_token, token_hash)
+                if user is None:
+                    return None
+                _auth_cache[token_hash] = user
             
-            user_data = {
+            return {
                 "user": user,
-                "profile": profile_response["data"] if profile_response["success"] else None
+                "profile": await AuthService.get_profile(user["id"])
             }
             
-            # Cache the result
-            _auth_cache[token_hash] = (user_data, current_time)
-            if __debug__:
-                logger.info(f"🔐 CACHED AUTH for user {user.get('id', 'unknown')[:8]}... (30s duration)")
-            
-            return user_data
-            
         except Exception as e:
             logger.error(f"Get user error: {str(e)}")
             return None
     
+    @staticmethod
+    async def _verify_token(access_token: str, token_hash: str) -> Optional[Dict[str, Any]]:
+        """Resolve the auth user for a token, locally or via Supabase Auth"""
+        if AUTH_VERIFICATION_MODE == "local":
+            if token_hash in _revoked_tokens:
+                return None
+            try:
+                claims = await get_jwt_verifier().verify(access_token)
+            except jwt.InvalidTokenError as e:
+                logger.debug(f"🔐 Token rejected: {e}")
+                return None
+            return claims_to_user(claims)
+        
+        user_response = await SupabaseService().get_user(access_token)
+        if not user_response["success"]:
+            return None
+        return user_response["data"]
+    
+    @staticmethod
+    async def get_profile(user_id: str) -> Optional[Dict[str, Any]]:
+        """Get a user's public.users profile through the bounded profile cache"""
+        profile = _profile_cache.get(user_id)
+        if profile is not None:
+            return profile
+        
+        profile_response = await SupabaseService().get_user_profile(user_id)
+        if not profile_response["success"]:
+            return None
+        
+        profile = profile_response["data"]
+        _profile_cache[user_id] = profile
+        return profile
+    
     async def reset_password(self, email: str) -> Dict[str, Any]:
         """Send password reset email"""
         try:
@@ -311,6 +352,8 @@ class AuthService:
             if not profile_update_response["success"]:
                 return profile_update_response
             
+            invalidate_user_profile(user_id)
+            
             # Step 2: Confirm email in Supabase Auth to complete the verification process
             if user_id:
                 auth_confirm_response = await self.supabase.confirm_user_email(user_id)
@@ -353,6 +396,7 @@ class AuthService:
                 {"role": final_role},
                 {"email": email}
             )
+            invalidate_user_profile(profile.get("id"))
             return response
         except Exception as e:
             logger.error(f"Update user role error: {str(e)}")
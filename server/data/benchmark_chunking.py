@@ -0,0 +1,224 @@
+"""
+Chunking Benchmark for AI.ttorney Legal Chatbot
+
+Compares retrieval hit rate of the previous character chunker (500 characters,
+50 overlap, full law header on every chunk) with the structure-aware token
+chunker in preprocess_data.py, over the same normalized articles from raw/.
+
+Queries are built from the corpus itself, so no labelled data is needed:
+- title queries: an article's title ("Grounds for legal separation")
+- passage queries: a sentence from the second half of a multi-sentence
+  article, i.e. text that the character chunker tends to cut away from the
+  article header
+
+A query is a hit at k when one of the top k chunks belongs to the article it
+came from. Retrieval is BM25 by default (offline, free); --embeddings ranks
+with text-embedding-3-small instead (needs OPENAI_API_KEY, embeds both corpora).
+
+Usage:
+    python benchmark_chunking.py
+    python benchmark_chunking.py --queries 300 --k 5
+    python benchmark_chunking.py --embeddings
+"""
+
+import argparse
+import math
+import random
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from preprocess_data import (
+    RAW_DATA_DIR,
+    chunk_article,
+    clean_text,
+    count_tokens,
+    read_articles,
+    split_sentences,
+)
+
+LEGACY_CHUNK_SIZE = 500
+LEGACY_CHUNK_OVERLAP = 50
+TERM_PATTERN = re.compile(r'\w+')
+
+
+# ============================================
+# Corpora
+# ============================================
+
+def load_articles() -> List[Dict[str, Any]]:
+    articles = []
+    for json_file in sorted(RAW_DATA_DIR.glob("*.json")):
+        for article in read_articles(json_file):
+            article['body'] = ' '.join(p for p in (clean_text(p) for p in article['paragraphs']) if p)
+            if article['body']:
+                articles.append(article)
+    return articles
+
+
+def legacy_chunks(articles: List[Dict[str, Any]]) -> List[Tuple[str, str]]:
+    """(parent_id, text) as the character chunker produced them"""
+    chunks = []
+    step = LEGACY_CHUNK_SIZE - LEGACY_CHUNK_OVERLAP
+    for article in articles:
+        header = f"{article['law']}\n{article['label']} {article['number']}"
+        if article.get('title'):
+            header += f": {article['title']}"
+        full_text = header + '\n' + '\n'.join(article.get('context', [])) + '\n\n' + article['body']
+        for i in range(0, len(full_text), step):
+            chunks.append((article['parent_id'], full_text[i:i + LEGACY_CHUNK_SIZE]))
+            if i + LEGACY_CHUNK_SIZE >= len(full_text):
+                break
+    return chunks
+
+
+def structured_chunks(articles: List[Dict[str, Any]]) -> List[Tuple[str, str]]:
+    return [
+        (item['metadata']['parent_id'], item['text'])
+        for article in articles
+        for item in chunk_article(article)
+    ]
+
+
+def build_queries(articles: List[Dict[str, Any]], count: int, seed: int) -> List[Tuple[str, str, str]]:
+    """(kind, query, parent_id), half title queries and half passage queries"""
+    rng = random.Random(seed)
+    titled = [a for a in articles if a.get('title')]
+    passages = []
+    for article in articles:
+        sentences = [s for s in split_sentences(article['body']) if len(s.split()) >= 6]
+        if len(sentences) >= 3:
+            sentence = rng.choice(sentences[len(sentences) // 2:])
+            passages.append((article, ' '.join(sentence.split()[:25])))
+
+    queries = [('title', a['title'], a['parent_id']) for a in rng.sample(titled, min(count // 2, len(titled)))]
+    queries += [('passage', text, a['parent_id']) for a, text in rng.sample(passages, min(count - len(queries), len(passages)))]
+    return queries
+
+
+# ============================================
+# Retrievers
+# ============================================
+
+class BM25:
+    def __init__(self, texts: List[str], k1: float = 1.5, b: float = 0.75):
+        self.k1, self.b = k1, b
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self.lengths = []
+        for doc, text in enumerate(texts):
+            terms = Counter(TERM_PATTERN.findall(text.lower()))
+            self.lengths.append(sum(terms.values()))
+            for term, tf in terms.items():
+                self.postings[term].append((doc, tf))
+        self.avg_length = sum(self.lengths) / max(len(self.lengths), 1)
+        n = len(texts)
+        self.idf = {t: math.log(1 + (n - len(p) + 0.5) / (len(p) + 0.5)) for t, p in self.postings.items()}
+
+    def search(self, query: str, k: int) -> List[int]:
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(TERM_PATTERN.findall(query.lower())):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for doc, tf in self.postings[term]:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[doc] / self.avg_length)
+                scores[doc] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return sorted(scores, key=scores.get, reverse=True)[:k]
+
+
+class EmbeddingRetriever:
+    def __init__(self, texts: List[str]):
+        self.matrix = self._normalize(_embed(texts))
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+    def search_many(self, queries: List[str], k: int) -> List[List[int]]:
+        scores = self._normalize(_embed(queries)) @ self.matrix.T
+        return np.argsort(-scores, axis=1)[:, :k].tolist()
+
+
+def _embed(texts: List[str], batch_size: int = 100) -> np.ndarray:
+    from generate_embeddings import generate_embeddings_batch
+    vectors = []
+    for i in range(0, len(texts), batch_size):
+        vectors.extend(generate_embeddings_batch(texts[i:i + batch_size]))
+    return np.asarray(vectors, dtype=np.float32)
+
+
+# ============================================
+# Benchmark
+# ============================================
+
+def evaluate(chunks: List[Tuple[str, str]], queries: List[Tuple[str, str, str]], k: int, embeddings: bool) -> Dict[str, Any]:
+    parents = [parent for parent, _ in chunks]
+    texts = [text for _, text in chunks]
+
+    if embeddings:
+        rankings = EmbeddingRetriever(texts).search_many([q for _, q, _ in queries], k)
+    else:
+        index = BM25(texts)
+        rankings = [index.search(q, k) for _, q, _ in queries]
+
+    results: Dict[str, Dict[str, float]] = defaultdict(lambda: {'n': 0, 'hit1': 0, 'hitk': 0, 'mrr': 0.0})
+    for (kind, _, target), ranking in zip(queries, rankings):
+        ranks = [rank for rank, doc in enumerate(ranking, 1) if parents[doc] == target]
+        for bucket in (kind, 'all'):
+            r = results[bucket]
+            r['n'] += 1
+            if ranks:
+                r['hit1'] += ranks[0] == 1
+                r['hitk'] += 1
+                r['mrr'] += 1 / ranks[0]
+
+    tokens = [count_tokens(text) for text in texts]
+    return {
+        'chunks': len(chunks),
+        'tokens': sum(tokens),
+        'avg_tokens': sum(tokens) / max(len(tokens), 1),
+        'results': dict(results)
+    }
+
+
+def print_report(name: str, report: Dict[str, Any], k: int):
+    print(f"\n📊 {name}")
+    print(f"   Chunks: {report['chunks']}  |  Tokens to embed: {report['tokens']:,}  |  Avg tokens/chunk: {report['avg_tokens']:.0f}")
+    for bucket in ('title', 'passage', 'all'):
+        r = report['results'].get(bucket)
+        if not r or not r['n']:
+            continue
+        print(f"   {bucket:<8} n={r['n']:<4} hit@1={r['hit1'] / r['n']:.3f}  hit@{k}={r['hitk'] / r['n']:.3f}  MRR@{k}={r['mrr'] / r['n']:.3f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Retrieval hit rate of the old vs. structure-aware chunker")
+    parser.add_argument("--queries", type=int, default=600, help="Number of queries (half title, half passage)")
+    parser.add_argument("--k", type=int, default=5, help="Cut-off for hit@k and MRR")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--embeddings", action="store_true", help="Rank with OpenAI embeddings instead of BM25")
+    args = parser.parse_args()
+
+    print("🚀 Chunking benchmark")
+    print(f"🔎 Retriever: {'text-embedding-3-small' if args.embeddings else 'BM25'}")
+    print("=" * 60)
+
+    articles = load_articles()
+    queries = build_queries(articles, args.queries, args.seed)
+    print(f"📚 {len(articles)} articles, {len(queries)} queries")
+
+    for name, chunker in (("Before: 500-char windows", legacy_chunks), ("After: structure-aware token windows", structured_chunks)):
+        start = time.perf_counter()
+        chunks = chunker(articles)
+        report = evaluate(chunks, queries, args.k, args.embeddings)
+        print_report(name, report, args.k)
+        print(f"   ⏱️  {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,24 +3,50 @@ Embeddings Generation Script for AI.ttorney Legal Chatbot
 
 This script:
 1. Loads processed legal data from server/data/processed/legal_knowledge.jsonl
-2. Generates embeddings using OpenAI's text-embedding-3-small model
-3. Saves embeddings with metadata to server/data/embeddings/embeddings.pkl
-4. Creates an index for fast similarity search
+2. Generates embeddings using OpenAI's text-embedding-3-small model, but only
+   for chunks that are new or changed since the last run
+3. Saves embeddings to server/data/embeddings/:
+   - vectors.npy      float32 matrix, one row per chunk (np.load(..., mmap_mode="r"))
+   - documents.jsonl  id, content hash, text and metadata for each row, same order
+   - manifest.json    model, dimension and row count (written last)
+
+Incremental runs:
+- Every chunk is keyed by sha256(model + text). Vectors for keys that are already
+  in the store (or in a legacy embeddings.pkl) are reused, so adding one law only
+  embeds that law's chunks and changing the model re-embeds everything
+- Batches run concurrently under an adaptive rate limiter: a 429 halves the
+  concurrency and pauses every worker for the server's retry-after, and each run
+  of successes lets it creep back up
+- Each finished batch is checkpointed to embeddings/checkpoint/, so a crashed or
+  interrupted run resumes where it stopped. A batch that keeps failing is
+  reported without throwing away the others; the store is only replaced once
+  every chunk has a vector
 
 Requirements:
 - OpenAI API key in .env file (OPENAI_API_KEY)
 - Processed data from preprocess_data.py
+
+Usage:
+    python generate_embeddings.py                # incremental
+    python generate_embeddings.py --full         # re-embed every chunk
+    python generate_embeddings.py test           # sample retrieval against the store
 """
 
+import argparse
+import asyncio
+import hashlib
 import json
 import os
 import pickle
+import random
+import shutil
+import sys
+import time
 import numpy as np
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from dotenv import load_dotenv
 from tqdm import tqdm
-import time
 
 # Load environment variables
 load_dotenv()
@@ -29,13 +55,20 @@ load_dotenv()
 PROCESSED_DATA_DIR = Path(__file__).parent / "processed"
 EMBEDDINGS_DIR = Path(__file__).parent / "embeddings"
 INPUT_FILE = PROCESSED_DATA_DIR / "legal_knowledge.jsonl"
-OUTPUT_FILE = EMBEDDINGS_DIR / "embeddings.pkl"
+VECTORS_FILE = EMBEDDINGS_DIR / "vectors.npy"
+DOCUMENTS_FILE = EMBEDDINGS_DIR / "documents.jsonl"
+MANIFEST_FILE = EMBEDDINGS_DIR / "manifest.json"
+CHECKPOINT_DIR = EMBEDDINGS_DIR / "checkpoint"
+LEGACY_PICKLE_FILE = EMBEDDINGS_DIR / "embeddings.pkl"  # Pre-incremental format, read once to seed the store
 
 # OpenAI Configuration
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 EMBEDDING_MODEL = "text-embedding-3-small"  # Cost-effective, high-quality embeddings
-BATCH_SIZE = 100  # Process in batches to avoid rate limits
-RATE_LIMIT_DELAY = 1  # seconds between batches
+BATCH_SIZE = 100  # Chunks per embeddings request
+CONCURRENCY = 4  # Concurrent requests to start with
+MAX_CONCURRENCY = 8  # Ceiling for the adaptive limiter
+MAX_BATCH_ATTEMPTS = 5  # Per batch, before it is reported as failed
+COST_PER_MILLION_TOKENS = 0.02  # USD, text-embedding-3-small list price
 
 
 def load_processed_data() -> List[Dict[str, Any]]:
@@ -45,22 +78,302 @@ def load_processed_data() -> List[Dict[str, Any]]:
             f"Processed data not found at {INPUT_FILE}\n"
             "Please run preprocess_data.py first."
         )
-    
+
     data = []
     with open(INPUT_FILE, 'r', encoding='utf-8') as f:
         for line in f:
             data.append(json.loads(line))
-    
+
     return data
 
 
+def content_hash(text: str, model: str = EMBEDDING_MODEL) -> str:
+    """Cache key for a chunk: the same text embedded by the same model"""
+    return hashlib.sha256(f"{model}\x00{text}".encode('utf-8')).hexdigest()
+
+
+# ============================================
+# Embedding store (vectors.npy + documents.jsonl)
+# ============================================
+
+def load_embedding_store(mmap: bool = True) -> Optional[Tuple[np.ndarray, List[Dict[str, Any]], Dict[str, Any]]]:
+    """
+    Load (vectors, documents, manifest), or None if there is no complete store.
+    With mmap the vectors stay on disk and pages are read on access.
+    """
+    if not (MANIFEST_FILE.exists() and VECTORS_FILE.exists() and DOCUMENTS_FILE.exists()):
+        return None
+
+    with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    vectors = np.load(VECTORS_FILE, mmap_mode='r' if mmap else None)
+    with open(DOCUMENTS_FILE, 'r', encoding='utf-8') as f:
+        documents = [json.loads(line) for line in f]
+
+    if not (len(documents) == vectors.shape[0] == manifest.get('total_chunks')):
+        print(f"⚠️  Embedding store is inconsistent ({len(documents)} documents, "
+              f"{vectors.shape[0]} vectors, manifest says {manifest.get('total_chunks')}); ignoring it")
+        return None
+    return vectors, documents, manifest
+
+
+def save_embedding_store(
+    documents: List[Dict[str, Any]],
+    hashes: List[str],
+    vector_for: Dict[str, np.ndarray],
+    dimension: int
+):
+    """Write the store atomically: vectors and documents first, manifest last"""
+    EMBEDDINGS_DIR.mkdir(parents=True, exist_ok=True)
+    vectors_tmp = VECTORS_FILE.with_suffix('.npy.tmp')
+    documents_tmp = DOCUMENTS_FILE.with_suffix('.jsonl.tmp')
+    manifest_tmp = MANIFEST_FILE.with_suffix('.json.tmp')
+
+    vectors = np.lib.format.open_memmap(vectors_tmp, mode='w+', dtype=np.float32, shape=(len(documents), dimension))
+    for row, chunk_hash in enumerate(hashes):
+        vectors[row] = vector_for[chunk_hash]
+    vectors.flush()
+    del vectors
+
+    with open(documents_tmp, 'w', encoding='utf-8') as f:
+        for doc, chunk_hash in zip(documents, hashes):
+            f.write(json.dumps({
+                'id': doc['id'],
+                'content_hash': chunk_hash,
+                'text': doc['text'],
+                'metadata': doc['metadata']
+            }, ensure_ascii=False) + '\n')
+
+    with open(manifest_tmp, 'w', encoding='utf-8') as f:
+        json.dump({
+            'model': EMBEDDING_MODEL,
+            'total_chunks': len(documents),
+            'embedding_dimension': dimension,
+            'generated_at': time.strftime('%Y-%m-%d %H:%M:%S')
+        }, f, indent=2)
+
+    os.replace(vectors_tmp, VECTORS_FILE)
+    os.replace(documents_tmp, DOCUMENTS_FILE)
+    os.replace(manifest_tmp, MANIFEST_FILE)
+
+
+def _store_row_key(doc: Dict[str, Any], chunk_hash: str) -> Tuple[str, str, str]:
+    return doc['id'], chunk_hash, json.dumps(doc['metadata'], sort_keys=True)
+
+
+def _known_vectors_from_store() -> Tuple[Dict[str, np.ndarray], List[Tuple[str, str, str]]]:
+    """Vectors in the current store by hash, plus its rows (to detect a no-op run)"""
+    store = load_embedding_store(mmap=True)
+    if store is None:
+        return {}, []
+    vectors, documents, manifest = store
+    if manifest.get('model') != EMBEDDING_MODEL:
+        return {}, []
+    # Row views into the memory map; only rows that are reused get read
+    known = {doc['content_hash']: vectors[row] for row, doc in enumerate(documents)}
+    return known, [_store_row_key(doc, doc['content_hash']) for doc in documents]
+
+
+def _known_vectors_from_legacy_pickle(needed: set) -> Dict[str, np.ndarray]:
+    if not LEGACY_PICKLE_FILE.exists():
+        return {}
+    with open(LEGACY_PICKLE_FILE, 'rb') as f:
+        data = pickle.load(f)
+    model = data.get('metadata', {}).get('model')
+    if model != EMBEDDING_MODEL:
+        return {}
+    known = {}
+    for doc, vector in zip(data['documents'], data['embeddings']):
+        chunk_hash = content_hash(doc['text'], model)
+        if chunk_hash in needed:
+            known[chunk_hash] = np.asarray(vector, dtype=np.float32)
+    return known
+
+
+# ============================================
+# Checkpoints
+# ============================================
+
+def _checkpoint_batch(hashes: List[str], vectors: np.ndarray):
+    """Persist one finished batch; the .json is written last and marks it complete"""
+    CHECKPOINT_DIR.mkdir(parents=True, exist_ok=True)
+    name = hashlib.sha256(''.join(hashes).encode()).hexdigest()[:16]
+    with open(CHECKPOINT_DIR / f"{name}.npy", 'wb') as f:
+        np.save(f, vectors)
+    with open(CHECKPOINT_DIR / f"{name}.json.tmp", 'w', encoding='utf-8') as f:
+        json.dump({'model': EMBEDDING_MODEL, 'hashes': hashes}, f)
+    os.replace(CHECKPOINT_DIR / f"{name}.json.tmp", CHECKPOINT_DIR / f"{name}.json")
+
+
+def _load_checkpoints() -> Dict[str, np.ndarray]:
+    known = {}
+    if not CHECKPOINT_DIR.exists():
+        return known
+    for meta_path in CHECKPOINT_DIR.glob('*.json'):
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('model') != EMBEDDING_MODEL:
+                continue
+            vectors = np.load(meta_path.with_suffix('.npy'))
+            known.update(zip(meta['hashes'], vectors))
+        except Exception as e:
+            print(f"⚠️  Skipping unreadable checkpoint {meta_path.name}: {e}")
+    return known
+
+
+# ============================================
+# Concurrent embedding with adaptive rate limiting
+# ============================================
+
+class AdaptiveRateLimiter:
+    """
+    Concurrency limit for API calls. A 429 halves the limit and pauses every
+    caller until the server's retry-after has passed; each `limit` successes
+    in a row raise it by one, up to `maximum`.
+    """
+
+    def __init__(self, initial: int, maximum: int):
+        self.limit = max(1, initial)
+        self.maximum = max(self.limit, maximum)
+        self.active = 0
+        self.paused_until = 0.0
+        self.throttled = 0
+        self._successes = 0
+        self._cond = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._cond:
+            while True:
+                pause = self.paused_until - time.monotonic()
+                if pause > 0:
+                    try:
+                        await asyncio.wait_for(self._cond.wait(), pause)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                if self.active < self.limit:
+                    self.active += 1
+                    return
+                await self._cond.wait()
+
+    async def release(self, throttled: bool = False, retry_after: Optional[float] = None):
+        async with self._cond:
+            self.active -= 1
+            if throttled:
+                self.throttled += 1
+                self.limit = max(1, self.limit // 2)
+                self._successes = 0
+                self.paused_until = max(self.paused_until, time.monotonic() + (retry_after or 1.0))
+            else:
+                self._successes += 1
+                if self._successes >= self.limit and self.limit < self.maximum:
+                    self.limit += 1
+                    self._successes = 0
+            self._cond.notify_all()
+
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    """retry-after(-ms) from an OpenAI APIStatusError, if the server sent one"""
+    headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+    for header, scale in (('retry-after-ms', 0.001), ('retry-after', 1.0)):
+        value = headers.get(header)
+        if value:
+            try:
+                return float(value) * scale
+            except ValueError:
+                continue  # HTTP-date form; fall back to the default pause
+    return None
+
+
+def _is_retryable(error: Exception) -> bool:
+    status = getattr(error, 'status_code', None)
+    # Connection errors and timeouts have no status; 4xx other than these will not recover
+    return status is None or status in (408, 409, 429) or status >= 500
+
+
+async def _embed_batch(client, limiter: AdaptiveRateLimiter, texts: List[str]) -> Tuple[np.ndarray, int]:
+    """Embed one batch with retries; returns (vectors, tokens used)"""
+    for attempt in range(1, MAX_BATCH_ATTEMPTS + 1):
+        await limiter.acquire()
+        try:
+            response = await client.embeddings.create(model=EMBEDDING_MODEL, input=texts)
+        except Exception as e:
+            throttled = getattr(e, 'status_code', None) == 429
+            await limiter.release(throttled=throttled, retry_after=_retry_after_seconds(e))
+            if attempt == MAX_BATCH_ATTEMPTS or not _is_retryable(e):
+                raise
+            if not throttled:
+                # The limiter already pauses everyone for a 429
+                await asyncio.sleep(min(30, 2 ** attempt) * random.uniform(0.8, 1.2))
+            continue
+
+        await limiter.release()
+        vectors = np.asarray([item.embedding for item in response.data], dtype=np.float32)
+        tokens = response.usage.total_tokens if getattr(response, 'usage', None) else 0
+        return vectors, tokens
+
+
+async def embed_missing_chunks(
+    pending: List[Tuple[str, str]],
+    concurrency: int = CONCURRENCY,
+    batch_size: int = BATCH_SIZE,
+    client=None
+) -> Tuple[Dict[str, np.ndarray], int, List[str]]:
+    """
+    Embed (hash, text) pairs concurrently, checkpointing each finished batch.
+    Returns (vectors by hash, tokens used, hashes that failed).
+    """
+    owns_client = client is None
+    if owns_client:
+        from openai import AsyncOpenAI
+        client = AsyncOpenAI(api_key=OPENAI_API_KEY, max_retries=0)  # Retries are ours
+
+    limiter = AdaptiveRateLimiter(concurrency, MAX_CONCURRENCY)
+    embedded: Dict[str, np.ndarray] = {}
+    failed: List[str] = []
+    tokens_used = 0
+    progress = tqdm(total=len(pending), desc="Embedding chunks")
+
+    async def run(batch: List[Tuple[str, str]]):
+        nonlocal tokens_used
+        hashes = [chunk_hash for chunk_hash, _ in batch]
+        try:
+            vectors, tokens = await _embed_batch(client, limiter, [text for _, text in batch])
+        except Exception as e:
+            print(f"\n❌ Batch of {len(batch)} chunks failed after retries: {str(e)}")
+            failed.extend(hashes)
+            return
+        _checkpoint_batch(hashes, vectors)
+        embedded.update(zip(hashes, vectors))
+        tokens_used += tokens
+        progress.update(len(batch))
+
+    try:
+        await asyncio.gather(*(
+            run(pending[i:i + batch_size]) for i in range(0, len(pending), batch_size)
+        ))
+    finally:
+        progress.close()
+        if owns_client:
+            await client.close()
+
+    if limiter.throttled:
+        print(f"⚠️  Rate limited {limiter.throttled} times; finished at concurrency {limiter.limit}")
+    return embedded, tokens_used, failed
+
+
+# ============================================
+# Main
+# ============================================
+
 def generate_embeddings_batch(texts: List[str]) -> List[List[float]]:
     """
-    Generate embeddings for a batch of texts using OpenAI API
-    
+    Generate embeddings for a batch of texts using OpenAI API (blocking)
+
     Args:
         texts: List of text strings to embed
-    
+
     Returns:
         List of embedding vectors
     """
@@ -68,15 +381,15 @@ def generate_embeddings_batch(texts: List[str]) -> List[List[float]]:
         # Initialize OpenAI client without proxies parameter
         from openai import OpenAI
         client = OpenAI(api_key=OPENAI_API_KEY)
-        
+
         response = client.embeddings.create(
             model=EMBEDDING_MODEL,
             input=texts
         )
-        
+
         embeddings = [item.embedding for item in response.data]
         return embeddings
-        
+
     except Exception as e:
         print(f"❌ Error generating embeddings: {str(e)}")
         raise
@@ -90,156 +403,173 @@ def cosine_similarity(vec1: np.ndarray, vec2: np.ndarray) -> float:
     return dot_product / (norm1 * norm2)
 
 
-def generate_all_embeddings():
+def generate_all_embeddings(
+    full: bool = False,
+    concurrency: int = CONCURRENCY,
+    batch_size: int = BATCH_SIZE
+) -> int:
     """
-    Main function to generate embeddings for all processed data
+    Main function to generate embeddings for all processed data.
+    Returns a process exit code (1 if some chunks could not be embedded).
     """
-    # Validate API key
-    if not OPENAI_API_KEY:
-        raise ValueError(
-            "OPENAI_API_KEY not found in environment variables.\n"
-            "Please add it to your .env file."
-        )
-    
     # Ensure directories exist
     EMBEDDINGS_DIR.mkdir(parents=True, exist_ok=True)
-    
+
     print("🚀 Starting embeddings generation for AI.ttorney Legal Chatbot")
     print(f"📂 Input file: {INPUT_FILE}")
-    print(f"📂 Output file: {OUTPUT_FILE}")
+    print(f"📂 Output: {VECTORS_FILE.name} + {DOCUMENTS_FILE.name} in {EMBEDDINGS_DIR}")
     print(f"🤖 Model: {EMBEDDING_MODEL}")
+    print(f"🔁 Mode: {'full re-embed' if full else 'incremental'}")
     print("=" * 60)
-    
+    start = time.perf_counter()
+
     # Load processed data
     print("\n📥 Loading processed data...")
     data = load_processed_data()
-    print(f"✅ Loaded {len(data)} text chunks")
-    
-    # Extract texts and prepare for embedding
-    texts = [item['text'] for item in data]
-    
-    # Generate embeddings in batches
-    print(f"\n🔄 Generating embeddings in batches of {BATCH_SIZE}...")
-    all_embeddings = []
-    
-    for i in tqdm(range(0, len(texts), BATCH_SIZE), desc="Processing batches"):
-        batch_texts = texts[i:i + BATCH_SIZE]
-        
-        try:
-            batch_embeddings = generate_embeddings_batch(batch_texts)
-            all_embeddings.extend(batch_embeddings)
-            
-            # Rate limiting
-            if i + BATCH_SIZE < len(texts):
-                time.sleep(RATE_LIMIT_DELAY)
-                
-        except Exception as e:
-            print(f"\n❌ Error processing batch {i // BATCH_SIZE + 1}: {str(e)}")
-            print("Stopping embeddings generation.")
-            return
-    
-    print(f"\n✅ Generated {len(all_embeddings)} embeddings")
-    
-    # Convert to numpy array for efficient operations
-    embeddings_array = np.array(all_embeddings, dtype=np.float32)
-    
-    # Prepare data structure for saving
-    embeddings_data = {
-        'embeddings': embeddings_array,
-        'documents': data,
-        'metadata': {
-            'model': EMBEDDING_MODEL,
-            'total_chunks': len(data),
-            'embedding_dimension': len(all_embeddings[0]),
-            'generated_at': time.strftime('%Y-%m-%d %H:%M:%S')
-        }
-    }
-    
-    # Save embeddings
-    print(f"\n💾 Saving embeddings to {OUTPUT_FILE}...")
-    with open(OUTPUT_FILE, 'wb') as f:
-        pickle.dump(embeddings_data, f)
-    
-    print("✅ Embeddings saved successfully!")
-    
+    hashes = [content_hash(item['text']) for item in data]
+    print(f"✅ Loaded {len(data)} text chunks ({len(set(hashes))} unique)")
+
+    # Reuse every vector we already have for an identical (model, text)
+    known: Dict[str, np.ndarray] = {}
+    store_rows: List[Tuple[str, str, str]] = []
+    if not full:
+        from_store, store_rows = _known_vectors_from_store()
+        known.update(from_store)
+    from_checkpoints = _load_checkpoints()
+    known.update(from_checkpoints)
+    missing = {h for h in hashes if h not in known}
+    if missing and not full:
+        from_legacy = _known_vectors_from_legacy_pickle(missing)
+        if from_legacy:
+            print(f"♻️  Seeded {len(from_legacy)} vectors from legacy {LEGACY_PICKLE_FILE.name}")
+        known.update(from_legacy)
+
+    # One request per unique missing text, in document order
+    pending: List[Tuple[str, str]] = []
+    queued = set()
+    for item, chunk_hash in zip(data, hashes):
+        if chunk_hash not in known and chunk_hash not in queued:
+            pending.append((chunk_hash, item['text']))
+            queued.add(chunk_hash)
+
+    reused = len(set(hashes)) - len(pending)
+    print(f"♻️  Reusing {reused} vectors ({len(from_checkpoints)} from an interrupted run)")
+    print(f"🆕 {len(pending)} chunks to embed")
+
+    tokens_used = 0
+    failed: List[str] = []
+    if pending:
+        # Validate API key
+        if not OPENAI_API_KEY:
+            raise ValueError(
+                "OPENAI_API_KEY not found in environment variables.\n"
+                "Please add it to your .env file."
+            )
+        print(f"\n🔄 Embedding in batches of {batch_size}, up to {concurrency} concurrent requests...")
+        embedded, tokens_used, failed = asyncio.run(
+            embed_missing_chunks(pending, concurrency=concurrency, batch_size=batch_size)
+        )
+        known.update(embedded)
+
+    if failed:
+        print(f"\n❌ {len(failed)} chunks could not be embedded. Finished batches are checkpointed;")
+        print("   re-run the script to retry only what is missing. The existing store was left unchanged.")
+        return 1
+
+    dimension = len(next(iter(known.values())))
+    if not pending and store_rows == [_store_row_key(doc, h) for doc, h in zip(data, hashes)]:
+        print("\n✅ Embedding store already up to date")
+    else:
+        print(f"\n💾 Writing {len(data)} vectors to {VECTORS_FILE}...")
+        save_embedding_store(data, hashes, known, dimension)
+        print("✅ Embeddings saved successfully!")
+
+    # The store now holds everything the checkpoints did
+    if CHECKPOINT_DIR.exists():
+        shutil.rmtree(CHECKPOINT_DIR)
+
     # Print summary
     print("\n" + "=" * 60)
     print("📊 SUMMARY")
     print("=" * 60)
-    print(f"Total chunks embedded: {len(data)}")
-    print(f"Embedding dimension: {len(all_embeddings[0])}")
+    print(f"Total chunks: {len(data)}")
+    print(f"Reused: {reused}")
+    print(f"Embedded this run: {len(pending)}")
+    print(f"Tokens used: {tokens_used:,} (~${tokens_used / 1_000_000 * COST_PER_MILLION_TOKENS:.4f})")
+    print(f"Embedding dimension: {dimension}")
     print(f"Model used: {EMBEDDING_MODEL}")
-    print(f"Output file size: {OUTPUT_FILE.stat().st_size / (1024 * 1024):.2f} MB")
-    
+    print(f"Vectors file size: {VECTORS_FILE.stat().st_size / (1024 * 1024):.2f} MB")
+    print(f"Elapsed: {time.perf_counter() - start:.1f}s")
+
     # Calculate and display sources
     sources = {}
     for item in data:
         source = item['metadata']['source']
         sources[source] = sources.get(source, 0) + 1
-    
+
     print("\n📈 Embeddings by source:")
     for source, count in sources.items():
         print(f"  - {source}: {count} chunks")
-    
-    print("\n✨ Ready for retrieval! You can now use these embeddings in main.py")
+
+    print("\n✨ Ready for retrieval! Run upload_to_qdrant.py to sync the vector store")
+    return 0
 
 
 def test_embeddings():
     """
     Test function to verify embeddings work correctly
     """
-    if not OUTPUT_FILE.exists():
-        print("❌ Embeddings file not found. Run generate_all_embeddings() first.")
+    store = load_embedding_store(mmap=True)
+    if store is None:
+        print("❌ Embedding store not found. Run generate_all_embeddings() first.")
         return
-    
+
     print("\n🧪 Testing embeddings...")
-    
-    with open(OUTPUT_FILE, 'rb') as f:
-        embeddings_data = pickle.load(f)
-    
-    embeddings = embeddings_data['embeddings']
-    documents = embeddings_data['documents']
-    
+
+    embeddings, documents, manifest = store
+
     print(f"✅ Loaded {len(embeddings)} embeddings")
     print(f"✅ Embedding dimension: {embeddings.shape[1]}")
-    
+
     # Test query
     test_query = "What are consumer rights?"
     print(f"\n🔍 Test query: '{test_query}'")
-    
+
     # Generate query embedding
-    client = openai.OpenAI(api_key=OPENAI_API_KEY)
-    query_response = client.embeddings.create(
-        model=EMBEDDING_MODEL,
-        input=[test_query]
+    query_embedding = np.array(generate_embeddings_batch([test_query])[0], dtype=np.float32)
+
+    # Calculate similarities (one matrix-vector product over the memory map)
+    similarities = (embeddings @ query_embedding) / (
+        np.linalg.norm(embeddings, axis=1) * np.linalg.norm(query_embedding)
     )
-    query_embedding = np.array(query_response.data[0].embedding)
-    
-    # Calculate similarities
-    similarities = []
-    for i, emb in enumerate(embeddings):
-        sim = cosine_similarity(query_embedding, emb)
-        similarities.append((i, sim))
-    
+
     # Get top 3 results
-    similarities.sort(key=lambda x: x[1], reverse=True)
-    top_results = similarities[:3]
-    
+    top_results = np.argsort(-similarities)[:3]
+
     print("\n📋 Top 3 most relevant chunks:")
-    for rank, (idx, score) in enumerate(top_results, 1):
+    for rank, idx in enumerate(top_results, 1):
         doc = documents[idx]
-        print(f"\n{rank}. Score: {score:.4f}")
+        print(f"\n{rank}. Score: {similarities[idx]:.4f}")
         print(f"   Source: {doc['metadata']['source']}")
         print(f"   Article: {doc['metadata'].get('article_number', 'N/A')}")
         print(f"   Text preview: {doc['text'][:150]}...")
-    
+
     print("\n✅ Embeddings test complete!")
 
 
-if __name__ == "__main__":
-    import sys
-    
-    if len(sys.argv) > 1 and sys.argv[1] == "test":
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Generate embeddings for the legal knowledge base")
+    parser.add_argument("command", nargs="?", choices=["generate", "test"], default="generate")
+    parser.add_argument("--full", action="store_true", help="Re-embed every chunk instead of only new or changed ones")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY, help="Concurrent requests to start with")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Chunks per embeddings request")
+    args = parser.parse_args()
+
+    if args.command == "test":
         test_embeddings()
-    else:
-        generate_all_embeddings()
+        return 0
+    return generate_all_embeddings(full=args.full, concurrency=args.concurrency, batch_size=args.batch_size)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
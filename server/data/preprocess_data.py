@@ -2,448 +2,503 @@
 Data Preprocessing Script for AI.ttorney Legal Chatbot
 
 This script:
-1. Loads all scraped JSON files from server/data/raw/
-2. Cleans and structures the data
-3. Chunks text into manageable pieces for embeddings
-4. Saves processed data to server/data/processed/legal_knowledge.jsonl
-
-Each line in the output JSONL contains:
-- id: unique identifier
-- text: cleaned legal text chunk
-- metadata: source, category, article number, etc.
+1. Loads all scraped JSON files from server/data/raw/ (one worker process per file)
+2. Normalizes each law's JSON layout into articles made of paragraphs
+3. Chunks every article on paragraph and sentence boundaries into windows
+   sized by token count, never across two articles
+4. Saves processed data to server/data/processed/:
+   - legal_knowledge.jsonl  one chunk per line (what gets embedded)
+   - legal_articles.jsonl   one whole article per line, keyed by parent_id,
+                            so retrieval can expand a hit to its full article
+   - article_index.json     every article's verbatim text keyed by law and
+                            number, for answering direct citations
+                            ("Art. 36 FC") without retrieval
+
+Each line in legal_knowledge.jsonl contains:
+- id: unique identifier ({parent_id}_{chunk_index})
+- text: one-line article reference followed by the chunk body
+- metadata: source, law, article number, parent_id, chunk_index, token_count, etc.
+
+Token counts are a fixed 4-characters-per-token estimate (count_tokens), not
+the embedding model's tokenizer. The estimate is the canonical sizer: the
+committed processed/ files are built with it, and re-running this script on
+any machine reproduces them exactly, so no re-embedding is needed unless the
+raw data or the chunking changes. A window of MAX_CHUNK_TOKENS estimated
+tokens is far below the embedding model's 8191-token input limit under any
+real tokenizer.
 """
 
 import json
+import math
 import os
 import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
-from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 # Configuration
 RAW_DATA_DIR = Path(__file__).parent / "raw"
 PROCESSED_DATA_DIR = Path(__file__).parent / "processed"
 OUTPUT_FILE = PROCESSED_DATA_DIR / "legal_knowledge.jsonl"
-CHUNK_SIZE = 500  # characters per chunk (adjust based on token limits)
-CHUNK_OVERLAP = 50  # overlap between chunks for context
+ARTICLES_FILE = PROCESSED_DATA_DIR / "legal_articles.jsonl"
+ARTICLE_INDEX_FILE = PROCESSED_DATA_DIR / "article_index.json"
+MAX_CHUNK_TOKENS = 256  # body tokens per chunk, excluding the reference line
+OVERLAP_TOKENS = 60  # carry the previous window's last sentence if it is at most this long
+CHARS_PER_TOKEN = 4  # token estimate used for all chunk sizing (see the module docstring)
+
 
+# Source URL mapping (from the raw JSON files)
+SOURCE_URLS = {
+    'consumer_act': 'https://lawphil.net/statutes/repacts/ra1992/ra_7394_1992.html',
+    'revised_penal_code': 'https://elibrary.judiciary.gov.ph/thebookshelf/showdocs/28/20426',
+    'family_code': 'https://lawphil.net/executive/execord/eo1987/eo_209_1987.html',
+    'labor_code': 'https://lawphil.net/statutes/presdecs/pd1974/pd_442_1974.html',
+    'civil_code': 'https://lawphil.net/statutes/repacts/ra1949/ra_386_1949.html',
+}
+VAWC_SOURCE_URL = 'https://lawphil.net/statutes/repacts/ra2004/ra_9262_2004.html'
+
+# Laws bundled into another law's raw file, by the law_number their articles carry:
+# (article index key, source URL)
+BUNDLED_LAWS = {
+    'Republic Act No. 9262': ('ra_9262', VAWC_SOURCE_URL),
+}
 
 # Compile regex patterns once for better performance
 WHITESPACE_PATTERN = re.compile(r'\s+')
 SPECIAL_CHARS_PATTERN = re.compile(r'[^\w\s.,;:!?()\-\'"áéíóúñÁÉÍÓÚÑ]')
+# Sentence ends and enumerated clauses ("...; (b) ...") followed by the next clause
+SENTENCE_BOUNDARY_PATTERN = re.compile(r'(?<=[.;:!?])\s+(?=[A-Z0-9("\'])')
 
 def clean_text(text: str) -> str:
     """Clean and normalize text content (optimized)"""
     if not text:
         return ""
-    
+
     # Remove extra whitespace
     text = WHITESPACE_PATTERN.sub(' ', text)
     # Remove special characters but keep punctuation
     text = SPECIAL_CHARS_PATTERN.sub('', text)
     # Strip leading/trailing whitespace
     text = text.strip()
-    
+
     return text
 
 
-def chunk_text(text: str, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP) -> List[str]:
-    """Split text into chunks - ULTRA FAST VERSION"""
-    if len(text) <= chunk_size:
-        return [text]
-    
+def count_tokens(text: str) -> int:
+    """Estimated token count; the same on every machine, so chunks are reproducible"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+# ============================================
+# Chunking
+# ============================================
+
+def split_sentences(paragraph: str) -> List[str]:
+    return [s for s in SENTENCE_BOUNDARY_PATTERN.split(paragraph) if s]
+
+
+def _split_oversized(sentence: str, max_tokens: int) -> List[str]:
+    """Last resort for a single sentence longer than a window: split between words"""
+    pieces, current = [], []
+    for word in sentence.split(' '):
+        if current and count_tokens(' '.join(current + [word])) > max_tokens:
+            pieces.append(' '.join(current))
+            current = []
+        current.append(word)
+    if current:
+        pieces.append(' '.join(current))
+    return pieces
+
+
+def chunk_paragraphs(
+    paragraphs: List[str],
+    max_tokens: int = MAX_CHUNK_TOKENS,
+    overlap_tokens: int = OVERLAP_TOKENS
+) -> List[str]:
+    """
+    Pack paragraphs into windows of at most max_tokens. Paragraphs stay whole
+    when they fit; longer ones are split into sentences. Windows are balanced
+    so the last one is not a stub, and a window that starts mid-paragraph
+    repeats the previous sentence when it is short.
+    """
+    # (text, tokens, starts_paragraph)
+    units: List[Tuple[str, int, bool]] = []
+    for paragraph in paragraphs:
+        tokens = count_tokens(paragraph)
+        if tokens <= max_tokens:
+            units.append((paragraph, tokens, True))
+            continue
+        first = True
+        for sentence in split_sentences(paragraph):
+            for piece in ([sentence] if count_tokens(sentence) <= max_tokens else _split_oversized(sentence, max_tokens)):
+                units.append((piece, count_tokens(piece), first))
+                first = False
+
+    if not units:
+        return []
+    total = sum(tokens for _, tokens, _ in units)
+    if total <= max_tokens:
+        return ['\n'.join(text for text, _, _ in units)]
+
+    # Aim for equal windows instead of max-sized ones plus a short tail
+    target = math.ceil(total / math.ceil(total / max_tokens))
+    windows: List[List[Tuple[str, int, bool]]] = [[]]
+    size = 0
+    for unit in units:
+        if windows[-1] and (size >= target or size + unit[1] > max_tokens):
+            previous = windows[-1][-1]
+            windows.append([])
+            size = 0
+            if not unit[2] and previous[1] <= overlap_tokens and previous[1] + unit[1] <= max_tokens:
+                windows[-1].append((previous[0], previous[1], False))
+                size = previous[1]
+        windows[-1].append(unit)
+        size += unit[1]
+
     chunks = []
-    i = 0
-    text_len = len(text)
-    
-    while i < text_len:
-        chunk_end = min(i + chunk_size, text_len)
-        chunks.append(text[i:chunk_end])
-        i += chunk_size - overlap
-    
+    for window in windows:
+        # Sentences of one paragraph are re-joined with spaces, paragraphs with newlines
+        text = window[0][0]
+        for unit_text, _, starts_paragraph in window[1:]:
+            text += ('\n' if starts_paragraph else ' ') + unit_text
+        chunks.append(text)
     return chunks
 
 
-def process_consumer_act(data: Dict[str, Any], source_file: str) -> List[Dict[str, Any]]:
-    """Process Consumer Act JSON data (handles topics structure)"""
-    processed_items = []
-    
-    law_title = data.get('title', 'Consumer Act of the Philippines')
-    law_info = data.get('law', {})
-    law_number = law_info.get('name', 'RA 7394')
-    
-    # Consumer Act has topics structure
-    topics = data.get('topics', {})
-    total_articles = sum(len(articles) for articles in topics.values())
-    
-    print(f"   📊 Found {total_articles} articles to process")
-    article_count = 0
-    
-    for topic_name, articles in topics.items():
-        print(f"   📁 Processing topic: {topic_name} ({len(articles)} articles)")
+def article_reference(article: Dict[str, Any]) -> str:
+    """One-line reference put in front of every chunk of an article"""
+    reference = f"{article['law']}, {article['label']} {article['number']}"
+    if article.get('title'):
+        reference += f": {article['title']}"
+    return reference
+
+
+def chunk_article(article: Dict[str, Any], max_tokens: int = MAX_CHUNK_TOKENS) -> Iterator[Dict[str, Any]]:
+    """Chunk records for one normalized article"""
+    paragraphs = [p for p in (clean_text(p) for p in article['paragraphs']) if p]
+    if not paragraphs:
+        return
+
+    bodies = chunk_paragraphs(paragraphs, max_tokens=max_tokens)
+    reference = article_reference(article)
+    # Topic/category/penalties only on the first chunk; later ones say they continue it
+    context = '\n'.join(article.get('context', []))
+
+    for idx, body in enumerate(bodies):
+        if idx == 0:
+            text = f"{reference}\n{context}\n\n{body}" if context else f"{reference}\n\n{body}"
+        else:
+            text = f"{reference} (continued)\n\n{body}"
+        yield {
+            'id': f"{article['parent_id']}_{idx}",
+            'text': text,
+            'metadata': {
+                **article['metadata'],
+                'parent_id': article['parent_id'],
+                'chunk_index': idx,
+                'total_chunks': len(bodies),
+                'token_count': count_tokens(text)
+            }
+        }
+
+
+def article_record(article: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The whole article, for expanding a retrieved chunk to its parent"""
+    paragraphs = [p for p in (clean_text(p) for p in article['paragraphs']) if p]
+    if not paragraphs:
+        return None
+    return {
+        'parent_id': article['parent_id'],
+        'text': article_reference(article) + '\n\n' + '\n'.join(paragraphs),
+        'metadata': article['metadata']
+    }
+
+
+def index_entry(article: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Article index entry: the article's verbatim text under its law and number"""
+    paragraphs = [p for p in (clean_text(p) for p in article['paragraphs']) if p]
+    if not paragraphs:
+        return None
+    metadata = article['metadata']
+    source = metadata['source']
+    law_key, source_url = BUNDLED_LAWS.get(metadata.get('law_number'), (source, SOURCE_URLS.get(source, '')))
+    return {
+        'law_key': law_key,
+        'number': article['number'],
+        'label': article['label'],
+        'title': article['title'],
+        'text': '\n'.join(paragraphs),
+        'parent_id': article['parent_id'],
+        'source_url': source_url
+    }
+
+
+# ============================================
+# Source readers: raw JSON layout -> normalized articles
+# ============================================
+#
+# A normalized article is a dict with parent_id, law, label ("Article" or
+# "Section"), number, title, context (lines for the first chunk), paragraphs
+# (raw text, cleaned when chunked) and the metadata every chunk carries.
+
+def _parent_id(source: str, label: str, number: str) -> str:
+    # RA 9262 sections live in family_code.json next to Family Code articles with the same numbers
+    return f"{source}_{number}" if label == 'Article' else f"{source}_{label.lower()}_{number}"
+
+
+def read_topic_articles(data: Dict[str, Any], source: str) -> Iterator[Dict[str, Any]]:
+    """Consumer Act, Family Code and Labor Code: {'topics': {name: [article, ...]}}"""
+    law_title = data.get('title', source)
+    laws = data.get('laws') or ([data['law']] if data.get('law') else [])
+    primary_number = (laws[0].get('name') if 'law' in data else laws[0].get('executive_order')) if laws else None
+    # Articles of a second law bundled into the file (RA 9262 in family_code.json) cite it by name
+    other_laws = {law.get('name'): law for law in laws[1:] if law.get('name')}
+
+    for topic_name, articles in data.get('topics', {}).items():
         for article in articles:
-            article_count += 1
-            if article_count % 20 == 0 or article_count == 1:
-                print(f"   ⏳ Progress: {article_count}/{total_articles} articles...")
-            article_number = article.get('number', 'Unknown')
-            article_title = article.get('title', '')
-            content = article.get('content', '')
+            number = str(article.get('number', 'Unknown'))
+            label = article.get('type') or 'Article'
+            title = article.get('title', '')
             topic = article.get('topic', topic_name)
-            
-            # Clean content
-            cleaned_content = clean_text(content)
-            
-            if not cleaned_content:
-                continue
-            
-            # Create full text with context
-            full_text = f"{law_title} ({law_number})\n"
-            full_text += f"Article {article_number}: {article_title}\n"
-            full_text += f"Topic: {topic}\n\n"
-            full_text += cleaned_content
-            
-            # Chunk the text
-            chunks = chunk_text(full_text)
-            
-            for idx, chunk in enumerate(chunks):
-                processed_items.append({
-                    'id': f"{source_file}_{article_number}_{idx}",
-                    'text': chunk,
-                    'metadata': {
-                        'source': source_file,
-                        'law': law_title,
-                        'law_number': law_number,
-                        'article_number': article_number,
-                        'article_title': article_title,
-                        'topic': topic,
-                        'chunk_index': idx,
-                        'total_chunks': len(chunks)
-                    }
-                })
-    
-    return processed_items
-
-
-def process_revised_penal_code(data: Dict[str, Any], source_file: str) -> List[Dict[str, Any]]:
-    """Process Revised Penal Code JSON data (array format)"""
-    processed_items = []
-    
+            other = other_laws.get(article.get('law'))
+            law = other.get('full_name', other['name']) if other else law_title
+            law_number = other['name'] if other else primary_number
+
+            metadata = {
+                'source': source,
+                'law': law,
+                'article_number': number,
+                'article_title': title,
+                'topic': topic
+            }
+            if law_number:
+                metadata['law_number'] = law_number
+            if label != 'Article':
+                metadata['provision_type'] = label
+
+            yield {
+                'parent_id': _parent_id(source, label, number),
+                'law': f"{law} ({law_number})" if law_number and not other else law,
+                'label': label,
+                'number': number,
+                'title': title,
+                'context': [f"Topic: {topic}"],
+                'paragraphs': [article.get('content', '')],
+                'metadata': metadata
+            }
+
+
+def read_penal_code_articles(data: List[Dict[str, Any]], source: str) -> Iterator[Dict[str, Any]]:
+    """Revised Penal Code: a list of articles"""
     law_title = 'Revised Penal Code of the Philippines'
-    
-    # Revised Penal Code is an array of articles
-    articles = data if isinstance(data, list) else []
-    total_articles = len(articles)
-    
-    print(f"   📊 Found {total_articles} articles to process")
-    
-    for idx, article in enumerate(articles, 1):
-        if idx % 5 == 0 or idx == 1:
-            print(f"   ⏳ Progress: {idx}/{total_articles} articles...")
-        article_number = str(article.get('article_number', 'Unknown'))
-        article_title = article.get('article_title', '')
-        content = article.get('article_text', '')
+
+    for article in (data if isinstance(data, list) else []):
+        number = str(article.get('article_number', 'Unknown'))
+        title = article.get('article_title', '')
         category = article.get('category', 'General')
         penalties = article.get('penalties', '')
-        
-        # Clean content
-        cleaned_content = clean_text(content)
-        
-        if not cleaned_content:
-            continue
-        
-        # Create full text with context
-        full_text = f"{law_title}\n"
-        full_text += f"Article {article_number}: {article_title}\n"
-        full_text += f"Category: {category}\n"
+
+        context = [f"Category: {category}"]
         if penalties and penalties != "No specific penalty mentioned":
-            full_text += f"Penalties: {penalties}\n"
-        full_text += "\n"
-        full_text += cleaned_content
-        
-        # Chunk the text
-        chunks = chunk_text(full_text)
-        
-        for idx, chunk in enumerate(chunks):
-            processed_items.append({
-                'id': f"{source_file}_{article_number}_{idx}",
-                'text': chunk,
-                'metadata': {
-                    'source': source_file,
-                    'law': law_title,
-                    'article_number': article_number,
-                    'article_title': article_title,
-                    'category': category,
-                    'penalties': penalties,
-                    'chunk_index': idx,
-                    'total_chunks': len(chunks)
-                }
-            })
-    
-    return processed_items
-
-
-def process_family_law(data: Dict[str, Any], source_file: str) -> List[Dict[str, Any]]:
-    """Process Family Law JSON data (handles topics structure)"""
-    processed_items = []
-    
-    law_title = data.get('title', 'Family Code of the Philippines')
-    
-    # Family code has topics structure
-    topics = data.get('topics', {})
-    total_articles = sum(len(articles) for articles in topics.values())
-    
-    print(f"   📊 Found {total_articles} articles to process")
-    article_count = 0
-    
-    for topic_name, articles in topics.items():
-        print(f"   📁 Processing topic: {topic_name} ({len(articles)} articles)")
-        for article in articles:
-            article_count += 1
-            if article_count % 20 == 0 or article_count == 1:
-                print(f"   ⏳ Progress: {article_count}/{total_articles} articles...")
-            article_number = article.get('number', 'Unknown')
-            article_title = article.get('title', '')
-            content = article.get('content', '')
-            topic = article.get('topic', topic_name)
-            
-            # Clean content
-            cleaned_content = clean_text(content)
-            
-            if not cleaned_content:
-                continue
-            
-            # Create full text with context
-            full_text = f"{law_title}\n"
-            full_text += f"Article {article_number}: {article_title}\n"
-            full_text += f"Topic: {topic}\n\n"
-            full_text += cleaned_content
-            
-            # Chunk the text
-            chunks = chunk_text(full_text)
-            
-            for idx, chunk in enumerate(chunks):
-                processed_items.append({
-                    'id': f"{source_file}_{article_number}_{idx}",
-                    'text': chunk,
-                    'metadata': {
-                        'source': source_file,
-                        'law': law_title,
-                        'article_number': article_number,
-                        'article_title': article_title,
-                        'topic': topic,
-                        'chunk_index': idx,
-                        'total_chunks': len(chunks)
-                    }
-                })
-    
-    return processed_items
-
-
-def process_labor_code(data: Dict[str, Any], source_file: str) -> List[Dict[str, Any]]:
-    """Process Labor Code JSON data (handles topics structure)"""
-    processed_items = []
-    
-    law_title = data.get('title', 'Labor Code of the Philippines')
-    
-    # Labor code has topics structure
-    topics = data.get('topics', {})
-    total_articles = sum(len(articles) for articles in topics.values())
-    
-    print(f"   📊 Found {total_articles} articles to process")
-    article_count = 0
-    
-    for topic_name, articles in topics.items():
-        print(f"   📁 Processing topic: {topic_name} ({len(articles)} articles)")
-        for article in articles:
-            article_count += 1
-            if article_count % 20 == 0 or article_count == 1:
-                print(f"   ⏳ Progress: {article_count}/{total_articles} articles...")
-            article_number = article.get('number', 'Unknown')
-            article_title = article.get('title', '')
-            content = article.get('content', '')
-            topic = article.get('topic', topic_name)
-            
-            # Clean content
-            cleaned_content = clean_text(content)
-            
-            if not cleaned_content:
-                continue
-            
-            # Create full text with context
-            full_text = f"{law_title}\n"
-            full_text += f"Article {article_number}: {article_title}\n"
-            full_text += f"Topic: {topic}\n\n"
-            full_text += cleaned_content
-            
-            # Chunk the text
-            chunks = chunk_text(full_text)
-            
-            for idx, chunk in enumerate(chunks):
-                processed_items.append({
-                    'id': f"{source_file}_{article_number}_{idx}",
-                    'text': chunk,
-                    'metadata': {
-                        'source': source_file,
-                        'law': law_title,
-                        'article_number': article_number,
-                        'article_title': article_title,
-                        'topic': topic,
-                        'chunk_index': idx,
-                        'total_chunks': len(chunks)
-                    }
-                })
-    
-    return processed_items
-
-
-def process_civil_code(data: Dict[str, Any], source_file: str) -> List[Dict[str, Any]]:
-    """Process Civil Code JSON data (handles sections structure)"""
-    processed_items = []
-    
+            context.append(f"Penalties: {penalties}")
+
+        yield {
+            'parent_id': _parent_id(source, 'Article', number),
+            'law': law_title,
+            'label': 'Article',
+            'number': number,
+            'title': title,
+            'context': context,
+            'paragraphs': [article.get('article_text', '')],
+            'metadata': {
+                'source': source,
+                'law': law_title,
+                'article_number': number,
+                'article_title': title,
+                'category': category,
+                'penalties': penalties
+            }
+        }
+
+
+def read_civil_code_articles(data: Dict[str, Any], source: str) -> Iterator[Dict[str, Any]]:
+    """Civil Code: {'sections': [{'heading', 'articles': [...]}]}"""
     law_title = data.get('title', 'Civil Code of the Philippines')
-    
-    # Civil code has sections structure
-    sections = data.get('sections', [])
-    total_sections = len(sections)
-    
-    print(f"   📊 Found {total_sections} sections to process")
-    
-    for section_idx, section in enumerate(sections, 1):
+
+    for section in data.get('sections', []):
         section_heading = section.get('heading', 'General')
-        articles = section.get('articles', [])
-        
-        # Show progress every 10 sections
-        if section_idx % 10 == 0 or section_idx == 1:
-            print(f"   ⏳ Progress: {section_idx}/{total_sections} sections - {section_heading[:40]}...")
-        
-        if section_idx % 50 == 0:
-            print(f"   💾 Processed {section_idx} sections so far...")
-        
-        for article in articles:
-            article_number = article.get('article_number', 'Unknown')
-            article_heading = article.get('heading', '')
+        for article in section.get('articles', []):
+            number = str(article.get('article_number', 'Unknown'))
+            # The scraper stores an article's first paragraph as its "heading";
+            # an enumerating first paragraph ("...are:") is followed by its list
+            heading = article.get('heading', '')
             paragraphs = article.get('paragraphs', [])
             subsections = article.get('subsections', [])
-            
-            # Combine paragraphs and subsections into content
-            content_parts = paragraphs + subsections
-            content = ' '.join(content_parts)
-            
-            # Clean content
-            cleaned_content = clean_text(content)
-            
-            if not cleaned_content:
+            if heading.rstrip().endswith(':'):
+                body = [heading] + subsections + paragraphs
+            else:
+                body = [heading] + paragraphs + subsections
+
+            yield {
+                'parent_id': _parent_id(source, 'Article', number),
+                'law': law_title,
+                'label': 'Article',
+                'number': number,
+                'title': '',
+                'context': [f"Section: {section_heading}"],
+                'paragraphs': body,
+                'metadata': {
+                    'source': source,
+                    'law': law_title,
+                    'section': section_heading,
+                    'article_number': number,
+                    'article_heading': heading
+                }
+            }
+
+
+# Route to the reader by filename keyword
+SOURCE_READERS: List[Tuple[Tuple[str, ...], Callable[[Any, str], Iterator[Dict[str, Any]]]]] = [
+    (('consumer', 'family', 'labor'), read_topic_articles),
+    (('penal', 'rpc'), read_penal_code_articles),
+    (('civil',), read_civil_code_articles),
+]
+
+
+def reader_for(source_name: str) -> Optional[Callable[[Any, str], Iterator[Dict[str, Any]]]]:
+    name = source_name.lower()
+    for keywords, reader in SOURCE_READERS:
+        if any(keyword in name for keyword in keywords):
+            return reader
+    return None
+
+
+def read_articles(json_file: Path) -> Iterator[Dict[str, Any]]:
+    """Normalized articles of one raw file (nothing for an unknown layout)"""
+    reader = reader_for(json_file.stem)
+    if reader is None:
+        return
+    with open(json_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    seen: Dict[str, int] = {}
+    for article in reader(data, json_file.stem):
+        # The scraped files repeat a few numbers for different (misnumbered) articles
+        seen[article['parent_id']] = seen.get(article['parent_id'], 0) + 1
+        if seen[article['parent_id']] > 1:
+            article['parent_id'] += f"-{seen[article['parent_id']]}"
+        yield article
+
+
+def process_file(json_file: Path) -> Dict[str, Any]:
+    """Worker: chunks and article records for one raw file"""
+    if reader_for(json_file.stem) is None:
+        return {'file': json_file.name, 'skipped': True, 'chunks': [], 'articles': [], 'index': []}
+    try:
+        chunks, articles, index = [], [], []
+        for article in read_articles(json_file):
+            record = article_record(article)
+            if record is None:
                 continue
-            
-            # Create full text with context
-            full_text = f"{law_title}\n"
-            full_text += f"Section: {section_heading}\n"
-            full_text += f"Article {article_number}"
-            if article_heading:
-                full_text += f": {article_heading}"
-            full_text += "\n\n"
-            full_text += cleaned_content
-            
-            # Chunk the text
-            chunks = chunk_text(full_text)
-            
-            for idx, chunk in enumerate(chunks):
-                processed_items.append({
-                    'id': f"{source_file}_{article_number}_{idx}",
-                    'text': chunk,
-                    'metadata': {
-                        'source': source_file,
-                        'law': law_title,
-                        'section': section_heading,
-                        'article_number': article_number,
-                        'article_heading': article_heading,
-                        'chunk_index': idx,
-                        'total_chunks': len(chunks)
-                    }
-                })
-    
-    return processed_items
-
-
-def process_all_files():
+            articles.append(record)
+            index.append(index_entry(article))
+            chunks.extend(chunk_article(article))
+        return {'file': json_file.name, 'skipped': False, 'chunks': chunks, 'articles': articles, 'index': index}
+    except Exception as e:
+        return {'file': json_file.name, 'skipped': False, 'error': str(e), 'chunks': [], 'articles': [], 'index': []}
+
+
+def process_all_files(workers: Optional[int] = None) -> int:
     """
     Main processing function
-    Loads all JSON files from raw/ and processes them
+    Loads all JSON files from raw/ in a process pool and writes both outputs.
+    Returns a process exit code.
     """
     # Ensure directories exist
     PROCESSED_DATA_DIR.mkdir(parents=True, exist_ok=True)
-    
+
     if not RAW_DATA_DIR.exists():
         print(f"❌ Raw data directory not found: {RAW_DATA_DIR}")
-        return
-    
-    all_processed_items = []
-    
-    # Get all JSON files from raw directory
-    json_files = list(RAW_DATA_DIR.glob("*.json"))
-    
+        return 1
+
+    # Get all JSON files from raw directory; sorted so the output order is stable
+    json_files = sorted(RAW_DATA_DIR.glob("*.json"))
+
     if not json_files:
         print(f"⚠️ No JSON files found in {RAW_DATA_DIR}")
         print("Please run the scraper scripts first to generate raw data.")
-        return
-    
-    # Sort files to process civil_code.json LAST (it's the slowest)
-    json_files.sort(key=lambda f: (f.name == 'civil_code.json', f.name))
-    
-    print(f"📂 Found {len(json_files)} JSON files to process")
-    
-    for json_file in json_files:
-        print(f"\n📄 Processing: {json_file.name}")
-        
-        try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            source_name = json_file.stem  # filename without extension
-            
-            # Route to appropriate processor based on filename
-            if 'consumer' in source_name.lower():
-                items = process_consumer_act(data, source_name)
-            elif 'penal' in source_name.lower() or 'rpc' in source_name.lower():
-                items = process_revised_penal_code(data, source_name)
-            elif 'family' in source_name.lower():
-                items = process_family_law(data, source_name)
-            elif 'labor' in source_name.lower():
-                items = process_labor_code(data, source_name)
-            elif 'civil' in source_name.lower():
-                items = process_civil_code(data, source_name)
-            else:
-                # Generic processor for unknown formats
-                print(f"⚠️ Unknown format for {source_name}, skipping...")
+        return 1
+
+    workers = workers or min(len(json_files), os.cpu_count() or 1)
+    print(f"📂 Found {len(json_files)} JSON files to process ({workers} workers)")
+    print(f"🔢 Token estimate: {CHARS_PER_TOKEN} characters per token")
+    start = time.perf_counter()
+
+    chunks_tmp = OUTPUT_FILE.with_suffix('.jsonl.tmp')
+    articles_tmp = ARTICLES_FILE.with_suffix('.jsonl.tmp')
+    sources: Dict[str, Dict[str, int]] = {}
+    # law key -> article number -> entry
+    article_index: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    failed = False
+
+    # Results arrive in file order and are written as each file finishes
+    with ProcessPoolExecutor(max_workers=workers) as executor, \
+            open(chunks_tmp, 'w', encoding='utf-8') as chunks_out, \
+            open(articles_tmp, 'w', encoding='utf-8') as articles_out:
+        for result in executor.map(process_file, json_files):
+            if result['skipped']:
+                print(f"⚠️ Unknown format for {result['file']}, skipping...")
                 continue
-            
-            all_processed_items.extend(items)
-            print(f"✅ Processed {len(items)} chunks from {json_file.name}")
-            
-        except Exception as e:
-            print(f"❌ Error processing {json_file.name}: {str(e)}")
-            continue
-    
-    # Save to JSONL format (one JSON object per line)
-    print(f"\n💾 Saving {len(all_processed_items)} processed chunks to {OUTPUT_FILE}")
-    
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        for item in all_processed_items:
-            f.write(json.dumps(item, ensure_ascii=False) + '\n')
-    
-    print(f"✅ Preprocessing complete!")
-    print(f"📊 Total chunks created: {len(all_processed_items)}")
+            if 'error' in result:
+                print(f"❌ Error processing {result['file']}: {result['error']}")
+                failed = True
+                continue
+
+            for item in result['chunks']:
+                chunks_out.write(json.dumps(item, ensure_ascii=False) + '\n')
+            for record in result['articles']:
+                articles_out.write(json.dumps(record, ensure_ascii=False) + '\n')
+            for entry in result['index']:
+                # A repeated (misnumbered) article number keeps its first article
+                article_index.setdefault(entry.pop('law_key'), {}).setdefault(entry.pop('number'), entry)
+
+            for item in result['chunks']:
+                stats = sources.setdefault(item['metadata']['source'], {'chunks': 0, 'tokens': 0})
+                stats['chunks'] += 1
+                stats['tokens'] += item['metadata']['token_count']
+            print(f"✅ Processed {len(result['articles'])} articles into {len(result['chunks'])} chunks from {result['file']}")
+
+    if failed:
+        # Keep the previous output rather than writing a corpus with a law missing
+        chunks_tmp.unlink(missing_ok=True)
+        articles_tmp.unlink(missing_ok=True)
+        print("\n❌ Preprocessing failed; existing output left unchanged")
+        return 1
+
+    index_tmp = ARTICLE_INDEX_FILE.with_suffix('.json.tmp')
+    with open(index_tmp, 'w', encoding='utf-8') as f:
+        json.dump({'version': 1, 'laws': article_index}, f, ensure_ascii=False, separators=(',', ':'))
+
+    os.replace(chunks_tmp, OUTPUT_FILE)
+    os.replace(articles_tmp, ARTICLES_FILE)
+    os.replace(index_tmp, ARTICLE_INDEX_FILE)
+
+    total_chunks = sum(s['chunks'] for s in sources.values())
+    total_tokens = sum(s['tokens'] for s in sources.values())
+    print(f"\n✅ Preprocessing complete in {time.perf_counter() - start:.1f}s!")
+    print(f"📊 Total chunks created: {total_chunks} ({total_tokens:,} tokens, "
+          f"{total_tokens / max(total_chunks, 1):.0f} per chunk)")
     print(f"📁 Output file: {OUTPUT_FILE}")
-    
-    # Generate summary statistics
-    sources = {}
-    for item in all_processed_items:
-        source = item['metadata']['source']
-        sources[source] = sources.get(source, 0) + 1
-    
+    print(f"📁 Articles file: {ARTICLES_FILE}")
+    print(f"📁 Article index: {ARTICLE_INDEX_FILE} "
+          f"({sum(len(a) for a in article_index.values())} articles in {len(article_index)} laws)")
+
     print("\n📈 Summary by source:")
-    for source, count in sources.items():
-        print(f"  - {source}: {count} chunks")
+    for source, stats in sources.items():
+        print(f"  - {source}: {stats['chunks']} chunks, {stats['tokens']:,} tokens")
+    return 0
 
 
 if __name__ == "__main__":
@@ -451,5 +506,5 @@ if __name__ == "__main__":
     print(f"📂 Raw data directory: {RAW_DATA_DIR}")
     print(f"📂 Output directory: {PROCESSED_DATA_DIR}")
     print("=" * 60)
-    
-    process_all_files()
+
+    sys.exit(process_all_files())
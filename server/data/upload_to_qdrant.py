@@ -1,198 +1,426 @@
 """
-Upload Embeddings to Qdrant Cloud for AI.ttorney Legal Chatbot
+Sync Embeddings to Qdrant Cloud for AI.ttorney Legal Chatbot
 
 This script:
-1. Loads embeddings from embeddings.pkl
-2. Creates a Qdrant collection
-3. Uploads all embeddings with metadata
-4. Saves to Qdrant Cloud for use by the chatbot API
+1. Loads the embedding store written by generate_embeddings.py
+   (vectors.npy + documents.jsonl)
+2. Reads what the collection currently holds with a payload-only scroll
+3. Sends only the difference:
+   - upserts points that are new (new chunk or changed text)
+   - overwrites payloads that changed (e.g. source_url) without re-sending vectors
+   - deletes points that are no longer in the corpus
+4. Runs those requests in parallel batches with bounded retries
+
+Point IDs are derived from the chunk id and its content hash, so reordering the
+corpus never moves a vector to another point, and a changed chunk shows up as
+one delete plus one upsert. The first sync against a collection uploaded with
+positional integer IDs replaces those points once.
 
 Requirements:
 - pip install qdrant-client
 - Qdrant Cloud account (free tier available)
 - QDRANT_URL and QDRANT_API_KEY in .env file
+
+Usage:
+    python upload_to_qdrant.py                  # sync the delta
+    python upload_to_qdrant.py --dry-run        # report the delta, change nothing
+    python upload_to_qdrant.py --payload-only   # only fix payloads of existing points
+    python upload_to_qdrant.py --recreate       # drop the collection and upload everything
 """
 
-import pickle
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
-from pathlib import Path
-from typing import List, Dict, Any
-from tqdm import tqdm
+import argparse
+import asyncio
 import os
+import random
+import sys
+import time
+import uuid
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
 from dotenv import load_dotenv
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import (
+    Distance,
+    OverwritePayloadOperation,
+    PointIdsList,
+    PointStruct,
+    SetPayload,
+    VectorParams,
+)
+from tqdm import tqdm
+
+from generate_embeddings import EMBEDDINGS_DIR, load_embedding_store
+from preprocess_data import SOURCE_URLS, VAWC_SOURCE_URL
 
 # Load environment variables
 load_dotenv()
 
 # Configuration
-EMBEDDINGS_FILE = Path(__file__).parent / "embeddings" / "embeddings.pkl"
 COLLECTION_NAME = "legal_knowledge"
 QDRANT_URL = os.getenv("QDRANT_URL")  # e.g., "https://your-cluster.qdrant.io"
 QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
-VECTOR_SIZE = 1536  # text-embedding-3-small dimension
-
-def load_embeddings() -> tuple[List[str], List[List[float]], List[str], List[Dict[str, Any]]]:
-    """Load embeddings from pickle file"""
-    print(f"📥 Loading embeddings from {EMBEDDINGS_FILE}")
-    
-    with open(EMBEDDINGS_FILE, 'rb') as f:
-        data = pickle.load(f)
-    
-    # Extract data from the structure
-    documents = data['documents']  # List of dicts with 'id', 'text', 'metadata'
-    embeddings = data['embeddings']  # numpy array
-    
-    # Parse documents
-    ids = [doc['id'] for doc in documents]
-    texts = [doc['text'] for doc in documents]
-    metadatas = [doc['metadata'] for doc in documents]
-    
-    # Convert numpy array to list if needed
-    if hasattr(embeddings, 'tolist'):
-        embeddings = embeddings.tolist()
-    
-    print(f"✅ Loaded {len(ids)} embeddings")
-    return ids, embeddings, texts, metadatas
-
-
-def create_qdrant_collection():
-    """Create or recreate Qdrant collection"""
-    print(f"\n🗄️  Connecting to Qdrant Cloud...")
-    
-    if not QDRANT_URL or not QDRANT_API_KEY:
-        raise ValueError("QDRANT_URL and QDRANT_API_KEY must be set in .env file")
-    
-    # Create client
-    client = QdrantClient(
-        url=QDRANT_URL,
-        api_key=QDRANT_API_KEY,
-    )
-    
-    print(f"✅ Connected to Qdrant Cloud")
-    
-    # Delete existing collection if it exists (for fresh upload)
-    try:
-        client.delete_collection(collection_name=COLLECTION_NAME)
-        print(f"🗑️  Deleted existing collection: {COLLECTION_NAME}")
-    except:
-        pass
-    
-    # Create new collection
-    client.create_collection(
+UPSERT_BATCH_SIZE = 128  # Points (with vectors) per upsert request
+PAYLOAD_BATCH_SIZE = 256  # Payload overwrites per batch_update_points request
+DELETE_BATCH_SIZE = 1000  # Point IDs per delete request
+SCROLL_PAGE_SIZE = 1000
+CONCURRENCY = 4  # Requests in flight at once
+MAX_ATTEMPTS = 4  # Per request, before the sync is reported as failed
+
+# Namespace for point IDs; changing it re-keys the whole collection
+POINT_ID_NAMESPACE = uuid.UUID("6f1d2c1e-6a53-4f4e-9a59-2d3b8f0c7a41")
+
+
+# ============================================
+# Desired state from the embedding store
+# ============================================
+
+def point_id_for(doc: Dict[str, Any]) -> str:
+    """Stable point ID: the same chunk with the same text always maps to the same point"""
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, f"{doc['id']}\x00{doc['content_hash']}"))
+
+
+def source_url_for(metadata: Dict[str, Any]) -> str:
+    # VAWC is filed under family_code but has its own statute page
+    if metadata.get('source') == 'family_code' and metadata.get('topic') == 'VAWC':
+        return VAWC_SOURCE_URL
+    return SOURCE_URLS.get(metadata.get('source', ''), '')
+
+
+def build_payload(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Payload stored with each point; the chatbot reads text and metadata from it"""
+    payload = dict(doc['metadata'])
+    payload['text'] = doc['text']
+    payload['chunk_id'] = doc['id']
+    payload['content_hash'] = doc['content_hash']
+    source_url = payload.get('source_url') or source_url_for(payload)
+    if source_url:
+        payload['source_url'] = source_url
+    return payload
+
+
+def load_desired_points() -> Tuple[np.ndarray, Dict[str, Tuple[int, Dict[str, Any]]]]:
+    """(vectors, {point id: (row in vectors, payload)}) for every chunk in the store"""
+    print(f"📥 Loading embeddings from {EMBEDDINGS_DIR}")
+
+    store = load_embedding_store(mmap=True)
+    if store is None:
+        raise FileNotFoundError(f"No embedding store in {EMBEDDINGS_DIR}; run generate_embeddings.py first")
+    vectors, documents, manifest = store
+
+    desired: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+    for row, doc in enumerate(documents):
+        desired[point_id_for(doc)] = (row, build_payload(doc))
+
+    print(f"✅ Loaded {len(documents)} chunks ({manifest.get('model')}, dimension {vectors.shape[1]})")
+    return vectors, desired
+
+
+# ============================================
+# Current state and diff
+# ============================================
+
+async def fetch_current_payloads(client: AsyncQdrantClient) -> Dict[Any, Dict[str, Any]]:
+    """Every point's payload, without vectors"""
+    current: Dict[Any, Dict[str, Any]] = {}
+    offset = None
+    info = await client.get_collection(collection_name=COLLECTION_NAME)
+
+    with tqdm(total=info.points_count or 0, desc="Scanning collection") as pbar:
+        while True:
+            points, offset = await client.scroll(
+                collection_name=COLLECTION_NAME,
+                limit=SCROLL_PAGE_SIZE,
+                offset=offset,
+                with_payload=True,
+                with_vectors=False
+            )
+            for point in points:
+                # Keep the ID as returned; legacy integer IDs must be deleted as integers
+                current[point.id] = point.payload or {}
+            pbar.update(len(points))
+            if offset is None or not points:
+                break
+
+    return current
+
+
+async def uses_point_id_scheme(client: AsyncQdrantClient) -> bool:
+    """
+    False when the collection is keyed some other way than point_id_for(),
+    e.g. a legacy upload with positional integer IDs. Checks one point.
+    """
+    points, _ = await client.scroll(
         collection_name=COLLECTION_NAME,
-        vectors_config=VectorParams(size=VECTOR_SIZE, distance=Distance.COSINE),
+        limit=1,
+        with_payload=["chunk_id", "content_hash"],
+        with_vectors=False
     )
-    
-    print(f"✅ Created collection: {COLLECTION_NAME}")
-    return client
-
-
-def upload_to_qdrant(client: QdrantClient, ids: List[str], embeddings: List[List[float]], 
-                     texts: List[str], metadatas: List[Dict[str, Any]]):
-    """Upload embeddings to Qdrant Cloud in batches"""
-    import time
-    
-    print(f"\n📤 Uploading {len(ids)} embeddings to Qdrant Cloud...")
-    print(f"⚠️  Using small batches for reliability. This will take a few minutes...")
-    
-    # Use very small batch size for free tier reliability
-    BATCH_SIZE = 25  # Reduced to 25 for better reliability
-    MAX_RETRIES = 3
-    DELAY_BETWEEN_BATCHES = 0.5  # Half second delay between batches
-    total_batches = (len(ids) + BATCH_SIZE - 1) // BATCH_SIZE
-    
-    for i in tqdm(range(0, len(ids), BATCH_SIZE), total=total_batches, desc="Uploading batches"):
-        batch_end = min(i + BATCH_SIZE, len(ids))
-        
-        # Create points for this batch
-        points = []
-        for j in range(i, batch_end):
-            # Add text to payload for retrieval
-            payload = metadatas[j].copy()
-            payload['text'] = texts[j]
-            
-            points.append(
-                PointStruct(
-                    id=j,  # Use numeric ID for Qdrant
-                    vector=embeddings[j],
-                    payload=payload
-                )
-            )
-        
-        # Upload batch with retry logic
-        for retry in range(MAX_RETRIES):
+    if not points:
+        return True
+    point = points[0]
+    payload = point.payload or {}
+    if not isinstance(point.id, str) or 'chunk_id' not in payload or 'content_hash' not in payload:
+        return False
+    return point.id == point_id_for({'id': payload['chunk_id'], 'content_hash': payload['content_hash']})
+
+
+def compute_delta(
+    desired: Dict[str, Tuple[int, Dict[str, Any]]],
+    current: Dict[Any, Dict[str, Any]]
+) -> Dict[str, List[Any]]:
+    """Point IDs to upsert, to overwrite the payload of, and to delete"""
+    upserts = [point_id for point_id in desired if point_id not in current]
+    payload_updates = [
+        point_id for point_id, (_, payload) in desired.items()
+        if point_id in current and current[point_id] != payload
+    ]
+    deletes = [point_id for point_id in current if point_id not in desired]
+    return {"upsert": upserts, "payload": payload_updates, "delete": deletes}
+
+
+def print_delta(delta: Dict[str, List[Any]], desired, current, sample: int = 5):
+    print("\n📊 Delta:")
+    print(f"   🆕 Upsert (new or changed text): {len(delta['upsert'])}")
+    print(f"   📝 Payload only: {len(delta['payload'])}")
+    print(f"   🗑️  Delete: {len(delta['delete'])}")
+    unchanged = len(desired) - len(delta['upsert']) - len(delta['payload'])
+    print(f"   ✅ Unchanged: {unchanged}")
+
+    for point_id in delta['payload'][:sample]:
+        old, new = current[point_id], desired[point_id][1]
+        changed = sorted(k for k in set(old) | set(new) if old.get(k) != new.get(k))
+        print(f"   · {new['chunk_id']}: {', '.join(changed)}")
+    for point_id in delta['upsert'][:sample]:
+        print(f"   + {desired[point_id][1]['chunk_id']}")
+    for point_id in delta['delete'][:sample]:
+        print(f"   - {current[point_id].get('chunk_id', point_id)}")
+
+
+# ============================================
+# Applying the delta
+# ============================================
+
+async def _with_retries(description: str, call, semaphore: asyncio.Semaphore):
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        async with semaphore:
             try:
-                client.upsert(
-                    collection_name=COLLECTION_NAME,
-                    points=points,
-                    wait=False  # Don't wait for indexing to complete
-                )
-                break  # Success, exit retry loop
+                return await call()
             except Exception as e:
-                if retry < MAX_RETRIES - 1:
-                    print(f"\n⚠️  Batch {i//BATCH_SIZE + 1} failed, retrying ({retry + 1}/{MAX_RETRIES})...")
-                    time.sleep(3)  # Wait longer before retry
-                else:
-                    print(f"\n❌ Batch {i//BATCH_SIZE + 1} failed after {MAX_RETRIES} retries: {str(e)}")
+                if attempt == MAX_ATTEMPTS:
                     raise
-        
-        # Small delay between batches to avoid rate limits
-        time.sleep(DELAY_BETWEEN_BATCHES)
-    
-    print(f"✅ Successfully uploaded all embeddings!")
-    print(f"⏳ Waiting for Qdrant to finish indexing...")
-    time.sleep(5)  # Give Qdrant time to index
-
-
-def verify_upload(client: QdrantClient, sample_embedding: List[float]):
-    """Verify the upload was successful"""
-    print(f"\n🔍 Verifying upload...")
-    
-    # Get collection info
-    collection_info = client.get_collection(collection_name=COLLECTION_NAME)
-    count = collection_info.points_count
-    print(f"✅ Collection contains {count} documents")
-    
-    # Test query with sample embedding
-    results = client.search(
+                print(f"\n⚠️  {description} failed ({str(e)}), retrying ({attempt}/{MAX_ATTEMPTS - 1})...")
+        # Back off outside the semaphore so other batches keep going
+        await asyncio.sleep(min(20, 2 ** attempt) * random.uniform(0.8, 1.2))
+
+
+async def apply_delta(
+    client: AsyncQdrantClient,
+    delta: Dict[str, List[Any]],
+    desired: Dict[str, Tuple[int, Dict[str, Any]]],
+    vectors: np.ndarray,
+    concurrency: int = CONCURRENCY
+) -> int:
+    """Send the delta in parallel batches; returns the number of failed requests"""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    jobs = []
+
+    def batches(ids: List[Any], size: int):
+        return [ids[i:i + size] for i in range(0, len(ids), size)]
+
+    for batch in batches(delta['upsert'], UPSERT_BATCH_SIZE):
+        async def upsert(batch=batch):
+            # Only the rows being sent are read from the memory map
+            points = [
+                PointStruct(id=point_id, vector=vectors[desired[point_id][0]].tolist(), payload=desired[point_id][1])
+                for point_id in batch
+            ]
+            await client.upsert(collection_name=COLLECTION_NAME, points=points, wait=True)
+        jobs.append((f"Upsert of {len(batch)} points", upsert, len(batch)))
+
+    for batch in batches(delta['payload'], PAYLOAD_BATCH_SIZE):
+        async def overwrite(batch=batch):
+            operations = [
+                OverwritePayloadOperation(overwrite_payload=SetPayload(payload=desired[point_id][1], points=[point_id]))
+                for point_id in batch
+            ]
+            await client.batch_update_points(collection_name=COLLECTION_NAME, update_operations=operations, wait=True)
+        jobs.append((f"Payload update of {len(batch)} points", overwrite, len(batch)))
+
+    for batch in batches(delta['delete'], DELETE_BATCH_SIZE):
+        async def delete(batch=batch):
+            await client.delete(
+                collection_name=COLLECTION_NAME,
+                points_selector=PointIdsList(points=batch),
+                wait=True
+            )
+        jobs.append((f"Delete of {len(batch)} points", delete, len(batch)))
+
+    failed = 0
+    progress = tqdm(total=sum(size for _, _, size in jobs), desc="Syncing points")
+
+    async def run(description, call, size):
+        nonlocal failed
+        try:
+            await _with_retries(description, call, semaphore)
+        except Exception as e:
+            print(f"\n❌ {description} failed after {MAX_ATTEMPTS} attempts: {str(e)}")
+            failed += 1
+            return
+        progress.update(size)
+
+    try:
+        await asyncio.gather(*(run(*job) for job in jobs))
+    finally:
+        progress.close()
+    return failed
+
+
+# ============================================
+# Collection management
+# ============================================
+
+def connect_to_qdrant() -> AsyncQdrantClient:
+    """Connect to Qdrant Cloud"""
+    print(f"\n🗄️  Connecting to Qdrant Cloud...")
+
+    if not QDRANT_URL or not QDRANT_API_KEY:
+        raise ValueError("QDRANT_URL and QDRANT_API_KEY must be set in .env file")
+
+    return AsyncQdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY, timeout=60)
+
+
+async def ensure_collection(client: AsyncQdrantClient, dimension: int, recreate: bool, dry_run: bool) -> bool:
+    """
+    Make sure the collection exists with the right vector size.
+    Returns False when it does not exist yet (so everything is an upsert).
+    """
+    exists = await client.collection_exists(collection_name=COLLECTION_NAME)
+
+    if exists and recreate and not dry_run:
+        await client.delete_collection(collection_name=COLLECTION_NAME)
+        print(f"🗑️  Deleted existing collection: {COLLECTION_NAME}")
+        exists = False
+
+    if exists:
+        info = await client.get_collection(collection_name=COLLECTION_NAME)
+        size = getattr(info.config.params.vectors, 'size', None)
+        if size is not None and size != dimension:
+            raise ValueError(
+                f"Collection '{COLLECTION_NAME}' stores {size}-dimensional vectors but the store has "
+                f"{dimension}; re-run with --recreate"
+            )
+        print(f"✅ Using existing collection: {COLLECTION_NAME}")
+        return True
+
+    if not dry_run:
+        await client.create_collection(
+            collection_name=COLLECTION_NAME,
+            vectors_config=VectorParams(size=dimension, distance=Distance.COSINE),
+        )
+        print(f"✅ Created collection: {COLLECTION_NAME}")
+    return False
+
+
+async def verify_sync(client: AsyncQdrantClient, expected: int, sample_vector: List[float]):
+    """Check the point count and run a sample query"""
+    print(f"\n🔍 Verifying sync...")
+
+    info = await client.get_collection(collection_name=COLLECTION_NAME)
+    status = "✅" if info.points_count == expected else "⚠️ "
+    print(f"{status} Collection contains {info.points_count} documents (expected {expected})")
+
+    response = await client.query_points(
         collection_name=COLLECTION_NAME,
-        query_vector=sample_embedding,
+        query=sample_vector,
         limit=3
     )
-    
+
     print(f"\n📋 Sample query results:")
-    for i, result in enumerate(results, 1):
+    for i, result in enumerate(response.points, 1):
         payload = result.payload
         print(f"\n{i}. Source: {payload.get('source', 'Unknown')}")
         print(f"   Article: {payload.get('article_number', 'N/A')}")
         print(f"   Score: {result.score:.4f}")
+        print(f"   URL: {payload.get('source_url', 'N/A')}")
         print(f"   Preview: {payload.get('text', '')[:100]}...")
 
 
-def main():
-    """Main execution function"""
-    print("🚀 Starting Qdrant Cloud Upload Process")
-    print("=" * 60)
-    
-    # Load embeddings
-    ids, embeddings, texts, metadatas = load_embeddings()
-    
-    # Create Qdrant collection
-    client = create_qdrant_collection()
-    
-    # Upload to Qdrant
-    upload_to_qdrant(client, ids, embeddings, texts, metadatas)
-    
-    # Verify upload (use first embedding as sample)
-    verify_upload(client, embeddings[0])
-    
+async def sync_to_qdrant(
+    dry_run: bool = False,
+    payload_only: bool = False,
+    recreate: bool = False,
+    concurrency: int = CONCURRENCY,
+    client: Optional[AsyncQdrantClient] = None
+) -> int:
+    """Bring the collection in line with the embedding store. Returns a process exit code."""
+    start = time.perf_counter()
+    vectors, desired = load_desired_points()
+
+    owns_client = client is None
+    if owns_client:
+        client = connect_to_qdrant()
+    try:
+        exists = await ensure_collection(client, vectors.shape[1], recreate, dry_run)
+        # Payload-only matches points by ID, so it cannot fix a collection keyed another way
+        if payload_only and exists and not await uses_point_id_scheme(client):
+            print(
+                f"\n❌ Point IDs in '{COLLECTION_NAME}' do not match this store's IDs (legacy integer IDs?); "
+                "a payload-only update would change nothing. Run a full sync with upload_to_qdrant.py first."
+            )
+            return 1
+        current = await fetch_current_payloads(client) if exists else {}
+
+        delta = compute_delta(desired, current)
+        if payload_only:
+            delta['upsert'], delta['delete'] = [], []
+        print_delta(delta, desired, current)
+
+        if dry_run:
+            print("\n🧪 Dry run: no changes sent")
+            return 0
+        if not any(delta.values()):
+            print("\n✅ Collection already up to date")
+            return 0
+
+        failed = await apply_delta(client, delta, desired, vectors, concurrency=concurrency)
+        if failed:
+            print(f"\n❌ {failed} requests failed; re-run the script to send the remaining delta")
+            return 1
+
+        if desired:
+            expected = len(current) if payload_only else len(desired)
+            await verify_sync(client, expected, vectors[0].tolist())
+    finally:
+        if owns_client:
+            await client.close()
+
     print("\n" + "=" * 60)
-    print("✅ Qdrant Cloud upload complete!")
+    print("✅ Qdrant sync complete!")
     print(f"🌐 Qdrant URL: {QDRANT_URL}")
     print(f"📊 Collection name: {COLLECTION_NAME}")
-    print(f"📈 Total documents: {len(ids)}")
+    print(f"📈 Total documents: {len(desired)}")
+    print(f"⏱️  Elapsed: {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Sync the embedding store to the Qdrant collection")
+    parser.add_argument("--dry-run", action="store_true", help="Report the delta without changing the collection")
+    parser.add_argument("--payload-only", action="store_true", help="Only overwrite changed payloads; never upload or delete points")
+    parser.add_argument("--recreate", action="store_true", help="Drop the collection and upload every point")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY, help="Requests in flight at once")
+    args = parser.parse_args()
+
+    print("🚀 Starting Qdrant Cloud Sync")
+    print("=" * 60)
+    return asyncio.run(sync_to_qdrant(
+        dry_run=args.dry_run,
+        payload_only=args.payload_only,
+        recreate=args.recreate,
+        concurrency=args.concurrency
+    ))
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
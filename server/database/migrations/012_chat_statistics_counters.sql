@@ -0,0 +1,362 @@
+-- ============================================
+-- Migration: Incremental chat statistics counters
+-- ============================================
+-- Purpose: Serve /api/chat-history/statistics and
+-- /api/chat-history/sessions/{id}/statistics with a single row read.
+--
+-- Previously ChatHistoryService.get_user_statistics downloaded every session
+-- and every chat_messages row of the user and summed them in Python. These
+-- tables hold the same numbers, maintained by triggers on every insert,
+-- update and delete of chat_sessions and chat_messages.
+--
+-- After applying, run: SELECT backfill_chat_stats();
+-- Periodically verify with: SELECT * FROM check_chat_stats_consistency();
+-- ============================================
+
+-- ============================================
+-- STEP 1: Counter tables
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS public.chat_session_stats (
+    session_id UUID PRIMARY KEY REFERENCES public.chat_sessions(id) ON DELETE CASCADE,
+    user_id UUID,
+    message_count INTEGER NOT NULL DEFAULT 0,
+    total_tokens BIGINT NOT NULL DEFAULT 0,
+    response_time_sum_ms BIGINT NOT NULL DEFAULT 0,
+    response_time_count INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    last_message_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS public.chat_user_stats (
+    user_id UUID PRIMARY KEY,
+    total_sessions INTEGER NOT NULL DEFAULT 0,
+    archived_sessions INTEGER NOT NULL DEFAULT 0,
+    sessions_en INTEGER NOT NULL DEFAULT 0,
+    sessions_fil INTEGER NOT NULL DEFAULT 0,
+    total_messages INTEGER NOT NULL DEFAULT 0,
+    total_tokens BIGINT NOT NULL DEFAULT 0,
+    response_time_sum_ms BIGINT NOT NULL DEFAULT 0,
+    response_time_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+COMMENT ON TABLE public.chat_session_stats IS 'Per-session chat counters maintained by triggers on chat_messages.';
+COMMENT ON TABLE public.chat_user_stats IS 'Per-user chat counters maintained by triggers on chat_sessions and chat_messages.';
+
+CREATE INDEX IF NOT EXISTS idx_chat_session_stats_user_id ON public.chat_session_stats(user_id);
+
+-- Backend reads these with the service role only
+ALTER TABLE public.chat_session_stats ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.chat_user_stats ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Service role can manage chat session stats" ON public.chat_session_stats;
+CREATE POLICY "Service role can manage chat session stats"
+ON public.chat_session_stats
+FOR ALL
+TO service_role
+USING (true)
+WITH CHECK (true);
+
+DROP POLICY IF EXISTS "Service role can manage chat user stats" ON public.chat_user_stats;
+CREATE POLICY "Service role can manage chat user stats"
+ON public.chat_user_stats
+FOR ALL
+TO service_role
+USING (true)
+WITH CHECK (true);
+
+-- ============================================
+-- STEP 2: Session triggers
+-- ============================================
+
+CREATE OR REPLACE FUNCTION chat_stats_on_session_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO public.chat_session_stats (session_id, user_id, created_at, last_message_at)
+        VALUES (NEW.id, NEW.user_id, NEW.created_at, COALESCE(NEW.last_message_at, NEW.created_at))
+        ON CONFLICT (session_id) DO NOTHING;
+
+        IF NEW.user_id IS NOT NULL THEN
+            INSERT INTO public.chat_user_stats (user_id, total_sessions, archived_sessions, sessions_en, sessions_fil)
+            VALUES (
+                NEW.user_id,
+                1,
+                CASE WHEN NEW.is_archived THEN 1 ELSE 0 END,
+                CASE WHEN NEW.language = 'en' THEN 1 ELSE 0 END,
+                CASE WHEN NEW.language = 'fil' THEN 1 ELSE 0 END
+            )
+            ON CONFLICT (user_id) DO UPDATE SET
+                total_sessions = chat_user_stats.total_sessions + 1,
+                archived_sessions = chat_user_stats.archived_sessions + EXCLUDED.archived_sessions,
+                sessions_en = chat_user_stats.sessions_en + EXCLUDED.sessions_en,
+                sessions_fil = chat_user_stats.sessions_fil + EXCLUDED.sessions_fil,
+                updated_at = NOW();
+        END IF;
+        RETURN NEW;
+
+    ELSIF TG_OP = 'UPDATE' THEN
+        IF NEW.user_id IS NOT NULL AND (
+            NEW.is_archived IS DISTINCT FROM OLD.is_archived
+            OR NEW.language IS DISTINCT FROM OLD.language
+        ) THEN
+            UPDATE public.chat_user_stats SET
+                archived_sessions = archived_sessions
+                    + (CASE WHEN NEW.is_archived THEN 1 ELSE 0 END)
+                    - (CASE WHEN OLD.is_archived THEN 1 ELSE 0 END),
+                sessions_en = sessions_en
+                    + (CASE WHEN NEW.language = 'en' THEN 1 ELSE 0 END)
+                    - (CASE WHEN OLD.language = 'en' THEN 1 ELSE 0 END),
+                sessions_fil = sessions_fil
+                    + (CASE WHEN NEW.language = 'fil' THEN 1 ELSE 0 END)
+                    - (CASE WHEN OLD.language = 'fil' THEN 1 ELSE 0 END),
+                updated_at = NOW()
+            WHERE user_id = NEW.user_id;
+        END IF;
+        RETURN NEW;
+
+    ELSIF TG_OP = 'DELETE' THEN
+        IF OLD.user_id IS NOT NULL THEN
+            UPDATE public.chat_user_stats SET
+                total_sessions = GREATEST(total_sessions - 1, 0),
+                archived_sessions = GREATEST(archived_sessions - (CASE WHEN OLD.is_archived THEN 1 ELSE 0 END), 0),
+                sessions_en = GREATEST(sessions_en - (CASE WHEN OLD.language = 'en' THEN 1 ELSE 0 END), 0),
+                sessions_fil = GREATEST(sessions_fil - (CASE WHEN OLD.language = 'fil' THEN 1 ELSE 0 END), 0),
+                updated_at = NOW()
+            WHERE user_id = OLD.user_id;
+        END IF;
+        RETURN OLD;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS trg_chat_stats_on_session_change ON public.chat_sessions;
+CREATE TRIGGER trg_chat_stats_on_session_change
+AFTER INSERT OR UPDATE OF is_archived, language OR DELETE ON public.chat_sessions
+FOR EACH ROW EXECUTE FUNCTION chat_stats_on_session_change();
+
+-- ============================================
+-- STEP 3: Message triggers
+-- ============================================
+
+CREATE OR REPLACE FUNCTION chat_stats_on_message_change()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_sign INTEGER;
+    v_row public.chat_messages%ROWTYPE;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        v_sign := 1;
+        v_row := NEW;
+    ELSE
+        v_sign := -1;
+        v_row := OLD;
+    END IF;
+
+    UPDATE public.chat_session_stats SET
+        message_count = GREATEST(message_count + v_sign, 0),
+        total_tokens = total_tokens + v_sign * COALESCE(v_row.tokens_used, 0),
+        response_time_sum_ms = response_time_sum_ms + v_sign * COALESCE(v_row.response_time_ms, 0),
+        response_time_count = response_time_count
+            + v_sign * (CASE WHEN COALESCE(v_row.response_time_ms, 0) > 0 THEN 1 ELSE 0 END),
+        last_message_at = CASE
+            WHEN v_sign = 1 THEN GREATEST(last_message_at, v_row.created_at)
+            ELSE last_message_at
+        END
+    WHERE session_id = v_row.session_id;
+
+    IF v_row.user_id IS NOT NULL THEN
+        INSERT INTO public.chat_user_stats (
+            user_id, total_messages, total_tokens, response_time_sum_ms, response_time_count
+        )
+        VALUES (
+            v_row.user_id,
+            GREATEST(v_sign, 0),
+            GREATEST(v_sign, 0) * COALESCE(v_row.tokens_used, 0),
+            GREATEST(v_sign, 0) * COALESCE(v_row.response_time_ms, 0),
+            GREATEST(v_sign, 0) * (CASE WHEN COALESCE(v_row.response_time_ms, 0) > 0 THEN 1 ELSE 0 END)
+        )
+        ON CONFLICT (user_id) DO UPDATE SET
+            total_messages = GREATEST(chat_user_stats.total_messages + v_sign, 0),
+            total_tokens = chat_user_stats.total_tokens + v_sign * COALESCE(v_row.tokens_used, 0),
+            response_time_sum_ms = chat_user_stats.response_time_sum_ms + v_sign * COALESCE(v_row.response_time_ms, 0),
+            response_time_count = chat_user_stats.response_time_count
+                + v_sign * (CASE WHEN COALESCE(v_row.response_time_ms, 0) > 0 THEN 1 ELSE 0 END),
+            updated_at = NOW();
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS trg_chat_stats_on_message_change ON public.chat_messages;
+CREATE TRIGGER trg_chat_stats_on_message_change
+AFTER INSERT OR DELETE ON public.chat_messages
+FOR EACH ROW EXECUTE FUNCTION chat_stats_on_message_change();
+
+-- ============================================
+-- STEP 4: Backfill
+-- ============================================
+-- Recomputes counters from the base tables. Pass a user id to repair a
+-- single user, or NULL to rebuild everything.
+
+CREATE OR REPLACE FUNCTION backfill_chat_stats(p_user_id UUID DEFAULT NULL)
+RETURNS INTEGER AS $$
+DECLARE
+    v_users INTEGER;
+BEGIN
+    INSERT INTO public.chat_session_stats (
+        session_id, user_id, message_count, total_tokens,
+        response_time_sum_ms, response_time_count, created_at, last_message_at
+    )
+    SELECT
+        s.id,
+        s.user_id,
+        COUNT(m.id),
+        COALESCE(SUM(m.tokens_used), 0),
+        COALESCE(SUM(m.response_time_ms) FILTER (WHERE m.response_time_ms > 0), 0),
+        COUNT(m.id) FILTER (WHERE m.response_time_ms > 0),
+        s.created_at,
+        COALESCE(MAX(m.created_at), s.last_message_at, s.created_at)
+    FROM public.chat_sessions s
+    LEFT JOIN public.chat_messages m ON m.session_id = s.id
+    WHERE p_user_id IS NULL OR s.user_id = p_user_id
+    GROUP BY s.id
+    ON CONFLICT (session_id) DO UPDATE SET
+        user_id = EXCLUDED.user_id,
+        message_count = EXCLUDED.message_count,
+        total_tokens = EXCLUDED.total_tokens,
+        response_time_sum_ms = EXCLUDED.response_time_sum_ms,
+        response_time_count = EXCLUDED.response_time_count,
+        created_at = EXCLUDED.created_at,
+        last_message_at = EXCLUDED.last_message_at;
+
+    -- Users whose sessions and messages are all gone get no row below; reset
+    -- every counter in scope first so theirs end up at 0 instead of stale
+    UPDATE public.chat_user_stats SET
+        total_sessions = 0,
+        archived_sessions = 0,
+        sessions_en = 0,
+        sessions_fil = 0,
+        total_messages = 0,
+        total_tokens = 0,
+        response_time_sum_ms = 0,
+        response_time_count = 0,
+        updated_at = NOW()
+    WHERE p_user_id IS NULL OR user_id = p_user_id;
+
+    WITH session_counts AS (
+        SELECT
+            user_id,
+            COUNT(*) AS total_sessions,
+            COUNT(*) FILTER (WHERE is_archived) AS archived_sessions,
+            COUNT(*) FILTER (WHERE language = 'en') AS sessions_en,
+            COUNT(*) FILTER (WHERE language = 'fil') AS sessions_fil
+        FROM public.chat_sessions
+        WHERE user_id IS NOT NULL AND (p_user_id IS NULL OR user_id = p_user_id)
+        GROUP BY user_id
+    ),
+    message_counts AS (
+        SELECT
+            user_id,
+            COUNT(*) AS total_messages,
+            COALESCE(SUM(tokens_used), 0) AS total_tokens,
+            COALESCE(SUM(response_time_ms) FILTER (WHERE response_time_ms > 0), 0) AS response_time_sum_ms,
+            COUNT(*) FILTER (WHERE response_time_ms > 0) AS response_time_count
+        FROM public.chat_messages
+        WHERE user_id IS NOT NULL AND (p_user_id IS NULL OR user_id = p_user_id)
+        GROUP BY user_id
+    )
+    INSERT INTO public.chat_user_stats (
+        user_id, total_sessions, archived_sessions, sessions_en, sessions_fil,
+        total_messages, total_tokens, response_time_sum_ms, response_time_count, updated_at
+    )
+    SELECT
+        COALESCE(s.user_id, m.user_id),
+        COALESCE(s.total_sessions, 0),
+        COALESCE(s.archived_sessions, 0),
+        COALESCE(s.sessions_en, 0),
+        COALESCE(s.sessions_fil, 0),
+        COALESCE(m.total_messages, 0),
+        COALESCE(m.total_tokens, 0),
+        COALESCE(m.response_time_sum_ms, 0),
+        COALESCE(m.response_time_count, 0),
+        NOW()
+    FROM session_counts s
+    FULL OUTER JOIN message_counts m ON m.user_id = s.user_id
+    ON CONFLICT (user_id) DO UPDATE SET
+        total_sessions = EXCLUDED.total_sessions,
+        archived_sessions = EXCLUDED.archived_sessions,
+        sessions_en = EXCLUDED.sessions_en,
+        sessions_fil = EXCLUDED.sessions_fil,
+        total_messages = EXCLUDED.total_messages,
+        total_tokens = EXCLUDED.total_tokens,
+        response_time_sum_ms = EXCLUDED.response_time_sum_ms,
+        response_time_count = EXCLUDED.response_time_count,
+        updated_at = NOW();
+
+    GET DIAGNOSTICS v_users = ROW_COUNT;
+    RETURN v_users;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- ============================================
+-- STEP 5: Consistency checker
+-- ============================================
+-- Returns one row per user whose counters differ from the base tables.
+-- An empty result means the triggers are keeping up.
+
+CREATE OR REPLACE FUNCTION check_chat_stats_consistency(p_limit INTEGER DEFAULT 100)
+RETURNS TABLE (
+    user_id UUID,
+    stored_sessions INTEGER,
+    actual_sessions BIGINT,
+    stored_messages INTEGER,
+    actual_messages BIGINT,
+    stored_tokens BIGINT,
+    actual_tokens BIGINT
+) AS $$
+    WITH actual AS (
+        SELECT
+            COALESCE(s.user_id, m.user_id) AS user_id,
+            COALESCE(s.total_sessions, 0) AS total_sessions,
+            COALESCE(m.total_messages, 0) AS total_messages,
+            COALESCE(m.total_tokens, 0) AS total_tokens
+        FROM (
+            SELECT user_id, COUNT(*) AS total_sessions
+            FROM public.chat_sessions
+            WHERE user_id IS NOT NULL
+            GROUP BY user_id
+        ) s
+        FULL OUTER JOIN (
+            SELECT user_id, COUNT(*) AS total_messages, COALESCE(SUM(tokens_used), 0) AS total_tokens
+            FROM public.chat_messages
+            WHERE user_id IS NOT NULL
+            GROUP BY user_id
+        ) m ON m.user_id = s.user_id
+    )
+    SELECT
+        COALESCE(a.user_id, st.user_id),
+        COALESCE(st.total_sessions, 0),
+        COALESCE(a.total_sessions, 0),
+        COALESCE(st.total_messages, 0),
+        COALESCE(a.total_messages, 0),
+        COALESCE(st.total_tokens, 0),
+        COALESCE(a.total_tokens, 0)
+    FROM actual a
+    FULL OUTER JOIN public.chat_user_stats st ON st.user_id = a.user_id
+    WHERE COALESCE(st.total_sessions, 0) <> COALESCE(a.total_sessions, 0)
+       OR COALESCE(st.total_messages, 0) <> COALESCE(a.total_messages, 0)
+       OR COALESCE(st.total_tokens, 0) <> COALESCE(a.total_tokens, 0)
+    LIMIT p_limit;
+$$ LANGUAGE sql STABLE SECURITY DEFINER;
+
+-- ============================================
+-- Verification
+-- ============================================
+-- SELECT backfill_chat_stats();
+-- SELECT * FROM check_chat_stats_consistency();
+-- SELECT * FROM chat_user_stats ORDER BY total_messages DESC LIMIT 10;
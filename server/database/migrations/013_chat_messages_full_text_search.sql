@@ -0,0 +1,117 @@
+-- ============================================
+-- Migration: Indexed full-text search over chat history
+-- ============================================
+-- Purpose: Back /api/chat-history/search with indexes instead of an
+-- unindexed ILIKE '%query%' scan joined to chat_sessions.
+--
+-- - search_vector: generated tsvector over message content. Uses the 'simple'
+--   configuration because messages mix English, Tagalog and Taglish, and
+--   English stemming would mangle Tagalog words.
+-- - GIN index on search_vector for ranked word search
+-- - pg_trgm GIN index on content for partial-word / typo-tolerant fallback
+-- - search_chat_messages(): ranked, highlighted, paginated results in one call
+-- ============================================
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- ============================================
+-- STEP 1: Search column and indexes
+-- ============================================
+
+ALTER TABLE public.chat_messages
+ADD COLUMN IF NOT EXISTS search_vector tsvector
+GENERATED ALWAYS AS (to_tsvector('simple', COALESCE(content, ''))) STORED;
+
+COMMENT ON COLUMN public.chat_messages.search_vector IS 'Generated full-text search vector for chat history search.';
+
+CREATE INDEX IF NOT EXISTS idx_chat_messages_search_vector
+ON public.chat_messages USING GIN (search_vector);
+
+CREATE INDEX IF NOT EXISTS idx_chat_messages_content_trgm
+ON public.chat_messages USING GIN (content gin_trgm_ops);
+
+-- Every search is scoped to one user
+CREATE INDEX IF NOT EXISTS idx_chat_messages_user_created
+ON public.chat_messages(user_id, created_at DESC);
+
+-- ============================================
+-- STEP 2: Search function
+-- ============================================
+-- Snippets are HTML: message content is escaped (&, <, >) before matches
+-- are wrapped in <mark> tags, so clients can render them as markup.
+--
+-- Word queries (websearch syntax: quotes, OR, -exclude) are ranked with
+-- ts_rank_cd. Queries with no searchable words (e.g. only punctuation such
+-- as "R.A." or "art.") fall back to an ILIKE match served by the trigram index.
+
+CREATE OR REPLACE FUNCTION search_chat_messages(
+    p_user_id UUID,
+    p_query TEXT,
+    p_limit INTEGER DEFAULT 20,
+    p_offset INTEGER DEFAULT 0
+)
+RETURNS TABLE (
+    message_id UUID,
+    session_id UUID,
+    session_title TEXT,
+    role TEXT,
+    content TEXT,
+    snippet TEXT,
+    rank REAL,
+    created_at TIMESTAMP WITH TIME ZONE,
+    total_count BIGINT
+) AS $$
+DECLARE
+    v_tsquery tsquery := websearch_to_tsquery('simple', p_query);
+BEGIN
+    IF numnode(v_tsquery) > 0 THEN
+        RETURN QUERY
+        SELECT
+            m.id,
+            m.session_id,
+            s.title::TEXT,
+            m.role::TEXT,
+            m.content,
+            ts_headline(
+                'simple',
+                replace(replace(replace(m.content, '&', '&amp;'), '<', '&lt;'), '>', '&gt;'),
+                v_tsquery,
+                'StartSel=<mark>, StopSel=</mark>, MaxWords=24, MinWords=8, MaxFragments=2, FragmentDelimiter=" … "'
+            ),
+            ts_rank_cd(m.search_vector, v_tsquery),
+            m.created_at,
+            COUNT(*) OVER ()
+        FROM public.chat_messages m
+        JOIN public.chat_sessions s ON s.id = m.session_id
+        WHERE m.user_id = p_user_id
+          AND m.search_vector @@ v_tsquery
+        ORDER BY ts_rank_cd(m.search_vector, v_tsquery) DESC, m.created_at DESC
+        LIMIT p_limit OFFSET p_offset;
+    ELSE
+        RETURN QUERY
+        SELECT
+            m.id,
+            m.session_id,
+            s.title::TEXT,
+            m.role::TEXT,
+            m.content,
+            replace(replace(replace(LEFT(m.content, 200), '&', '&amp;'), '<', '&lt;'), '>', '&gt;'),
+            word_similarity(p_query, m.content),
+            m.created_at,
+            COUNT(*) OVER ()
+        FROM public.chat_messages m
+        JOIN public.chat_sessions s ON s.id = m.session_id
+        WHERE m.user_id = p_user_id
+          AND m.content ILIKE '%' || replace(replace(replace(p_query, '\', '\\'), '%', '\%'), '_', '\_') || '%'
+        ORDER BY word_similarity(p_query, m.content) DESC, m.created_at DESC
+        LIMIT p_limit OFFSET p_offset;
+    END IF;
+END;
+$$ LANGUAGE plpgsql STABLE SECURITY DEFINER;
+
+-- ============================================
+-- Verification
+-- ============================================
+-- SELECT * FROM search_chat_messages('<user-uuid>', 'annulment family code', 20, 0);
+-- EXPLAIN ANALYZE SELECT id FROM chat_messages
+--   WHERE user_id = '<user-uuid>' AND search_vector @@ websearch_to_tsquery('simple', 'annulment');
@@ -0,0 +1,71 @@
+-- ============================================
+-- Migration: Denormalized last-message preview on chat_sessions
+-- ============================================
+-- Purpose: Load the chat sidebar in a single query.
+--
+-- get_user_sessions used to run one "chat_messages ORDER BY created_at DESC
+-- LIMIT 1" query per session to build previews (N+1). The preview now lives
+-- on chat_sessions and is kept current by a trigger on message insert.
+-- The index below backs keyset pagination on (last_message_at, id).
+-- ============================================
+
+-- ============================================
+-- STEP 1: Preview columns
+-- ============================================
+
+ALTER TABLE public.chat_sessions
+ADD COLUMN IF NOT EXISTS last_message_preview TEXT NULL,
+ADD COLUMN IF NOT EXISTS last_message_preview_at TIMESTAMP WITH TIME ZONE NULL;
+
+COMMENT ON COLUMN public.chat_sessions.last_message_preview IS 'First 100 characters of the newest message, maintained by trigger.';
+COMMENT ON COLUMN public.chat_sessions.last_message_preview_at IS 'created_at of the message the preview was taken from.';
+
+-- ============================================
+-- STEP 2: Keep the preview current
+-- ============================================
+
+CREATE OR REPLACE FUNCTION chat_sessions_set_last_message_preview()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE public.chat_sessions SET
+        last_message_preview = CASE
+            WHEN LENGTH(NEW.content) > 100 THEN LEFT(NEW.content, 100) || '...'
+            ELSE NEW.content
+        END,
+        last_message_preview_at = NEW.created_at
+    WHERE id = NEW.session_id
+      -- Batched inserts may arrive out of order; only move the preview forward
+      AND (last_message_preview_at IS NULL OR last_message_preview_at <= NEW.created_at);
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS trg_chat_sessions_last_message_preview ON public.chat_messages;
+CREATE TRIGGER trg_chat_sessions_last_message_preview
+AFTER INSERT ON public.chat_messages
+FOR EACH ROW EXECUTE FUNCTION chat_sessions_set_last_message_preview();
+
+-- ============================================
+-- STEP 3: Backfill existing sessions
+-- ============================================
+
+UPDATE public.chat_sessions s SET
+    last_message_preview = CASE
+        WHEN LENGTH(latest.content) > 100 THEN LEFT(latest.content, 100) || '...'
+        ELSE latest.content
+    END,
+    last_message_preview_at = latest.created_at
+FROM (
+    SELECT DISTINCT ON (session_id) session_id, content, created_at
+    FROM public.chat_messages
+    ORDER BY session_id, created_at DESC
+) latest
+WHERE latest.session_id = s.id;
+
+-- ============================================
+-- STEP 4: Keyset pagination index
+-- ============================================
+
+CREATE INDEX IF NOT EXISTS idx_chat_sessions_user_keyset
+ON public.chat_sessions(user_id, is_archived, last_message_at DESC, id DESC);
@@ -0,0 +1,36 @@
+-- ============================================
+-- Migration: Race-free consultation booking
+-- ============================================
+-- Purpose: Make double-booking impossible at the database level.
+--
+-- ConsultationService.check_booking_conflict was a read-then-insert check
+-- (and failed open on errors), so two concurrent requests for the same
+-- lawyer, date and time could both succeed. A unique partial index over the
+-- active statuses lets the insert itself decide: the loser gets a unique
+-- violation (23505), which the service maps to BookingConflictError.
+--
+-- The predicate matches the statuses the old check treated as occupying a
+-- slot, so rejected/completed/cancelled bookings free the slot again.
+-- ============================================
+
+-- ============================================
+-- STEP 1: Find existing double-bookings (must be resolved first)
+-- ============================================
+-- The index cannot be created while duplicates exist. Review the output of
+-- this query and reject/cancel the extra requests before continuing:
+--
+-- SELECT lawyer_id, consultation_date, consultation_time, array_agg(id ORDER BY created_at) AS ids
+-- FROM public.consultation_requests
+-- WHERE status IN ('pending', 'accepted')
+-- GROUP BY lawyer_id, consultation_date, consultation_time
+-- HAVING COUNT(*) > 1;
+
+-- ============================================
+-- STEP 2: Unique partial index
+-- ============================================
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_consultation_requests_active_slot
+ON public.consultation_requests(lawyer_id, consultation_date, consultation_time)
+WHERE status IN ('pending', 'accepted');
+
+COMMENT ON INDEX public.uq_consultation_requests_active_slot IS 'At most one pending/accepted consultation per lawyer, date and time.';
@@ -0,0 +1,50 @@
+-- ============================================
+-- Migration: Lawyer dashboard consultation stats in one query
+-- ============================================
+-- Purpose: Stop downloading a lawyer's whole consultation history to count it.
+--
+-- GET /api/consult-actions/stats used to select * for every consultation a
+-- lawyer ever had and count statuses in Python. The RPC below returns all
+-- counters as a single row using FILTER aggregates, served from an index
+-- on (lawyer_id, status, consultation_date).
+--
+-- p_today is passed by the server so "today" matches the server's date.
+-- ============================================
+
+-- ============================================
+-- STEP 1: Index
+-- ============================================
+
+CREATE INDEX IF NOT EXISTS idx_consultation_requests_lawyer_status_date
+ON public.consultation_requests(lawyer_id, status, consultation_date);
+
+-- ============================================
+-- STEP 2: Grouped counts RPC
+-- ============================================
+
+CREATE OR REPLACE FUNCTION get_lawyer_consultation_stats(
+    p_lawyer_id UUID,
+    p_today DATE DEFAULT CURRENT_DATE
+)
+RETURNS TABLE (
+    total_requests BIGINT,
+    pending_requests BIGINT,
+    accepted_requests BIGINT,
+    completed_requests BIGINT,
+    rejected_requests BIGINT,
+    cancelled_requests BIGINT,
+    today_sessions BIGINT
+) AS $$
+    SELECT
+        COUNT(*),
+        COUNT(*) FILTER (WHERE status = 'pending'),
+        COUNT(*) FILTER (WHERE status = 'accepted'),
+        COUNT(*) FILTER (WHERE status = 'completed'),
+        COUNT(*) FILTER (WHERE status = 'rejected'),
+        COUNT(*) FILTER (WHERE status = 'cancelled'),
+        COUNT(*) FILTER (WHERE status = 'accepted' AND consultation_date = p_today)
+    FROM public.consultation_requests
+    WHERE lawyer_id = p_lawyer_id;
+$$ LANGUAGE sql STABLE SECURITY DEFINER;
+
+COMMENT ON FUNCTION get_lawyer_consultation_stats IS 'Status counts and today''s accepted sessions for one lawyer (lawyer_info.id), as one row.';
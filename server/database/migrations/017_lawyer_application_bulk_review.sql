@@ -0,0 +1,137 @@
+-- ============================================
+-- Migration: Bulk review of lawyer applications
+-- ============================================
+-- Purpose: Let admins clear the pending queue in pages after a bar-exam
+-- results release instead of one application at a time.
+--
+-- Reviewing one application used to take four round trips (read the
+-- application, patch it, read the user, patch the user) and the pending list
+-- was returned in full. This migration adds:
+--   * Stored Roll of Attorneys scores (roll_*), computed by the server when a
+--     page of the review queue is first shown, so the queue can be read
+--     without re-running the matcher.
+--   * A keyset index for paging pending applications oldest first.
+--   * save_lawyer_application_roll_checks: writes a page of scores at once.
+--   * bulk_review_lawyer_applications: applies a batch of decisions and the
+--     matching users updates (role, pending_lawyer, reject_count, blocking)
+--     in one transaction, with the same rules as the single review endpoint.
+-- ============================================
+
+-- ============================================
+-- STEP 1: Stored roll verification scores
+-- ============================================
+
+ALTER TABLE public.lawyer_applications
+    ADD COLUMN IF NOT EXISTS roll_match_type TEXT,
+    ADD COLUMN IF NOT EXISTS roll_confidence SMALLINT,
+    ADD COLUMN IF NOT EXISTS roll_match_id BIGINT,
+    ADD COLUMN IF NOT EXISTS roll_checked_at TIMESTAMPTZ;
+
+COMMENT ON COLUMN public.lawyer_applications.roll_match_type IS 'EXACT, PARTIAL, MULTIPLE or NONE from the last Roll of Attorneys check.';
+COMMENT ON COLUMN public.lawyer_applications.roll_confidence IS 'Best roll match score of the last check, 0-100.';
+COMMENT ON COLUMN public.lawyer_applications.roll_match_id IS 'supreme_court_roll.id of the best match of the last check.';
+
+-- ============================================
+-- STEP 2: Review queue index
+-- ============================================
+
+CREATE INDEX IF NOT EXISTS idx_lawyer_applications_pending_queue
+ON public.lawyer_applications(submitted_at, id)
+WHERE status = 'pending';
+
+-- ============================================
+-- STEP 3: Save a page of roll scores
+-- ============================================
+-- p_checks: [{"id": uuid, "match_type": text, "confidence": int,
+--             "match_id": bigint | null}, ...]
+
+CREATE OR REPLACE FUNCTION save_lawyer_application_roll_checks(
+    p_checks JSONB
+)
+RETURNS INTEGER AS $$
+    WITH updated AS (
+        UPDATE public.lawyer_applications a
+        SET roll_match_type = c.match_type,
+            roll_confidence = c.confidence,
+            roll_match_id = c.match_id,
+            roll_checked_at = NOW()
+        FROM jsonb_to_recordset(p_checks)
+            AS c(id UUID, match_type TEXT, confidence SMALLINT, match_id BIGINT)
+        WHERE a.id = c.id
+        RETURNING 1
+    )
+    SELECT COUNT(*)::INTEGER FROM updated;
+$$ LANGUAGE sql VOLATILE SECURITY DEFINER;
+
+COMMENT ON FUNCTION save_lawyer_application_roll_checks IS 'Stores Roll of Attorneys scores for many applications in one statement.';
+
+-- ============================================
+-- STEP 4: Bulk review RPC
+-- ============================================
+-- p_decisions: [{"id": uuid, "status": "accepted" | "rejected" | "resubmission",
+--                "admin_notes": text | null, "matched_roll_id": bigint | null}, ...]
+--
+-- Only applications that are still pending are reviewed; the rest (already
+-- reviewed by another admin, or unknown ids) are left out of the result so
+-- the caller can report them as skipped. An accepted decision without a
+-- matched_roll_id takes the stored roll match when that match was EXACT.
+
+CREATE OR REPLACE FUNCTION bulk_review_lawyer_applications(
+    p_admin_id UUID,
+    p_decisions JSONB
+)
+RETURNS TABLE (
+    application_id UUID,
+    user_id UUID,
+    status TEXT,
+    matched_roll_id BIGINT
+) AS $$
+    WITH decisions AS (
+        SELECT
+            d.id,
+            d.status,
+            d.admin_notes,
+            CASE
+                WHEN d.status = 'accepted' AND d.matched_roll_id IS NULL AND a.roll_match_type = 'EXACT'
+                    THEN a.roll_match_id
+                ELSE d.matched_roll_id
+            END AS matched_roll_id
+        FROM jsonb_to_recordset(p_decisions)
+            AS d(id UUID, status TEXT, admin_notes TEXT, matched_roll_id BIGINT)
+        JOIN public.lawyer_applications a ON a.id = d.id
+        WHERE d.status IN ('accepted', 'rejected', 'resubmission')
+    ),
+    reviewed AS (
+        UPDATE public.lawyer_applications a
+        SET status = d.status::lawyer_application_status,
+            reviewed_by = p_admin_id,
+            reviewed_at = NOW(),
+            admin_notes = d.admin_notes,
+            matched_roll_id = d.matched_roll_id,
+            matched_at = CASE WHEN d.matched_roll_id IS NOT NULL THEN NOW() ELSE a.matched_at END,
+            updated_at = NOW()
+        FROM decisions d
+        WHERE a.id = d.id
+          AND a.status = 'pending'
+        RETURNING a.id, a.user_id, d.status, d.matched_roll_id
+    ),
+    users_updated AS (
+        UPDATE public.users u
+        SET role = CASE WHEN r.status = 'accepted' THEN 'verified_lawyer' ELSE 'registered_user' END::user_role,
+            pending_lawyer = FALSE,
+            reject_count = CASE WHEN r.status = 'rejected' THEN COALESCE(u.reject_count, 0) + 1 ELSE u.reject_count END,
+            last_rejected_at = CASE WHEN r.status = 'rejected' THEN NOW() ELSE u.last_rejected_at END,
+            is_blocked_from_applying = CASE
+                WHEN r.status = 'rejected' AND COALESCE(u.reject_count, 0) + 1 >= 3 THEN TRUE
+                ELSE u.is_blocked_from_applying
+            END,
+            updated_at = NOW()
+        FROM reviewed r
+        WHERE u.id = r.user_id
+        RETURNING u.id
+    )
+    SELECT r.id, r.user_id, r.status, r.matched_roll_id
+    FROM reviewed r;
+$$ LANGUAGE sql VOLATILE SECURITY DEFINER;
+
+COMMENT ON FUNCTION bulk_review_lawyer_applications IS 'Reviews a batch of pending lawyer applications and updates their users in one transaction; returns the applications actually reviewed.';
@@ -0,0 +1,60 @@
+-- ============================================
+-- Migration: Glossary version stamp
+-- ============================================
+-- Purpose: Let the server keep the legal glossary in memory and reload it
+-- only when glossary_terms actually changed.
+--
+-- Every statement that writes glossary_terms (from the admin panel, the API
+-- or SQL) bumps a single counter row. The server's glossary index polls
+-- get_glossary_version() at most every few seconds and reloads the terms
+-- when the number moved, instead of querying glossary_terms per request.
+-- ============================================
+
+-- ============================================
+-- STEP 1: Version row
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS public.glossary_version (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    version BIGINT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+COMMENT ON TABLE public.glossary_version IS 'Single-row change counter for glossary_terms, bumped by a statement trigger.';
+
+INSERT INTO public.glossary_version (id) VALUES (TRUE)
+ON CONFLICT (id) DO NOTHING;
+
+-- Only read through get_glossary_version()
+ALTER TABLE public.glossary_version ENABLE ROW LEVEL SECURITY;
+
+-- ============================================
+-- STEP 2: Bump on every write
+-- ============================================
+
+CREATE OR REPLACE FUNCTION bump_glossary_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE public.glossary_version
+    SET version = version + 1,
+        updated_at = NOW()
+    WHERE id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS trg_glossary_terms_version ON public.glossary_terms;
+CREATE TRIGGER trg_glossary_terms_version
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.glossary_terms
+FOR EACH STATEMENT EXECUTE FUNCTION bump_glossary_version();
+
+-- ============================================
+-- STEP 3: Read the stamp
+-- ============================================
+
+CREATE OR REPLACE FUNCTION get_glossary_version()
+RETURNS BIGINT AS $$
+    SELECT version FROM public.glossary_version WHERE id;
+$$ LANGUAGE sql STABLE SECURITY DEFINER;
+
+COMMENT ON FUNCTION get_glossary_version IS 'Current glossary_terms change counter; changes whenever any glossary term is written.';
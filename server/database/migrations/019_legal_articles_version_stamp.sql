@@ -0,0 +1,61 @@
+-- ============================================
+-- Migration: Legal guides version stamp
+-- ============================================
+-- Purpose: Let the server keep the legal guides (legal_articles) in memory,
+-- answer If-None-Match revalidations without a query, and reload only when
+-- legal_articles actually changed.
+--
+-- Same scheme as 018_glossary_version_stamp.sql: every statement that
+-- writes legal_articles (from the admin panel, the API or SQL) bumps a
+-- single counter row, and the server's guide cache polls
+-- get_legal_articles_version() at most every few seconds.
+-- ============================================
+
+-- ============================================
+-- STEP 1: Version row
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS public.legal_articles_version (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    version BIGINT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+COMMENT ON TABLE public.legal_articles_version IS 'Single-row change counter for legal_articles, bumped by a statement trigger.';
+
+INSERT INTO public.legal_articles_version (id) VALUES (TRUE)
+ON CONFLICT (id) DO NOTHING;
+
+-- Only read through get_legal_articles_version()
+ALTER TABLE public.legal_articles_version ENABLE ROW LEVEL SECURITY;
+
+-- ============================================
+-- STEP 2: Bump on every write
+-- ============================================
+
+CREATE OR REPLACE FUNCTION bump_legal_articles_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE public.legal_articles_version
+    SET version = version + 1,
+        updated_at = NOW()
+    WHERE id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS trg_legal_articles_version ON public.legal_articles;
+CREATE TRIGGER trg_legal_articles_version
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.legal_articles
+FOR EACH STATEMENT EXECUTE FUNCTION bump_legal_articles_version();
+
+-- ============================================
+-- STEP 3: Read the stamp
+-- ============================================
+
+CREATE OR REPLACE FUNCTION get_legal_articles_version()
+RETURNS BIGINT AS $$
+    SELECT version FROM public.legal_articles_version WHERE id;
+$$ LANGUAGE sql STABLE SECURITY DEFINER;
+
+COMMENT ON FUNCTION get_legal_articles_version IS 'Current legal_articles change counter; changes whenever any legal article is written.';
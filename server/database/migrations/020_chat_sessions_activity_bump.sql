@@ -0,0 +1,43 @@
+-- ============================================
+-- Migration: Per-session activity bump for the chat write-behind queue
+-- ============================================
+-- Purpose: Move each chat session's updated_at / last_message_at to the
+-- time of its own newest message when queued messages are flushed.
+--
+-- services/chat_write_behind.py writes messages in batches. It used to
+-- bump every session in a batch with one UPDATE ... WHERE id IN (...),
+-- which gave all of them the newest session's timestamp and reordered the
+-- chat sidebar. The flush now sends one (id, timestamp) pair per session.
+-- ============================================
+
+-- ============================================
+-- STEP 1: Bump function
+-- ============================================
+
+CREATE OR REPLACE FUNCTION bump_chat_sessions(p_bumps JSONB)
+RETURNS INTEGER AS $$
+    WITH bumps AS (
+        SELECT (b->>'id')::uuid AS id, (b->>'at')::timestamptz AS at
+        FROM jsonb_array_elements(p_bumps) AS b
+    ),
+    updated AS (
+        UPDATE public.chat_sessions s SET
+            -- Batches may be replayed or flushed out of order; only move forward
+            updated_at = GREATEST(COALESCE(s.updated_at, b.at), b.at),
+            last_message_at = GREATEST(COALESCE(s.last_message_at, b.at), b.at)
+        FROM bumps b
+        WHERE s.id = b.id
+        RETURNING s.id
+    )
+    SELECT COUNT(*)::int FROM updated;
+$$ LANGUAGE sql SECURITY DEFINER;
+
+COMMENT ON FUNCTION bump_chat_sessions(JSONB) IS
+'Sets updated_at and last_message_at per session from [{"id": ..., "at": ...}], never moving them backwards.';
+
+-- ============================================
+-- STEP 2: Permissions
+-- ============================================
+
+REVOKE ALL ON FUNCTION bump_chat_sessions(JSONB) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION bump_chat_sessions(JSONB) TO service_role;
@@ -0,0 +1,60 @@
+-- ============================================
+-- Migration: Lawyer directory version stamp
+-- ============================================
+-- Purpose: Let the server's lawyer directory reload only when lawyer_info
+-- actually changed, instead of on a fixed TTL.
+--
+-- Same scheme as 018_glossary_version_stamp.sql: every statement that
+-- writes lawyer_info (profile edits, onboarding or SQL) bumps a single
+-- counter row, and the server's lawyer directory polls
+-- get_lawyer_info_version() at most every few seconds.
+-- ============================================
+
+-- ============================================
+-- STEP 1: Version row
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS public.lawyer_info_version (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    version BIGINT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+COMMENT ON TABLE public.lawyer_info_version IS 'Single-row change counter for lawyer_info, bumped by a statement trigger.';
+
+INSERT INTO public.lawyer_info_version (id) VALUES (TRUE)
+ON CONFLICT (id) DO NOTHING;
+
+-- Only read through get_lawyer_info_version()
+ALTER TABLE public.lawyer_info_version ENABLE ROW LEVEL SECURITY;
+
+-- ============================================
+-- STEP 2: Bump on every write
+-- ============================================
+
+CREATE OR REPLACE FUNCTION bump_lawyer_info_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE public.lawyer_info_version
+    SET version = version + 1,
+        updated_at = NOW()
+    WHERE id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS trg_lawyer_info_version ON public.lawyer_info;
+CREATE TRIGGER trg_lawyer_info_version
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.lawyer_info
+FOR EACH STATEMENT EXECUTE FUNCTION bump_lawyer_info_version();
+
+-- ============================================
+-- STEP 3: Read the stamp
+-- ============================================
+
+CREATE OR REPLACE FUNCTION get_lawyer_info_version()
+RETURNS BIGINT AS $$
+    SELECT version FROM public.lawyer_info_version WHERE id;
+$$ LANGUAGE sql STABLE SECURITY DEFINER;
+
+COMMENT ON FUNCTION get_lawyer_info_version IS 'Current lawyer_info change counter; changes whenever any lawyer profile is written.';
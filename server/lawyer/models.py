@@ -68,6 +68,11 @@ class LawyerApplicationResponse(BaseModel):
     is_latest: Optional[bool] = True
     # Acknowledgment field for rejected applications
     acknowledged: Optional[bool] = False
+    # Stored Roll of Attorneys check, filled in by the review queue
+    roll_match_type: Optional[str] = None
+    roll_confidence: Optional[int] = None
+    roll_match_id: Optional[int] = None
+    roll_checked_at: Optional[datetime] = None
 
 class LawyerApplicationStatusResponse(BaseModel):
     has_application: bool
@@ -86,3 +91,48 @@ class FileUploadResponse(BaseModel):
     file_path: Optional[str] = None
     message: str
     error: Optional[str] = None
+
+class RollMatchResponse(BaseModel):
+    id: Optional[int] = None
+    full_name: str
+    last_name: str
+    first_name: str
+    middle_name: str
+    roll_number: str
+    roll_signing_date: Optional[date] = None
+    score: float
+
+class RollVerificationResponse(BaseModel):
+    is_verified: bool
+    confidence: int  # Best match score, 0-100
+    match_type: Literal["EXACT", "PARTIAL", "MULTIPLE", "NONE"]
+    matches: List[RollMatchResponse]
+    processing_time_ms: float
+
+MAX_BULK_REVIEW = 100  # Decisions per bulk review request
+
+class BulkReviewDecision(LawyerApplicationReview):
+    application_id: UUID
+
+class BulkReviewRequest(BaseModel):
+    decisions: List[BulkReviewDecision]
+    
+    @validator('decisions')
+    def validate_decisions(cls, v):
+        if not v:
+            raise ValueError('At least one decision is required')
+        if len(v) > MAX_BULK_REVIEW:
+            raise ValueError(f'At most {MAX_BULK_REVIEW} decisions per request')
+        if len({d.application_id for d in v}) != len(v):
+            raise ValueError('Each application can only be decided once per request')
+        return v
+
+class BulkReviewResponse(BaseModel):
+    reviewed: List[UUID]
+    skipped: List[UUID]  # Not pending any more, or not found
+    notified: int
+
+class ReviewQueueResponse(BaseModel):
+    applications: List[LawyerApplicationResponse]
+    has_more: bool
+    next_cursor: Optional[str] = None
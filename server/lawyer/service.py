@@ -1,19 +1,32 @@
 from services.supabase_service import SupabaseService
+from services.notification_service import NotificationService
 from lawyer.models import (
     LawyerApplicationSubmit, 
     LawyerApplicationReview, 
     LawyerApplicationResponse,
     LawyerApplicationStatusResponse,
-    LawyerApplicationHistoryResponse
+    LawyerApplicationHistoryResponse,
+    BulkReviewDecision
 )
-from typing import Dict, Any, Optional, List
+from lawyer.verification import RollRecord, get_roll_verifier
+from supabase import create_client
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime, timezone
+import asyncio
+import base64
+import json
 import logging
+import time
 import uuid
 import httpx
 
 logger = logging.getLogger(__name__)
 
+ROLL_REFRESH_SECONDS = 6 * 3600  # Rebuild the roll index from supreme_court_roll this often
+ROLL_PAGE_SIZE = 1000
+
+_roll_load_lock = asyncio.Lock()
+
 class LawyerApplicationService:
     """Service for handling lawyer applications with role/pending logic"""
     
@@ -233,7 +246,256 @@ class LawyerApplicationService:
             logger.error(f"Review application error: {str(e)}")
             return {"success": False, "error": str(e)}
     
+    async def verify_against_roll(self, application_id: str) -> Dict[str, Any]:
+        """Match an application against the Roll of Attorneys (admin only)"""
+        try:
+            app_result = await self._get_application_by_id(application_id)
+            if not app_result["success"]:
+                return {"success": False, "error": "Application not found"}
+            
+            verifier_result = await self._get_roll_verifier()
+            if not verifier_result["success"]:
+                return verifier_result
+            
+            result = verifier_result["verifier"].verify_application(app_result["data"])
+            return {"success": True, "data": result.to_dict()}
+            
+        except Exception as e:
+            logger.error(f"Verify against roll error: {str(e)}")
+            return {"success": False, "error": str(e)}
+    
+    async def get_review_queue(self, limit: int = 50, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Page of pending applications, oldest first, with Roll of Attorneys
+        scores (admin only). Raises ValueError for a malformed cursor.
+        """
+        params = {
+            "status": "eq.pending",
+            "select": "*",
+            "order": "submitted_at.asc,id.asc",
+            "limit": str(limit + 1)  # One extra row to know whether another page exists
+        }
+        if cursor:
+            submitted_at, last_id = self._decode_cursor(cursor)
+            params["or"] = (
+                f'(submitted_at.gt."{submitted_at}",'
+                f'and(submitted_at.eq."{submitted_at}",id.gt.{last_id}))'
+            )
+        
+        try:
+            async with httpx.AsyncClient() as client:
+                response = await client.get(
+                    f"{self.supabase.rest_url}/lawyer_applications",
+                    params=params,
+                    headers=self.supabase._get_headers(use_service_key=True)
+                )
+            
+            if response.status_code != 200:
+                logger.error(f"Get review queue failed: {response.status_code}")
+                return {"success": False, "error": "Failed to get applications"}
+            
+            data = response.json()
+            rows = data[:limit]
+            has_more = len(data) > limit
+            
+            await self._precompute_roll_checks(rows)
+            
+            next_cursor = None
+            if has_more and rows:
+                next_cursor = self._encode_cursor(rows[-1]["submitted_at"], rows[-1]["id"])
+            
+            return {
+                "success": True,
+                "data": {
+                    "applications": rows,
+                    "has_more": has_more,
+                    "next_cursor": next_cursor
+                }
+            }
+            
+        except Exception as e:
+            logger.error(f"Get review queue error: {str(e)}")
+            return {"success": False, "error": str(e)}
+    
+    async def bulk_review_applications(self, decisions: List[BulkReviewDecision], admin_id: str) -> Dict[str, Any]:
+        """Apply a batch of review decisions in one transaction and notify the applicants (admin only)"""
+        try:
+            payload = [
+                {
+                    "id": str(decision.application_id),
+                    "status": decision.status,
+                    "admin_notes": decision.admin_notes,
+                    "matched_roll_id": decision.matched_roll_id
+                }
+                for decision in decisions
+            ]
+            
+            async with httpx.AsyncClient(timeout=30.0) as client:
+                response = await client.post(
+                    f"{self.supabase.rest_url}/rpc/bulk_review_lawyer_applications",
+                    json={"p_admin_id": admin_id, "p_decisions": payload},
+                    headers=self.supabase._get_headers(use_service_key=True)
+                )
+            
+            if response.status_code != 200:
+                error_data = response.json() if response.content else {}
+                logger.error(f"Bulk review failed: {response.status_code}, {error_data}")
+                return {"success": False, "error": "Failed to review applications"}
+            
+            reviewed = response.json()
+            reviewed_ids = {row["application_id"] for row in reviewed}
+            skipped = [item["id"] for item in payload if item["id"] not in reviewed_ids]
+            
+            notified = await self._notify_applicants(reviewed) if reviewed else 0
+            logger.info(f"✅ Bulk review by admin {admin_id[:8]}...: {len(reviewed)} reviewed, "
+                        f"{len(skipped)} skipped, {notified} notified")
+            
+            return {
+                "success": True,
+                "data": {
+                    "reviewed": [row["application_id"] for row in reviewed],
+                    "skipped": skipped,
+                    "notified": notified
+                }
+            }
+            
+        except Exception as e:
+            logger.error(f"Bulk review error: {str(e)}")
+            return {"success": False, "error": str(e)}
+    
     # Private helper methods
+    async def _get_roll_verifier(self) -> Dict[str, Any]:
+        """Roll index, built from supreme_court_roll on first use and when stale"""
+        verifier = get_roll_verifier()
+        if verifier.loaded_at and time.time() - verifier.loaded_at < ROLL_REFRESH_SECONDS:
+            return {"success": True, "verifier": verifier}
+        
+        async with _roll_load_lock:
+            # Another request may have rebuilt it while we waited
+            if verifier.loaded_at and time.time() - verifier.loaded_at < ROLL_REFRESH_SECONDS:
+                return {"success": True, "verifier": verifier}
+            
+            rows_result = await self._get_roll_records()
+            if not rows_result["success"]:
+                if verifier.records:
+                    logger.warning("⚠️  Could not refresh the roll of attorneys; using the loaded index")
+                    return {"success": True, "verifier": verifier}
+                return rows_result
+            
+            records = [RollRecord.from_supreme_court_roll(row) for row in rows_result["data"]]
+            await asyncio.to_thread(verifier.load, records)
+            logger.info(f"✅ Roll of attorneys indexed: {len(verifier.records)} records")
+            return {"success": True, "verifier": verifier}
+    
+    async def _get_roll_records(self) -> Dict[str, Any]:
+        """Every supreme_court_roll row, paged by id"""
+        try:
+            rows: List[Dict[str, Any]] = []
+            last_id = 0
+            async with httpx.AsyncClient(timeout=30.0) as client:
+                while True:
+                    response = await client.get(
+                        f"{self.supabase.rest_url}/supreme_court_roll?select=id,full_name,roll_number,roll_signing_date"
+                        f"&id=gt.{last_id}&order=id.asc&limit={ROLL_PAGE_SIZE}",
+                        headers=self.supabase._get_headers(use_service_key=True)
+                    )
+                    
+                    if response.status_code != 200:
+                        logger.error(f"Get roll records failed: {response.status_code}")
+                        return {"success": False, "error": "Failed to load the roll of attorneys"}
+                    
+                    page = response.json()
+                    rows.extend(page)
+                    if len(page) < ROLL_PAGE_SIZE:
+                        return {"success": True, "data": rows}
+                    last_id = page[-1]["id"]
+                    
+        except Exception as e:
+            logger.error(f"Get roll records error: {str(e)}")
+            return {"success": False, "error": str(e)}
+    
+    async def _precompute_roll_checks(self, applications: List[Dict[str, Any]]) -> None:
+        """
+        Score applications that have no stored roll check, or a non-EXACT one
+        older than the loaded roll (new attorneys may have been added since),
+        and store all new scores with one RPC call
+        """
+        verifier_result = await self._get_roll_verifier()
+        if not verifier_result["success"]:
+            logger.warning("⚠️  Roll of attorneys unavailable; review queue returned without new scores")
+            return
+        
+        verifier = verifier_result["verifier"]
+        stale = [row for row in applications if self._needs_roll_check(row, verifier.loaded_at)]
+        if not stale:
+            return
+        
+        checked_at = datetime.now(timezone.utc).isoformat()
+        checks = []
+        for row, result in zip(stale, verifier.verify_many(stale)):
+            match_id = result.matches[0].record.id if result.matches else None
+            row.update({
+                "roll_match_type": result.match_type,
+                "roll_confidence": result.confidence,
+                "roll_match_id": match_id,
+                "roll_checked_at": checked_at
+            })
+            checks.append({
+                "id": row["id"],
+                "match_type": result.match_type,
+                "confidence": result.confidence,
+                "match_id": match_id
+            })
+        
+        try:
+            async with httpx.AsyncClient() as client:
+                response = await client.post(
+                    f"{self.supabase.rest_url}/rpc/save_lawyer_application_roll_checks",
+                    json={"p_checks": checks},
+                    headers=self.supabase._get_headers(use_service_key=True)
+                )
+            if response.status_code != 200:
+                logger.warning(f"⚠️  Could not store roll checks: {response.status_code}")
+        except Exception as e:
+            logger.warning(f"⚠️  Could not store roll checks: {str(e)}")
+    
+    @staticmethod
+    def _needs_roll_check(application: Dict[str, Any], roll_loaded_at: Optional[float]) -> bool:
+        """Whether an application's stored roll check is missing or may be out of date"""
+        checked_at = application.get("roll_checked_at")
+        if not checked_at or not application.get("roll_match_type"):
+            return True
+        if application["roll_match_type"] == "EXACT" or not roll_loaded_at:
+            return False
+        checked = datetime.fromisoformat(str(checked_at).replace("Z", "+00:00"))
+        return checked.timestamp() < roll_loaded_at
+    
+    async def _notify_applicants(self, reviewed: List[Dict[str, Any]]) -> int:
+        """Send every review outcome of a bulk review in one notification insert"""
+        try:
+            client = create_client(self.supabase.url, self.supabase.service_key)
+            return await NotificationService(client).notify_lawyer_applications_reviewed(reviewed)
+        except Exception as e:
+            logger.error(f"Failed to send lawyer application notifications: {e}")
+            return 0
+    
+    @staticmethod
+    def _encode_cursor(submitted_at: str, application_id: str) -> str:
+        """Opaque keyset cursor for the review queue"""
+        raw = json.dumps([submitted_at, str(application_id)])
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+    
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[str, str]:
+        """Decode a cursor from _encode_cursor; raises ValueError if malformed"""
+        try:
+            submitted_at, application_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            # Validate both parts before they are placed in a filter
+            datetime.fromisoformat(str(submitted_at).replace("Z", "+00:00"))
+            return submitted_at, str(uuid.UUID(application_id))
+        except Exception:
+            raise ValueError("Invalid cursor")
+    
     async def _can_user_apply(self, user_id: str) -> Dict[str, Any]:
         """Check if user can submit an application"""
         try:
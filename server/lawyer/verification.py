@@ -0,0 +1,586 @@
+"""
+Lawyer verification against the Roll of Attorneys
+
+Matches an applicant's name (plus roll number and signing date when given)
+against the Supreme Court roll without scanning it. The old admin-side check
+(LawyerVerificationService.ts) computed a Levenshtein score against every
+roll record per applicant; here the roll is indexed once and each applicant
+is scored against a few dozen candidates:
+
+- Blocking: records are grouped by (phonetic key of the last name, first
+  initial), so "Dela Cruz", "Delacruz" and "Dela Crus" land in one block
+- Trigrams: a trigram index over distinct last names finds surnames with
+  typos the phonetic key misses; a second one over every name token is the
+  fallback when nothing in the blocks scores (e.g. a misspelled first
+  initial)
+- Scoring: candidates are scored with one batched Levenshtein pass in numpy,
+  using the field weights of the old check (last 40%, first 30%, middle 20%)
+
+Results are classified EXACT, PARTIAL, MULTIPLE or NONE with a confidence
+percentage, like the old check. Only an unambiguous EXACT match counts as
+verified; everything else stays with the admin.
+"""
+
+import logging
+import re
+import time
+import unicodedata
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MATCH_THRESHOLD = 0.6  # Minimum score to count as a match (as in the old check)
+EXACT_THRESHOLD = 0.9  # A lone match at or above this is EXACT
+AMBIGUITY_MARGIN = 0.05  # Runner-up this close to the best match makes it MULTIPLE
+LAST_NAME_MIN_DICE = 0.5  # Trigram similarity for a surname to join the candidates
+FALLBACK_CANDIDATES = 64  # Records rescored when the blocks have no match
+STOP_TRIGRAM_FRACTION = 0.05  # Trigrams in more records than this don't select anything
+MAX_NAME_CHARS = 32  # Longer names are truncated for scoring
+MAX_MATCHES = 10  # Matches returned per applicant
+SIMILAR_CACHE_SIZE = 20000  # Surnames whose similar-surname lists are kept
+
+# Field weights, as in LawyerVerificationService.ts
+LAST_WEIGHT = 0.4
+FIRST_WEIGHT = 0.3
+MIDDLE_WEIGHT = 0.2
+NAME_WEIGHT = 0.8  # Remaining 20% goes to roll number / signing date when given
+
+NAME_SUFFIXES = {"JR", "SR", "II", "III", "IV", "ATTY", "ATTORNEY"}
+# Words that belong to the surname that follows them: "Dela Cruz", "De los Santos"
+SURNAME_PARTICLES = {"DE", "DEL", "DELA", "DELOS", "DELAS", "LA", "LAS", "LOS", "SAN", "STA", "STO", "VDA", "DI", "DA", "VAN", "VON", "MC", "MAC"}
+DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%d/%m/%Y", "%B %d, %Y", "%b %d, %Y", "%m-%d-%Y")
+
+QUERY_PAD = 254  # Padding codes for the batched Levenshtein; never equal to a letter
+TARGET_PAD = 255
+
+SOUNDEX_CODES = {
+    **dict.fromkeys("BFPV", "1"),
+    **dict.fromkeys("CGJKQSXZ", "2"),
+    **dict.fromkeys("DT", "3"),
+    "L": "4",
+    **dict.fromkeys("MN", "5"),
+    "R": "6",
+}
+
+
+def normalize_name(value: Optional[str]) -> str:
+    """Uppercase ASCII letters and single spaces; accents, punctuation and suffixes removed"""
+    text = unicodedata.normalize("NFKD", value or "")
+    text = "".join(c for c in text if not unicodedata.combining(c)).upper()
+    text = re.sub(r"[^A-Z\s]", " ", text)
+    return " ".join(token for token in text.split() if token not in NAME_SUFFIXES)
+
+
+def normalize_roll_number(value: Any) -> str:
+    digits = re.sub(r"\D", "", str(value or ""))
+    return digits.lstrip("0")
+
+
+def parse_roll_date(value: Any) -> Optional[date]:
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = str(value).strip()
+    for fmt in DATE_FORMATS:
+        try:
+            # ISO values may carry a time ("2019-05-02T00:00:00")
+            return datetime.strptime(text[:10] if fmt == "%Y-%m-%d" else text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def phonetic_key(name: str) -> str:
+    """
+    Soundex of a normalized surname, with the spelling variants common in
+    Filipino and Spanish names folded first (C/K/Q, V/B, Z/S, PH/F), so the
+    first letter no longer splits "Cruz"/"Kruz" or "Villanueva"/"Bilanueva"
+    """
+    text = name.replace(" ", "")
+    if not text:
+        return ""
+    text = text.replace("PH", "F").replace("QU", "K").replace("GUI", "GI").replace("GUE", "GE")
+    text = re.sub(r"C(?=[EI])", "S", text)
+    first = {"C": "K", "Q": "K", "V": "B", "Z": "S"}.get(text[0], text[0])
+    key = [first]
+    previous = SOUNDEX_CODES.get(text[0], "")
+    for char in text[1:]:
+        code = SOUNDEX_CODES.get(char, "")
+        if code and code != previous:
+            key.append(code)
+            if len(key) == 4:
+                break
+        if char not in "HW":
+            previous = code
+    return "".join(key).ljust(4, "0")
+
+
+def _take_surname(tokens: List[str]) -> Tuple[List[str], List[str]]:
+    """Split the trailing surname (with its particles) off a token list"""
+    start = len(tokens) - 1
+    while start > 1 and tokens[start - 1] in SURNAME_PARTICLES:
+        start -= 1
+    return tokens[:start], tokens[start:]
+
+
+def split_full_name(full_name: str) -> Tuple[str, str, str]:
+    """
+    (first, middle, last) from "Juan Santos Dela Cruz" or the roll's
+    "DELA CRUZ, JUAN SANTOS" form. The last given name is read as the middle
+    name (the mother's surname, by Philippine convention); scoring also
+    compares first and middle together, so a two-word first name with no
+    middle name still matches.
+    """
+    if "," in full_name:
+        surname, _, given = full_name.partition(",")
+        last = normalize_name(surname)
+        given_tokens = normalize_name(given).split()
+    else:
+        tokens = normalize_name(full_name).split()
+        if len(tokens) < 2:
+            return "", "", " ".join(tokens)
+        given_tokens, last_tokens = _take_surname(tokens)
+        last = " ".join(last_tokens)
+
+    if len(given_tokens) >= 2:
+        first_tokens, middle_tokens = _take_surname(given_tokens)
+        return " ".join(first_tokens), " ".join(middle_tokens), last
+    return " ".join(given_tokens), "", last
+
+
+def _trigrams(token: str) -> List[str]:
+    padded = f"  {token} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def _name_trigrams(name: str) -> List[str]:
+    """Trigrams of each token separately, so token order doesn't matter"""
+    grams = set()
+    for token in name.split():
+        grams.update(_trigrams(token))
+    return sorted(grams)
+
+
+def _encode(values: Sequence[str], pad: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Padded uint8 code matrix and lengths for a list of normalized strings"""
+    codes = np.full((len(values), MAX_NAME_CHARS), pad, dtype=np.uint8)
+    lengths = np.zeros(len(values), dtype=np.int64)
+    for row, value in enumerate(values):
+        data = value[:MAX_NAME_CHARS].encode("ascii")
+        codes[row, :len(data)] = np.frombuffer(data, dtype=np.uint8)
+        lengths[row] = len(data)
+    return codes, lengths
+
+
+def batch_levenshtein(queries: np.ndarray, query_lengths: np.ndarray, targets: np.ndarray, target_lengths: np.ndarray) -> np.ndarray:
+    """
+    Edit distance for every row pair (queries[r], targets[r]) at once.
+
+    Runs the usual dynamic program one query character at a time over all
+    rows, on E[i][j] = D[i][j] - j. In that form a match is -1 on the
+    diagonal, a deletion +1 from above and an insertion is free from the
+    left, so insertions reduce to one running minimum down each column. The
+    table is kept transposed (target position x row) so every step is a
+    vector op across rows, and rows are ordered longest query first so rows
+    whose query is used up drop out of the remaining steps.
+    """
+    order = np.argsort(-query_lengths, kind="stable")
+    query_lengths = query_lengths[order]
+    target_lengths = target_lengths[order]
+    width = int(target_lengths.max(initial=0))
+    steps = int(query_lengths[0]) if len(order) else 0
+
+    targets = targets[order, :width].T
+    matches = targets[None, :, :] == queries[order, :steps].T[:, None, :]  # (step, position, row)
+    # Rows still running at step i: query_lengths >= i, a prefix since they are sorted
+    running = len(order) - np.searchsorted(query_lengths[::-1], np.arange(steps + 2), side="left")
+
+    previous = np.zeros((width + 1, len(order)), dtype=np.int16)
+    current = np.empty_like(previous)
+    distances = target_lengths.copy()  # Empty query: insert the whole target
+
+    for i in range(1, steps + 1):
+        k = running[i]
+        before, now = previous[:, :k], current[:, :k]
+        now[0] = i
+        np.minimum(before[:-1] - matches[i - 1, :, :k], before[1:] + 1, out=now[1:])
+        np.minimum.accumulate(now, axis=0, out=now)
+        finished = slice(running[i + 1], k)
+        if finished.start < k:
+            ends = target_lengths[finished]
+            distances[finished] = now[ends, np.arange(finished.start, k)] + ends
+        previous, current = current, previous
+
+    result = np.empty_like(distances)
+    result[order] = distances
+    return result
+
+
+def _similarity(distances: np.ndarray, query_lengths: np.ndarray, target_lengths: np.ndarray) -> np.ndarray:
+    """(longer - distance) / longer, 1 for two empty strings and 0 when only one is empty"""
+    longer = np.maximum(query_lengths, target_lengths)
+    scores = np.where(longer > 0, 1 - distances / np.maximum(longer, 1), 1.0)
+    one_empty = (query_lengths == 0) != (target_lengths == 0)
+    return np.where(one_empty, 0.0, scores)
+
+
+@dataclass(frozen=True)
+class RollRecord:
+    """One attorney on the roll, with normalized name fields"""
+    id: Optional[int]
+    last_name: str
+    first_name: str
+    middle_name: str = ""
+    roll_number: str = ""
+    roll_signing_date: Optional[date] = None
+    full_name: str = ""  # As it appears on the roll
+
+    @classmethod
+    def from_supreme_court_roll(cls, row: Dict[str, Any]) -> "RollRecord":
+        """Row of the supreme_court_roll table (id, full_name, roll_number, roll_signing_date)"""
+        first, middle, last = split_full_name(row.get("full_name") or "")
+        return cls(
+            id=row.get("id"),
+            last_name=last,
+            first_name=first,
+            middle_name=middle,
+            roll_number=normalize_roll_number(row.get("roll_number")),
+            roll_signing_date=parse_roll_date(row.get("roll_signing_date")),
+            full_name=row.get("full_name") or "",
+        )
+
+    @classmethod
+    def from_lawyers_list(cls, row: Dict[str, Any], record_id: Optional[int] = None) -> "RollRecord":
+        """Entry of lawyers_list.json, the export the admin tests use"""
+        last = normalize_name(row.get("Lastname"))
+        first = normalize_name(row.get("Firstname"))
+        middle = normalize_name(row.get("Middle Name"))
+        return cls(
+            id=record_id,
+            last_name=last,
+            first_name=first,
+            middle_name=middle,
+            roll_number=normalize_roll_number(row.get("Roll No.")),
+            roll_signing_date=parse_roll_date(row.get("Roll Signed Date")),
+            full_name=f"{row.get('Lastname', '')}, {row.get('Firstname', '')} {row.get('Middle Name', '')}".strip(),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "full_name": self.full_name,
+            "last_name": self.last_name,
+            "first_name": self.first_name,
+            "middle_name": self.middle_name,
+            "roll_number": self.roll_number,
+            "roll_signing_date": self.roll_signing_date.isoformat() if self.roll_signing_date else None,
+        }
+
+
+@dataclass
+class RollMatch:
+    record: RollRecord
+    score: float
+
+
+@dataclass
+class VerificationResult:
+    is_verified: bool
+    confidence: int  # Best match score as a percentage
+    match_type: str  # "EXACT", "PARTIAL", "MULTIPLE" or "NONE"
+    matches: List[RollMatch] = field(default_factory=list)
+    processing_time_ms: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "is_verified": self.is_verified,
+            "confidence": self.confidence,
+            "match_type": self.match_type,
+            "matches": [{**m.record.to_dict(), "score": round(m.score, 4)} for m in self.matches],
+            "processing_time_ms": round(self.processing_time_ms, 3),
+        }
+
+
+@dataclass
+class _Query:
+    first: str
+    middle: str
+    last: str
+    roll_number: str
+    signing_date: Optional[date]
+
+    @property
+    def given(self) -> str:
+        return f"{self.first} {self.middle}".strip()
+
+
+@dataclass(frozen=True)
+class _RollIndex:
+    """Everything load() builds, replaced as one object"""
+    records: List[RollRecord]
+    blocks: Dict[Tuple[str, str], np.ndarray]  # (phonetic key, first initial) -> record ids
+    by_last_initial: Dict[Tuple[str, str], np.ndarray]
+    by_roll: Dict[str, np.ndarray]
+    last_names: List[str]  # Distinct surnames
+    last_gram_counts: np.ndarray
+    last_postings: Dict[str, np.ndarray]  # Trigram -> surname ids
+    name_postings: Dict[str, np.ndarray]  # Trigram -> record ids
+    codes: Dict[str, Tuple[np.ndarray, np.ndarray]]  # Field -> (codes, lengths)
+    roll_numbers: np.ndarray
+    signing_dates: np.ndarray
+    # Surname -> similar surnames on this roll; dropped with the index on reload
+    similar_cache: Dict[str, List[str]] = field(default_factory=dict)
+
+
+class RollVerifier:
+    """Indexed roll of attorneys; build once with load(), then verify() per applicant"""
+
+    def __init__(self, records: Optional[Iterable[RollRecord]] = None):
+        self._index: Optional[_RollIndex] = None
+        self.loaded_at: Optional[float] = None
+        self.verifications = 0
+        self.fallbacks = 0
+        self.total_candidates = 0
+        if records is not None:
+            self.load(records)
+
+    @property
+    def records(self) -> List[RollRecord]:
+        return self._index.records if self._index is not None else []
+
+    def load(self, records: Iterable[RollRecord]):
+        """(Re)build every index; the previous ones serve until this returns"""
+        start = time.perf_counter()
+        records = [r for r in records if r.last_name]
+        count = len(records)
+
+        blocks: Dict[Tuple[str, str], List[int]] = {}
+        by_last_initial: Dict[Tuple[str, str], List[int]] = {}
+        by_roll: Dict[str, List[int]] = {}
+        last_names: Dict[str, int] = {}
+        name_postings: Dict[str, List[int]] = {}
+
+        for index, record in enumerate(records):
+            initial = record.first_name[:1]
+            blocks.setdefault((phonetic_key(record.last_name), initial), []).append(index)
+            by_last_initial.setdefault((record.last_name, initial), []).append(index)
+            last_names.setdefault(record.last_name, len(last_names))
+            if record.roll_number:
+                by_roll.setdefault(record.roll_number, []).append(index)
+            for gram in _name_trigrams(f"{record.first_name} {record.middle_name} {record.last_name}"):
+                name_postings.setdefault(gram, []).append(index)
+
+        last_postings: Dict[str, List[int]] = {}
+        for last, last_index in last_names.items():
+            for gram in _name_trigrams(last):
+                last_postings.setdefault(gram, []).append(last_index)
+
+        as_array = lambda ids: np.array(ids, dtype=np.int32)
+        fields = {
+            "last": [r.last_name for r in records],
+            "first": [r.first_name for r in records],
+            "middle": [r.middle_name for r in records],
+            "given": [f"{r.first_name} {r.middle_name}".strip() for r in records],
+        }
+        codes = {name: _encode(values, TARGET_PAD) for name, values in fields.items()}
+
+        last_name_list = list(last_names)
+        index = _RollIndex(
+            records=records,
+            blocks={key: as_array(ids) for key, ids in blocks.items()},
+            by_last_initial={key: as_array(ids) for key, ids in by_last_initial.items()},
+            by_roll={key: as_array(ids) for key, ids in by_roll.items()},
+            last_names=last_name_list,
+            last_gram_counts=np.array([len(_name_trigrams(last)) for last in last_name_list], dtype=np.int32),
+            last_postings={gram: as_array(ids) for gram, ids in last_postings.items()},
+            name_postings={gram: as_array(ids) for gram, ids in name_postings.items() if len(ids) <= max(1, STOP_TRIGRAM_FRACTION * count)},
+            codes=codes,
+            roll_numbers=np.array([r.roll_number for r in records], dtype=object),
+            signing_dates=np.array([r.roll_signing_date.toordinal() if r.roll_signing_date else 0 for r in records], dtype=np.int64),
+        )
+        # load() runs in a worker thread while verify() runs on the event loop;
+        # one reference swap means a verify() sees either the old index or the new one
+        self._index = index
+        self.loaded_at = time.time()
+
+        logger.info(f"Roll index built: {count} records, {len(index.blocks)} blocks, "
+                    f"{len(index.last_names)} surnames in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+    def _query(self, full_name: str, first_name: str, middle_name: str, last_name: str,
+               roll_number: Any, roll_signing_date: Any) -> _Query:
+        if last_name or first_name:
+            first, middle, last = normalize_name(first_name), normalize_name(middle_name), normalize_name(last_name)
+        else:
+            first, middle, last = split_full_name(full_name)
+        return _Query(first, middle, last, normalize_roll_number(roll_number), parse_roll_date(roll_signing_date))
+
+    def _similar_last_names(self, index: _RollIndex, last: str) -> List[str]:
+        """Surnames on the roll sharing enough trigrams with last, memoized per surname"""
+        similar = index.similar_cache.get(last)
+        if similar is not None:
+            return similar
+
+        grams = _name_trigrams(last)
+        postings = [index.last_postings[g] for g in grams if g in index.last_postings]
+        similar = []
+        if postings:
+            ids, shared = np.unique(np.concatenate(postings), return_counts=True)
+            dice = 2 * shared / (len(grams) + index.last_gram_counts[ids])
+            similar = [index.last_names[i] for i in ids[dice >= LAST_NAME_MIN_DICE]]
+
+        if len(index.similar_cache) >= SIMILAR_CACHE_SIZE:
+            index.similar_cache.clear()
+        index.similar_cache[last] = similar
+        return similar
+
+    def _candidates(self, index: _RollIndex, query: _Query) -> np.ndarray:
+        initial = query.first[:1]
+        found = [index.blocks.get((phonetic_key(query.last), initial))]
+        found += [index.by_last_initial.get((last, initial)) for last in self._similar_last_names(index, query.last)]
+        if query.roll_number:
+            found.append(index.by_roll.get(query.roll_number))
+        found = [ids for ids in found if ids is not None]
+        return np.unique(np.concatenate(found)) if found else np.empty(0, dtype=np.int32)
+
+    def _fallback_candidates(self, index: _RollIndex, query: _Query) -> np.ndarray:
+        """Records sharing the most name trigrams with the applicant, in any order"""
+        grams = _name_trigrams(f"{query.first} {query.middle} {query.last}")
+        postings = [index.name_postings[g] for g in grams if g in index.name_postings]
+        if not postings:
+            return np.empty(0, dtype=np.int32)
+        ids, shared = np.unique(np.concatenate(postings), return_counts=True)
+        keep = shared >= max(2, len(grams) // 3)
+        ids, shared = ids[keep], shared[keep]
+        if len(ids) > FALLBACK_CANDIDATES:
+            ids = ids[np.argpartition(-shared, FALLBACK_CANDIDATES)[:FALLBACK_CANDIDATES]]
+        return ids
+
+    def _similarities(self, index: _RollIndex, candidates: np.ndarray, pairs: Sequence[Tuple[str, str]]) -> np.ndarray:
+        """Similarity of each (applicant value, roll field) pair for every candidate, in one batched pass"""
+        n = len(candidates)
+        query_codes, query_lengths = _encode([value for value, _ in pairs], QUERY_PAD)
+        targets = np.concatenate([index.codes[name][0][candidates] for _, name in pairs])
+        target_lengths = np.concatenate([index.codes[name][1][candidates] for _, name in pairs])
+        lengths = np.repeat(query_lengths, n)
+        distances = batch_levenshtein(np.repeat(query_codes, n, axis=0), lengths, targets, target_lengths)
+        return _similarity(distances, lengths, target_lengths).reshape(len(pairs), n)
+
+    def _score(self, index: _RollIndex, query: _Query, candidates: np.ndarray) -> np.ndarray:
+        """Score of every candidate"""
+        last, first, middle = self._similarities(index, candidates, [(query.last, "last"), (query.first, "first"), (query.middle, "middle")])
+
+        # Field weights as in the old check; middle only counts when both sides have one
+        has_middle = bool(query.middle) & (index.codes["middle"][1][candidates] > 0)
+        name_score = (LAST_WEIGHT * last + FIRST_WEIGHT * first + np.where(has_middle, MIDDLE_WEIGHT * middle, 0)) \
+            / np.where(has_middle, LAST_WEIGHT + FIRST_WEIGHT + MIDDLE_WEIGHT, LAST_WEIGHT + FIRST_WEIGHT)
+
+        if query.middle and name_score.max() < EXACT_THRESHOLD:
+            # An applicant with two first names who left out the middle name
+            # reads as first + middle ("Maria Clara Santos"); compare the given
+            # names as a whole as well. Only done when needed: the longest
+            # string sets the number of Levenshtein steps.
+            (given,) = self._similarities(index, candidates, [(query.given, "given")])
+            combined = (LAST_WEIGHT * last + (FIRST_WEIGHT + MIDDLE_WEIGHT) * given) / (LAST_WEIGHT + FIRST_WEIGHT + MIDDLE_WEIGHT)
+            name_score = np.maximum(name_score, combined)
+
+        present = np.zeros(len(candidates), dtype=np.int64)
+        agreed = np.zeros(len(candidates), dtype=np.int64)
+        if query.roll_number:
+            roll_numbers = index.roll_numbers[candidates]
+            present += roll_numbers != ""
+            agreed += roll_numbers == query.roll_number
+        if query.signing_date:
+            dates = index.signing_dates[candidates]
+            present += dates != 0
+            agreed += dates == query.signing_date.toordinal()
+        identifier_score = agreed / np.maximum(present, 1)
+        return np.where(present > 0, NAME_WEIGHT * name_score + (1 - NAME_WEIGHT) * identifier_score, name_score)
+
+    def _classify(self, index: _RollIndex, candidates: np.ndarray, scores: np.ndarray) -> VerificationResult:
+        above = scores >= MATCH_THRESHOLD
+        candidates, scores = candidates[above], scores[above]
+        if not len(candidates):
+            return VerificationResult(is_verified=False, confidence=0, match_type="NONE")
+
+        order = np.argsort(-scores, kind="stable")[:MAX_MATCHES]
+        matches = [RollMatch(index.records[candidates[i]], float(scores[i])) for i in order]
+        best = matches[0].score
+        confidence = int(round(best * 100))
+
+        if len(matches) > 1 and best - matches[1].score <= AMBIGUITY_MARGIN:
+            return VerificationResult(is_verified=False, confidence=confidence, match_type="MULTIPLE", matches=matches)
+        if best >= EXACT_THRESHOLD:
+            return VerificationResult(is_verified=True, confidence=confidence, match_type="EXACT", matches=matches)
+        return VerificationResult(is_verified=False, confidence=confidence, match_type="PARTIAL", matches=matches)
+
+    def verify(self, full_name: str = "", first_name: str = "", middle_name: str = "", last_name: str = "",
+               roll_number: Any = None, roll_signing_date: Any = None) -> VerificationResult:
+        """Match one applicant; pass full_name, or the separate name fields"""
+        start = time.perf_counter()
+        index = self._index  # Held for the whole call; load() may swap in a new one
+        if index is None or not index.records:
+            raise RuntimeError("Roll of attorneys is not loaded")
+
+        query = self._query(full_name, first_name, middle_name, last_name, roll_number, roll_signing_date)
+        if not query.last:
+            return VerificationResult(is_verified=False, confidence=0, match_type="NONE",
+                                      processing_time_ms=(time.perf_counter() - start) * 1000)
+
+        candidates = self._candidates(index, query)
+        scores = self._score(index, query, candidates) if len(candidates) else np.empty(0)
+        if not (scores >= MATCH_THRESHOLD).any():
+            self.fallbacks += 1
+            candidates = np.setdiff1d(self._fallback_candidates(index, query), candidates)
+            scores = self._score(index, query, candidates) if len(candidates) else np.empty(0)
+
+        result = self._classify(index, candidates, scores)
+        result.processing_time_ms = (time.perf_counter() - start) * 1000
+        self.verifications += 1
+        self.total_candidates += len(candidates)
+        return result
+
+    def verify_application(self, application: Dict[str, Any]) -> VerificationResult:
+        """
+        Match a lawyer_applications row (full_name, roll_number,
+        roll_signing_date) or an applicant in the admin test-data shape
+        (first_name, middle_name, last_name, roll_number)
+        """
+        return self.verify(
+            full_name=application.get("full_name") or application.get("applicant_name") or "",
+            first_name=application.get("first_name") or "",
+            middle_name=application.get("middle_name") or "",
+            last_name=application.get("last_name") or "",
+            roll_number=application.get("roll_number"),
+            roll_signing_date=application.get("roll_signing_date"),
+        )
+
+    def verify_many(self, applications: Iterable[Dict[str, Any]]) -> List[VerificationResult]:
+        return [self.verify_application(application) for application in applications]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "records": len(self.records),
+            "blocks": len(self._index.blocks) if self._index is not None else 0,
+            "verifications": self.verifications,
+            "fallbacks": self.fallbacks,
+            "avg_candidates": round(self.total_candidates / self.verifications, 1) if self.verifications else 0,
+            "loaded_at": self.loaded_at,
+        }
+
+
+_roll_verifier: Optional[RollVerifier] = None
+
+
+def get_roll_verifier() -> RollVerifier:
+    """Get or create RollVerifier singleton"""
+    global _roll_verifier
+    if _roll_verifier is None:
+        _roll_verifier = RollVerifier()
+    return _roll_verifier
@@ -49,10 +49,56 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"❌ Failed to test Supabase connection: {str(e)}")
     
+    # Start batched chat persistence (replays any journaled rows from a crash)
+    chat_write_queue = None
+    try:
+        from services.chat_write_behind import get_chat_write_queue
+        chat_write_queue = get_chat_write_queue()
+        await chat_write_queue.start()
+    except Exception as e:
+        logger.error(f"❌ Failed to start chat write-behind queue: {str(e)}")
+        chat_write_queue = None
+    
+    # Lift expired suspensions and consultation bans in the background
+    user_status_service = None
+    try:
+        from services.user_status_service import get_user_status_service
+        user_status_service = get_user_status_service()
+        user_status_service.start_sweeper()
+    except Exception as e:
+        logger.error(f"❌ Failed to start user status sweeper: {str(e)}")
+        user_status_service = None
+    
+    # Deliver OTP and support email off the request path
+    mail_queue = None
+    try:
+        from services.mail_queue import get_mail_queue
+        mail_queue = get_mail_queue()
+        await mail_queue.start()
+    except Exception as e:
+        logger.error(f"❌ Failed to start mail queue: {str(e)}")
+        mail_queue = None
+    
     yield
     
     # Shutdown
     logger.info("AI.ttorney API shutting down...")
+    if chat_write_queue:
+        await chat_write_queue.stop()
+    if user_status_service:
+        await user_status_service.stop_sweeper()
+    if mail_queue:
+        await mail_queue.stop()
+    try:
+        from services.places_cache import get_places_cache
+        await get_places_cache().close()
+    except Exception as e:
+        logger.error(f"❌ Failed to close Google Places client: {str(e)}")
+    try:
+        from services.shared_state import get_shared_state
+        await get_shared_state().close()
+    except Exception as e:
+        logger.error(f"❌ Failed to close shared state backend: {str(e)}")
 
 # Create FastAPI app
 app = FastAPI(
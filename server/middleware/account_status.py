@@ -4,7 +4,7 @@ Account Status Middleware
 Middleware to check if users are suspended or banned before allowing access to protected routes.
 
 Features:
-- Automatic suspension expiry checking
+- Suspension expiry handled by the shared user status cache and sweeper
 - Clear error messages for suspended/banned users
 - Fail-open for high availability
 - Comprehensive logging
@@ -17,7 +17,7 @@ from fastapi import HTTPException, Depends, status
 from typing import Dict, Any
 import logging
 from middleware.auth import get_current_user
-from services.violation_tracking_service import get_violation_tracking_service
+from services.user_status_service import get_user_status_service
 
 logger = logging.getLogger(__name__)
 
@@ -50,9 +50,8 @@ async def check_account_status(
     try:
         user_id = current_user["user"]["id"]
         
-        # Check user status
-        violation_service = get_violation_tracking_service()
-        user_status = await violation_service.check_user_status(user_id)
+        # Check user status (shared cache, no per-request write path)
+        user_status = await get_user_status_service().check_user_status(user_id)
         
         if not user_status["is_allowed"]:
             logger.warning(f"🚫 Blocked access for {user_status['account_status']} user {user_id[:8]}...")
@@ -98,9 +97,8 @@ async def check_account_status_optional(
     try:
         user_id = current_user["user"]["id"]
         
-        # Check user status
-        violation_service = get_violation_tracking_service()
-        user_status = await violation_service.check_user_status(user_id)
+        # Check user status (shared cache, no per-request write path)
+        user_status = await get_user_status_service().check_user_status(user_id)
         
         return (current_user, user_status["is_allowed"])
         
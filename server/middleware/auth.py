@@ -20,11 +20,8 @@ async def get_current_user(credentials: Optional[HTTPAuthorizationCredentials] =
             )
         
         token = credentials.credentials
-        logger.info(f"🔐 Authenticating user with token: {token[:20]}...")
         user_data = await AuthService.get_user(token)
         
-        logger.info(f"🔐 User data received: {user_data}")
-        
         if not user_data:
             logger.warning("🔐 No user data returned from AuthService")
             raise HTTPException(
@@ -33,6 +30,7 @@ async def get_current_user(credentials: Optional[HTTPAuthorizationCredentials] =
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
+        logger.debug(f"🔐 Authenticated user {user_data['user'].get('id', 'unknown')[:8]}...")
         return user_data
     except HTTPException:
         raise
@@ -44,6 +42,16 @@ async def get_current_user(credentials: Optional[HTTPAuthorizationCredentials] =
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+async def get_optional_user(credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)) -> Optional[Dict[str, Any]]:
+    """Get current user for public endpoints; None when anonymous or the token is invalid"""
+    if not credentials:
+        return None
+    try:
+        return await AuthService.get_user(credentials.credentials) or None
+    except Exception as e:
+        logger.warning(f"🔐 Optional authentication failed, treating as anonymous: {str(e)}")
+        return None
+
 async def get_current_active_user(current_user: Dict[str, Any] = Depends(get_current_user)) -> Dict[str, Any]:
     """Get current active user"""
     profile = current_user.get("profile")
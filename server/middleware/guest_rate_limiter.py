@@ -24,7 +24,6 @@ import sys
 from typing import Dict, Optional
 from datetime import datetime
 from fastapi import Request
-from collections import defaultdict
 
 # Add parent directory to path for config imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -37,15 +36,23 @@ from config.guest_config import (
     GuestSessionValidation,
     GuestErrorMessages,
     calculate_remaining_prompts,
-    is_prompt_limit_reached,
     validate_session_id,
     calculate_reset_time,
 )
+from services.shared_state import MemoryStateBackend, get_shared_state, sliding_window_hit
 
-# In-memory store (sufficient for <5000 users)
-# For >5000 users or multiple servers, use Redis
-GUEST_SESSIONS = {}  # {session_id: {count, created_at, ip}}
-IP_RATE_LIMITS = defaultdict(lambda: {"count": 0, "reset_time": 0})
+# Guest sessions and per-IP counters live in the shared state backend
+# (services/shared_state.py) so every API worker enforces the same quota.
+# Keys expire natively: sessions a little after SESSION_EXPIRY_HOURS (so an
+# expired session still gets the "session expired" message), IP windows
+# after two windows.
+SESSION_KEY_PREFIX = "guest:session:"
+IP_KEY_PREFIX = "guest:ip:"
+IP_WINDOW_SECONDS = 3600
+
+
+def _session_key(session_id: str) -> str:
+    return f"{SESSION_KEY_PREFIX}{session_id}"
 
 
 class GuestRateLimiter:
@@ -66,29 +73,56 @@ class GuestRateLimiter:
         return str(uuid.uuid4())
     
     @staticmethod
-    def check_ip_rate_limit(ip: str) -> tuple[bool, Optional[int]]:
+    async def check_ip_rate_limit(ip: str) -> tuple[bool, Optional[int]]:
         """
         IP-based rate limiting (backup layer)
         Prevents abuse even if session tokens are compromised
         
-        Returns: (is_allowed, seconds_until_reset)
+        Returns: (is_allowed, seconds_until_allowed)
         
-        For <5000 users, IP limiting is simple and effective
+        Sliding window over the last hour, so a burst at the end of one
+        clock hour can no longer be followed by a full quota at the start
+        of the next. Counts the request when it is allowed.
         """
-        now = time.time()
-        ip_data = IP_RATE_LIMITS[ip]
-        
-        # Reset if hour has passed
-        if now >= ip_data["reset_time"]:
-            ip_data["count"] = 0
-            ip_data["reset_time"] = now + 3600  # 1 hour
-        
-        # Check limit
-        if ip_data["count"] >= IP_RATE_LIMIT_PER_HOUR:
-            seconds_left = int(ip_data["reset_time"] - now)
-            return False, seconds_left
-        
-        return True, None
+        allowed, _, retry_after = await sliding_window_hit(
+            get_shared_state(),
+            f"{IP_KEY_PREFIX}{ip}",
+            IP_RATE_LIMIT_PER_HOUR,
+            IP_WINDOW_SECONDS
+        )
+        return allowed, retry_after
+    
+    @staticmethod
+    async def _ip_rejection(request: Optional[Request], ip: str) -> Optional[Dict]:
+        """
+        Count a served prompt against the IP; returns the rejection response
+        when the IP is over its limit (skipped without a Request object)
+        """
+        if not request:
+            return None
+        ip_allowed, ip_seconds_left = await GuestRateLimiter.check_ip_rate_limit(ip)
+        if ip_allowed:
+            return None
+        return {
+            "allowed": False,
+            "reason": "ip_rate_limit",
+            "message": GuestErrorMessages.ip_rate_limit(max(1, (ip_seconds_left or 0) // 60)),
+            "seconds_left": ip_seconds_left,
+            "reset_seconds": ip_seconds_left,
+            "remaining": 0
+        }
+    
+    @staticmethod
+    async def _create_session(ip: str) -> tuple[str, float]:
+        """Create a fresh server-side session; returns (session_id, created_at)"""
+        session_id = GuestRateLimiter.generate_session_id()
+        created_at = time.time()
+        await get_shared_state().hset(
+            _session_key(session_id),
+            {"count": 0, "created_at": created_at, "ip": ip},
+            ttl=GuestSessionValidation.MAX_SESSION_AGE_SECONDS
+        )
+        return session_id, created_at
     
     @staticmethod
     async def validate_guest_request(
@@ -107,75 +141,74 @@ class GuestRateLimiter:
         Returns: {"allowed": bool, "server_count": int, "remaining": int, ...}
         """
         ip = request.client.host if request and request.client else "unknown"
+        state = get_shared_state()
         
-        # STEP 1: IP rate limiting (skip if no Request object)
-        if request:
-            ip_allowed, ip_seconds_left = GuestRateLimiter.check_ip_rate_limit(ip)
-            if not ip_allowed:
-                return {
-                    "allowed": False,
-                    "reason": "ip_rate_limit",
-                    "message": GuestErrorMessages.IP_RATE_LIMIT,
-                    "seconds_left": ip_seconds_left,
-                    "remaining": 0
-                }
-        
-        # STEP 2: Session Validation
+        # STEP 1: Session Validation
+        # New and refreshed sessions are checked against the IP limit before
+        # they are created, so dropping the session token cannot bypass it
         if not session_id:
             # New guest - create simple session
-            session_id = GuestRateLimiter.generate_session_id()
-            GUEST_SESSIONS[session_id] = {
-                "count": 0,
-                "created_at": time.time(),
-                "ip": ip
-            }
+            rejection = await GuestRateLimiter._ip_rejection(request, ip)
+            if rejection:
+                return rejection
+            session_id, created_at = await GuestRateLimiter._create_session(ip)
             
             return {
                 "allowed": True,
                 "session_id": session_id,
                 "server_count": 0,
                 "remaining": GUEST_PROMPT_LIMIT,
-                "reset_time": int(time.time() + SESSION_EXPIRY_HOURS * 3600)
+                "reset_time": calculate_reset_time(created_at)
             }
         
         # Get server-side session data
-        session_data = GUEST_SESSIONS.get(session_id)
+        session_data = await state.hgetall(_session_key(session_id))
         if not session_data:
             # Session not found - server was likely restarted
             # Create new session to provide seamless experience
             print(f"🔄 Session {session_id} not found (server restart). Creating new session.")
-            new_session_id = GuestRateLimiter.generate_session_id()
-            GUEST_SESSIONS[new_session_id] = {
-                "count": 0,
-                "created_at": time.time(),
-                "ip": ip
-            }
+            rejection = await GuestRateLimiter._ip_rejection(request, ip)
+            if rejection:
+                return rejection
+            new_session_id, created_at = await GuestRateLimiter._create_session(ip)
             
             return {
                 "allowed": True,
                 "session_id": new_session_id,
                 "server_count": 0,
                 "remaining": GUEST_PROMPT_LIMIT,
-                "reset_time": int(time.time() + SESSION_EXPIRY_HOURS * 3600),
+                "reset_time": calculate_reset_time(created_at),
                 "message": "Session refreshed due to server restart"
             }
         
-        # STEP 3: Check session expiry
-        session_age = time.time() - session_data["created_at"]
+        created_at = float(session_data["created_at"])
+        
+        # STEP 2: Check session expiry
+        session_age = time.time() - created_at
         if session_age > SESSION_EXPIRY_HOURS * 3600:
-            del GUEST_SESSIONS[session_id]
+            await state.delete(_session_key(session_id))
             return {
                 "allowed": False,
                 "reason": "session_expired",
                 "message": GuestErrorMessages.session_expired()
             }
         
-        # STEP 4: Server-side count validation (NEVER trust client)
-        server_count = session_data["count"]
+        # STEP 3: Server-side count validation (NEVER trust client)
+        # Reserve the prompt atomically so concurrent requests on any worker
+        # cannot both take the last one
+        server_count = await state.hincrby(_session_key(session_id), "count", 1)
+        if server_count is None:
+            # Expired between the read and the increment
+            return {
+                "allowed": False,
+                "reason": "session_expired",
+                "message": GuestErrorMessages.session_expired()
+            }
         
         # DRY: Use helper to check limit
-        if is_prompt_limit_reached(server_count):
-            reset_time = calculate_reset_time(session_data["created_at"])
+        if server_count > GUEST_PROMPT_LIMIT:
+            await state.hincrby(_session_key(session_id), "count", -1)
+            reset_time = calculate_reset_time(created_at)
             seconds_left = reset_time - int(time.time())
             hours_left = seconds_left // 3600
             minutes_left = (seconds_left % 3600) // 60
@@ -183,43 +216,44 @@ class GuestRateLimiter:
             return {
                 "allowed": False,
                 "reason": "limit_reached",
-                "server_count": server_count,
+                "server_count": GUEST_PROMPT_LIMIT,
                 "remaining": 0,
                 "reset_time": reset_time,
                 "reset_seconds": seconds_left,
                 "message": GuestErrorMessages.limit_reached(GUEST_PROMPT_LIMIT, hours_left, minutes_left)
             }
         
-        # ALLOWED: Increment server-side count
-        session_data["count"] += 1
-        IP_RATE_LIMITS[ip]["count"] += 1
+        # STEP 4: IP rate limiting (skip if no Request object)
+        # Checked last so only prompts that are actually served count against the IP
+        rejection = await GuestRateLimiter._ip_rejection(request, ip)
+        if rejection:
+            await state.hincrby(_session_key(session_id), "count", -1)
+            return rejection
         
         # DRY: Use helpers for calculations
         return {
             "allowed": True,
             "session_id": session_id,
-            "server_count": session_data["count"],
-            "remaining": calculate_remaining_prompts(session_data["count"]),
-            "reset_time": calculate_reset_time(session_data["created_at"])
+            "server_count": server_count,
+            "remaining": calculate_remaining_prompts(server_count),
+            "reset_time": calculate_reset_time(created_at)
         }
     
     @staticmethod
     def cleanup_expired_sessions() -> int:
         """
-        Cleanup expired sessions (call periodically)
-        For <5000 users, run this every hour via cron or background task
+        Drop expired sessions and IP windows from the in-memory backend.
+        The backend already reaps due keys on every operation from its expiry
+        heap, so this only pops what is due - no scan over live sessions.
+        Redis expires keys natively, so there is nothing to do there.
         """
-        now = time.time()
-        expired = [
-            sid for sid, data in GUEST_SESSIONS.items()
-            if now - data["created_at"] > SESSION_EXPIRY_HOURS * 3600
-        ]
-        
-        for session_id in expired:
-            del GUEST_SESSIONS[session_id]
+        state = get_shared_state()
+        if not isinstance(state, MemoryStateBackend):
+            return 0
         
-        print(f"🧹 Cleaned up {len(expired)} expired guest sessions")
-        return len(expired)
+        removed = state.purge_expired()
+        print(f"🧹 Cleaned up {removed} expired guest rate limit keys")
+        return removed
     
     @staticmethod
     def get_stats() -> Dict:
@@ -227,9 +261,9 @@ class GuestRateLimiter:
         Get current rate limiter statistics (useful for monitoring)
         """
         return {
-            "active_sessions": len(GUEST_SESSIONS),
-            "total_prompts_used": sum(s["count"] for s in GUEST_SESSIONS.values()),
-            "unique_ips": len(set(s["ip"] for s in GUEST_SESSIONS.values()))
+            "prompt_limit": GUEST_PROMPT_LIMIT,
+            "ip_limit_per_hour": IP_RATE_LIMIT_PER_HOUR,
+            "state": get_shared_state().get_stats()
         }
 
 
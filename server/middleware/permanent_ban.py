@@ -18,6 +18,7 @@ from fastapi import HTTPException, Depends, status, Request
 from typing import Dict, Any
 import logging
 from middleware.auth import get_current_user
+from services.user_status_service import get_user_status_service
 
 logger = logging.getLogger(__name__)
 
@@ -58,9 +59,11 @@ async def block_permanently_banned_users(
                 detail="User profile not found"
             )
         
-        account_status = profile.get("account_status")
         user_id = profile.get("id", "unknown")
         
+        # Shared status cache, invalidated on every ban/suspension write
+        account_status = await get_user_status_service().get_account_status(user_id)
+        
         # STRICT: No fail-open for banned users
         if account_status == "banned":
             logger.warning(f"🚫 PERMANENTLY_BANNED user blocked: {user_id[:8]}...")
@@ -108,7 +111,7 @@ async def block_permanently_banned_users_optional(
         if not profile:
             return (current_user, False)
         
-        account_status = profile.get("account_status")
+        account_status = await get_user_status_service().get_account_status(profile.get("id"))
         is_not_banned = account_status != "banned"
         
         return (current_user, is_not_banned)
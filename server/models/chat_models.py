@@ -157,10 +157,11 @@ class SessionWithMessagesResponse(BaseModel):
 class SessionListResponse(BaseModel):
     """List of sessions with pagination"""
     sessions: List[ChatSessionResponse]
-    total: int
+    total: Optional[int] = None  # Only on the first page; cursor pages leave it out
     page: int
     page_size: int
     has_more: bool
+    next_cursor: Optional[str] = None  # Pass back as ?cursor= for the next page
 
 
 # ============================================================================
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 
 class LegalArticleBase(BaseModel):
@@ -39,6 +39,7 @@ class CategoryResponse(BaseModel):
     success: bool = True
     data: List[str] = []
     count: int = 0
+    counts: Dict[str, int] = {}  # Articles per category
 
 class SearchParams(BaseModel):
     search: Optional[str] = None
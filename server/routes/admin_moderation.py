@@ -24,6 +24,7 @@ from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List, Literal
 from datetime import datetime
 from middleware.auth import require_role
+from services.user_status_service import invalidate_user_status
 from services.supabase_service import SupabaseService
 from models.violation_types import ViolationType
 import httpx
@@ -551,6 +552,7 @@ async def lift_suspension(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     detail="Failed to lift suspension"
                 )
+            invalidate_user_status(user_id)
             
             # Mark suspension as lifted
             suspension_update_response = await client.patch(
@@ -649,6 +651,7 @@ async def lift_ban(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     detail="Failed to lift ban"
                 )
+            invalidate_user_status(user_id)
             
             # Mark all suspensions as lifted
             suspension_update_response = await client.patch(
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Body, Request
 from auth.models import UserSignUp, UserSignIn, OTPRequest, VerifyOTPRequest, OTPResponse, PasswordReset, SendOTPRequest
 from auth.service import AuthService, clear_auth_cache
+from services.user_status_service import invalidate_user_status
 from services.otp_service import OTPService
 from middleware.auth import get_current_user
 from pydantic import BaseModel
@@ -78,7 +79,6 @@ async def sign_in(credentials: UserSignIn):
 @router.post("/signout")
 async def sign_out(request: Request):
     """Sign out user"""
-    from auth.service import clear_auth_cache
     from utils.auth_utils import extract_bearer_token
     
     # Extract token from request header
@@ -722,8 +722,8 @@ async def deactivate_account(
         
         logger.info(f"✅ Account deactivated successfully: {user_id[:8]}...")
         
-        # Clear auth cache to force fresh data on next request
-        clear_auth_cache()
+        # Drop the cached profile so the next request sees the new status
+        invalidate_user_status(user_id)
         
         return {
             "success": True,
@@ -782,6 +782,7 @@ async def reactivate_account(current_user: Dict[str, Any] = Depends(get_current_
             )
         
         logger.info(f"✅ Account reactivated successfully: {user_id[:8]}...")
+        invalidate_user_status(user_id)
         
         return {
             "success": True,
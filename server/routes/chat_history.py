@@ -60,8 +60,9 @@ async def create_session(
 @router.get("/sessions", response_model=SessionListResponse)
 async def get_user_sessions(
     include_archived: bool = Query(False, description="Include archived sessions"),
-    page: int = Query(1, ge=1, description="Page number"),
+    page: int = Query(1, ge=1, description="Page number (ignored when cursor is given)"),
     page_size: int = Query(20, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     current_user: dict = Depends(get_current_user),
     service: ChatHistoryService = Depends(get_chat_history_service)
 ):
@@ -69,8 +70,11 @@ async def get_user_sessions(
     Get all chat sessions for the current user
     
     - **include_archived**: Include archived sessions (default: false)
-    - **page**: Page number (default: 1)
     - **page_size**: Items per page (default: 20, max: 100)
+    - **cursor**: Keyset cursor from the previous response's next_cursor
+    - **page**: Offset pagination for older clients (default: 1)
+    
+    `total` is only returned when no cursor is given; cursor pages set it to null.
     """
     try:
         user_id = UUID(current_user["user"]["id"])
@@ -80,12 +84,15 @@ async def get_user_sessions(
             user_id=user_id,
             include_archived=include_archived,
             page=page,
-            page_size=page_size
+            page_size=page_size,
+            cursor=cursor
         )
         
-        logger.info(f"Returning {sessions.total} sessions for user {user_id}")
+        logger.info(f"Returning {len(sessions.sessions)} sessions (total {sessions.total}) for user {user_id}")
         return sessions
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except KeyError as e:
         logger.error(f"KeyError accessing user data: {str(e)}, current_user structure: {current_user}")
         raise HTTPException(status_code=500, detail=f"Invalid user data structure: {str(e)}")
@@ -275,18 +282,14 @@ async def get_session_statistics(
     - **session_id**: UUID of the session
     """
     try:
-        # Verify session belongs to user
-        session = await service.get_session(session_id)
-        if not session:
-            raise HTTPException(status_code=404, detail="Session not found")
-        
-        if str(session.user_id) != current_user["user"]["id"]:
-            raise HTTPException(status_code=403, detail="Access denied")
-        
-        stats = await service.get_session_statistics(session_id)
+        # Ownership is checked in the same read as the counters
+        stats = await service.get_session_statistics(
+            session_id,
+            user_id=UUID(current_user["user"]["id"])
+        )
         
         if not stats:
-            raise HTTPException(status_code=404, detail="Statistics not found")
+            raise HTTPException(status_code=404, detail="Session not found")
         
         return stats
         
@@ -331,41 +334,53 @@ async def get_user_statistics(
 @router.get("/search")
 async def search_messages(
     query: str = Query(..., min_length=1, max_length=200, description="Search query"),
-    limit: int = Query(20, ge=1, le=100, description="Max results"),
+    limit: int = Query(20, ge=1, le=100, description="Max results per page"),
+    page: int = Query(1, ge=1, description="Page number"),
     current_user: dict = Depends(get_current_user),
     service: ChatHistoryService = Depends(get_chat_history_service)
 ):
     """
     Search through chat messages
     
-    - **query**: Search term
-    - **limit**: Maximum number of results (default: 20, max: 100)
+    Results are ranked by relevance and include a highlighted snippet
+    (HTML-escaped content, matches wrapped in <mark> tags).
+    
+    - **query**: Search terms (supports "quoted phrases", OR and -exclusions)
+    - **limit**: Results per page (default: 20, max: 100)
+    - **page**: Page number (default: 1)
     """
     try:
         user_id = UUID(current_user["user"]["id"])
+        offset = (page - 1) * limit
         
-        results = await service.search_messages(
+        results, total = await service.search_messages(
             user_id=user_id,
             query=query,
-            limit=limit
+            limit=limit,
+            offset=offset
         )
         
         # Format results
         formatted_results = []
-        for session, message in results:
+        for row in results:
             formatted_results.append({
-                "session_id": str(session.id),
-                "session_title": session.title,
-                "message_id": str(message.id),
-                "message_content": message.content,
-                "message_role": message.role,
-                "created_at": message.created_at.isoformat()
+                "session_id": str(row["session_id"]),
+                "session_title": row["session_title"],
+                "message_id": str(row["message_id"]),
+                "message_content": row["content"],
+                "message_role": row["role"],
+                "snippet": row["snippet"],
+                "rank": row["rank"],
+                "created_at": row["created_at"]
             })
         
         return {
             "query": query,
             "results": formatted_results,
-            "count": len(formatted_results)
+            "count": len(formatted_results),
+            "total": total,
+            "page": page,
+            "has_more": offset + len(formatted_results) < total
         }
         
     except Exception as e:
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from typing import Optional, List, Dict, Any
+from datetime import date
 import logging
 from supabase import Client
 from config.dependencies import get_current_user, get_supabase
 from services.lawyer_profile_service import LawyerProfileService
-from services.lawyer_availability_service import LawyerAvailabilityService
+from services.lawyer_availability_service import LawyerAvailabilityService, MAX_DAYS_PER_QUERY
 from models.consultation_models import LawyerProfileUpdate, AcceptingConsultationsUpdate
 from pydantic import BaseModel
 
@@ -301,4 +302,41 @@ async def get_bookable_slots(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to fetch bookable slots"
-        )
\ No newline at end of file
+        )
+
+
+@router.get("/api/lawyers/bookable-slots")
+async def get_bookable_slots_for_lawyers(
+    lawyer_ids: str = Query(..., description="Comma-separated lawyer_info ids"),
+    start_date: Optional[date] = Query(None, description="First day (YYYY-MM-DD), defaults to today"),
+    days: int = Query(7, ge=1, le=MAX_DAYS_PER_QUERY, description="Number of days"),
+    user=Depends(get_current_user),
+    service: LawyerAvailabilityService = Depends(get_availability_service)
+):
+    """
+    Get free time slots for several lawyers over several days (booking screen).
+    
+    Returns {"slots": {lawyer_id: {"YYYY-MM-DD": ["HH:MM", ...]}}}
+    """
+    ids = [lawyer_id.strip() for lawyer_id in lawyer_ids.split(",") if lawyer_id.strip()]
+    start = start_date or date.today()
+    
+    try:
+        slots = await service.get_bookable_slots_range(ids, start, days)
+        return {
+            "success": True,
+            "start_date": start.isoformat(),
+            "days": days,
+            "slots": slots
+        }
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error fetching bookable slots for lawyers: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to fetch bookable slots"
+        )
@@ -1,16 +1,20 @@
-from fastapi import APIRouter, HTTPException, Depends, status, UploadFile, File, Form
+from fastapi import APIRouter, HTTPException, Depends, status, UploadFile, File, Form, Query
 from lawyer.models import (
     LawyerApplicationSubmit, 
     LawyerApplicationReview, 
     LawyerApplicationResponse,
     LawyerApplicationStatusResponse,
     LawyerApplicationHistoryResponse,
-    FileUploadResponse
+    FileUploadResponse,
+    RollVerificationResponse,
+    BulkReviewRequest,
+    BulkReviewResponse,
+    ReviewQueueResponse
 )
 from lawyer.service import LawyerApplicationService
 from services.storage_service import StorageService
 from middleware.auth import get_current_user, require_role
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from datetime import date
 import logging
 
@@ -212,6 +216,66 @@ async def get_pending_applications(
             detail="Failed to get pending applications"
         )
 
+@router.get("/review-queue", response_model=ReviewQueueResponse)
+async def get_review_queue(
+    limit: int = Query(50, ge=1, le=100, description="Applications per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    current_user: Dict[str, Any] = Depends(require_role("admin"))
+):
+    """Page through pending lawyer applications, oldest first, with roll verification scores (admin only)"""
+    try:
+        result = await lawyer_service.get_review_queue(limit=limit, cursor=cursor)
+        
+        if not result["success"]:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=result["error"]
+            )
+        
+        return ReviewQueueResponse(**result["data"])
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Get review queue error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get pending applications"
+        )
+
+@router.post("/bulk-review", response_model=BulkReviewResponse)
+async def bulk_review_lawyer_applications(
+    review_data: BulkReviewRequest,
+    current_user: Dict[str, Any] = Depends(require_role("admin"))
+):
+    """Accept, reject or return many lawyer applications at once (admin only)"""
+    try:
+        admin_id = current_user["user"]["id"]
+        
+        result = await lawyer_service.bulk_review_applications(review_data.decisions, admin_id)
+        
+        if not result["success"]:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=result["error"]
+            )
+        
+        return BulkReviewResponse(**result["data"])
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Bulk review error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
 @router.post("/{application_id}/review", response_model=Dict[str, Any])
 async def review_lawyer_application(
     application_id: str,
@@ -248,6 +312,32 @@ async def review_lawyer_application(
             detail="Internal server error"
         )
 
+@router.get("/{application_id}/roll-verification", response_model=RollVerificationResponse)
+async def verify_application_against_roll(
+    application_id: str,
+    current_user: Dict[str, Any] = Depends(require_role("admin"))
+):
+    """Match an application against the Roll of Attorneys (admin only)"""
+    try:
+        result = await lawyer_service.verify_against_roll(application_id)
+        
+        if not result["success"]:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=result["error"]
+            )
+        
+        return RollVerificationResponse(**result["data"])
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Roll verification error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to verify application against the roll"
+        )
+
 @router.post("/clear-pending", response_model=Dict[str, Any])
 async def clear_pending_lawyer_status(
     current_user: Dict[str, Any] = Depends(get_current_user)
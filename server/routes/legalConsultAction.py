@@ -4,9 +4,10 @@ from typing import List, Optional, Dict, Any
 import logging
 from pydantic import BaseModel
 from datetime import datetime, date
+from cachetools import TTLCache
 from config.dependencies import get_current_user as get_auth_user, get_supabase
 from services.notification_service import NotificationService
-from services.consultation_service import ConsultationService
+from services.consultation_service import ConsultationService, release_slot_reservation
 from services.consultation_request_service import ConsultationRequestService
 from services.consultation_ban_service import get_consultation_ban_service
 
@@ -18,6 +19,10 @@ logging.basicConfig(level=logging.INFO)
 # Create router
 router = APIRouter(prefix="/api/consult-actions", tags=["consultation-actions"])
 
+# Dashboard stats per lawyer_info.id, dropped by the status actions below.
+# The short TTL covers changes made outside this router (new requests).
+stats_cache = TTLCache(maxsize=1000, ttl=30)
+
 # Pydantic models
 class ConsultationRequest(BaseModel):
     id: str
@@ -172,6 +177,15 @@ async def get_my_consultations(
         logger.error(f"Error fetching consultations: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+def invalidate_consultation_stats(lawyer_info_id: Optional[str]) -> None:
+    """
+    Drop cached dashboard stats for a lawyer after one of their consultations changes
+    """
+    if not lawyer_info_id:
+        return
+    for key in [key for key in list(stats_cache.keys()) if key[0] == lawyer_info_id]:
+        stats_cache.pop(key, None)
+
 @router.get("/stats", response_model=ConsultationStats)
 async def get_consultation_stats(
     current_user: Dict[str, Any] = Depends(get_current_user_dict),
@@ -212,40 +226,36 @@ async def get_consultation_stats(
                 today_sessions=0
             )
         
-        # Get all consultations for the lawyer
-        response = supabase.table("consultation_requests").select("*").eq("lawyer_id", lawyer_info_id).execute()
+        # Cache key includes the date so today_sessions rolls over at midnight
+        today = date.today().isoformat()
+        cache_key = (lawyer_info_id, today)
+        if cache_key in stats_cache:
+            return stats_cache[cache_key]
+        
+        # Status counts and today's sessions in one row
+        # (database/migrations/016_consultation_stats_rpc.sql)
+        response = supabase.rpc("get_lawyer_consultation_stats", {
+            "p_lawyer_id": lawyer_info_id,
+            "p_today": today
+        }).execute()
         
         if hasattr(response, 'error') and response.error:
             logger.error(f"Supabase error: {response.error}")
             raise HTTPException(status_code=500, detail="Database error")
         
-        consultations = response.data if hasattr(response, 'data') else []
-        
-        # Calculate stats
-        total_requests = len(consultations)
-        pending_requests = len([c for c in consultations if c.get("status") == "pending"])
-        accepted_requests = len([c for c in consultations if c.get("status") == "accepted"])
-        completed_requests = len([c for c in consultations if c.get("status") == "completed"])
-        rejected_requests = len([c for c in consultations if c.get("status") == "rejected"])
-        cancelled_requests = len([c for c in consultations if c.get("status") == "cancelled"])  # Add this line
-        
-        # Calculate today's sessions (accepted consultations for today)
-        today = date.today().isoformat()
-        today_sessions = len([
-            c for c in consultations 
-            if c.get("status") == "accepted" and c.get("consultation_date") == today
-        ])
+        row = response.data[0] if response.data else {}
         
         stats = ConsultationStats(
-            total_requests=total_requests,
-            pending_requests=pending_requests,
-            accepted_requests=accepted_requests,
-            completed_requests=completed_requests,
-            rejected_requests=rejected_requests,
-            cancelled_requests=cancelled_requests, 
-            today_sessions=today_sessions
+            total_requests=row.get("total_requests") or 0,
+            pending_requests=row.get("pending_requests") or 0,
+            accepted_requests=row.get("accepted_requests") or 0,
+            completed_requests=row.get("completed_requests") or 0,
+            rejected_requests=row.get("rejected_requests") or 0,
+            cancelled_requests=row.get("cancelled_requests") or 0,
+            today_sessions=row.get("today_sessions") or 0
         )
         
+        stats_cache[cache_key] = stats
         return stats
         
     except Exception as e:
@@ -392,6 +402,9 @@ async def update_consultation_status(
             logger.error(f"Supabase update error: {update_response.error}")
             raise HTTPException(status_code=500, detail="Database error")
         
+        release_slot_reservation(consultations[0], new_status)
+        invalidate_consultation_stats(lawyer_info_id)
+        
         await _send_consultation_notification(supabase, consultations[0], new_status)
         
         return SuccessResponse(success=True, message=f"Consultation {new_status} successfully")
@@ -456,6 +469,9 @@ async def cancel_consultation(
             logger.error(f"Supabase update error: {update_response.error}")
             raise HTTPException(status_code=500, detail="Database error")
         
+        release_slot_reservation(consultation_data, "cancelled")
+        invalidate_consultation_stats(consultation_data.get("lawyer_id"))
+        
         # Apply consultation ban if this was an accepted consultation
         ban_message = None
         if is_accepted_consultation:
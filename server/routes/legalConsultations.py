@@ -1,23 +1,26 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Response
 from services.supabase_service import SupabaseService
+from services.lawyer_directory import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    get_lawyer_directory,
+    normalize_specialization,
+)
 from typing import List, Optional
 import logging
 import httpx
 from pydantic import BaseModel
 from datetime import datetime
-from cachetools import TTLCache
-import asyncio
-import time
 import uuid
 
 router = APIRouter(prefix="/legal-consultations", tags=["legal-consultations"])
 logger = logging.getLogger(__name__)
 
-lawyers_cache = TTLCache(maxsize=100, ttl=60)  # 1 minute for fresher data
-single_lawyer_cache = TTLCache(maxsize=500, ttl=120)  # 2 minutes for individual lawyers
-
-pending_requests = {}
-request_lock = asyncio.Lock()
+# Columns the directory needs; avoids pulling every lawyer_info column
+LAWYER_DIRECTORY_COLUMNS = (
+    "id,lawyer_id,name,bio,specialization,location,hours,days,"
+    "accepting_consultations,hours_available,created_at"
+)
 
 class Lawyer(BaseModel):
     id: uuid.UUID
@@ -41,85 +44,48 @@ class LawyerResponse(BaseModel):
     error: Optional[str] = None
     cached: bool = False
     timestamp: Optional[float] = None
-
-def normalize_specialization(specialization):
-    """Normalize specialization data from database to frontend format"""
-    if not specialization:
-        return []
-    
-    if isinstance(specialization, list):
-        return [spec.strip() for spec in specialization if spec.strip()]
-    
-    if isinstance(specialization, str):
-        # Split by comma and clean up whitespace
-        return [spec.strip() for spec in specialization.split(',') if spec.strip()]
-    
-    return []
+    total: Optional[int] = None
+    page: Optional[int] = None
+    page_size: Optional[int] = None
+    has_more: Optional[bool] = None
 
 def get_cache_key(*args):
     """Generate a cache key from arguments"""
     return ":".join(str(arg) for arg in args)
 
 async def get_lawyers_with_cache(supabase_service, use_cache=True):
-    """Get lawyers with caching support"""
-    cache_key = "all_lawyers"
-    
-    if use_cache and cache_key in lawyers_cache:
-        logger.info("Returning cached lawyers data")
-        cached_data = lawyers_cache[cache_key]
-        cached_data['cached'] = True
-        return cached_data
-    
-    async with request_lock:
-        if cache_key in pending_requests:
-            logger.info("Waiting for ongoing lawyers request to complete")
-            return await pending_requests[cache_key]
-        
-        future = asyncio.Future()
-        pending_requests[cache_key] = future
-        
-    try:
-        start_time = time.time()
-        lawyers = await fetch_lawyers_from_db(supabase_service)
-        elapsed_time = time.time() - start_time
-        
-        logger.info(f"Fetched {len(lawyers)} lawyers in {elapsed_time:.2f} seconds")
-        
-        response_data = LawyerResponse(
-            success=True, 
-            data=lawyers,
-            cached=False,
-            timestamp=time.time()
-        )
-        
-        lawyers_cache[cache_key] = response_data.dict()
-        
-        return response_data.dict()
-        
-    except Exception as e:
-        error_response = LawyerResponse(
-            success=False, 
-            error=str(e),
-            cached=False,
-            timestamp=time.time()
+    """Load the lawyer directory index; returns True when served from cache"""
+    directory = get_lawyer_directory()
+    return await directory.ensure_loaded(
+        lambda: fetch_lawyers_from_db(supabase_service),
+        lambda: fetch_lawyer_info_version(supabase_service),
+        force=not use_cache
+    )
+
+async def fetch_lawyer_info_version(supabase_service) -> Optional[int]:
+    """Current lawyer_info version stamp, or None if the database has none"""
+    async with httpx.AsyncClient(timeout=5.0) as client:
+        response = await client.post(
+            f"{supabase_service.rest_url}/rpc/get_lawyer_info_version",
+            json={},
+            headers=supabase_service._get_headers()
         )
-        return error_response.dict()
-    finally:
-        async with request_lock:
-            if cache_key in pending_requests:
-                future = pending_requests.pop(cache_key)
-                if not future.done():
-                    future.set_result(response_data.dict() if 'response_data' in locals() else error_response.dict())
+
+    if response.status_code != 200:
+        logger.warning(f"Lawyer info version stamp unavailable: {response.status_code}")
+        return None
+    version = response.json()
+    return int(version) if version is not None else None
 
 async def fetch_lawyers_from_db(supabase_service):
-    """Fetch lawyers from database with optimized query - HTTP first for speed"""
+    """Fetch raw lawyer_info rows - HTTP first for speed"""
     try:
         # Use HTTP API directly for better performance
         async with httpx.AsyncClient(timeout=10.0) as client:
             url = f"{supabase_service.rest_url}/lawyer_info"
             response = await client.get(
                 url,
-                params={"select": "*"},
+                params={"select": LAWYER_DIRECTORY_COLUMNS},
                 headers=supabase_service._get_headers(use_service_key=True)
             )
             
@@ -129,33 +95,7 @@ async def fetch_lawyers_from_db(supabase_service):
                     raise Exception("No data returned from API")
                 
                 logger.info(f"Found {len(lawyers_data)} lawyers using HTTP API")
-                
-                lawyers = []
-                for lawyer_data in lawyers_data:
-                    try:
-                        accepting = bool(lawyer_data.get("accepting_consultations", False))
-                        lawyer = Lawyer(
-                            id=lawyer_data.get("id"),
-                            lawyer_id=lawyer_data.get("lawyer_id"),
-                            name=lawyer_data.get("name", "Unknown Lawyer"),
-                            specialization=normalize_specialization(lawyer_data.get("specialization")),
-                            location=lawyer_data.get("location"),
-                            hours=lawyer_data.get("hours"),
-                            days=lawyer_data.get("days"),
-                            bio=lawyer_data.get("bio"),
-                            available=accepting,
-                            hours_available=lawyer_data.get("hours_available"),
-                            created_at=lawyer_data.get("created_at"),
-                        )
-                        lawyers.append(lawyer)
-                    except Exception as e:
-                        logger.warning(f"Error parsing lawyer data: {e}")
-                        continue
-                
-                if not lawyers:
-                    raise Exception("No valid lawyer data found")
-                
-                return lawyers
+                return lawyers_data
             else:
                 raise Exception(f"HTTP request failed: {response.status_code}")
 
@@ -164,38 +104,11 @@ async def fetch_lawyers_from_db(supabase_service):
         
         # Fallback to Supabase client
         try:
-            response = supabase_service.supabase.table("lawyer_info").select("*").execute()
+            response = supabase_service.supabase.table("lawyer_info").select(LAWYER_DIRECTORY_COLUMNS).execute()
             
             if hasattr(response, 'data') and response.data:
-                lawyers_data = response.data
-                logger.info(f"Found {len(lawyers_data)} lawyers using Supabase client fallback")
-                
-                lawyers = []
-                for lawyer_data in lawyers_data:
-                    try:
-                        accepting = bool(lawyer_data.get("accepting_consultations", False))
-                        lawyer = Lawyer(
-                            id=lawyer_data.get("id"),
-                            lawyer_id=lawyer_data.get("lawyer_id"),
-                            name=lawyer_data.get("name", "Unknown Lawyer"),
-                            specialization=normalize_specialization(lawyer_data.get("specialization")),
-                            location=lawyer_data.get("location"),
-                            hours=lawyer_data.get("hours"),
-                            days=lawyer_data.get("days"),
-                            bio=lawyer_data.get("bio"),
-                            available=accepting,
-                            hours_available=lawyer_data.get("hours_available"),
-                            created_at=lawyer_data.get("created_at"),
-                        )
-                        lawyers.append(lawyer)
-                    except Exception as e:
-                        logger.warning(f"Error parsing lawyer data: {e}")
-                        continue
-                
-                if not lawyers:
-                    raise Exception("No valid lawyer data found")
-                
-                return lawyers
+                logger.info(f"Found {len(response.data)} lawyers using Supabase client fallback")
+                return response.data
             else:
                 raise Exception("No data returned from Supabase client")
         except Exception as client_error:
@@ -206,18 +119,35 @@ async def fetch_lawyers_from_db(supabase_service):
 @router.get("/lawyers", response_model=LawyerResponse)
 async def get_lawyers(
     use_cache: bool = Query(True, description="Use cached data if available"),
-    refresh: bool = Query(False, description="Force refresh cache")
+    refresh: bool = Query(False, description="Force refresh cache"),
+    specialization: Optional[str] = Query(None, description="Exact specialization, case-insensitive"),
+    location: Optional[str] = Query(None, description="Location or part of it, e.g. a city"),
+    accepting: Optional[bool] = Query(None, description="Only lawyers (not) accepting consultations"),
+    q: Optional[str] = Query(None, max_length=100, description="Name prefix, e.g. 'dela cr'"),
+    page: Optional[int] = Query(None, ge=1, description="Page number; omit to return every match"),
+    page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
 ):
-    """Get all lawyers from the database with caching"""
+    """Get lawyers from the directory index with filtering and pagination"""
     try:
         if refresh:
-            cache_key = "all_lawyers"
-            lawyers_cache.pop(cache_key, None)
-            logger.info("Cache cleared due to refresh request")
+            logger.info("Lawyer directory reload due to refresh request")
         
         supabase_service = SupabaseService()
-        result = await get_lawyers_with_cache(supabase_service, use_cache)
-        return LawyerResponse(**result)
+        cached = await get_lawyers_with_cache(supabase_service, use_cache and not refresh)
+        
+        directory = get_lawyer_directory()
+        matches = directory.query(
+            specialization=specialization,
+            location=location,
+            accepting=accepting,
+            name_prefix=q
+        )
+        
+        # Body is assembled from pre-serialized entries, so skip response_model validation
+        return Response(
+            content=directory.render(matches, cached=cached, page=page, page_size=page_size),
+            media_type="application/json"
+        )
         
     except Exception as e:
         logger.error(f"Error fetching lawyers: {str(e)}", exc_info=True)
@@ -236,16 +166,23 @@ async def get_lawyer(
         except ValueError:
             return LawyerResponse(success=False, error="Invalid lawyer ID format")
         
-        cache_key = f"lawyer_{lawyer_id}"
-        
-        if use_cache and cache_key in single_lawyer_cache:
-            logger.info(f"Returning cached data for lawyer {lawyer_id}")
-            cached_data = single_lawyer_cache[cache_key]
-            cached_data['cached'] = True
-            return LawyerResponse(**cached_data)
-        
         supabase_service = SupabaseService()
         
+        # Served from the directory snapshot, which profile updates invalidate
+        directory = get_lawyer_directory()
+        try:
+            cached = await get_lawyers_with_cache(supabase_service, use_cache)
+            idx = directory.get(lawyer_id)
+        except Exception as e:
+            logger.warning(f"Lawyer directory unavailable, reading lawyer directly: {e}")
+            idx = None
+        if idx is not None:
+            return Response(
+                content=directory.render([idx], cached=cached),
+                media_type="application/json"
+            )
+        
+        # Not in the snapshot yet (e.g. just created) - read it directly
         response = supabase_service.supabase.table("lawyer_info").select("*").eq("lawyer_id", lawyer_id).execute()
         
         if hasattr(response, 'data') and response.data:
@@ -254,7 +191,7 @@ async def get_lawyer(
                 id=lawyer_data.get("id"),
                 lawyer_id=lawyer_data.get("lawyer_id"),
                 name=lawyer_data.get("name", "Unknown Lawyer"),
-                specialization=lawyer_data.get("specialization"),
+                specialization=normalize_specialization(lawyer_data.get("specialization")),
                 location=lawyer_data.get("location"),
                 hours=lawyer_data.get("hours"),
                 bio=lawyer_data.get("bio"),
@@ -264,10 +201,7 @@ async def get_lawyer(
                 created_at=lawyer_data.get("created_at")
             )
             
-            result = LawyerResponse(success=True, data=[lawyer], cached=False)
-            single_lawyer_cache[cache_key] = result.dict()
-            
-            return result
+            return LawyerResponse(success=True, data=[lawyer], cached=False)
         else:
             return LawyerResponse(success=False, error="Lawyer not found")
             
@@ -278,18 +212,14 @@ async def get_lawyer(
 @router.delete("/cache/clear")
 async def clear_cache():
     """Clear all caches"""
-    lawyers_cache.clear()
-    single_lawyer_cache.clear()
-    pending_requests.clear()
+    get_lawyer_directory().invalidate()
     return {"success": True, "message": "Cache cleared successfully"}
 
 @router.get("/cache/status")
 async def cache_status():
     """Get cache status"""
     return {
-        "all_lawyers_cache_size": len(lawyers_cache),
-        "single_lawyer_cache_size": len(single_lawyer_cache),
-        "pending_requests": len(pending_requests)
+        "directory": get_lawyer_directory().get_stats()
     }
     
 # Add this to your consultation_requests.py router
@@ -1,51 +1,53 @@
-from fastapi import APIRouter, HTTPException, Query, Depends
-from services.legal_article_service import LegalArticleService
-from services.notification_service import NotificationService
-from config.dependencies import get_supabase
-from supabase import Client
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from middleware.auth import get_optional_user
+from services.legal_article_service import get_legal_article_service
+from services.guide_cache import etag_matches
+from services.favorites_cache import get_user_favorites
 from models.legal_article import (
     LegalArticleResponse, 
     LegalArticleSearchResponse, 
     LegalArticleSingleResponse,
-    CategoryResponse,
-    SearchParams
+    CategoryResponse
 )
-from typing import Optional
+from typing import Optional, Tuple
 import logging
 
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/legal", tags=["legal"])
 
+# Clients may keep responses but must revalidate them with If-None-Match
+CACHE_CONTROL = "no-cache"
+
+def conditional_response(request: Request, cached: Tuple[str, str], per_user: bool = False) -> Response:
+    """Cached JSON body with its ETag, or 304 when the client already has it"""
+    body, etag = cached
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if per_user:
+        # Bookmark flags depend on who is asking
+        headers["Vary"] = "Authorization"
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
 @router.get("/articles", response_model=LegalArticleResponse)
 async def get_legal_articles(
+    request: Request,
     domain: Optional[str] = Query(None, description="Filter by domain (legacy)"),
     category: Optional[str] = Query(None, description="Filter by category (preferred)"),
     search: Optional[str] = Query(None, description="Search query for titles, descriptions, and content in both languages"),
     limit: int = Query(50, ge=1, le=100, description="Number of articles to return"),
-    offset: int = Query(0, ge=0, description="Number of articles to skip")
+    offset: int = Query(0, ge=0, description="Number of articles to skip"),
+    current_user: Optional[dict] = Depends(get_optional_user)
 ):
     """
-    Get legal articles from the database with improved security and performance
+    Get legal articles from the guide cache, with ETag revalidation.
+    Signed-in users get "is_bookmarked" on every article.
     """
     try:
-        service = LegalArticleService()
-        params = SearchParams(
-            search=search,
-            category=category,
-            limit=limit,
-            offset=offset
-        )
-        
-        articles, total_count = await service.get_articles(params)
-        
-        return LegalArticleResponse(
-            success=True,
-            data=articles,
-            count=len(articles),
-            limit=limit,
-            offset=offset
-        )
+        cache = await get_legal_article_service().get_guide_cache()
+        bookmarks = await get_user_favorites("guides", current_user)
+        return conditional_response(request, cache.list_response(category, search, limit, offset, bookmarks=bookmarks), per_user=True)
         
     except Exception as e:
         logger.error(f"Error fetching legal articles: {str(e)}")
@@ -54,31 +56,20 @@ async def get_legal_articles(
 
 @router.get("/search", response_model=LegalArticleSearchResponse)
 async def search_legal_articles(
+    request: Request,
     q: str = Query(..., description="Search query for titles, descriptions, and content in both languages"),
     category: Optional[str] = Query(None, description="Filter by category"),
     limit: int = Query(20, ge=1, le=50, description="Number of articles to return"),
-    offset: int = Query(0, ge=0, description="Number of articles to skip")
+    offset: int = Query(0, ge=0, description="Number of articles to skip"),
+    current_user: Optional[dict] = Depends(get_optional_user)
 ):
     """
     Search legal articles with support for Filipino and English text
     """
     try:
-        service = LegalArticleService()
-        articles, total_count = await service.search_articles(
-            query=q,
-            category=category,
-            limit=limit,
-            offset=offset
-        )
-        
-        return LegalArticleSearchResponse(
-            success=True,
-            data=articles,
-            count=len(articles),
-            limit=limit,
-            offset=offset,
-            query=q
-        )
+        cache = await get_legal_article_service().get_guide_cache()
+        bookmarks = await get_user_favorites("guides", current_user)
+        return conditional_response(request, cache.list_response(category, q, limit, offset, query=q, bookmarks=bookmarks), per_user=True)
         
     except Exception as e:
         logger.error(f"Error searching legal articles: {str(e)}")
@@ -86,19 +77,13 @@ async def search_legal_articles(
 
 
 @router.get("/categories", response_model=CategoryResponse)
-async def get_legal_article_categories():
+async def get_legal_article_categories(request: Request):
     """
-    Get all available categories for legal articles
+    Get all available categories for legal articles, with article counts
     """
     try:
-        service = LegalArticleService()
-        categories = await service.get_categories()
-        
-        return CategoryResponse(
-            success=True,
-            data=categories,
-            count=len(categories)
-        )
+        cache = await get_legal_article_service().get_guide_cache()
+        return conditional_response(request, cache.categories_response())
         
     except Exception as e:
         logger.error(f"Error fetching legal article categories: {str(e)}")
@@ -106,21 +91,18 @@ async def get_legal_article_categories():
 
 
 @router.get("/articles/{article_id}", response_model=LegalArticleSingleResponse)
-async def get_legal_article(article_id: str):
+async def get_legal_article(request: Request, article_id: str):
     """
     Get a specific legal article by ID
     """
     try:
-        service = LegalArticleService()
-        article = await service.get_article_by_id(article_id)
+        cache = await get_legal_article_service().get_guide_cache()
+        cached = cache.article_response(article_id)
         
-        if not article:
+        if cached is None:
             raise HTTPException(status_code=404, detail="Article not found")
         
-        return LegalArticleSingleResponse(
-            success=True,
-            data=article
-        )
+        return conditional_response(request, cached)
         
     except HTTPException:
         raise
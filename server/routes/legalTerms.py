@@ -1,120 +1,112 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from middleware.auth import get_optional_user
 from services.supabase_service import SupabaseService
-from typing import List, Optional
+from services.glossary_index import get_glossary_index
+from services.favorites_cache import get_user_favorites
+from typing import Any, Dict, List, Optional
 import logging
 import httpx
 
 router = APIRouter(prefix="/glossary", tags=["glossary"])
 logger = logging.getLogger(__name__)
 
+GLOSSARY_PAGE_SIZE = 1000  # Rows per request while loading the glossary
+
+# Listings carry the signed-in user's favorite flags
+PER_USER_HEADERS = {"Vary": "Authorization"}
+
+_supabase_service: Optional[SupabaseService] = None
+
+def get_supabase_service() -> SupabaseService:
+    """Shared SupabaseService for the glossary loaders"""
+    global _supabase_service
+    if _supabase_service is None:
+        _supabase_service = SupabaseService()
+    return _supabase_service
+
+async def fetch_glossary_from_db() -> List[Dict[str, Any]]:
+    """Fetch every glossary_terms row, paged by id"""
+    supabase_service = get_supabase_service()
+    rows: List[Dict[str, Any]] = []
+    async with httpx.AsyncClient(timeout=15.0) as client:
+        while True:
+            response = await client.get(
+                f"{supabase_service.rest_url}/glossary_terms",
+                params={
+                    "select": "*",
+                    "order": "id.asc",
+                    "limit": str(GLOSSARY_PAGE_SIZE),
+                    "offset": str(len(rows))
+                },
+                headers=supabase_service._get_headers()
+            )
+
+            if response.status_code != 200:
+                raise Exception(f"Supabase query failed: {response.status_code} {response.text}")
+
+            page = response.json()
+            rows.extend(page)
+            if len(page) < GLOSSARY_PAGE_SIZE:
+                return rows
+
+async def fetch_glossary_version() -> Optional[int]:
+    """Current glossary version stamp, or None if the database has none"""
+    supabase_service = get_supabase_service()
+    async with httpx.AsyncClient(timeout=5.0) as client:
+        response = await client.post(
+            f"{supabase_service.rest_url}/rpc/get_glossary_version",
+            json={},
+            headers=supabase_service._get_headers()
+        )
+
+    if response.status_code != 200:
+        logger.warning(f"Glossary version stamp unavailable: {response.status_code}")
+        return None
+    version = response.json()
+    return int(version) if version is not None else None
+
+async def get_loaded_glossary():
+    """Glossary index, loaded on first use and refreshed when its version changes"""
+    index = get_glossary_index()
+    await index.ensure_loaded(fetch_glossary_from_db, fetch_glossary_version)
+    return index
+
 @router.get("/terms")
 async def get_glossary_terms(
     category: Optional[str] = Query(None, description="Filter by category"),
     search: Optional[str] = Query(None, description="Search query"),
     page: int = Query(1, ge=1, description="Page number"),
-    limit: int = Query(10, ge=1, le=100, description="Items per page")
+    limit: int = Query(10, ge=1, le=100, description="Items per page"),
+    current_user: Optional[dict] = Depends(get_optional_user)
 ):
-    """Get paginated glossary terms with optional filtering and search"""
+    """
+    Get paginated glossary terms with optional filtering and search.
+    Signed-in users get "is_favorite" on every term.
+    """
     try:
-        supabase_service = SupabaseService()
-        
-        # Build the base query
-        base_url = f"{supabase_service.rest_url}/glossary_terms"
-        params = {
-            "select": "id,term_en,term_fil,definition_en,definition_fil,example_en,example_fil,category,created_at",
-            "order": "term_en.asc",
-            "limit": str(limit),
-            "offset": str((page - 1) * limit)
-        }
-        
-        # Add category filter if provided
-        if category and category.lower() != "all":
-            params["category"] = f"eq.{category}"
-        
-        # Add search filter if provided
-        if search and search.strip():
-            search_term = search.strip()
-            search_param = f"(term_en.ilike.*{search_term}*,term_fil.ilike.*{search_term}*,definition_en.ilike.*{search_term}*,definition_fil.ilike.*{search_term}*)"
-            params["or"] = search_param
-        
-        # Execute the query
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                base_url,
-                params=params,
-                headers=supabase_service._get_headers()
-            )
-            
-            if response.status_code == 200:
-                terms = response.json()
-                
-                # Get total count for pagination
-                count_params = {"select": "count"}
-                if category and category.lower() != "all":
-                    count_params["category"] = f"eq.{category}"
-                if search and search.strip():
-                    count_params["or"] = search_param
-                
-                count_response = await client.get(
-                    base_url,
-                    params=count_params,
-                    headers=supabase_service._get_headers()
-                )
-                
-                if count_response.status_code == 200:
-                    # Supabase returns count in a range header or in the response
-                    count_data = count_response.json()
-                    total_count = count_data[0]["count"] if isinstance(count_data, list) and count_data else 0
-                else:
-                    total_count = len(terms)
-                
-                return {
-                    "terms": terms,
-                    "pagination": {
-                        "page": page,
-                        "limit": limit,
-                        "total": total_count,
-                        "pages": (total_count + limit - 1) // limit if total_count > 0 else 1
-                    }
-                }
-            else:
-                logger.error(f"Supabase query failed: {response.text}")
-                raise HTTPException(status_code=500, detail="Failed to fetch glossary terms")
-                
+        index = await get_loaded_glossary()
+        matches, facets = index.query(search=search, category=category)
+        favorites = await get_user_favorites("terms", current_user)
+
+        # Body is assembled from pre-serialized terms
+        return Response(
+            content=index.render_page(matches, facets, page, limit, favorites),
+            media_type="application/json",
+            headers=PER_USER_HEADERS
+        )
+
     except Exception as e:
         logger.error(f"Error fetching glossary terms: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.get("/terms/all")
-async def get_all_glossary_terms():
+async def get_all_glossary_terms(current_user: Optional[dict] = Depends(get_optional_user)):
     """Get all glossary terms without pagination for client-side filtering"""
     try:
-        supabase_service = SupabaseService()
-        
-        # Fetch all terms at once
-        base_url = f"{supabase_service.rest_url}/glossary_terms"
-        params = {
-            "select": "id,term_en,term_fil,definition_en,definition_fil,example_en,example_fil,category,created_at",
-            "order": "term_en.asc",
-        }
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                base_url,
-                params=params,
-                headers=supabase_service._get_headers()
-            )
-            
-            if response.status_code == 200:
-                terms = response.json()
-                return {
-                    "terms": terms,
-                    "total": len(terms)
-                }
-            else:
-                logger.error(f"Supabase query failed: {response.text}")
-                raise HTTPException(status_code=500, detail="Failed to fetch glossary terms")
-                
+        index = await get_loaded_glossary()
+        favorites = await get_user_favorites("terms", current_user)
+        return Response(content=index.render_all(favorites), media_type="application/json", headers=PER_USER_HEADERS)
+
     except Exception as e:
         logger.error(f"Error fetching all glossary terms: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -123,47 +115,26 @@ async def get_all_glossary_terms():
 async def get_glossary_term(term_id: str):
     """Get a specific glossary term by ID"""
     try:
-        supabase_service = SupabaseService()
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{supabase_service.rest_url}/glossary_terms?id=eq.{term_id}&select=*",
-                headers=supabase_service._get_headers()
-            )
-            
-            if response.status_code == 200:
-                terms = response.json()
-                if terms:
-                    return terms[0]
-                else:
-                    raise HTTPException(status_code=404, detail="Term not found")
-            else:
-                raise HTTPException(status_code=500, detail="Failed to fetch term")
-                
+        index = await get_loaded_glossary()
+        term = index.get(term_id)
+        if term is None:
+            raise HTTPException(status_code=404, detail="Term not found")
+        return term
+
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching term {term_id}: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.get("/categories")
 async def get_categories():
-    """Get all available categories"""
+    """Get all available categories with their term counts"""
     try:
-        supabase_service = SupabaseService()
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{supabase_service.rest_url}/glossary_terms?select=category",
-                headers=supabase_service._get_headers()
-            )
-            
-            if response.status_code == 200:
-                categories_data = response.json()
-                # Extract unique categories
-                categories = list(set([item["category"] for item in categories_data if item["category"]]))
-                return {"categories": sorted(categories)}
-            else:
-                raise HTTPException(status_code=500, detail="Failed to fetch categories")
-                
+        index = await get_loaded_glossary()
+        counts = index.categories()
+        return {"categories": sorted(counts), "counts": counts}
+
     except Exception as e:
         logger.error(f"Error fetching categories: {str(e)}")
-        raise HTTPException(status_code=500, detail="Internal server error")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Internal server error")
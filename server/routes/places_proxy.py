@@ -1,11 +1,14 @@
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
+import asyncio
 import httpx
 import os
 import logging
 from typing import Optional
 
+from services.places_cache import PlacesAPIError, get_places_cache, with_distances
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -45,54 +48,51 @@ async def get_nearby_places(request: NearbySearchRequest):
                 content={"success": False, "error": "Google Maps API key not configured"}
             )
         
-        # Construct Google Places API URL
-        url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
-        params = {
-            "location": f"{request.latitude},{request.longitude}",
-            "radius": request.radius,
-            "type": request.type,
-            "key": api_key
-        }
-        
         logger.info(f"Proxying Google Places API request for location: {request.latitude}, {request.longitude}")
         
-        # Make request to Google Places API
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params)
-            
-            if response.status_code != 200:
+        # Served from the geohash-bucketed cache when another request from the
+        # same area already ran this search
+        data = await get_places_cache().nearby(
+            request.latitude, request.longitude, request.radius, place_type=request.type
+        )
+        
+        if data.get("status") != "OK":
+            logger.warning(f"Google Places API returned status: {data.get('status')}")
+            if data.get("status") == "ZERO_RESULTS":
+                return {
+                    "success": True,
+                    "results": [],
+                    "count": 0,
+                    "message": "No results found in this area"
+                }
+            else:
                 raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Google Places API error: {response.status_code}"
+                    status_code=400,
+                    detail=f"Google Places API error: {data.get('status')} - {data.get('error_message', 'Unknown error')}"
                 )
+        
+        # The cached search ran from the cell center; keep Google's order but
+        # only what is inside the caller's own radius
+        results = with_distances(
+            data.get("results", []), request.latitude, request.longitude,
+            sort=False, max_km=request.radius / 1000
+        )
+        logger.info(f"Found {len(results)} places")
+        
+        return {
+            "success": True,
+            "results": results,
+            "count": len(results),
+            "message": f"Found {len(results)} places"
+        }
             
-            data = response.json()
-            
-            if data.get("status") != "OK":
-                logger.warning(f"Google Places API returned status: {data.get('status')}")
-                if data.get("status") == "ZERO_RESULTS":
-                    return {
-                        "success": True,
-                        "results": [],
-                        "count": 0,
-                        "message": "No results found in this area"
-                    }
-                else:
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"Google Places API error: {data.get('status')} - {data.get('error_message', 'Unknown error')}"
-                    )
-            
-            results = data.get("results", [])
-            logger.info(f"Found {len(results)} places")
-            
-            return {
-                "success": True,
-                "results": results,
-                "count": len(results),
-                "message": f"Found {len(results)} places"
-            }
-            
+    except HTTPException:
+        raise
+    except PlacesAPIError as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=f"Google Places API error: {e.status_code}"
+        )
     except httpx.RequestError as e:
         logger.error(f"Request error: {str(e)}")
         raise HTTPException(
@@ -119,50 +119,40 @@ async def geocode_address(request: GeocodeRequest):
                 content={"success": False, "error": "Google Maps API key not configured"}
             )
         
-        url = "https://maps.googleapis.com/maps/api/geocode/json"
-        params = {
-            "address": request.address,
-            "key": api_key
-        }
-        
         logger.info(f"Geocoding address: {request.address}")
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params)
-            
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Google Geocoding API error: {response.status_code}"
-                )
-            
-            data = response.json()
-            
-            if data.get("status") != "OK":
-                logger.warning(f"Geocoding API returned status: {data.get('status')}")
-                return {
-                    "success": False,
-                    "message": f"Could not find location: {request.address}",
-                    "status": data.get("status")
-                }
+        data = await get_places_cache().geocode(request.address)
+        
+        if data.get("status") != "OK":
+            logger.warning(f"Geocoding API returned status: {data.get('status')}")
+            return {
+                "success": False,
+                "message": f"Could not find location: {request.address}",
+                "status": data.get("status")
+            }
+        
+        if data.get("results") and len(data["results"]) > 0:
+            result = data["results"][0]
+            location = result["geometry"]["location"]
             
-            if data.get("results") and len(data["results"]) > 0:
-                result = data["results"][0]
-                location = result["geometry"]["location"]
-                
-                return {
-                    "success": True,
-                    "latitude": location["lat"],
-                    "longitude": location["lng"],
-                    "formatted_address": result["formatted_address"],
-                    "place_id": result.get("place_id")
-                }
-            else:
-                return {
-                    "success": False,
-                    "message": f"No results found for: {request.address}"
-                }
+            return {
+                "success": True,
+                "latitude": location["lat"],
+                "longitude": location["lng"],
+                "formatted_address": result["formatted_address"],
+                "place_id": result.get("place_id")
+            }
+        else:
+            return {
+                "success": False,
+                "message": f"No results found for: {request.address}"
+            }
                 
+    except PlacesAPIError as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=f"Google Geocoding API error: {e.status_code}"
+        )
     except httpx.RequestError as e:
         logger.error(f"Request error: {str(e)}")
         raise HTTPException(
@@ -191,212 +181,131 @@ async def search_by_location(request: LocationSearchRequest):
                 content={"success": False, "error": "Google Maps API key not configured"}
             )
         
+        places = get_places_cache()
+        logger.info(f"Searching for {request.type} in: {request.location_name}")
+        
         # First, geocode the location name
-        geocode_url = "https://maps.googleapis.com/maps/api/geocode/json"
-        geocode_params = {
-            "address": request.location_name,
-            "key": api_key
-        }
+        geocode_data = await places.geocode(request.location_name)
         
-        logger.info(f"Searching for {request.type} in: {request.location_name}")
+        if geocode_data.get("status") != "OK" or not geocode_data.get("results"):
+            return {
+                "success": False,
+                "message": f"Could not find location: {request.location_name}",
+                "results": [],
+                "count": 0
+            }
         
-        async with httpx.AsyncClient() as client:
-            # Geocode the location
-            geocode_response = await client.get(geocode_url, params=geocode_params)
-            
-            if geocode_response.status_code != 200:
-                raise HTTPException(
-                    status_code=geocode_response.status_code,
-                    detail=f"Geocoding API error: {geocode_response.status_code}"
-                )
-            
-            geocode_data = geocode_response.json()
-            
-            if geocode_data.get("status") != "OK" or not geocode_data.get("results"):
-                return {
-                    "success": False,
-                    "message": f"Could not find location: {request.location_name}",
-                    "results": [],
-                    "count": 0
-                }
-            
-            # Get coordinates from geocoding result
-            location = geocode_data["results"][0]["geometry"]["location"]
-            formatted_address = geocode_data["results"][0]["formatted_address"]
-            
-            # Fixed max radius search - fetch all within 50km for client-side filtering
-            # This ensures consistent results regardless of selected filter
-            max_search_radius = 50000  # 50km - fetch everything within this range
-            all_results = []
-            search_radius_used = max_search_radius
-            
-            # Multiple search strategies for comprehensive law firm coverage
-            search_strategies = [
-                {"type": "lawyer", "description": "law firms and legal services"},
-                {"keyword": "law firm", "description": "law firms by keyword"},
-                {"keyword": "law office", "description": "law offices by keyword"},
-                {"keyword": "legal services", "description": "legal service providers"},
-                {"keyword": "attorney office", "description": "attorney offices"}
-            ]
-            
-            # Search at max radius to get ALL results for client-side filtering
-            logger.info(f"Searching within {max_search_radius/1000}km radius of {formatted_address}")
-            
-            for strategy in search_strategies:
-                places_url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
-                places_params = {
-                    "location": f"{location['lat']},{location['lng']}",
-                    "radius": max_search_radius,
-                    "key": api_key
-                }
-                
-                # Add either type or keyword parameter
-                if "type" in strategy:
-                    places_params["type"] = strategy["type"]
-                else:
-                    places_params["keyword"] = strategy["keyword"]
-                
-                logger.info(f"Trying {strategy['description']} search")
-                places_response = await client.get(places_url, params=places_params)
-                
-                if places_response.status_code != 200:
-                    continue  # Try next strategy
-                
-                places_data = places_response.json()
-                
-                if places_data.get("status") == "OK" and places_data.get("results"):
-                    # Combine results from all strategies, avoiding duplicates
-                    existing_place_ids = {result.get("place_id") for result in all_results}
-                    new_results = [
-                        result for result in places_data["results"] 
-                        if result.get("place_id") not in existing_place_ids
-                    ]
-                    all_results.extend(new_results)
-                    logger.info(f"Found {len(new_results)} new results from {strategy['description']} (total: {len(all_results)})")
-                    
-                    # Handle pagination - Google Places API returns max 20 results per request
-                    # Check if there's a next_page_token for more results
-                    next_page_token = places_data.get("next_page_token")
-                    while next_page_token and len(all_results) < 100:  # Limit to 100 total results
-                        # Wait 2 seconds before requesting next page (Google requirement)
-                        import asyncio
-                        await asyncio.sleep(2)
-                        
-                        next_page_params = {
-                            "pagetoken": next_page_token,
-                            "key": api_key
-                        }
-                        
-                        logger.info(f"Fetching next page of results for {strategy['description']}")
-                        next_page_response = await client.get(places_url, params=next_page_params)
-                        
-                        if next_page_response.status_code == 200:
-                            next_page_data = next_page_response.json()
-                            if next_page_data.get("status") == "OK" and next_page_data.get("results"):
-                                existing_place_ids = {result.get("place_id") for result in all_results}
-                                new_page_results = [
-                                    result for result in next_page_data["results"]
-                                    if result.get("place_id") not in existing_place_ids
-                                ]
-                                all_results.extend(new_page_results)
-                                logger.info(f"Found {len(new_page_results)} more results (total: {len(all_results)})")
-                                next_page_token = next_page_data.get("next_page_token")
-                            else:
-                                break
-                        else:
-                            break
-                            
-                elif places_data.get("status") == "ZERO_RESULTS":
-                    logger.info(f"No results for {strategy['description']} within {max_search_radius/1000}km")
-                    continue
-                else:
-                    logger.warning(f"API error for {strategy['description']}: {places_data.get('status')}")
-                    continue
-            
-            if not all_results:
-                return {
-                    "success": True,
-                    "results": [],
-                    "count": 0,
-                    "message": f"No {request.type}s found within 50km of {formatted_address}",
-                    "location": {
-                        "latitude": location["lat"],
-                        "longitude": location["lng"],
-                        "formatted_address": formatted_address
-                    }
-                }
-            
-            # Calculate precise distances and add to results
-            import math
-            
-            def calculate_distance(lat1, lon1, lat2, lon2):
-                """Calculate precise distance using Haversine formula"""
-                R = 6371  # Earth's radius in kilometers
-                
-                lat1_rad = math.radians(lat1)
-                lon1_rad = math.radians(lon1)
-                lat2_rad = math.radians(lat2)
-                lon2_rad = math.radians(lon2)
-                
-                dlat = lat2_rad - lat1_rad
-                dlon = lon2_rad - lon1_rad
-                
-                a = math.sin(dlat/2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon/2)**2
-                c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-                
-                return R * c
-            
-            # Add distance to each result and sort by distance
-            for result in all_results:
-                result_location = result.get("geometry", {}).get("location", {})
-                if result_location:
-                    distance = calculate_distance(
-                        location["lat"], location["lng"],
-                        result_location.get("lat", 0), result_location.get("lng", 0)
-                    )
-                    result["distance_km"] = round(distance, 2)
-                else:
-                    result["distance_km"] = 999  # Unknown distance, put at end
-            
-            # Sort by distance (nearest first)
-            all_results.sort(key=lambda x: x.get("distance_km", 999))
-            
-            # Categorize results by distance
-            very_close = [r for r in all_results if r.get("distance_km", 999) <= 2]  # Within 2km
-            close = [r for r in all_results if 2 < r.get("distance_km", 999) <= 10]  # 2-10km
-            nearby = [r for r in all_results if r.get("distance_km", 999) > 10]  # >10km
-            
-            # Generate appropriate message for law firms/offices
-            entity_type = "law firms & offices"
-            if very_close:
-                message = f"Found {len(very_close)} {entity_type} in {formatted_address}"
-                if close or nearby:
-                    message += f" and {len(close + nearby)} more in surrounding areas"
-            elif close:
-                closest_distance = min([r.get("distance_km", 999) for r in close])
-                message = f"No {entity_type} directly in {formatted_address}. Found {len(close)} within {closest_distance:.1f}-10km"
-                if nearby:
-                    message += f" and {len(nearby)} more nearby"
+        # Get coordinates from geocoding result
+        location = geocode_data["results"][0]["geometry"]["location"]
+        formatted_address = geocode_data["results"][0]["formatted_address"]
+        
+        # Fixed max radius search - fetch all within 50km for client-side filtering
+        # This ensures consistent results regardless of selected filter
+        max_search_radius = 50000  # 50km - fetch everything within this range
+        search_radius_used = max_search_radius
+        
+        # Multiple search strategies for comprehensive law firm coverage
+        search_strategies = [
+            {"type": "lawyer", "description": "law firms and legal services"},
+            {"keyword": "law firm", "description": "law firms by keyword"},
+            {"keyword": "law office", "description": "law offices by keyword"},
+            {"keyword": "legal services", "description": "legal service providers"},
+            {"keyword": "attorney office", "description": "attorney offices"}
+        ]
+        
+        # Search at max radius to get ALL results for client-side filtering.
+        # Strategies run concurrently (each pages through next_page_token on
+        # its own) and are cached per area, so repeat searches cost no quota.
+        logger.info(f"Searching within {max_search_radius/1000}km radius of {formatted_address}")
+        
+        responses = await asyncio.gather(*(
+            places.nearby(
+                location["lat"], location["lng"], max_search_radius,
+                place_type=strategy.get("type"),
+                keyword=strategy.get("keyword"),
+                all_pages=True
+            )
+            for strategy in search_strategies
+        ), return_exceptions=True)
+        
+        # Combine results from all strategies, avoiding duplicates
+        all_results = []
+        seen_place_ids = set()
+        for strategy, places_data in zip(search_strategies, responses):
+            if isinstance(places_data, Exception):
+                logger.warning(f"API error for {strategy['description']}: {places_data}")
+                continue  # Try next strategy
+            if places_data.get("status") == "OK" and places_data.get("results"):
+                new_results = [
+                    result for result in places_data["results"]
+                    if result.get("place_id") not in seen_place_ids
+                ]
+                seen_place_ids.update(result.get("place_id") for result in new_results)
+                all_results.extend(new_results)
+                logger.info(f"Found {len(new_results)} new results from {strategy['description']} (total: {len(all_results)})")
+            elif places_data.get("status") == "ZERO_RESULTS":
+                logger.info(f"No results for {strategy['description']} within {max_search_radius/1000}km")
             else:
-                closest_distance = min([r.get("distance_km", 999) for r in nearby]) if nearby else 0
-                message = f"No {entity_type} in {formatted_address}. Showing {len(nearby)} nearest options (starting from {closest_distance:.1f}km away)"
-            
+                logger.warning(f"API error for {strategy['description']}: {places_data.get('status')}")
+        
+        if not all_results:
             return {
                 "success": True,
-                "results": all_results,
-                "count": len(all_results),
-                "search_radius_km": search_radius_used / 1000 if search_radius_used else None,
-                "very_close_count": len(very_close),
-                "close_count": len(close),
-                "nearby_count": len(nearby),
-                "message": message,
+                "results": [],
+                "count": 0,
+                "message": f"No {request.type}s found within 50km of {formatted_address}",
                 "location": {
                     "latitude": location["lat"],
                     "longitude": location["lng"],
                     "formatted_address": formatted_address
                 }
             }
+        
+        # Add distance to each result and sort by distance (nearest first),
+        # keeping the 100 nearest
+        all_results = with_distances(all_results, location["lat"], location["lng"], limit=100)
+        
+        # Categorize results by distance
+        very_close = [r for r in all_results if r.get("distance_km", 999) <= 2]  # Within 2km
+        close = [r for r in all_results if 2 < r.get("distance_km", 999) <= 10]  # 2-10km
+        nearby = [r for r in all_results if r.get("distance_km", 999) > 10]  # >10km
+        
+        # Generate appropriate message for law firms/offices
+        entity_type = "law firms & offices"
+        if very_close:
+            message = f"Found {len(very_close)} {entity_type} in {formatted_address}"
+            if close or nearby:
+                message += f" and {len(close + nearby)} more in surrounding areas"
+        elif close:
+            closest_distance = min([r.get("distance_km", 999) for r in close])
+            message = f"No {entity_type} directly in {formatted_address}. Found {len(close)} within {closest_distance:.1f}-10km"
+            if nearby:
+                message += f" and {len(nearby)} more nearby"
+        else:
+            closest_distance = min([r.get("distance_km", 999) for r in nearby]) if nearby else 0
+            message = f"No {entity_type} in {formatted_address}. Showing {len(nearby)} nearest options (starting from {closest_distance:.1f}km away)"
+        
+        return {
+            "success": True,
+            "results": all_results,
+            "count": len(all_results),
+            "search_radius_km": search_radius_used / 1000 if search_radius_used else None,
+            "very_close_count": len(very_close),
+            "close_count": len(close),
+            "nearby_count": len(nearby),
+            "message": message,
+            "location": {
+                "latitude": location["lat"],
+                "longitude": location["lng"],
+                "formatted_address": formatted_address
+            }
+        }
             
+    except PlacesAPIError as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=f"Geocoding API error: {e.status_code}"
+        )
     except httpx.RequestError as e:
         logger.error(f"Request error: {str(e)}")
         raise HTTPException(
@@ -436,10 +345,8 @@ async def autocomplete_places(request: AutocompleteRequest):
             }
         
         # Google Places Autocomplete API parameters (Philippines-focused)
-        url = "https://maps.googleapis.com/maps/api/place/autocomplete/json"
         params = {
             "input": input_text,
-            "key": api_key,
             "components": "country:ph",  # Restrict to Philippines only
             "language": "en",  # Consistent language
         }
@@ -452,48 +359,43 @@ async def autocomplete_places(request: AutocompleteRequest):
         
         logger.info(f"Autocomplete search for: {input_text}")
         
-        # Use timeout and connection limits for better performance
-        timeout = httpx.Timeout(5.0)  # 5 second timeout
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            response = await client.get(url, params=params)
-            
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Google Places Autocomplete API error: {response.status_code}"
-                )
-            
-            data = response.json()
-            
-            if data.get("status") != "OK":
-                logger.warning(f"Autocomplete API returned status: {data.get('status')}")
-                return {
-                    "success": True,
-                    "predictions": [],
-                    "message": f"No suggestions found for: {request.input}"
-                }
-            
-            predictions = data.get("predictions", [])
-            
-            # Format predictions for frontend use (limit to 5 for performance)
-            formatted_predictions = []
-            for prediction in predictions[:5]:  # Limit to top 5 results
-                formatted_predictions.append({
-                    "place_id": prediction.get("place_id"),
-                    "description": prediction.get("description"),
-                    "main_text": prediction.get("structured_formatting", {}).get("main_text", ""),
-                    "secondary_text": prediction.get("structured_formatting", {}).get("secondary_text", ""),
-                    "types": prediction.get("types", [])
-                })
-            
-            logger.info(f"Found {len(formatted_predictions)} autocomplete suggestions")
-            
+        # Cached per input/bias; 5 second timeout on misses
+        data = await get_places_cache().autocomplete(params)
+        
+        if data.get("status") != "OK":
+            logger.warning(f"Autocomplete API returned status: {data.get('status')}")
             return {
                 "success": True,
-                "predictions": formatted_predictions,
-                "count": len(formatted_predictions)
+                "predictions": [],
+                "message": f"No suggestions found for: {request.input}"
             }
+        
+        predictions = data.get("predictions", [])
+        
+        # Format predictions for frontend use (limit to 5 for performance)
+        formatted_predictions = []
+        for prediction in predictions[:5]:  # Limit to top 5 results
+            formatted_predictions.append({
+                "place_id": prediction.get("place_id"),
+                "description": prediction.get("description"),
+                "main_text": prediction.get("structured_formatting", {}).get("main_text", ""),
+                "secondary_text": prediction.get("structured_formatting", {}).get("secondary_text", ""),
+                "types": prediction.get("types", [])
+            })
+        
+        logger.info(f"Found {len(formatted_predictions)} autocomplete suggestions")
+        
+        return {
+            "success": True,
+            "predictions": formatted_predictions,
+            "count": len(formatted_predictions)
+        }
             
+    except PlacesAPIError as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=f"Google Places Autocomplete API error: {e.status_code}"
+        )
     except httpx.RequestError as e:
         logger.error(f"Request error: {str(e)}")
         raise HTTPException(
@@ -520,48 +422,39 @@ async def get_place_details(place_id: str):
                 "error": "Google Maps API key not configured"
             }
         
-        url = "https://maps.googleapis.com/maps/api/place/details/json"
-        params = {
-            "place_id": place_id,
-            "fields": "name,formatted_address,geometry,place_id,types",
-            "key": api_key
-        }
-        
         logger.info(f"Getting place details for: {place_id}")
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params)
-            
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Google Places Details API error: {response.status_code}"
-                )
-            
-            data = response.json()
-            
-            if data.get("status") != "OK":
-                logger.warning(f"Place Details API returned status: {data.get('status')}")
-                return {
-                    "success": False,
-                    "message": f"Could not get details for place: {place_id}"
-                }
-            
-            result = data.get("result", {})
-            location = result.get("geometry", {}).get("location", {})
-            
+        data = await get_places_cache().place_details(
+            place_id, "name,formatted_address,geometry,place_id,types"
+        )
+        
+        if data.get("status") != "OK":
+            logger.warning(f"Place Details API returned status: {data.get('status')}")
             return {
-                "success": True,
-                "place": {
-                    "place_id": result.get("place_id"),
-                    "name": result.get("name"),
-                    "formatted_address": result.get("formatted_address"),
-                    "latitude": location.get("lat"),
-                    "longitude": location.get("lng"),
-                    "types": result.get("types", [])
-                }
+                "success": False,
+                "message": f"Could not get details for place: {place_id}"
+            }
+        
+        result = data.get("result", {})
+        location = result.get("geometry", {}).get("location", {})
+        
+        return {
+            "success": True,
+            "place": {
+                "place_id": result.get("place_id"),
+                "name": result.get("name"),
+                "formatted_address": result.get("formatted_address"),
+                "latitude": location.get("lat"),
+                "longitude": location.get("lng"),
+                "types": result.get("types", [])
             }
+        }
             
+    except PlacesAPIError as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=f"Google Places Details API error: {e.status_code}"
+        )
     except httpx.RequestError as e:
         logger.error(f"Request error: {str(e)}")
         raise HTTPException(
@@ -583,5 +476,6 @@ async def health_check():
     return {
         "success": True,
         "message": "Places proxy service is healthy",
-        "service": "Google Places API Proxy"
+        "service": "Google Places API Proxy",
+        "cache": get_places_cache().get_stats()
     }
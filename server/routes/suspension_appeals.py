@@ -22,6 +22,7 @@ from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List, Literal
 from datetime import datetime
 from middleware.auth import get_current_user, require_role
+from services.user_status_service import invalidate_user_status
 from services.supabase_service import SupabaseService
 import httpx
 import logging
@@ -518,6 +519,7 @@ async def review_appeal(
                     },
                     headers=supabase._get_headers(use_service_key=True)
                 )
+                invalidate_user_status(appeal['user_id'])
                 
                 logger.info(f"✅ Admin {admin_id[:8]}... APPROVED appeal {appeal_id[:8]}... and lifted suspension")
             else:
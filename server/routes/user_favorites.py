@@ -1,8 +1,9 @@
 from fastapi import APIRouter, HTTPException, Depends
 from typing import List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from middleware.auth import get_current_user
 from services.supabase_service import SupabaseService
+from services.favorites_cache import MAX_BATCH_IDS, get_favorites_cache
 import logging
 import httpx
 
@@ -28,6 +29,15 @@ class BookmarkGuideResponse(BaseModel):
     article_id: str
     bookmarked_at: str
 
+class BatchCheckRequest(BaseModel):
+    ids: List[str] = Field(..., max_length=MAX_BATCH_IDS)  # Glossary term or article IDs
+
+class BatchFavoriteResponse(BaseModel):
+    favorite_ids: List[str]  # Requested IDs that are favorited, in request order
+
+class BatchBookmarkResponse(BaseModel):
+    bookmarked_ids: List[str]  # Requested IDs that are bookmarked, in request order
+
 # ============= GLOSSARY FAVORITES ENDPOINTS =============
 
 @router.get("/terms")
@@ -109,6 +119,7 @@ async def add_favorite_term(
                 existing = check_response.json()
                 if existing:
                     logger.info(f"Term {request.glossary_id} already favorited by user {user_id}")
+                    get_favorites_cache().add("terms", user_id, request.glossary_id)
                     raise HTTPException(status_code=409, detail="Term already in favorites")
             
             # Insert new favorite
@@ -123,6 +134,7 @@ async def add_favorite_term(
             
             if insert_response.status_code == 201:
                 favorite = insert_response.json()[0]
+                get_favorites_cache().add("terms", user_id, request.glossary_id)
                 logger.info(f"✅ Added term {request.glossary_id} to favorites for user {user_id}")
                 return favorite
             else:
@@ -156,6 +168,7 @@ async def remove_favorite_term(term_id: str, current_user: dict = Depends(get_cu
             )
             
             if response.status_code == 204:
+                get_favorites_cache().remove("terms", user_id, term_id)
                 logger.info(f"✅ Removed term {term_id} from favorites for user {user_id}")
                 return {"success": True, "message": "Favorite removed successfully"}
             else:
@@ -168,6 +181,26 @@ async def remove_favorite_term(term_id: str, current_user: dict = Depends(get_cu
         logger.error(f"Error removing favorite term: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@router.post("/terms/check", response_model=BatchFavoriteResponse)
+async def check_favorite_terms(
+    request: BatchCheckRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """Check which of the given glossary terms are favorited by the current user"""
+    try:
+        user_id = current_user.get("user", {}).get("id") or current_user.get("profile", {}).get("id")
+        if not user_id:
+            raise HTTPException(status_code=401, detail="User ID not found")
+
+        favorite_ids = await get_favorites_cache().check("terms", user_id, request.ids)
+        return {"favorite_ids": favorite_ids}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error checking favorite terms: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
 @router.get("/terms/check/{glossary_id}")
 async def check_favorite_term(
     glossary_id: str,
@@ -178,28 +211,10 @@ async def check_favorite_term(
         user_id = current_user.get("user", {}).get("id") or current_user.get("profile", {}).get("id")
         if not user_id:
             raise HTTPException(status_code=401, detail="User ID not found")
-        
-        supabase_service = SupabaseService()
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{supabase_service.rest_url}/user_glossary_favorites",
-                params={
-                    "user_id": f"eq.{user_id}",
-                    "glossary_id": f"eq.{glossary_id}",
-                    "select": "id"
-                },
-                headers=supabase_service._get_headers()
-            )
-            
-            if response.status_code == 200:
-                existing = response.json()
-                is_favorite = len(existing) > 0
-                return {"is_favorite": is_favorite}
-            else:
-                logger.error(f"Failed to check favorite: {response.text}")
-                raise HTTPException(status_code=500, detail="Failed to check favorite status")
-                
+
+        favorite_ids = await get_favorites_cache().get_ids("terms", user_id)
+        return {"is_favorite": glossary_id in favorite_ids}
+
     except HTTPException:
         raise
     except Exception as e:
@@ -272,6 +287,7 @@ async def add_bookmarked_guide(
                 existing = check_response.json()
                 if existing:
                     logger.info(f"Guide {request.article_id} already bookmarked by user {user_id}")
+                    get_favorites_cache().add("guides", user_id, request.article_id)
                     raise HTTPException(status_code=409, detail="Guide already in bookmarks")
             
             # Insert new bookmark
@@ -286,6 +302,7 @@ async def add_bookmarked_guide(
             
             if insert_response.status_code == 201:
                 bookmark = insert_response.json()[0]
+                get_favorites_cache().add("guides", user_id, request.article_id)
                 logger.info(f"✅ Added guide {request.article_id} to bookmarks for user {user_id}")
                 return bookmark
             else:
@@ -322,6 +339,7 @@ async def remove_bookmarked_guide(
             )
             
             if response.status_code == 204:
+                get_favorites_cache().remove("guides", user_id, article_id)
                 logger.info(f"✅ Removed guide {article_id} from bookmarks for user {user_id}")
                 return {"success": True, "message": "Bookmark removed successfully"}
             else:
@@ -334,6 +352,26 @@ async def remove_bookmarked_guide(
         logger.error(f"Error removing bookmarked guide: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@router.post("/guides/check", response_model=BatchBookmarkResponse)
+async def check_bookmarked_guides(
+    request: BatchCheckRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """Check which of the given legal guides are bookmarked by the current user"""
+    try:
+        user_id = current_user.get("user", {}).get("id") or current_user.get("profile", {}).get("id")
+        if not user_id:
+            raise HTTPException(status_code=401, detail="User ID not found")
+
+        bookmarked_ids = await get_favorites_cache().check("guides", user_id, request.ids)
+        return {"bookmarked_ids": bookmarked_ids}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error checking bookmarked guides: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
 @router.get("/guides/check/{article_id}")
 async def check_bookmarked_guide(
     article_id: str,
@@ -344,28 +382,10 @@ async def check_bookmarked_guide(
         user_id = current_user.get("user", {}).get("id") or current_user.get("profile", {}).get("id")
         if not user_id:
             raise HTTPException(status_code=401, detail="User ID not found")
-        
-        supabase_service = SupabaseService()
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{supabase_service.rest_url}/user_guide_bookmarks",
-                params={
-                    "user_id": f"eq.{user_id}",
-                    "article_id": f"eq.{article_id}",
-                    "select": "id"
-                },
-                headers=supabase_service._get_headers()
-            )
-            
-            if response.status_code == 200:
-                existing = response.json()
-                is_bookmarked = len(existing) > 0
-                return {"is_bookmarked": is_bookmarked}
-            else:
-                logger.error(f"Failed to check bookmark: {response.text}")
-                raise HTTPException(status_code=500, detail="Failed to check bookmark status")
-                
+
+        bookmarked_ids = await get_favorites_cache().get_ids("guides", user_id)
+        return {"is_bookmarked": article_id in bookmarked_ids}
+
     except HTTPException:
         raise
     except Exception as e:
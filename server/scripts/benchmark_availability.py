@@ -0,0 +1,96 @@
+"""
+Benchmark: bookable-slot resolution for 200 lawyers x 14 days
+
+Runs entirely offline on synthetic data. Measures the in-memory part of
+LawyerAvailabilityService.get_bookable_slots_range (compute_bookable_slots)
+and reports how many database round trips the old per-slot
+_is_slot_booked loop would have needed for the same request.
+
+Usage:
+    python benchmark_availability.py [--lawyers 200] [--days 14] [--runs 20]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from services.lawyer_availability_service import (
+    LawyerAvailabilityService,
+    compute_bookable_slots,
+    parse_weekly_availability,
+)
+
+SLOT_TIMES = ["08:00", "09:00", "10:00", "11:00", "13:00", "14:00", "15:00", "16:00", "17:00", "18:00"]
+
+
+def make_dataset(lawyers: int, days: int, start: date, seed: int = 7):
+    rng = random.Random(seed)
+    hours_available = {}
+    bookings = []
+
+    for n in range(lawyers):
+        lawyer_id = f"lawyer-{n:04d}"
+        workdays = rng.sample(LawyerAvailabilityService.DAYS, k=rng.randint(3, 6))
+        hours_available[lawyer_id] = {
+            day: sorted(rng.sample(SLOT_TIMES, k=rng.randint(2, 8))) for day in workdays
+        }
+
+        # Roughly a third of configured slots are already booked
+        for offset in range(days):
+            day_date = start + timedelta(days=offset)
+            day_name = day_date.strftime("%A")
+            for slot in hours_available[lawyer_id].get(day_name, []):
+                if rng.random() < 0.33:
+                    bookings.append((lawyer_id, day_date.isoformat(), slot))
+
+    return hours_available, bookings
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark availability resolution")
+    parser.add_argument("--lawyers", type=int, default=200)
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    start = date.today()
+    hours_available, bookings = make_dataset(args.lawyers, args.days, start)
+
+    # Round trips the old implementation needed: one availability read per
+    # lawyer-day plus one _is_slot_booked query per configured slot
+    old_round_trips = 0
+    for offset in range(args.days):
+        day_name = (start + timedelta(days=offset)).strftime("%A")
+        for availability in hours_available.values():
+            old_round_trips += 1 + len(availability.get(day_name, []))
+
+    timings = []
+    result = {}
+    for _ in range(args.runs):
+        t0 = time.perf_counter()
+        weekly = {lawyer_id: parse_weekly_availability(hours) for lawyer_id, hours in hours_available.items()}
+        result = compute_bookable_slots(weekly, bookings, start, args.days)
+        timings.append((time.perf_counter() - t0) * 1000)
+
+    free_slots = sum(len(slots) for days in result.values() for slots in days.values())
+    timings.sort()
+
+    print(f"Lawyers x days:        {args.lawyers} x {args.days}")
+    print(f"Active bookings:       {len(bookings)}")
+    print(f"Free slots resolved:   {free_slots}")
+    print(f"In-memory resolution:  median {statistics.median(timings):.2f} ms, "
+          f"max {timings[-1]:.2f} ms over {args.runs} runs")
+    print(f"DB round trips (old):  {old_round_trips}")
+    print(f"DB round trips (new):  2")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
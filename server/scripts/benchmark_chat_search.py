@@ -0,0 +1,135 @@
+"""
+Benchmark: chat history search on a user with 10k messages
+
+Compares the old unindexed ILIKE query with the search_chat_messages RPC
+(database/migrations/013_chat_messages_full_text_search.sql).
+
+Seeds a throwaway session with synthetic bilingual messages for the given
+user, runs each query several times, prints median/p95 latency, and deletes
+the seeded session afterwards (messages cascade).
+
+Usage:
+    python benchmark_chat_search.py --user <user-uuid> [--messages 10000] [--runs 10]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from uuid import uuid4
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from services.chat_history_service import ChatHistoryService
+from dotenv import load_dotenv
+
+load_dotenv()
+
+QUERIES = [
+    "annulment",
+    "psychological incapacity",
+    "sahod overtime",
+    "\"final pay\"",
+    "barangay -kasal",
+]
+
+VOCABULARY = (
+    "annulment marriage kasal psychological incapacity custody anak support sustento "
+    "employer amo sahod overtime final pay resignation tanggal trabaho contract kontrata "
+    "lease upa barangay kaso reklamo estafa theft nakaw property lupa inheritance mana "
+    "article section republic act family code labor code civil code penal code consumer "
+    "paano ano pwede ba ako dapat kailangan the what how can my is a of to for and"
+).split()
+
+SEED_BATCH_SIZE = 500
+
+
+def seed(service: ChatHistoryService, user_id: str, count: int) -> str:
+    """Create a session with `count` synthetic messages and return its id"""
+    session_id = str(uuid4())
+    service.supabase.table("chat_sessions").insert({
+        "id": session_id,
+        "user_id": user_id,
+        "title": "Search benchmark (safe to delete)",
+        "language": "en"
+    }).execute()
+
+    rng = random.Random(42)
+    for start in range(0, count, SEED_BATCH_SIZE):
+        rows = []
+        for i in range(start, min(start + SEED_BATCH_SIZE, count)):
+            words = rng.choices(VOCABULARY, k=rng.randint(12, 80))
+            rows.append({
+                "session_id": session_id,
+                "user_id": user_id,
+                "role": "user" if i % 2 == 0 else "assistant",
+                "content": " ".join(words).capitalize() + "."
+            })
+        service.supabase.table("chat_messages").insert(rows).execute()
+        print(f"   seeded {min(start + SEED_BATCH_SIZE, count)}/{count}")
+
+    return session_id
+
+
+def time_runs(fn, runs: int):
+    timings = []
+    result = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    return statistics.median(timings), p95, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark chat history search")
+    parser.add_argument("--user", required=True, help="User id to seed messages for")
+    parser.add_argument("--messages", type=int, default=10000)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    service = ChatHistoryService()
+
+    print(f"Seeding {args.messages} messages for user {args.user}...")
+    session_id = seed(service, args.user, args.messages)
+
+    try:
+        print(f"\n{'query':<28} {'ILIKE median':>13} {'ILIKE p95':>10} {'FTS median':>11} {'FTS p95':>8} {'hits':>6}")
+        for query in QUERIES:
+            ilike_median, ilike_p95, _ = time_runs(
+                lambda: service.supabase.table("chat_messages")
+                    .select("*, chat_sessions!inner(*)")
+                    .eq("user_id", args.user)
+                    .ilike("content", f"%{query.strip(chr(34))}%")
+                    .limit(20)
+                    .execute(),
+                args.runs
+            )
+            fts_median, fts_p95, response = time_runs(
+                lambda: service.supabase.rpc("search_chat_messages", {
+                    "p_user_id": args.user,
+                    "p_query": query,
+                    "p_limit": 20,
+                    "p_offset": 0
+                }).execute(),
+                args.runs
+            )
+            hits = response.data[0]["total_count"] if response.data else 0
+            print(
+                f"{query:<28} {ilike_median:>11.1f}ms {ilike_p95:>8.1f}ms "
+                f"{fts_median:>9.1f}ms {fts_p95:>6.1f}ms {hits:>6}"
+            )
+    finally:
+        service.supabase.table("chat_sessions").delete().eq("id", session_id).execute()
+        print(f"\nCleaned up benchmark session {session_id}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
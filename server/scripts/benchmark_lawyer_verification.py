@@ -0,0 +1,222 @@
+"""
+Benchmark: applicant verification against a 70k-record Roll of Attorneys
+
+Runs entirely offline on a synthetic roll. Applicants follow the categories of
+admin/automated-tests/shared-utilities/test-data-generator.py: valid
+(copied from the roll), partial (typo, missing middle name, roll's
+"LAST, FIRST MIDDLE" form), multiple (a name shared by two attorneys) and
+invalid (not on the roll). Reports per-applicant latency of
+RollVerifier.verify, how often each category got the expected
+classification, and the cost of the old linear Levenshtein scan
+(LawyerVerificationService.ts) on a few applicants for comparison.
+
+Usage:
+    python benchmark_lawyer_verification.py [--records 70000] [--applicants 1000] [--baseline 2]
+"""
+
+import argparse
+import itertools
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from lawyer.verification import RollRecord, RollVerifier
+
+SURNAMES = (
+    "SANTOS REYES CRUZ BAUTISTA OCAMPO GARCIA MENDOZA TORRES TOMAS ANDRADA CASTILLO FLORES VILLANUEVA RAMOS "
+    "CASTRO RIVERA AQUINO NAVARRO SALAZAR MERCADO AGUILAR LOPEZ GONZALES PASCUAL FERNANDEZ DOMINGO "
+    "GUTIERREZ SORIANO DIZON MANALO VALDEZ SANTIAGO DEL+ROSARIO DELA+CRUZ DE+LEON DE+GUZMAN DE+LOS+SANTOS "
+    "MACARAEG MAGBANUA MANALASTAS PANGILINAN QUIAMBAO SISON TOLENTINO VILLAREAL YAP TAN LIM GO CHUA "
+    "ESPIRITU JIMENEZ LACSON MALLARI NEPOMUCENO ORTIZ PADILLA QUIZON ROXAS SALVADOR UMALI VELASCO ZAMORA"
+).split()
+SYLLABLES = "BA BI BU CA DA DI GA GO LA LI LU MA MI NA NI PA PI RA RO SA SI TA TI TU YA AN AL AR ON IN".split()
+FIRST_NAMES = (
+    "JUAN JOSE MARIA ANA ANTONIO MIGUEL CARLOS RAMON EDUARDO FRANCISCO MANUEL ROBERTO RICARDO FERDINAND "
+    "ROSARIO TERESITA CORAZON LOURDES CRISTINA PATRICIA JENNIFER MICHELLE KRISTINE ANGELICA CAMILLE "
+    "MARK JOHN PAUL MICHAEL JAMES JOSEPH RAFAEL GABRIEL ANDRES EMMANUEL RENATO ERNESTO ARNEL ROMMEL "
+    "MARICEL MARILOU JOCELYN ROWENA LIEZL KATHERINE ELIZABETH ISABEL BEATRIZ VICTORIA REGINA LEA"
+).split()
+
+
+def make_surnames(rng: random.Random, count: int):
+    """Common surnames plus a long tail of generated ones, like the real roll"""
+    names = [s.replace("+", " ") for s in SURNAMES]
+    seen = set(names)
+    while len(names) < count:
+        name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        if name not in seen:
+            seen.add(name)
+            names.append(name)
+    return names
+
+
+def make_roll(records: int, seed: int = 7):
+    rng = random.Random(seed)
+    surnames = make_surnames(rng, max(500, records // 6))
+    # Zipf-like: the common surnames cover a large share of the roll
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) ** 0.8 for rank in range(len(surnames))))
+    start = date(1950, 1, 1)
+    roll = []
+    for n in range(records):
+        last, middle = rng.choices(surnames, cum_weights=cum_weights, k=2)
+        first = rng.choice(FIRST_NAMES)
+        if rng.random() < 0.25:
+            first = f"{first} {rng.choice(FIRST_NAMES)}"
+        roll.append({
+            "id": n + 1,
+            "full_name": f"{last}, {first} {middle}",
+            "roll_number": str(10000 + n),
+            "roll_signing_date": (start + timedelta(days=rng.randint(0, 27000))).isoformat(),
+        })
+    return roll, surnames
+
+
+def typo(rng: random.Random, value: str) -> str:
+    letters = [i for i, c in enumerate(value) if c != " "]
+    i = rng.choice(letters)
+    edit = rng.choice(("swap", "drop", "replace"))
+    if edit == "swap" and i + 1 < len(value) and value[i + 1] != " ":
+        return value[:i] + value[i + 1] + value[i] + value[i + 2:]
+    if edit == "drop" and len(letters) > 3:
+        return value[:i] + value[i + 1:]
+    return value[:i] + rng.choice("AEIOUNRST") + value[i + 1:]
+
+
+def make_applicants(roll, surnames, count: int, seed: int = 11):
+    """(category, application, expected match types)"""
+    rng = random.Random(seed)
+    records = [RollRecord.from_supreme_court_roll(row) for row in roll]
+    applicants = []
+    for n in range(count):
+        row = rng.choice(roll)
+        record = records[row["id"] - 1]
+        given = f"{record.first_name} {record.middle_name}".strip()
+        category = ("valid", "partial", "invalid", "multiple")[n % 4]
+
+        if category == "valid":
+            application = {"full_name": f"{given} {record.last_name}", "roll_number": row["roll_number"],
+                           "roll_signing_date": row["roll_signing_date"]}
+            expected = {"EXACT"}
+        elif category == "partial":
+            variant = rng.choice(("typo", "no_middle", "roll_form"))
+            if variant == "typo":
+                name = f"{record.first_name} {record.middle_name} {typo(rng, record.last_name)}"
+            elif variant == "no_middle":
+                name = f"{record.first_name} {record.last_name}"
+            else:
+                name = row["full_name"].title()
+            application = {"full_name": name}
+            expected = {"EXACT", "PARTIAL", "MULTIPLE"}
+        elif category == "invalid":
+            application = {"full_name": f"{rng.choice(FIRST_NAMES)} ZZYX{typo(rng, 'QWERTY')} VOKHTAR", "roll_number": f"99999{n}"}
+            expected = {"NONE"}
+        else:
+            # Name only, for a name another attorney also has
+            application = {"full_name": f"{given} {record.last_name}", "duplicate_of": row["id"]}
+            expected = {"MULTIPLE"}
+        applicants.append((category, application, expected))
+    return applicants
+
+
+def add_duplicates(roll, applicants):
+    """Give every 'multiple' applicant's attorney a namesake on the roll"""
+    next_id = len(roll) + 1
+    for _, application, _ in applicants:
+        original = application.pop("duplicate_of", None)
+        if original is not None:
+            roll.append({**roll[original - 1], "id": next_id, "roll_number": str(90000 + next_id)})
+            next_id += 1
+
+
+def linear_scan(records, application) -> int:
+    """The old check: weighted Levenshtein against every record, matches above 0.6"""
+    def levenshtein(a, b):
+        previous = list(range(len(b) + 1))
+        for i, ca in enumerate(a, 1):
+            current = [i]
+            for j, cb in enumerate(b, 1):
+                current.append(min(current[j - 1] + 1, previous[j] + 1, previous[j - 1] + (ca != cb)))
+            previous = current
+        return previous[-1]
+
+    def similarity(a, b):
+        if a == b:
+            return 1.0
+        if not a or not b:
+            return 0.0
+        longer = max(len(a), len(b))
+        return (longer - levenshtein(a, b)) / longer
+
+    from lawyer.verification import split_full_name
+    first, middle, last = split_full_name(application["full_name"])
+    matches = 0
+    for record in records:
+        score = 0.3 * similarity(first, record.first_name) + 0.4 * similarity(last, record.last_name)
+        weight = 0.7
+        if middle and record.middle_name:
+            score += 0.2 * similarity(middle, record.middle_name)
+            weight += 0.2
+        if score / weight > 0.6:
+            matches += 1
+    return matches
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark roll of attorneys verification")
+    parser.add_argument("--records", type=int, default=70000)
+    parser.add_argument("--applicants", type=int, default=1000)
+    parser.add_argument("--baseline", type=int, default=2, help="Applicants to run through the linear scan (0 to skip)")
+    args = parser.parse_args()
+
+    roll, surnames = make_roll(args.records)
+    applicants = make_applicants(roll, surnames, args.applicants)
+    add_duplicates(roll, applicants)
+
+    t0 = time.perf_counter()
+    verifier = RollVerifier(RollRecord.from_supreme_court_roll(row) for row in roll)
+    build_ms = (time.perf_counter() - t0) * 1000
+
+    # Warm up numpy and the caches
+    for _, application, _ in applicants[:20]:
+        verifier.verify_application(application)
+
+    timings = []
+    outcomes = {}
+    for category, application, expected in applicants:
+        t0 = time.perf_counter()
+        result = verifier.verify_application(application)
+        timings.append((time.perf_counter() - t0) * 1000)
+        hits, total = outcomes.get(category, (0, 0))
+        outcomes[category] = (hits + (result.match_type in expected), total + 1)
+
+    timings.sort()
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"Roll records:          {len(verifier.records)}")
+    print(f"Index build:           {build_ms:.0f} ms")
+    print(f"Applicants:            {len(applicants)}")
+    print(f"Per applicant:         median {statistics.median(timings):.3f} ms, p95 {p95:.3f} ms, "
+          f"mean {statistics.mean(timings):.3f} ms, max {timings[-1]:.3f} ms")
+    print(f"Index stats:           {verifier.get_stats()}")
+    for category, (hits, total) in outcomes.items():
+        print(f"Expected outcome:      {category:<9} {hits}/{total}")
+
+    if args.baseline:
+        scanned = [application for category, application, _ in applicants if category == "valid"][:args.baseline]
+        t0 = time.perf_counter()
+        for application in scanned:
+            linear_scan(verifier.records, application)
+        per_applicant = (time.perf_counter() - t0) * 1000 / len(scanned)
+        print(f"Linear scan (old):     {per_applicant:.0f} ms per applicant "
+              f"({per_applicant / statistics.mean(timings):.0f}x slower)")
+
+    return 0 if statistics.median(timings) < 1.0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""
+Backfill and consistency check for chat statistics counters
+(chat_session_stats / chat_user_stats, see database/migrations/012_chat_statistics_counters.sql)
+
+Usage:
+    python chat_stats_maintenance.py --backfill            # rebuild counters for every user
+    python chat_stats_maintenance.py --backfill --user ID  # rebuild counters for one user
+    python chat_stats_maintenance.py --check               # report drifted users
+    python chat_stats_maintenance.py --check --repair      # report, then rebuild drifted users
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from uuid import UUID
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from services.chat_history_service import ChatHistoryService
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Maintain chat statistics counters")
+    parser.add_argument("--backfill", action="store_true", help="Recompute counters from chat_sessions/chat_messages")
+    parser.add_argument("--check", action="store_true", help="List users whose counters have drifted")
+    parser.add_argument("--repair", action="store_true", help="With --check, rebuild counters for drifted users")
+    parser.add_argument("--user", type=UUID, help="Limit --backfill to a single user id")
+    parser.add_argument("--limit", type=int, default=100, help="Max drifted users to report")
+    args = parser.parse_args()
+
+    if not args.backfill and not args.check:
+        parser.print_help()
+        return 1
+
+    service = ChatHistoryService()
+
+    if args.backfill:
+        scope = f"user {args.user}" if args.user else "all users"
+        print(f"Backfilling chat statistics for {scope}...")
+        updated = service.backfill_statistics(args.user)
+        print(f"✅ Rebuilt counters for {updated} user(s)")
+
+    if args.check:
+        print("Checking chat statistics consistency...")
+        drifted = service.check_statistics_consistency(limit=args.limit)
+        if not drifted:
+            print("✅ All counters match the base tables")
+            return 0
+
+        print(f"⚠️  {len(drifted)} user(s) with drifted counters:")
+        for row in drifted:
+            print(
+                f"   {row['user_id']}: sessions {row['stored_sessions']}/{row['actual_sessions']}, "
+                f"messages {row['stored_messages']}/{row['actual_messages']}, "
+                f"tokens {row['stored_tokens']}/{row['actual_tokens']}"
+            )
+
+        if not args.repair:
+            return 2
+
+        for row in drifted:
+            service.backfill_statistics(UUID(row["user_id"]))
+        print(f"✅ Repaired {len(drifted)} user(s)")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+Scrape Philippine statutes into server/data/raw/
+
+Fetches every source concurrently (at most --per-host requests in flight per
+site), revalidates cached pages with conditional requests, and rewrites
+data/raw/<source>.json only when an article actually changed.
+
+Usage:
+    python scrape_statutes.py                       # all sources
+    python scrape_statutes.py family_code labor_code
+    python scrape_statutes.py --resume              # skip sources a failed run finished
+    python scrape_statutes.py --refresh             # revalidate even fresh cached pages
+    python scrape_statutes.py --offline             # parse saved fixtures, no network
+
+Fixture runs (--offline / --fixtures) never write to data/raw/: they go to
+--output, or to a fresh temporary directory when none is given.
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+from typing import List, Optional
+
+from scraping import FixtureFetcher, OutputStore, PARSERS, PoliteFetcher, run_scrape
+from scraping.fetcher import PER_HOST_CONCURRENCY
+from scraping.output import DEFAULT_OUTPUT_DIR
+
+FIXTURES_DIR = Path(__file__).parent / "scraping" / "fixtures"
+
+
+def _uses_fixtures(args) -> bool:
+    return bool(args.offline or args.fixtures)
+
+
+async def _run(args) -> int:
+    if _uses_fixtures(args):
+        fetcher = FixtureFetcher(Path(args.fixtures) if args.fixtures else FIXTURES_DIR)
+        # Fixtures hold a few articles per source; never let them replace the real data
+        output = Path(args.output) if args.output else Path(tempfile.mkdtemp(prefix="statutes-offline-"))
+        print(f"🧪 Fixture run, writing to {output}")
+    else:
+        fetcher = PoliteFetcher(per_host=args.per_host)
+        output = Path(args.output) if args.output else DEFAULT_OUTPUT_DIR
+
+    store = OutputStore(output)
+    sources = args.sources or list(PARSERS)
+
+    try:
+        results = await run_scrape(sources, fetcher, store, resume=args.resume, refresh=args.refresh)
+    finally:
+        await fetcher.close()
+
+    changed = 0
+    failed = 0
+    for result in results:
+        name = PARSERS[result.source].name
+        if result.skipped:
+            print(f"⏭️  {name}: done in the interrupted run, skipped")
+            continue
+        if result.error:
+            failed += 1
+            print(f"❌ {name}: {result.error}")
+            continue
+        statuses = ', '.join(f"{page} {status}" for page, status in result.fetch_statuses.items())
+        print(f"{'📝' if result.changes.has_changes else '✅'} {name}: {result.changes.describe()} [{statuses}] {result.elapsed:.1f}s")
+        for label, count in result.summary.items():
+            print(f"   • {label}: {count}")
+        changed += result.changes.has_changes
+
+    stats = ', '.join(f"{key}={value}" for key, value in fetcher.get_stats().items())
+    print(f"\n📊 {changed} source(s) changed, {failed} failed | {stats}")
+
+    if failed:
+        print("💡 Re-run with --resume to retry only the failed sources")
+        return 1
+    if changed and not _uses_fixtures(args):
+        print("\n🔄 Next steps (from server/data):")
+        print("   python preprocess_data.py")
+        print("   python generate_embeddings.py")
+        print("   python upload_to_qdrant.py")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Scrape Philippine statutes into data/raw/")
+    parser.add_argument("sources", nargs="*", metavar="source",
+                        help=f"Sources to scrape (default: all of {', '.join(PARSERS)})")
+    parser.add_argument("--resume", action="store_true", help="Skip sources finished by an interrupted run")
+    parser.add_argument("--refresh", action="store_true", help="Revalidate cached pages even if still fresh")
+    parser.add_argument("--per-host", type=int, default=PER_HOST_CONCURRENCY, help="Concurrent requests per site")
+    parser.add_argument("--offline", action="store_true", help="Parse the saved fixtures instead of fetching")
+    parser.add_argument("--fixtures", help="Fixture directory for --offline (default: scraping/fixtures)")
+    parser.add_argument("--output", help="Output directory (default: server/data/raw; a temporary directory for --offline)")
+    args = parser.parse_args(argv)
+    unknown = [source for source in args.sources if source not in PARSERS]
+    if unknown:
+        parser.error(f"unknown source(s): {', '.join(unknown)} (choose from {', '.join(PARSERS)})")
+    if _uses_fixtures(args) and args.output and Path(args.output).resolve() == DEFAULT_OUTPUT_DIR.resolve():
+        parser.error("--offline/--fixtures output cannot be server/data/raw")
+
+    print("🏛️  STATUTE SCRAPER")
+    print("=" * 35)
+    return asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,27 @@
+"""
+Statute scraping framework
+
+Fetching (fetcher), per-site parsing (parsers/), change detection and output
+(output) and the concurrent, resumable runner (runner). The command line entry
+point is scripts/scrape_statutes.py.
+"""
+
+from .base import StatuteParser
+from .fetcher import FetchError, FixtureFetcher, HTTPCache, PoliteFetcher
+from .output import ChangeSet, OutputStore
+from .parsers import PARSERS, get_parser
+from .runner import SourceResult, run_scrape
+
+__all__ = [
+    'StatuteParser',
+    'FetchError',
+    'FixtureFetcher',
+    'HTTPCache',
+    'PoliteFetcher',
+    'ChangeSet',
+    'OutputStore',
+    'PARSERS',
+    'get_parser',
+    'SourceResult',
+    'run_scrape',
+]
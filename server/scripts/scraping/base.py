@@ -0,0 +1,50 @@
+"""
+Base class for site-specific statute parsers
+
+A parser names its output (`source`, the data/raw/<source>.json stem), the
+pages it needs (`pages`: page key -> URL) and turns those pages into the JSON
+document the preprocessing step reads. The framework does the fetching,
+caching, change detection and writing; a parser only parses.
+
+To add a law: subclass StatuteParser in parsers/, implement parse() and
+articles() (and to_markdown() for a readable copy), then register the class in
+parsers/__init__.py.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+
+class StatuteParser(ABC):
+    source: str = ""  # Output file stem in data/raw/
+    name: str = ""  # Display name
+    pages: Dict[str, str] = {}  # page key -> URL
+    encoding: Optional[str] = 'utf-8'  # None: use the charset the server declares
+    # Per-article fields that change on every run and must not count as a change
+    volatile_fields: Tuple[str, ...] = ()
+
+    @staticmethod
+    def soup(html: str) -> BeautifulSoup:
+        return BeautifulSoup(html, 'html.parser')
+
+    @abstractmethod
+    def parse(self, pages: Dict[str, str], accessed_at: str) -> Any:
+        """Build the output document from {page key: html}"""
+
+    @abstractmethod
+    def articles(self, document: Any) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """(stable key, article) for every article, used to detect changes"""
+
+    def to_markdown(self, document: Any) -> Optional[str]:
+        """Readable copy written next to the JSON; None to skip it"""
+        return None
+
+    def summary(self, document: Any) -> Dict[str, int]:
+        """Counts printed after a run, e.g. articles per topic"""
+        counts: Dict[str, int] = {}
+        for _, article in self.articles(document):
+            topic = article.get('topic') or article.get('category') or 'Articles'
+            counts[topic] = counts.get(topic, 0) + 1
+        return counts
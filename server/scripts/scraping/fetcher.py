@@ -0,0 +1,252 @@
+"""
+Polite, cached page fetching for the statute scrapers
+
+- Requests run concurrently, but each host gets at most `per_host` requests in
+  flight and a minimum gap between request starts
+- Every response body is kept in an on-disk cache with its ETag/Last-Modified.
+  A cached page younger than `fresh_for` is served without touching the
+  network; an older one is revalidated with a conditional request, so an
+  unchanged statute costs a 304 instead of a full download
+- 429s and 5xx responses are retried with backoff, honouring Retry-After
+
+FixtureFetcher serves saved HTML files instead, for offline tests.
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / ".cache" / "http"
+USER_AGENT = (
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+)
+PER_HOST_CONCURRENCY = 2
+MIN_INTERVAL_SECONDS = 1.0  # Between request starts to the same host
+FRESH_FOR_SECONDS = 6 * 3600  # Serve the cache without revalidating for this long
+MAX_ATTEMPTS = 4
+TIMEOUT_SECONDS = 30.0
+
+
+class FetchError(Exception):
+    """A page could not be fetched and is not in the cache"""
+
+
+@dataclass
+class FetchResult:
+    url: str
+    text: str
+    status: str  # "fetched", "not_modified", "cached" or "fixture"
+
+
+class HTTPCache:
+    """Response bodies on disk, keyed by URL, with the validators to revalidate them"""
+
+    def __init__(self, directory: Path = DEFAULT_CACHE_DIR):
+        self.directory = Path(directory)
+
+    def _paths(self, url: str):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return self.directory / f"{key}.body", self.directory / f"{key}.json"
+
+    def get(self, url: str) -> Optional[Dict]:
+        body_path, meta_path = self._paths(url)
+        if not (body_path.exists() and meta_path.exists()):
+            return None
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        meta['body'] = body_path.read_bytes()
+        return meta
+
+    def put(self, url: str, body: bytes, headers: httpx.Headers):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        body_path, meta_path = self._paths(url)
+        body_path.with_suffix('.tmp').write_bytes(body)
+        body_path.with_suffix('.tmp').replace(body_path)
+        self._write_meta(meta_path, {
+            'url': url,
+            'etag': headers.get('etag'),
+            'last_modified': headers.get('last-modified'),
+            'content_type': headers.get('content-type'),
+            'fetched_at': time.time(),
+            'validated_at': time.time()
+        })
+
+    def touch(self, url: str):
+        """Record a successful revalidation (304)"""
+        _, meta_path = self._paths(url)
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        meta['validated_at'] = time.time()
+        self._write_meta(meta_path, meta)
+
+    @staticmethod
+    def _write_meta(path: Path, meta: Dict):
+        tmp = path.with_suffix('.json.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+        tmp.replace(path)
+
+
+def _decode(body: bytes, content_type: Optional[str], encoding: Optional[str]) -> str:
+    if encoding is None and content_type and 'charset=' in content_type:
+        encoding = content_type.split('charset=', 1)[1].split(';')[0].strip()
+    try:
+        return body.decode(encoding or 'utf-8', errors='replace')
+    except LookupError:
+        return body.decode('utf-8', errors='replace')
+
+
+def _retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get('retry-after')
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+class PoliteFetcher:
+    """Concurrent fetcher with per-host limits and a conditional-request cache"""
+
+    def __init__(
+        self,
+        cache: Optional[HTTPCache] = None,
+        per_host: int = PER_HOST_CONCURRENCY,
+        min_interval: float = MIN_INTERVAL_SECONDS,
+        fresh_for: float = FRESH_FOR_SECONDS,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.cache = cache or HTTPCache()
+        self.per_host = per_host
+        self.min_interval = min_interval
+        self.fresh_for = fresh_for
+        self._client = httpx.AsyncClient(
+            timeout=TIMEOUT_SECONDS,
+            follow_redirects=True,
+            headers={'User-Agent': USER_AGENT},
+            transport=transport
+        )
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        self._host_locks: Dict[str, asyncio.Lock] = {}
+        self._host_next_start: Dict[str, float] = {}
+
+        # Stats
+        self.requests = 0
+        self.not_modified = 0
+        self.cache_hits = 0
+        self.retries = 0
+
+    async def close(self):
+        await self._client.aclose()
+
+    async def _wait_turn(self, host: str):
+        """Space out request starts to one host by min_interval"""
+        lock = self._host_locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            delay = self._host_next_start.get(host, 0.0) - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._host_next_start[host] = time.monotonic() + self.min_interval
+
+    async def fetch(self, url: str, encoding: Optional[str] = 'utf-8', refresh: bool = False) -> FetchResult:
+        """
+        Page text for url. encoding=None decodes with the charset the server
+        declared (what requests did when a scraper left response.encoding alone).
+        """
+        cached = self.cache.get(url)
+        if cached and not refresh and time.time() - cached.get('validated_at', 0) < self.fresh_for:
+            self.cache_hits += 1
+            return FetchResult(url, _decode(cached['body'], cached.get('content_type'), encoding), 'cached')
+
+        headers = {}
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        host = urlparse(url).netloc
+        slots = self._host_slots.setdefault(host, asyncio.Semaphore(self.per_host))
+        last_error: Optional[str] = None
+
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            pause = None
+            async with slots:
+                await self._wait_turn(host)
+                self.requests += 1
+                try:
+                    response = await self._client.get(url, headers=headers)
+                except httpx.HTTPError as e:
+                    last_error = f"{type(e).__name__}: {e}"
+                else:
+                    if response.status_code == 304 and cached:
+                        self.not_modified += 1
+                        self.cache.touch(url)
+                        return FetchResult(url, _decode(cached['body'], cached.get('content_type'), encoding), 'not_modified')
+                    if response.status_code == 200:
+                        self.cache.put(url, response.content, response.headers)
+                        return FetchResult(url, _decode(response.content, response.headers.get('content-type'), encoding), 'fetched')
+                    last_error = f"HTTP {response.status_code}"
+                    if response.status_code != 429 and response.status_code < 500:
+                        break
+                    pause = _retry_after_seconds(response)
+
+            if attempt < MAX_ATTEMPTS:
+                self.retries += 1
+                await asyncio.sleep(pause if pause is not None else min(30, 2 ** attempt) * random.uniform(0.8, 1.2))
+
+        if cached:
+            # The site is down or refusing us; the last good copy beats failing the run
+            print(f"⚠️  {url}: {last_error}; using cached copy")
+            self.cache_hits += 1
+            return FetchResult(url, _decode(cached['body'], cached.get('content_type'), encoding), 'cached')
+        raise FetchError(f"{url}: {last_error}")
+
+    async def fetch_page(self, source: str, page: str, url: str, encoding: Optional[str] = 'utf-8', refresh: bool = False) -> FetchResult:
+        return await self.fetch(url, encoding=encoding, refresh=refresh)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'requests': self.requests,
+            'not_modified': self.not_modified,
+            'cache_hits': self.cache_hits,
+            'retries': self.retries,
+        }
+
+
+class FixtureFetcher:
+    """Serves saved pages from fixtures/<source>/<page>.html instead of the network"""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.served = 0
+
+    def path_for(self, source: str, page: str) -> Path:
+        return self.directory / source / f"{page}.html"
+
+    async def fetch_page(self, source: str, page: str, url: str, encoding: Optional[str] = 'utf-8', refresh: bool = False) -> FetchResult:
+        path = self.path_for(source, page)
+        if not path.exists():
+            raise FetchError(f"{url}: no fixture at {path}")
+        self.served += 1
+        return FetchResult(url, path.read_text(encoding='utf-8'), 'fixture')
+
+    async def close(self):
+        pass
+
+    def get_stats(self) -> Dict[str, int]:
+        return {'fixtures_served': self.served}
@@ -0,0 +1,136 @@
+"""
+Change detection and output for scraped statutes
+
+Each article is hashed without its volatile fields, and the hashes of the last
+written run live in data/raw/.scrape/manifest.json. A run whose articles all
+hash the same leaves data/raw/<source>.json untouched, so an unchanged law
+does not bump date_accessed or send the downstream pipeline a new file.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .base import StatuteParser
+
+DEFAULT_OUTPUT_DIR = Path(__file__).parent.parent.parent / "data" / "raw"
+STATE_DIRNAME = ".scrape"
+
+
+@dataclass
+class ChangeSet:
+    source: str
+    added: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    total: int = 0
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+    def describe(self) -> str:
+        if not self.has_changes:
+            return f"no changes ({self.total} articles)"
+        return f"+{len(self.added)} added, ~{len(self.changed)} changed, -{len(self.removed)} removed ({self.total} articles)"
+
+
+def article_hash(article: Dict[str, Any], volatile_fields=()) -> str:
+    stable = {k: v for k, v in article.items() if k not in volatile_fields}
+    encoded = json.dumps(stable, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def article_hashes(parser: StatuteParser, document: Any) -> Dict[str, str]:
+    """{key: hash}; the sites repeat a few article numbers, so later copies get a -N suffix"""
+    hashes: Dict[str, str] = {}
+    seen: Dict[str, int] = {}
+    for key, article in parser.articles(document):
+        seen[key] = seen.get(key, 0) + 1
+        if seen[key] > 1:
+            key = f"{key}-{seen[key]}"
+        hashes[key] = article_hash(article, parser.volatile_fields)
+    return hashes
+
+
+def _write_atomic(path: Path, content: str):
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp, path)
+
+
+class OutputStore:
+    """data/raw/<source>.json and .md, plus the article-hash manifest"""
+
+    def __init__(self, directory: Path = DEFAULT_OUTPUT_DIR):
+        self.directory = Path(directory)
+        self.state_dir = self.directory / STATE_DIRNAME
+        self.manifest_path = self.state_dir / "manifest.json"
+        self._manifest: Optional[Dict[str, Dict[str, str]]] = None
+        # Sources are written from worker threads; they share one manifest file
+        self._lock = threading.Lock()
+
+    def json_path(self, source: str) -> Path:
+        return self.directory / f"{source}.json"
+
+    def markdown_path(self, source: str) -> Path:
+        return self.directory / f"{source}.md"
+
+    @property
+    def manifest(self) -> Dict[str, Dict[str, str]]:
+        if self._manifest is None:
+            if self.manifest_path.exists():
+                with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                    self._manifest = json.load(f)
+            else:
+                self._manifest = {}
+        return self._manifest
+
+    def previous_hashes(self, parser: StatuteParser) -> Optional[Dict[str, str]]:
+        """Hashes of the last run; bootstrapped from the existing JSON on first use"""
+        if parser.source in self.manifest:
+            return self.manifest[parser.source]
+        existing = self.json_path(parser.source)
+        if not existing.exists():
+            return None
+        with open(existing, 'r', encoding='utf-8') as f:
+            return article_hashes(parser, json.load(f))
+
+    def diff(self, parser: StatuteParser, document: Any) -> ChangeSet:
+        current = article_hashes(parser, document)
+        previous = self.previous_hashes(parser)
+        changes = ChangeSet(parser.source, total=len(current))
+        if previous is None:
+            changes.added = list(current)
+            return changes
+        changes.added = [key for key in current if key not in previous]
+        changes.changed = [key for key in current if key in previous and previous[key] != current[key]]
+        changes.removed = [key for key in previous if key not in current]
+        return changes
+
+    def write(self, parser: StatuteParser, document: Any, force: bool = False) -> ChangeSet:
+        """Write the source's files if any article changed (or force); returns the diff"""
+        changes = self.diff(parser, document)
+        source = parser.source
+        if changes.has_changes or force or not self.json_path(source).exists():
+            self.directory.mkdir(parents=True, exist_ok=True)
+            _write_atomic(self.json_path(source), json.dumps(document, indent=2, ensure_ascii=False))
+            markdown = parser.to_markdown(document)
+            if markdown is not None:
+                _write_atomic(self.markdown_path(source), markdown)
+
+        if source not in self.manifest or changes.has_changes:
+            hashes = article_hashes(parser, document)
+            with self._lock:
+                self.manifest[source] = hashes
+                self.save_manifest()
+        return changes
+
+    def save_manifest(self):
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        _write_atomic(self.manifest_path, json.dumps(self.manifest, indent=2, sort_keys=True))
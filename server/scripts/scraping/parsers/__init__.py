@@ -0,0 +1,29 @@
+"""
+Registered statute parsers, keyed by source (the data/raw/<source>.json stem)
+"""
+
+from typing import Dict, Type
+
+from ..base import StatuteParser
+from .civil_code import CivilCodeParser
+from .consumer_act import ConsumerActParser
+from .family_code import FamilyCodeParser
+from .labor_code import LaborCodeParser
+from .revised_penal_code import RevisedPenalCodeParser
+
+PARSERS: Dict[str, Type[StatuteParser]] = {
+    parser.source: parser
+    for parser in (
+        CivilCodeParser,
+        ConsumerActParser,
+        FamilyCodeParser,
+        LaborCodeParser,
+        RevisedPenalCodeParser,
+    )
+}
+
+
+def get_parser(source: str) -> StatuteParser:
+    if source not in PARSERS:
+        raise KeyError(f"Unknown source '{source}'. Available: {', '.join(PARSERS)}")
+    return PARSERS[source]()
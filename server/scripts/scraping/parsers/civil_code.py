@@ -0,0 +1,112 @@
+"""
+Civil Code of the Philippines (Republic Act No. 386), from LawPhil
+"""
+
+import re
+from typing import Any, Dict
+
+from ..base import StatuteParser
+from ..text import clean_text
+
+CIVIL_CODE_URL = "https://lawphil.net/statutes/repacts/ra1949/ra_386_1949.html"
+ARTICLE_PATTERN = re.compile(r"Article\s+(\d+)\.?\s*(.*)", re.I)
+SUBSECTION_PATTERN = re.compile(r"^\(\d+\)")
+
+
+class CivilCodeParser(StatuteParser):
+    source = "civil_code"
+    name = "Civil Code (RA 386)"
+    pages = {"main": CIVIL_CODE_URL}
+
+    def parse(self, pages: Dict[str, str], accessed_at: str) -> Dict[str, Any]:
+        data = {
+            "title": None,
+            "preamble": None,
+            "category": "Civil Law",
+            "sections": [],
+            "metadata": {
+                "source_url": CIVIL_CODE_URL,
+                "date_accessed": accessed_at,
+            },
+        }
+
+        current_section = None
+        current_article = None
+
+        for p in self.soup(pages["main"]).find_all("p"):
+            text = clean_text(p.get_text(" ", strip=True))
+            if not text:
+                continue
+
+            # Title & preamble detection
+            if not data["title"] and re.search(r"REPUBLIC ACT", text, re.I):
+                data["title"] = text
+                continue
+            if not data["preamble"] and re.search(r"AN ACT", text, re.I):
+                data["preamble"] = text
+                continue
+
+            # Centered paragraphs are section headings
+            if p.get("align", "").lower() == "center":
+                current_section = {"heading": text, "articles": []}
+                data["sections"].append(current_section)
+                continue
+
+            article_match = ARTICLE_PATTERN.match(text)
+            if article_match:
+                number, heading = article_match.groups()
+                current_article = {
+                    "article_number": number,
+                    "heading": heading.strip() or None,
+                    "paragraphs": [],
+                    "subsections": [],
+                }
+                if not current_section:
+                    current_section = {"heading": "Uncategorized", "articles": []}
+                    data["sections"].append(current_section)
+                current_section["articles"].append(current_article)
+                continue
+
+            # Numbered items
+            if SUBSECTION_PATTERN.match(text):
+                if current_article:
+                    current_article["subsections"].append(text)
+                continue
+
+            if current_article:
+                current_article["paragraphs"].append(text)
+
+        return data
+
+    def articles(self, document: Dict[str, Any]):
+        for section in document.get('sections', []):
+            for article in section['articles']:
+                yield article['article_number'], article
+
+    def summary(self, document: Dict[str, Any]) -> Dict[str, int]:
+        return {
+            'Sections': len(document['sections']),
+            'Articles': sum(len(s['articles']) for s in document['sections'])
+        }
+
+    def to_markdown(self, document: Dict[str, Any]) -> str:
+        md = [f"# {document['title']}\n"]
+        if document["preamble"]:
+            md.append(f"**{document['preamble']}**\n")
+
+        for section in document["sections"]:
+            md.append(f"\n## {section['heading']}\n")
+            for article in section["articles"]:
+                heading = f"### Article {article['article_number']}"
+                if article["heading"]:
+                    heading += f" — {article['heading']}"
+                md.append(heading + "\n")
+                for para in article["paragraphs"]:
+                    md.append(f"{para}\n")
+                for sub in article["subsections"]:
+                    md.append(f"- {sub}\n")
+
+        md.append("\n---")
+        md.append(f"\n**Source:** {document['metadata']['source_url']}")
+        md.append(f"\n**Date Accessed:** {document['metadata']['date_accessed']}")
+        return "\n".join(md)
@@ -0,0 +1,89 @@
+"""
+Consumer Act of the Philippines (Republic Act No. 7394), from LawPhil
+"""
+
+from typing import Any, Dict
+
+from ..base import StatuteParser
+from ..text import KeywordClassifier
+from .lawphil import organize_by_topics, parse_justified_articles, topic_articles, topic_markdown
+
+CONSUMER_ACT_URL = "https://lawphil.net/statutes/repacts/ra1992/ra_7394_1992.html"
+TOPICS = ["Consumer Rights", "Unfair Sales Practices"]
+
+
+def _fallback_topic(text: str, number: str) -> str:
+    # Title II is consumer rights, Title IV unfair sales practices; else by article range
+    if 'title ii' in text or 'title 2' in text:
+        return 'Consumer Rights'
+    if 'title iv' in text or 'title 4' in text:
+        return 'Unfair Sales Practices'
+    try:
+        return 'Consumer Rights' if 1 <= int(number) <= 50 else 'Unfair Sales Practices'
+    except ValueError:
+        return 'Consumer Rights'
+
+
+CLASSIFIER = KeywordClassifier(
+    {
+        'Consumer Rights': [
+            'rights', 'right to', 'safety', 'information', 'redress', 'remedy', 'protection',
+            'consumer rights', 'basic rights', 'welfare', 'health', 'security', 'quality',
+            'standard', 'warranty', 'guarantee', 'complaint', 'grievance', 'compensation'
+        ],
+        'Unfair Sales Practices': [
+            'unfair', 'deceptive', 'misleading', 'false', 'fraud', 'misrepresentation',
+            'advertising', 'promotion', 'marketing', 'sales', 'selling', 'offer',
+            'price manipulation', 'bait and switch', 'pyramid', 'chain letter',
+            'unconscionable', 'prohibited acts', 'unlawful', 'violation'
+        ],
+    },
+    default='Consumer Rights',
+    fallback=_fallback_topic
+)
+
+
+class ConsumerActParser(StatuteParser):
+    source = "consumer_act"
+    name = "Consumer Act (RA 7394)"
+    pages = {"main": CONSUMER_ACT_URL}
+
+    def parse(self, pages: Dict[str, str], accessed_at: str) -> Dict[str, Any]:
+        articles = parse_justified_articles(self.soup(pages["main"]), "Republic Act No. 7394", CLASSIFIER.classify)
+        topics = organize_by_topics(articles, TOPICS)
+        return {
+            "title": "THE CONSUMER ACT OF THE PHILIPPINES",
+            "description": "Republic Act No. 7394 - Consumer Protection Law",
+            "law": {
+                "name": "Republic Act No. 7394",
+                "full_name": "The Consumer Act of the Philippines",
+                "date": "April 13, 1992",
+                "url": CONSUMER_ACT_URL
+            },
+            "topics": topics,
+            "statistics": {
+                "total_articles": len(articles),
+                "by_topic": {topic: len(entries) for topic, entries in topics.items()}
+            },
+            "metadata": {
+                "date_accessed": accessed_at,
+                "source": CONSUMER_ACT_URL
+            }
+        }
+
+    def articles(self, document):
+        return topic_articles(document)
+
+    def to_markdown(self, document: Dict[str, Any]) -> str:
+        law = document['law']
+        return topic_markdown(
+            document,
+            law_lines=[
+                "## Law Details\n",
+                f"- **{law['name']}** ({law['full_name']})",
+                f"- **Date:** {law['date']}",
+                f"- **Source:** {law['url']}\n",
+            ],
+            stat_lines=[f"- **Total Articles:** {document['statistics']['total_articles']}\n"],
+            unit="articles"
+        )
@@ -0,0 +1,144 @@
+"""
+Family Code of the Philippines (E.O. 209) together with RA 9262 (VAWC), from LawPhil
+"""
+
+import re
+from typing import Any, Dict, List
+
+from ..base import StatuteParser
+from ..text import KeywordClassifier, clean_text, first_phrase, number_ranges
+from .lawphil import organize_by_topics, parse_justified_articles, topic_articles, topic_markdown
+
+FAMILY_CODE_URL = "https://lawphil.net/executive/execord/eo1987/eo_209_1987.html"
+RA_9262_URL = "https://lawphil.net/statutes/repacts/ra2004/ra_9262_2004.html"
+TOPICS = ["Marriage", "Annulment", "Child Custody", "VAWC"]
+SECTION_PATTERN = re.compile(r"(?:SEC\.|SECTION)\s+(\d+)\.?\s*(.*)", re.I | re.DOTALL)
+
+CLASSIFIER = KeywordClassifier(
+    {
+        'Marriage': [
+            'marriage', 'marry', 'married', 'spouse', 'husband', 'wife', 'wedding', 'matrimony',
+            'conjugal', 'marital', 'solemniz', 'ceremony', 'license', 'requisite', 'consent',
+            'legal capacity', 'impediment', 'celebration', 'contract', 'union', 'family life'
+        ],
+        'Annulment': [
+            'annul', 'void', 'nullity', 'invalid', 'fraud', 'force', 'intimidation', 'unsound mind',
+            'insanity', 'impotence', 'sexually transmissible disease', 'concealment', 'prescription',
+            'declaration of nullity', 'voidable', 'ab initio'
+        ],
+        'Child Custody': [
+            'custody', 'parental authority', 'child', 'children', 'minor', 'best interest',
+            'guardianship', 'support', 'visitation', 'separation', 'legitimate', 'illegitimate',
+            'paternity', 'filiation', 'adoption', 'welfare', 'care', 'upbringing'
+        ],
+        'VAWC': [
+            'violence', 'abuse', 'physical', 'psychological', 'sexual', 'economic', 'battering',
+            'threat', 'harassment', 'stalking', 'protection order', 'barangay', 'women',
+            'domestic violence', 'intimidation', 'coercion', 'deprivation', 'exploitation'
+        ],
+    },
+    default='Marriage',
+    fallback=number_ranges([(1, 44, 'Marriage'), (45, 55, 'Annulment'), (200, 10 ** 6, 'Child Custody')], 'Marriage')
+)
+
+
+def parse_ra_9262(soup) -> List[Dict[str, Any]]:
+    """RA 9262 sections; every one of them is tagged VAWC"""
+    current_title = ""
+    current_chapter = ""
+    sections = []
+
+    for p in soup.find_all("p"):
+        text = clean_text(p.get_text(" ", strip=True))
+        if not text:
+            continue
+
+        # Detect centered headings
+        if p.has_attr("align") and p["align"] == "center":
+            if "TITLE" in text.upper():
+                current_title = text
+            elif "CHAPTER" in text.upper():
+                current_chapter = text
+            continue
+
+        section_match = SECTION_PATTERN.match(text)
+        if section_match:
+            number = section_match.group(1)
+            sections.append({
+                "law": "Republic Act No. 9262",
+                "type": "Section",
+                "number": number,
+                "title": first_phrase(section_match.group(2), stop='.–—-') or f"Section {number}",
+                "content": text,
+                "topic": "VAWC",
+                "hierarchy": {
+                    "title": current_title,
+                    "chapter": current_chapter
+                }
+            })
+
+    return sections
+
+
+class FamilyCodeParser(StatuteParser):
+    source = "family_code"
+    name = "Family Code (E.O. 209) & RA 9262"
+    pages = {"family_code": FAMILY_CODE_URL, "ra_9262": RA_9262_URL}
+
+    def parse(self, pages: Dict[str, str], accessed_at: str) -> Dict[str, Any]:
+        family_code_articles = parse_justified_articles(
+            self.soup(pages["family_code"]), "Family Code (E.O. 209)", CLASSIFIER.classify
+        )
+        ra_9262_sections = parse_ra_9262(self.soup(pages["ra_9262"]))
+        entries = family_code_articles + ra_9262_sections
+        topics = organize_by_topics(entries, TOPICS)
+
+        return {
+            "title": "COMPREHENSIVE FAMILY LAW COMPENDIUM",
+            "description": "Family Code of the Philippines and Republic Act No. 9262 (VAWC)",
+            "laws": [
+                {
+                    "name": "Family Code of the Philippines",
+                    "executive_order": "EXECUTIVE ORDER NO. 209",
+                    "date": "July 6, 1987",
+                    "url": FAMILY_CODE_URL
+                },
+                {
+                    "name": "Republic Act No. 9262",
+                    "full_name": "Anti-Violence Against Women and Their Children Act of 2004",
+                    "date": "March 8, 2004",
+                    "url": RA_9262_URL
+                }
+            ],
+            "topics": topics,
+            "statistics": {
+                "total_entries": len(entries),
+                "family_code_articles": len(family_code_articles),
+                "ra_9262_sections": len(ra_9262_sections),
+                "by_topic": {topic: len(items) for topic, items in topics.items()}
+            },
+            "metadata": {
+                "date_accessed": accessed_at,
+                "sources": [FAMILY_CODE_URL, RA_9262_URL]
+            }
+        }
+
+    def articles(self, document):
+        return topic_articles(document)
+
+    def to_markdown(self, document: Dict[str, Any]) -> str:
+        law_lines = ["## Laws Covered\n"]
+        for law in document['laws']:
+            law_lines.append(f"- **{law['name']}** ({law.get('executive_order', law.get('full_name', ''))})")
+            law_lines.append(f"  - Date: {law['date']}")
+            law_lines.append(f"  - Source: {law['url']}\n")
+        stats = document['statistics']
+        return topic_markdown(
+            document,
+            law_lines=law_lines,
+            stat_lines=[
+                f"- **Total Entries:** {stats['total_entries']}",
+                f"- **Family Code Articles:** {stats['family_code_articles']}",
+                f"- **RA 9262 Sections:** {stats['ra_9262_sections']}\n",
+            ]
+        )
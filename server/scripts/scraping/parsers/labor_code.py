@@ -0,0 +1,146 @@
+"""
+Labor Code of the Philippines (P.D. 442), from LawPhil
+"""
+
+import re
+from typing import Any, Dict, List
+
+from ..base import StatuteParser
+from ..text import KeywordClassifier
+from ..text import clean_text as collapse_whitespace
+from .lawphil import organize_by_topics, topic_articles
+
+LABOR_CODE_URL = "https://lawphil.net/statutes/presdecs/pd1974/pd_442_1974.html"
+BOOK_PATTERN = re.compile(r"^BOOK\s+[IVXLC]+\b", re.I)
+TITLE_PATTERN = re.compile(r"^TITLE\s+[IVXLC]+\b", re.I)
+CHAPTER_PATTERN = re.compile(r"^CHAPTER\s+[IVXLC0-9]+\b", re.I)
+ARTICLE_PATTERN = re.compile(r"^(ART\.|ARTICLE)\s*(\d+)\.?\s*(.*)", re.I)
+FOOTNOTE_PATTERN = re.compile(r'\(LABOR CODE.*?\)', re.I)
+
+CLASSIFIER = KeywordClassifier(
+    {
+        "Employment": ["employment", "employer", "employee", "work", "contract", "termination", "wage", "salary"],
+        "Labor Relations": ["union", "collective", "bargaining", "strike", "conciliation", "arbitration"],
+        "Social Welfare": ["sss", "gsis", "insurance", "benefit", "pension"],
+        "Health and Safety": ["safety", "health", "accident", "hazard", "sanitation"]
+    },
+    default="General Provisions"
+)
+
+
+def clean_text(text: str) -> str:
+    """Collapse whitespace and drop "(LABOR CODE ...)" footnote artifacts"""
+    return FOOTNOTE_PATTERN.sub('', collapse_whitespace(text)).strip()
+
+
+def parse_labor_articles(soup) -> List[Dict[str, Any]]:
+    articles = []
+    current_book, current_title, current_chapter = "", "", ""
+    current_article = None
+    buffer: List[str] = []
+
+    def flush():
+        if current_article:
+            current_article["content"] = clean_text(" ".join(buffer))
+            articles.append(current_article)
+
+    for p in soup.find_all("p"):
+        text = clean_text(p.get_text(" ", strip=True))
+        if not text:
+            continue
+
+        # Detect Book, Title, Chapter
+        if BOOK_PATTERN.match(text):
+            current_book = text
+            continue
+        if TITLE_PATTERN.match(text):
+            current_title = text
+            continue
+        if CHAPTER_PATTERN.match(text):
+            current_chapter = text
+            continue
+
+        article_match = ARTICLE_PATTERN.match(text)
+        if article_match:
+            flush()
+            number = article_match.group(2)
+            title = article_match.group(3).strip()
+            buffer = []
+
+            # If the article line already carries its body, split the title off
+            split_parts = re.split(r'[\.\-–:]\s+', title, 1)
+            if len(split_parts) > 1 and len(split_parts[1].split()) > 5:
+                title = split_parts[0].strip()
+                buffer.append(split_parts[1].strip())
+
+            current_article = {
+                "law": "Labor Code (P.D. 442)",
+                "type": "Article",
+                "number": number,
+                "title": title or f"Article {number}",
+                "content": "",
+                "topic": "",
+                "hierarchy": {
+                    "book": current_book,
+                    "title": current_title,
+                    "chapter": current_chapter
+                }
+            }
+            continue
+
+        # Following paragraphs belong to the open article
+        if current_article:
+            buffer.append(text)
+
+    flush()
+
+    for article in articles:
+        article["topic"] = CLASSIFIER.classify(article["content"] or article["title"])
+    return articles
+
+
+class LaborCodeParser(StatuteParser):
+    source = "labor_code"
+    name = "Labor Code (P.D. 442)"
+    pages = {"main": LABOR_CODE_URL}
+
+    def parse(self, pages: Dict[str, str], accessed_at: str) -> Dict[str, Any]:
+        articles = parse_labor_articles(self.soup(pages["main"]))
+        # Topics in order of first appearance, as the site lays them out
+        topics = organize_by_topics(articles, [])
+        return {
+            "title": "LABOR CODE OF THE PHILIPPINES",
+            "description": "Presidential Decree No. 442 - Labor Code of the Philippines",
+            "laws": [
+                {
+                    "name": "Labor Code of the Philippines",
+                    "executive_order": "P.D. No. 442",
+                    "date": "May 1, 1974",
+                    "url": LABOR_CODE_URL
+                }
+            ],
+            "topics": topics,
+            "statistics": {
+                "total_articles": len(articles),
+                "by_topic": {topic: len(items) for topic, items in topics.items()}
+            },
+            "metadata": {
+                "source": LABOR_CODE_URL,
+                "date_accessed": accessed_at
+            }
+        }
+
+    def articles(self, document):
+        return topic_articles(document)
+
+    def to_markdown(self, document: Dict[str, Any]) -> str:
+        md = [f"# {document['title']}\n", f"{document['description']}\n"]
+        md.append("## Topics\n")
+        for topic, articles in document["topics"].items():
+            md.append(f"### {topic}\n")
+            for article in articles:
+                hierarchy = article['hierarchy']
+                md.append(f"#### Article {article['number']}: {article['title']}")
+                md.append(f"*{hierarchy['book']} | {hierarchy['title']} | {hierarchy['chapter']}*")
+                md.append(f"\n{article['content']}\n")
+        return "\n".join(md)
@@ -0,0 +1,111 @@
+"""
+Shared parsing for LawPhil statute pages laid out as justified <p> blocks
+with TITLE / Chapter headings and "Article N. Title. - text" paragraphs
+"""
+
+import re
+from typing import Any, Callable, Dict, List
+
+from bs4 import BeautifulSoup
+
+from ..text import clean_text, first_phrase
+
+TITLE_PATTERN = re.compile(r"TITLE\s+([IVXLC]+)\s*[-–—]?\s*(.+)", re.I)
+STANDALONE_TITLE_PATTERN = re.compile(r"^TITLE\s+[IVXLC]+\s*$", re.I)
+CHAPTER_PATTERN = re.compile(r"Chapter\s+(\d+)\.\s*(.+)")
+ARTICLE_PATTERN = re.compile(r"Article\s+(\d+)\.?\s*(.*)", re.DOTALL)
+
+
+def parse_justified_articles(
+    soup: BeautifulSoup,
+    law: str,
+    classify: Callable[[str, str, str], str]
+) -> List[Dict[str, Any]]:
+    """Articles of a LawPhil page, each tagged with classify(content, title, number)"""
+    current_title = ""
+    current_chapter = ""
+    articles = []
+
+    for p in soup.find_all("p", attrs={'align': 'justify'}):
+        text = clean_text(p.get_text(" ", strip=True))
+        if not text:
+            continue
+
+        # Detect TITLE
+        title_match = TITLE_PATTERN.match(text)
+        if title_match:
+            current_title = f"TITLE {title_match.group(1)} — {title_match.group(2).strip()}"
+            continue
+
+        # Also check for standalone TITLE lines
+        if STANDALONE_TITLE_PATTERN.match(text):
+            current_title = text.strip()
+            continue
+
+        # Detect Chapter
+        chapter_match = CHAPTER_PATTERN.match(text)
+        if chapter_match:
+            current_chapter = f"Chapter {chapter_match.group(1)}. {chapter_match.group(2).strip()}"
+            continue
+
+        # Detect Article; the title is its first sentence
+        article_match = ARTICLE_PATTERN.match(text)
+        if article_match:
+            number = article_match.group(1)
+            title = first_phrase(article_match.group(2)) or f"Article {number}"
+            articles.append({
+                "law": law,
+                "type": "Article",
+                "number": number,
+                "title": title,
+                "content": text,
+                "topic": classify(text, title, number),
+                "hierarchy": {
+                    "title": current_title,
+                    "chapter": current_chapter
+                }
+            })
+
+    return articles
+
+
+def organize_by_topics(entries: List[Dict[str, Any]], topic_names: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """Group entries under the given topics, in that order"""
+    topics: Dict[str, List[Dict[str, Any]]] = {name: [] for name in topic_names}
+    for entry in entries:
+        topics.setdefault(entry['topic'], []).append(entry)
+    return topics
+
+
+def topic_articles(document: Dict[str, Any]):
+    """(type:number, article) over a {'topics': {...}} document"""
+    for entries in document.get('topics', {}).values():
+        for entry in entries:
+            yield f"{entry.get('type', 'Article')}:{entry['number']}", entry
+
+
+def topic_markdown(document: Dict[str, Any], law_lines: List[str], stat_lines: List[str], unit: str = "entries") -> str:
+    """Markdown layout shared by the topic-organized statutes"""
+    md = [f"# {document['title']}\n", f"{document['description']}\n"]
+    md.extend(law_lines)
+
+    md.append("## Statistics\n")
+    md.extend(stat_lines)
+    md.append("### By Topic:\n")
+    for topic, count in document['statistics']['by_topic'].items():
+        md.append(f"- **{topic}:** {count} {unit}")
+
+    for topic_name, entries in document['topics'].items():
+        md.append(f"\n## {topic_name}\n")
+        for entry in entries:
+            md.append(f"\n### {entry['law']} - {entry['type']} {entry['number']}")
+            md.append(f"**{entry['title']}**\n")
+            if entry['hierarchy'].get('title'):
+                md.append(f"*{entry['hierarchy']['title']}*")
+            if entry['hierarchy'].get('chapter'):
+                md.append(f" | *{entry['hierarchy']['chapter']}*")
+            md.append("\n")
+            md.append(f"{entry['content']}\n")
+
+    md.append(f"\n---\n**Date Accessed:** {document['metadata']['date_accessed']}")
+    return "\n".join(md)
@@ -0,0 +1,218 @@
+"""
+Revised Penal Code (Act No. 3815), from the Supreme Court E-Library
+
+The page is one long run of text, so articles are cut out of it on their
+"ART. N." headers rather than by HTML structure.
+"""
+
+import re
+from datetime import datetime
+from typing import Any, Dict, List
+
+from ..base import StatuteParser
+
+RPC_URL = "https://elibrary.judiciary.gov.ph/thebookshelf/showdocs/28/20426"
+ARTICLE_SPLIT_PATTERNS = [
+    r'(ART\.\s+\d+\.)',
+    r'(Art\.\s+\d+\.)',
+    r'(ARTICLE\s+\d+\.)',
+    r'(Article\s+\d+\.)'
+]
+PENALTY_PATTERNS = [
+    r'reclusion\s+perpetua',
+    r'reclusion\s+temporal',
+    r'prision\s+mayor',
+    r'prision\s+correccional',
+    r'arresto\s+mayor',
+    r'arresto\s+menor',
+    r'destierro',
+    r'fine[s]?\s+of\s+(?:not\s+)?(?:less\s+than\s+|more\s+than\s+)?(?:P|₱)?\s*\d+(?:,\d{3})*(?:\.\d{2})?',
+    r'fine[s]?\s+(?:ranging\s+)?from\s+(?:P|₱)?\s*\d+(?:,\d{3})*\s+to\s+(?:P|₱)?\s*\d+(?:,\d{3})*',
+    r'imprisonment\s+(?:of\s+)?(?:not\s+)?(?:less\s+than\s+|more\s+than\s+)?\d+\s+(?:years?|months?|days?)',
+    r'death',
+    r'life\s+imprisonment'
+]
+NO_PENALTY = "No specific penalty mentioned"
+MIN_CONTENT_CHARS = 30
+MIN_ARTICLE_CHARS = 50
+
+
+def clean_article_content(content: str) -> str:
+    """Normalize article text; the E-Library page carries mojibake and stray non-ASCII"""
+    content = re.sub(r'\s+', ' ', content)
+
+    # Remove dash artifacts at start/end
+    content = re.sub(r'^\s*[-–—]\s*', '', content)
+    content = re.sub(r'\s*[-–—]\s*$', '', content)
+
+    content = content.replace('–', '-').replace('—', '-')
+    for artifact in ('Â€', 'â', 'Â', 'Ã', '¢', '€'):
+        content = content.replace(artifact, '')
+    content = re.sub(r'[^\x00-\x7F]+', '', content)
+
+    content = re.sub(r'\s+', ' ', content)
+    # Ensure proper sentence spacing
+    content = re.sub(r'\.([A-Z])', r'. \1', content)
+    content = re.sub(r'\.+$', '.', content)
+    return content.strip()
+
+
+def extract_penalties(content: str) -> str:
+    """Penalties named in the article, "; "-joined, first mention wins"""
+    unique: List[str] = []
+    for pattern in PENALTY_PATTERNS:
+        for penalty in re.findall(pattern, content, re.IGNORECASE):
+            if penalty.lower() not in [p.lower() for p in unique]:
+                unique.append(penalty)
+    return "; ".join(unique) if unique else NO_PENALTY
+
+
+def extract_article_title(content: str, article_num: int) -> str:
+    """Title from "ART. N. Title. — body", falling back to the first words"""
+    # ART. [num]. [Title] [description]. — [content]
+    match = re.search(rf'ART\.\s*{article_num}\.\s*([^.—]+(?:\s+[^.—]+)*)\s*[.—]', content, re.IGNORECASE)
+    if match and 5 <= len(match.group(1).strip()) <= 100:
+        return match.group(1).strip()
+
+    # Title before an em dash
+    match = re.search(rf'ART\.\s*{article_num}\.\s*([^—]+)—', content, re.IGNORECASE)
+    if match:
+        title = re.sub(r'\s+', ' ', match.group(1).strip())
+        if 5 <= len(title) <= 100:
+            return title
+
+    # First sentence after the article number
+    match = re.search(rf'ART\.\s*{article_num}\.\s*([^.]+\.)', content, re.IGNORECASE)
+    if match and 5 <= len(match.group(1).strip()) <= 150:
+        return match.group(1).strip()
+
+    # Fallback: up to 12 words after "ART." and the number
+    words = content.split()
+    title_start = 0
+    for i, word in enumerate(words):
+        if word.upper() == 'ART.' or word.isdigit():
+            continue
+        title_start = i
+        break
+
+    if title_start < len(words):
+        title_words = []
+        for word in words[title_start:title_start + 12]:
+            title_words.append(word)
+            if word.endswith('.') and len(title_words) >= 3:
+                break
+        title = ' '.join(title_words)
+        if not title.endswith('.'):
+            title = title.rstrip('.,;:') + '.'
+        return title
+
+    return f"Article {article_num}"
+
+
+def remove_article_header(content: str, article_num: int) -> str:
+    """Article body without the "ART. N." header and its title"""
+    for pattern in (
+        rf'^ART\.\s*{article_num}\.\s*[^.—]*[.—]\s*',
+        rf'^Art\.\s*{article_num}\.\s*[^.—]*[.—]\s*',
+        rf'^ARTICLE\s*{article_num}\.\s*[^.—]*[.—]\s*'
+    ):
+        content = re.sub(pattern, '', content, flags=re.IGNORECASE)
+
+    # Drop a leading title sentence if one is left
+    for pattern in (r'^[A-Z][^.]*\.\s*', r'^[^.]{5,100}\.\s*'):
+        match = re.match(pattern, content)
+        if match and len(match.group(0).strip()) < 150:
+            content = re.sub(pattern, '', content, count=1)
+            break
+
+    return content.strip()
+
+
+def categorize_article(article_num: int) -> str:
+    if article_num == 11:
+        return "Self-Defense"
+    if 293 <= article_num <= 302:
+        return "Robbery"
+    if 303 <= article_num <= 312:
+        return "Theft"
+    if article_num == 315:
+        return "Estafa"
+    return "Other Criminal Law"
+
+
+class RevisedPenalCodeParser(StatuteParser):
+    source = "revised_penal_code"
+    name = "Revised Penal Code"
+    pages = {"main": RPC_URL}
+    encoding = None  # The E-Library declares its own charset
+    volatile_fields = ('scraped_at',)
+
+    def parse(self, pages: Dict[str, str], accessed_at: str) -> List[Dict[str, Any]]:
+        soup = self.soup(pages["main"])
+        text_content = re.sub(r'\s+', ' ', " ".join(soup.stripped_strings))
+
+        splits: List[str] = []
+        for pattern in ARTICLE_SPLIT_PATTERNS:
+            splits = re.split(pattern, text_content, flags=re.IGNORECASE)
+            if len(splits) > 1:
+                break
+        if len(splits) < 2:
+            return []
+
+        scraped_at = datetime.now().isoformat()
+        articles = []
+        # splits alternates header, body after the leading text
+        for i in range(1, len(splits) - 1, 2):
+            header = splits[i].strip()
+            number_match = re.search(r'(\d+)', header)
+            if not number_match:
+                continue
+            article_num = int(number_match.group(1))
+
+            cleaned = clean_article_content(f"{header} {splits[i + 1].strip()}".strip())
+            if len(cleaned) < MIN_CONTENT_CHARS:
+                continue
+
+            body = remove_article_header(cleaned, article_num)
+            if len(body) < MIN_ARTICLE_CHARS:
+                continue
+
+            articles.append({
+                'article_number': article_num,
+                'article_title': extract_article_title(cleaned, article_num),
+                'article_text': body,
+                'penalties': extract_penalties(cleaned),
+                'word_count': len(body.split()),
+                'character_count': len(body),
+                'source_url': RPC_URL,
+                'scraped_at': scraped_at,
+                'category': categorize_article(article_num)
+            })
+
+        return articles
+
+    def articles(self, document: List[Dict[str, Any]]):
+        for article in document:
+            yield str(article['article_number']), article
+
+    def to_markdown(self, document: List[Dict[str, Any]]) -> str:
+        md = ["# REVISED PENAL CODE OF THE PHILIPPINES\n", "**Source:** Supreme Court E-Library\n", "---\n"]
+
+        by_category: Dict[str, List[Dict[str, Any]]] = {}
+        for article in document:
+            by_category.setdefault(article.get('category', 'General'), []).append(article)
+
+        for category, articles in sorted(by_category.items()):
+            md.append(f"## {category}\n")
+            for article in sorted(articles, key=lambda a: a.get('article_number', 0)):
+                md.append(f"### Article {article['article_number']}")
+                if article.get('article_title'):
+                    md.append(f"**{article['article_title']}**\n")
+                md.append(f"{article['article_text']}\n")
+                if article.get('penalties') and article['penalties'] != NO_PENALTY:
+                    md.append(f"*Penalties:* {article['penalties']}\n")
+                md.append("---\n")
+
+        scraped = document[0]['scraped_at'][:19].replace('T', ' ') if document else ''
+        md.append(f"\n**Scraped:** {scraped}")
+        return "\n".join(md) + "\n"
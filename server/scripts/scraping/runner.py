@@ -0,0 +1,109 @@
+"""
+Runs statute parsers concurrently with a resumable checkpoint
+
+Sources fetch in parallel (the fetcher keeps each host polite) and parse in
+worker threads. Every finished source is recorded in
+data/raw/.scrape/checkpoint.json; after a failure, --resume skips the sources
+that already finished. The checkpoint is cleared once a run completes.
+"""
+
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .fetcher import FetchError
+from .output import ChangeSet, OutputStore
+from .parsers import get_parser
+
+
+@dataclass
+class SourceResult:
+    source: str
+    changes: Optional[ChangeSet] = None
+    summary: Dict[str, int] = field(default_factory=dict)
+    fetch_statuses: Dict[str, str] = field(default_factory=dict)
+    skipped: bool = False
+    error: Optional[str] = None
+    elapsed: float = 0.0
+
+
+class Checkpoint:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.completed: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.completed = json.load(f).get('completed', {})
+
+    def mark_done(self, source: str, info: Dict[str, Any]):
+        self.completed[source] = info
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'completed': self.completed}, f, indent=2)
+        os.replace(tmp, self.path)
+
+    def clear(self):
+        self.completed = {}
+        if self.path.exists():
+            self.path.unlink()
+
+
+async def scrape_source(source: str, fetcher, store: OutputStore, accessed_at: str, refresh: bool = False) -> SourceResult:
+    parser = get_parser(source)
+    result = SourceResult(source)
+    start = time.perf_counter()
+
+    pages = await asyncio.gather(*(
+        fetcher.fetch_page(source, page, url, encoding=parser.encoding, refresh=refresh)
+        for page, url in parser.pages.items()
+    ))
+    result.fetch_statuses = {page: fetched.status for page, fetched in zip(parser.pages, pages)}
+
+    html = {page: fetched.text for page, fetched in zip(parser.pages, pages)}
+    document = await asyncio.to_thread(parser.parse, html, accessed_at)
+    if not list(parser.articles(document)):
+        # A layout change that parses to nothing must not wipe the last good copy
+        raise ValueError(f"{source}: no articles parsed; keeping the existing output")
+
+    result.changes = await asyncio.to_thread(store.write, parser, document)
+    result.summary = parser.summary(document)
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+async def run_scrape(
+    sources: List[str],
+    fetcher,
+    store: Optional[OutputStore] = None,
+    resume: bool = False,
+    refresh: bool = False
+) -> List[SourceResult]:
+    store = store or OutputStore()
+    checkpoint = Checkpoint(store.state_dir / "checkpoint.json")
+    if not resume:
+        checkpoint.clear()
+    accessed_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    async def run_one(source: str) -> SourceResult:
+        if source in checkpoint.completed:
+            return SourceResult(source, skipped=True)
+        try:
+            result = await scrape_source(source, fetcher, store, accessed_at, refresh)
+        except (FetchError, ValueError) as e:
+            return SourceResult(source, error=str(e))
+        checkpoint.mark_done(source, {
+            'finished_at': datetime.now().isoformat(),
+            'changed': result.changes.has_changes
+        })
+        return result
+
+    results = await asyncio.gather(*(run_one(source) for source in sources))
+    if all(result.error is None for result in results):
+        checkpoint.clear()
+    return list(results)
@@ -0,0 +1,63 @@
+"""
+Text helpers shared by the statute parsers
+"""
+
+import re
+from typing import Callable, Dict, List, Optional
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def clean_text(text: str) -> str:
+    """Collapse whitespace runs into single spaces"""
+    return WHITESPACE_PATTERN.sub(' ', (text or '').strip())
+
+
+def first_phrase(text: str, stop: str = '.') -> Optional[str]:
+    """Text up to the first stop character, used as an article title"""
+    match = re.match(rf'^([^{re.escape(stop)}]+)', text.strip())
+    return clean_text(match.group(1)) if match else None
+
+
+class KeywordClassifier:
+    """
+    Topic tagging by keyword hits in an article's content and title.
+
+    Each topic scores one point per keyword found; the best score wins and
+    ties go to the topic listed first. With no hits at all, `fallback` decides
+    (it gets the lowercased text and the article number).
+    """
+
+    def __init__(
+        self,
+        keywords: Dict[str, List[str]],
+        default: str,
+        fallback: Optional[Callable[[str, str], str]] = None
+    ):
+        self.keywords = {topic: [k.lower() for k in words] for topic, words in keywords.items()}
+        self.default = default
+        self.fallback = fallback
+
+    def classify(self, content: str, title: str = "", number: str = "") -> str:
+        text = f"{content} {title}".lower()
+        scores = {topic: sum(1 for k in words if k in text) for topic, words in self.keywords.items()}
+        best = max(scores, key=scores.get) if scores else self.default
+        if scores.get(best, 0) > 0:
+            return best
+        if self.fallback is not None:
+            return self.fallback(text, str(number))
+        return self.default
+
+
+def number_ranges(ranges: List[tuple], default: str) -> Callable[[str, str], str]:
+    """Fallback for KeywordClassifier: [(first, last, topic), ...] on the article number"""
+    def fallback(_text: str, number: str) -> str:
+        try:
+            num = int(number)
+        except (TypeError, ValueError):
+            return default
+        for first, last, topic in ranges:
+            if first <= num <= last:
+                return topic
+        return default
+    return fallback
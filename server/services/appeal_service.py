@@ -4,6 +4,7 @@ Business logic for suspension appeal system
 """
 
 from services.supabase_service import SupabaseService
+from services.user_status_service import invalidate_user_status
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 import logging
@@ -315,6 +316,7 @@ class AppealService:
                 })\
                 .eq("id", user_id)\
                 .execute()
+            invalidate_user_status(user_id)
             
             logger.info(f"Suspension {suspension_id} lifted for user {user_id}")
             
@@ -344,6 +346,7 @@ class AppealService:
                 .update({"suspension_end": new_end_date.isoformat()})\
                 .eq("id", user_id)\
                 .execute()
+            invalidate_user_status(user_id)
             
             logger.info(f"Suspension {suspension_id} reduced to {new_end_date}")
             
@@ -0,0 +1,306 @@
+"""
+Article Lookup for AI.ttorney
+Direct citation answers from the prebuilt article index
+
+Questions like "What does Article 36 of the Family Code say?" name the exact
+provision they want. This module finds such citations in a question
+("Art. 36 FC", "RA 9262 Sec 5", "Artikulo 247 ng RPC", "Articles 36 and 45
+of the Family Code") and resolves them against data/processed/article_index.json,
+which preprocess_data.py builds from the raw statutes. The chatbot uses the
+result to answer verbatim-lookup questions without retrieval and to pin the
+cited articles into the context of everything else.
+"""
+
+import json
+import logging
+import os
+import re
+import unicodedata
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ARTICLE_INDEX_PATH = Path(__file__).parent.parent / "data" / "processed" / "article_index.json"
+MAX_CITATIONS = 5  # Articles pinned or quoted per question
+MAX_RANGE = 10  # "Articles 36-45" expands; wider ranges are ignored
+
+# Display names, keyed like the article index
+LAW_NAMES = {
+    "family_code": "Family Code of the Philippines",
+    "ra_9262": "Republic Act No. 9262 (Anti-VAWC Act)",
+    "revised_penal_code": "Revised Penal Code",
+    "civil_code": "Civil Code of the Philippines",
+    "labor_code": "Labor Code of the Philippines",
+    "consumer_act": "Consumer Act of the Philippines",
+}
+
+# Names a law goes by, matched against normalized text (see _normalize)
+LAW_ALIASES = {
+    "family_code": [
+        r"family\s+code", r"(?:eo|executive\s+order)\s*(?:no\s*)?209",
+        r"kodigo\s+(?:ng|sa)\s+pamilya", r"batas\s+(?:ng|sa)\s+pamilya",
+    ],
+    "ra_9262": [
+        r"(?:ra|republic\s+act)\s*(?:no\s*)?9262", r"anti\s*-?\s*vawc", r"vawc\s+law", r"vawc\s+act",
+        r"anti\s*-?\s*violence\s+against\s+women(?:\s+and\s+their\s+children)?(?:\s+act)?",
+    ],
+    "revised_penal_code": [
+        r"(?:revised\s+)?penal\s+code", r"act\s*(?:no\s*)?3815", r"(?:binagong\s+)?kodigo\s+penal",
+    ],
+    "civil_code": [
+        r"(?:new\s+)?civil\s+code", r"(?:ra|republic\s+act)\s*(?:no\s*)?386\b", r"kodigo\s+sibil",
+    ],
+    "labor_code": [
+        r"labou?r\s+code", r"(?:pd|presidential\s+decree)\s*(?:no\s*)?442",
+        r"kodigo\s+(?:ng|sa)\s+paggawa",
+    ],
+    "consumer_act": [
+        r"consumer\s+act", r"(?:ra|republic\s+act)\s*(?:no\s*)?7394",
+    ],
+}
+
+# Abbreviations too ambiguous to count unless written right next to a provision
+SHORT_ALIASES = {
+    "family_code": [r"fc"],
+    "revised_penal_code": [r"rpc"],
+    "civil_code": [r"ncc", r"cc"],
+    "labor_code": [r"lc"],
+    "ra_9262": [r"vawc"],
+}
+
+_NUMBER_LIST = r"\d+(?:\s*(?:,|and|at|&|or|o|to|-|hanggang)\s*\d+)*"
+PROVISION_PATTERN = re.compile(
+    r"\b(?:(?P<article>art(?:icle|ikulo|iculo)?s?)|(?P<section>sec(?:tion|s)?|seksi?yon)|(?P<sign>§+))"
+    rf"\s*(?:no\s*)?(?P<numbers>{_NUMBER_LIST})\b"
+    # "ika-36 na artikulo"
+    r"|\bika\s*-?\s*(?P<ordinal>\d+)\s+na\s+(?:(?P<ordinal_article>artikulo|article)|seksi?yon|section)\b"
+)
+
+
+def _alias_pattern(aliases: Dict[str, List[str]]) -> re.Pattern:
+    """One alternation with a named group per law"""
+    groups = []
+    for law, patterns in aliases.items():
+        groups.append(f"(?P<{law}>" + "|".join(r"\b(?:" + alias + r")\b" for alias in patterns) + ")")
+    return re.compile("|".join(groups))
+
+
+LAW_PATTERN = _alias_pattern(LAW_ALIASES)
+SHORT_LAW_PATTERN = _alias_pattern(SHORT_ALIASES)
+# Words allowed between a provision and the law it belongs to
+PROVISION_THEN_LAW_GAP = re.compile(r"^[\s,]*(?:(?:of|ng|sa|under|in|from|the|ang|mga|nasa|ayon)\s+){0,3}$")
+LAW_THEN_PROVISION_GAP = re.compile(r"^[\s,:;]*(?:(?:s|under|at|ng|sa|the)\s+){0,2}$")
+
+# Once the citation is removed, only these words may be left for a verbatim lookup: a bare
+# citation ("Art. 36 FC?") or one wrapped in a request for its wording ("What does Article 36
+# of the Family Code say?", "Ano ang nakasaad sa Article 41?"). Anything else ("... say about
+# my husband leaving?") is a question about the provision, answered with it pinned.
+LOOKUP_FILLER = {
+    "what", "is", "are", "the", "of", "does", "do", "did", "say", "says", "state", "states", "provide",
+    "provides", "about", "please", "pls", "po", "ang", "ng", "sa", "ano", "yung", "ung", "under", "in",
+    "text", "full", "wording", "exact", "words", "content", "contents", "written", "show", "give", "me",
+    "quote", "read", "recite", "and", "at", "sinasabi", "nakasaad", "nilalaman", "laman", "sabi",
+    "nakasulat", "pakibasa", "ipakita", "nga",
+}
+
+
+@dataclass(frozen=True)
+class Citation:
+    law: Optional[str]  # Article index key, None if no law could be attached
+    number: str
+    kind: str  # "Article" or "Section"
+    start: int
+    end: int
+
+
+def _normalize(text: str) -> str:
+    """Lowercase, strip accents and punctuation: "R.A. No. 9262" -> "ra no 9262", "Art." -> "art" """
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    text = "".join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold()
+    text = re.sub(r"(?<=\b[a-z])\.(?=[a-z]\b)", "", text)  # r.a. -> ra., e.o. -> eo.
+    text = re.sub(r"[.'’()\[\]\"“”?!]", " ", text)
+    return re.sub(r"\s+", " ", text)
+
+
+def _expand_numbers(numbers: str) -> List[str]:
+    tokens = re.findall(r"\d+|to|hanggang|-", numbers)
+    result: List[str] = []
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token.isdigit() and i + 2 < len(tokens) and tokens[i + 1] in ("to", "hanggang", "-") and tokens[i + 2].isdigit():
+            first, last = int(token), int(tokens[i + 2])
+            if 0 < last - first <= MAX_RANGE:
+                result.extend(str(n) for n in range(first, last + 1))
+            else:
+                result.extend([token, tokens[i + 2]])
+            i += 3
+            continue
+        if token.isdigit():
+            result.append(token)
+        i += 1
+    return list(dict.fromkeys(result))
+
+
+def _law_mentions(text: str) -> List[Tuple[int, int, str, bool]]:
+    """(start, end, law, is_short) for every law name in normalized text"""
+    mentions = []
+    for pattern, short in ((LAW_PATTERN, False), (SHORT_LAW_PATTERN, True)):
+        for match in pattern.finditer(text):
+            mentions.append((match.start(), match.end(), match.lastgroup, short))
+    # A short alias inside a full name ("vawc" in "anti vawc") is the same mention
+    full = [m for m in mentions if not m[3]]
+    return sorted(
+        [m for m in mentions if not m[3] or not any(f[0] <= m[0] and m[1] <= f[1] for f in full)],
+        key=lambda m: m[0]
+    )
+
+
+def parse_citations(text: str) -> List[Citation]:
+    """
+    Statute citations in a question, in order. A provision takes the law named
+    right after it ("Art. 36 of the Family Code", "Artikulo 247 ng RPC") or right
+    before it ("RA 9262 Sec 5"); failing that, the only law named anywhere in
+    the question ("Under the Family Code, what do Articles 36 and 45 say?").
+    """
+    normalized = _normalize(text)
+    laws = _law_mentions(normalized)
+    # Law names contain numbers ("RA 9262") that must not read as provisions
+    law_spans = [(start, end) for start, end, _, _ in laws]
+    named_laws = {law for _, _, law, short in laws if not short}
+    sole_law = next(iter(named_laws)) if len(named_laws) == 1 else None
+
+    citations: List[Citation] = []
+    for match in PROVISION_PATTERN.finditer(normalized):
+        if any(start <= match.start() < end for start, end in law_spans):
+            continue
+        if match.group("ordinal"):
+            kind = "Article" if match.group("ordinal_article") else "Section"
+            numbers = [match.group("ordinal")]
+        else:
+            kind = "Section" if (match.group("section") or match.group("sign")) else "Article"
+            numbers = _expand_numbers(match.group("numbers"))
+
+        law = None
+        after = [m for m in laws if m[0] >= match.end() and PROVISION_THEN_LAW_GAP.match(normalized[match.end():m[0]])]
+        before = [m for m in laws if m[1] <= match.start() and LAW_THEN_PROVISION_GAP.match(normalized[m[1]:match.start()])]
+        if after:
+            law = after[0][2]
+        elif before:
+            law = before[-1][2]
+        elif sole_law:
+            law = sole_law
+
+        for number in numbers:
+            citations.append(Citation(law, number, kind, match.start(), match.end()))
+
+    return list(dict.fromkeys(citations))
+
+
+def is_verbatim_request(text: str) -> bool:
+    """True when the question asks what a provision says rather than what it means for someone"""
+    normalized = _normalize(text)
+    if not PROVISION_PATTERN.search(normalized):
+        return False
+    remainder = PROVISION_PATTERN.sub(" ", normalized)
+    remainder = LAW_PATTERN.sub(" ", remainder)
+    remainder = SHORT_LAW_PATTERN.sub(" ", remainder)
+    return all(word in LOOKUP_FILLER for word in re.findall(r"[a-z0-9]+", remainder))
+
+
+class ArticleLookup:
+    """The article index, loaded on first use and reloaded when the file is rebuilt"""
+
+    def __init__(self, path: Path = ARTICLE_INDEX_PATH):
+        self.path = Path(path)
+        self._laws: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._mtime: Optional[float] = None
+
+        # Stats
+        self.lookups = 0
+        self.hits = 0
+
+    def _ensure_loaded(self):
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            if self._mtime is None:
+                logger.warning(f"Article index not found at {self.path}; run data/preprocess_data.py")
+                self._mtime = -1.0
+            return
+        if mtime == self._mtime:
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            self._laws = json.load(f).get("laws", {})
+        self._mtime = mtime
+        logger.info(f"Loaded article index: {sum(len(a) for a in self._laws.values())} articles")
+
+    def get(self, law: str, number: str) -> Optional[Dict[str, Any]]:
+        """Entry for one provision: label, title, text, parent_id, source_url, plus law and number"""
+        self._ensure_loaded()
+        self.lookups += 1
+        entry = self._laws.get(law, {}).get(str(number))
+        if entry is None:
+            return None
+        self.hits += 1
+        return {**entry, "law": law, "law_name": LAW_NAMES.get(law, law), "number": str(number)}
+
+    def resolve(self, text: str) -> Tuple[List[Dict[str, Any]], List[Citation]]:
+        """
+        (found entries, citations that named no law or no known provision), capped at
+        MAX_CITATIONS. A citation only matches an entry of its own kind: the Family Code
+        has no "Section 5", so "Sec. 5 FC" is left unresolved rather than read as Article 5.
+        """
+        found, unresolved = [], []
+        for citation in parse_citations(text):
+            entry = self.get(citation.law, citation.number) if citation.law else None
+            if entry is None or entry["label"] != citation.kind:
+                unresolved.append(citation)
+            elif all(e["parent_id"] != entry["parent_id"] for e in found):
+                found.append(entry)
+        return found[:MAX_CITATIONS], unresolved
+
+    def get_stats(self) -> Dict[str, Any]:
+        self._ensure_loaded()
+        return {
+            "articles": sum(len(a) for a in self._laws.values()),
+            "lookups": self.lookups,
+            "hits": self.hits,
+        }
+
+
+def article_heading(entry: Dict[str, Any]) -> str:
+    """ "Revised Penal Code, Article 247 - Death or physical injuries ..." """
+    heading = f"{entry['law_name']}, {entry['label']} {entry['number']}"
+    title = entry.get("title") or ""
+    # Civil Code articles have no title, and some titles are just the opening sentence
+    if title and not entry["text"].startswith(title) and len(title) <= 120:
+        heading += f" - {title}"
+    return heading
+
+
+def to_source(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Entry in the shape retrieval returns its sources in"""
+    text = entry["text"]
+    return {
+        "source": entry["law"] if entry["law"] != "ra_9262" else "family_code",
+        "law": entry["law_name"],
+        "article_number": entry["number"],
+        "article_title": entry.get("title") or "",
+        "text_preview": text[:200] + "..." if len(text) > 200 else text,
+        "source_url": entry.get("source_url", ""),
+        "relevance_score": 1.0,
+    }
+
+
+_article_lookup: Optional[ArticleLookup] = None
+
+
+def get_article_lookup() -> ArticleLookup:
+    """Get or create ArticleLookup singleton"""
+    global _article_lookup
+    if _article_lookup is None:
+        _article_lookup = ArticleLookup()
+    return _article_lookup
@@ -3,6 +3,8 @@ Chat History Service for AI.ttorney
 Manages chat sessions and messages using Supabase
 """
 
+import base64
+import json
 import logging
 from typing import List, Optional, Dict, Any, Tuple
 from uuid import UUID
@@ -21,6 +23,8 @@ from models.chat_models import (
     SessionStatistics,
     UserChatStatistics
 )
+from services.conversation_cache import get_conversation_cache
+from services.chat_write_behind import get_chat_write_queue
 
 load_dotenv()
 logger = logging.getLogger(__name__)
@@ -98,46 +102,69 @@ class ChatHistoryService:
         user_id: UUID,
         include_archived: bool = False,
         page: int = 1,
-        page_size: int = 20
+        page_size: int = 20,
+        cursor: Optional[str] = None
     ) -> SessionListResponse:
-        """Get all sessions for a user with pagination"""
+        """
+        Get sessions for a user, newest first, in a single query
+        
+        Previews come from the denormalized chat_sessions.last_message_preview
+        column (see migrations/014_chat_sessions_last_message_preview.sql).
+        Pass the returned next_cursor to fetch the following page (keyset
+        pagination on last_message_at, id). `page` is only used by clients that
+        do not send a cursor yet.
+        
+        `total` is the user's session count. It is returned with page-number
+        requests only; on cursor pages the count would cover just the rows
+        after the cursor, so it is None there and clients keep the first one.
+        """
         try:
             # Build query
             query = self.supabase.table("chat_sessions")\
-                .select("*", count="exact")\
+                .select("*", count=None if cursor else "exact")\
                 .eq("user_id", str(user_id))
             
             if not include_archived:
                 query = query.eq("is_archived", False)
             
-            # Add pagination
-            offset = (page - 1) * page_size
+            offset = 0
+            if cursor:
+                last_message_at, last_id = self._decode_cursor(cursor)
+                query = query.or_(
+                    f'last_message_at.lt."{last_message_at}",'
+                    f'and(last_message_at.eq."{last_message_at}",id.lt.{last_id})'
+                )
+            else:
+                offset = (page - 1) * page_size
+            
+            # Fetch one extra row to know whether another page exists
             query = query.order("last_message_at", desc=True)\
-                .range(offset, offset + page_size - 1)
+                .order("id", desc=True)\
+                .range(offset, offset + page_size)
             
             response = query.execute()
+            rows = response.data[:page_size]
+            has_more = len(response.data) > page_size
             
-            # Get last message preview for each session
-            sessions = []
-            for session_data in response.data:
-                session = ChatSessionDB(**session_data)
-                
-                # Get last message as preview
-                preview = await self._get_last_message_preview(session.id)
-                
-                sessions.append(
-                    ChatSessionResponse.from_db(session, preview=preview)
+            sessions = [
+                ChatSessionResponse.from_db(
+                    ChatSessionDB(**session_data),
+                    preview=session_data.get("last_message_preview")
                 )
+                for session_data in rows
+            ]
             
-            total = response.count or 0
-            has_more = (offset + page_size) < total
+            next_cursor = None
+            if has_more and rows:
+                next_cursor = self._encode_cursor(rows[-1]["last_message_at"], rows[-1]["id"])
             
             return SessionListResponse(
                 sessions=sessions,
-                total=total,
+                total=None if cursor else (response.count or 0),
                 page=page,
                 page_size=page_size,
-                has_more=has_more
+                has_more=has_more,
+                next_cursor=next_cursor
             )
             
         except Exception as e:
@@ -205,6 +232,8 @@ class ChatHistoryService:
                 .eq("id", str(session_id))\
                 .execute()
             
+            get_conversation_cache().invalidate(session_id)
+
             # Verify deletion was successful
             if response.data is not None:
                 logger.info(f"Successfully deleted session {session_id} and all related messages")
@@ -296,6 +325,72 @@ class ChatHistoryService:
             metadata=metadata
         )
     
+    # ========================================================================
+    # Write-Behind (chatbot hot path)
+    # ========================================================================
+    
+    async def session_exists(self, session_id: UUID) -> bool:
+        """Check a session exists, answering from memory when possible"""
+        if get_conversation_cache().contains(session_id):
+            return True
+        if get_chat_write_queue().has_pending_session(session_id):
+            return True
+        return await self.get_session(session_id) is not None
+    
+    async def create_session_deferred(
+        self,
+        user_id: Optional[UUID] = None,
+        title: str = "New Conversation",
+        language: str = "en"
+    ) -> str:
+        """
+        Create a session with a client-side id and queue the insert.
+        Falls back to a direct insert when the write-behind queue is not running.
+        """
+        write_queue = get_chat_write_queue()
+        if not write_queue.running:
+            session = await self.create_session(user_id=user_id, title=title, language=language)
+            return str(session.id)
+        
+        session_id = await write_queue.enqueue_session(
+            user_id=str(user_id) if user_id else None,
+            title=title,
+            language=language
+        )
+        logger.info(f"Queued session {session_id} for user {user_id}")
+        return session_id
+    
+    async def add_message_deferred(
+        self,
+        session_id: UUID,
+        user_id: UUID,
+        role: str,
+        content: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Add a message with a client-side id and queue the insert.
+        Falls back to a direct insert when the write-behind queue is not running.
+        """
+        write_queue = get_chat_write_queue()
+        if not write_queue.running:
+            message = await self.add_message(
+                session_id=session_id,
+                user_id=user_id,
+                role=role,
+                content=content,
+                metadata=metadata
+            )
+            return str(message.id)
+        
+        return await write_queue.enqueue_message(
+            session_id=str(session_id),
+            role=role,
+            content=content,
+            user_id=str(user_id) if user_id else None,
+            metadata=metadata
+        )
+    
     async def get_session_messages(
         self,
         session_id: UUID,
@@ -321,7 +416,30 @@ class ChatHistoryService:
         except Exception as e:
             logger.error(f"Error getting messages for session {session_id}: {str(e)}")
             return []
-    
+
+    async def get_recent_messages(
+        self,
+        session_id: UUID,
+        limit: int
+    ) -> List[ChatMessageDB]:
+        """Get the most recent messages in a session, oldest first"""
+        try:
+            response = self.supabase.table("chat_messages")\
+                .select("*")\
+                .eq("session_id", str(session_id))\
+                .order("created_at", desc=True)\
+                .limit(limit)\
+                .execute()
+
+            messages = [ChatMessageDB(**msg) for msg in reversed(response.data)]
+            logger.info(f"Retrieved {len(messages)} recent messages from session {session_id}")
+
+            return messages
+
+        except Exception as e:
+            logger.error(f"Error getting recent messages for session {session_id}: {str(e)}")
+            raise
+
     async def get_session_with_messages(
         self,
         session_id: UUID,
@@ -354,14 +472,27 @@ class ChatHistoryService:
     # Statistics & Analytics
     # ========================================================================
     
-    async def get_session_statistics(self, session_id: UUID) -> Optional[SessionStatistics]:
-        """Get statistics for a session"""
+    async def get_session_statistics(
+        self,
+        session_id: UUID,
+        user_id: Optional[UUID] = None
+    ) -> Optional[SessionStatistics]:
+        """
+        Get statistics for a session
+        
+        Reads the trigger-maintained chat_session_stats row
+        (see migrations/012_chat_statistics_counters.sql).
+        When user_id is given, sessions owned by other users are not returned.
+        """
         try:
-            # Use the view created in migration
-            response = self.supabase.table("v_session_statistics")\
+            query = self.supabase.table("chat_session_stats")\
                 .select("*")\
-                .eq("session_id", str(session_id))\
-                .execute()
+                .eq("session_id", str(session_id))
+            
+            if user_id:
+                query = query.eq("user_id", str(user_id))
+            
+            response = query.limit(1).execute()
             
             if not response.data:
                 return None
@@ -371,7 +502,7 @@ class ChatHistoryService:
                 session_id=str(data["session_id"]),
                 message_count=data["message_count"],
                 total_tokens=data["total_tokens"] or 0,
-                avg_response_time_ms=data["avg_response_time_ms"] or 0.0,
+                avg_response_time_ms=self._average(data["response_time_sum_ms"], data["response_time_count"]),
                 created_at=data["created_at"],
                 last_message_at=data["last_message_at"]
             )
@@ -381,46 +512,38 @@ class ChatHistoryService:
             return None
     
     async def get_user_statistics(self, user_id: UUID) -> Optional[UserChatStatistics]:
-        """Get overall chat statistics for a user"""
+        """
+        Get overall chat statistics for a user
+        
+        Reads the trigger-maintained chat_user_stats row instead of downloading
+        every session and message of the user.
+        """
         try:
-            # Get session counts
-            sessions_response = self.supabase.table("chat_sessions")\
-                .select("id, is_archived, language", count="exact")\
-                .eq("user_id", str(user_id))\
-                .execute()
-            
-            total_sessions = sessions_response.count or 0
-            active_sessions = sum(1 for s in sessions_response.data if not s["is_archived"])
-            archived_sessions = total_sessions - active_sessions
-            
-            # Get language distribution
-            language_counts = {}
-            for session in sessions_response.data:
-                lang = session["language"]
-                language_counts[lang] = language_counts.get(lang, 0) + 1
-            
-            most_used_language = max(language_counts, key=language_counts.get) if language_counts else "en"
-            
-            # Get message statistics
-            messages_response = self.supabase.table("chat_messages")\
-                .select("tokens_used, response_time_ms", count="exact")\
+            response = self.supabase.table("chat_user_stats")\
+                .select("*")\
                 .eq("user_id", str(user_id))\
+                .limit(1)\
                 .execute()
             
-            total_messages = messages_response.count or 0
+            # Users who never chatted have no counter row yet
+            data = response.data[0] if response.data else {}
             
-            # Calculate averages
-            total_tokens = sum(m.get("tokens_used", 0) or 0 for m in messages_response.data)
-            response_times = [m.get("response_time_ms") for m in messages_response.data if m.get("response_time_ms")]
-            avg_response_time = sum(response_times) / len(response_times) if response_times else 0.0
+            total_sessions = data.get("total_sessions", 0)
+            archived_sessions = data.get("archived_sessions", 0)
+            sessions_en = data.get("sessions_en", 0)
+            sessions_fil = data.get("sessions_fil", 0)
+            most_used_language = "fil" if sessions_fil > sessions_en else "en"
             
             return UserChatStatistics(
                 total_sessions=total_sessions,
-                total_messages=total_messages,
-                total_tokens=total_tokens,
-                avg_response_time_ms=avg_response_time,
+                total_messages=data.get("total_messages", 0),
+                total_tokens=data.get("total_tokens", 0),
+                avg_response_time_ms=self._average(
+                    data.get("response_time_sum_ms", 0),
+                    data.get("response_time_count", 0)
+                ),
                 most_used_language=most_used_language,
-                active_sessions=active_sessions,
+                active_sessions=total_sessions - archived_sessions,
                 archived_sessions=archived_sessions
             )
             
@@ -428,58 +551,80 @@ class ChatHistoryService:
             logger.error(f"Error getting user statistics: {str(e)}")
             return None
     
+    def backfill_statistics(self, user_id: Optional[UUID] = None) -> int:
+        """Recompute statistics counters from the base tables (all users, or one user)"""
+        response = self.supabase.rpc(
+            "backfill_chat_stats",
+            {"p_user_id": str(user_id) if user_id else None}
+        ).execute()
+        return response.data or 0
+    
+    def check_statistics_consistency(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """List users whose statistics counters differ from the base tables"""
+        response = self.supabase.rpc(
+            "check_chat_stats_consistency",
+            {"p_limit": limit}
+        ).execute()
+        return response.data or []
+    
     # ========================================================================
     # Helper Methods
     # ========================================================================
     
-    async def _get_last_message_preview(self, session_id: UUID) -> Optional[str]:
-        """Get preview of last message in session"""
+    @staticmethod
+    def _average(total: Optional[int], count: Optional[int]) -> float:
+        """Average from a sum/count counter pair"""
+        return float(total) / count if count else 0.0
+    
+    @staticmethod
+    def _encode_cursor(last_message_at: str, session_id: str) -> str:
+        """Opaque keyset cursor for session listing"""
+        raw = json.dumps([last_message_at, str(session_id)])
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+    
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[str, str]:
+        """Decode a cursor from _encode_cursor; raises ValueError if malformed"""
         try:
-            response = self.supabase.table("chat_messages")\
-                .select("content")\
-                .eq("session_id", str(session_id))\
-                .order("created_at", desc=True)\
-                .limit(1)\
-                .execute()
-            
-            if response.data:
-                content = response.data[0]["content"]
-                return content[:100] + "..." if len(content) > 100 else content
-            
-            return None
-            
-        except Exception as e:
-            logger.error(f"Error getting last message preview: {str(e)}")
-            return None
+            last_message_at, session_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            # Validate both parts before they are placed in a filter
+            datetime.fromisoformat(str(last_message_at).replace("Z", "+00:00"))
+            return last_message_at, str(UUID(session_id))
+        except Exception:
+            raise ValueError("Invalid cursor")
     
     async def search_messages(
         self,
         user_id: UUID,
         query: str,
-        limit: int = 20
-    ) -> List[Tuple[ChatSessionDB, ChatMessageDB]]:
-        """Search messages by content (requires full-text search setup)"""
+        limit: int = 20,
+        offset: int = 0
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Search a user's messages with the indexed full-text search RPC
+        (see migrations/013_chat_messages_full_text_search.sql).
+        
+        Returns (results, total) where results are ranked best-first and carry a
+        highlighted HTML snippet: content escaped, matches wrapped in <mark> tags.
+        """
         try:
-            # Basic text search using ILIKE
-            # For production, consider using PostgreSQL full-text search
-            response = self.supabase.table("chat_messages")\
-                .select("*, chat_sessions!inner(*)")\
-                .eq("user_id", str(user_id))\
-                .ilike("content", f"%{query}%")\
-                .limit(limit)\
-                .execute()
-            
-            results = []
-            for item in response.data:
-                message = ChatMessageDB(**item)
-                session = ChatSessionDB(**item["chat_sessions"])
-                results.append((session, message))
-            
-            return results
+            response = self.supabase.rpc(
+                "search_chat_messages",
+                {
+                    "p_user_id": str(user_id),
+                    "p_query": query,
+                    "p_limit": limit,
+                    "p_offset": offset
+                }
+            ).execute()
+            
+            rows = response.data or []
+            total = rows[0]["total_count"] if rows else 0
+            return rows, total
             
         except Exception as e:
             logger.error(f"Error searching messages: {str(e)}")
-            return []
+            return [], 0
 
 
 # Singleton instance
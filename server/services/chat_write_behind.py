@@ -0,0 +1,489 @@
+"""
+Chat Write-Behind Queue for AI.ttorney
+Batches chat session and message inserts off the request path
+
+save_chat_interaction used to create the session and insert both messages with
+blocking supabase-py calls before the chatbot response was returned. Rows are
+now given client-side UUIDs and queued here; a background task flushes them as
+bulk upserts every FLUSH_INTERVAL_SECONDS or as soon as BATCH_SIZE rows are
+waiting.
+
+Guarantees:
+- Every queued row is appended to a local JSONL journal before enqueue returns,
+  and the journal is replayed on startup, so a crash does not lose messages.
+  Each worker process has its own journal (JOURNAL_PATH plus the pid), held
+  with a lock file while the process runs; on startup a worker also takes
+  over the journals of workers that are no longer running
+- Upserts are keyed on the client-side id, so replaying a row twice is harmless
+- When MAX_PENDING rows are waiting (e.g. the database is down), enqueue waits
+  for a flush instead of growing memory without limit
+- A row the database rejects (constraint or data error, e.g. its session was
+  deleted) is found by splitting the batch, appended to DEAD_LETTER_PATH and
+  dropped; only network and server errors are retried
+"""
+
+import asyncio
+import glob
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from dotenv import load_dotenv
+from supabase import create_client, Client
+
+try:
+    import fcntl
+except ImportError:  # Windows: no journal takeover between processes
+    fcntl = None
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+# Configuration
+FLUSH_INTERVAL_SECONDS = 0.3  # Flush at least this often while rows are pending
+BATCH_SIZE = 50  # Flush immediately once this many rows are pending
+MAX_PENDING = 1000  # Backpressure threshold
+MAX_FLUSH_RETRY_DELAY_SECONDS = 10.0  # Cap for the retry backoff after failed flushes
+JOURNAL_PATH = os.getenv(
+    "CHAT_WRITE_JOURNAL",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "chat_write_journal.jsonl")
+)
+DEAD_LETTER_PATH = os.getenv(
+    "CHAT_WRITE_DEAD_LETTER",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "chat_write_dead_letter.jsonl")
+)
+# Postgres error classes that reject the row itself (22 data exception, 23
+# integrity constraint violation); retrying such a row can never succeed
+REJECTED_ROW_ERROR_CLASSES = ("22", "23")
+
+
+def _is_rejected_row(error: Exception) -> bool:
+    """True if a PostgREST error is caused by the rows sent, not the network or server"""
+    code = getattr(error, "code", None)
+    return isinstance(code, str) and code.startswith(REJECTED_ROW_ERROR_CLASSES)
+
+
+class ChatWriteBehindQueue:
+    """Queue that persists chat sessions and messages in batches"""
+
+    def __init__(self, supabase: Client, journal_path: str = JOURNAL_PATH, dead_letter_path: str = DEAD_LETTER_PATH):
+        self.supabase = supabase
+        self.dead_letter_path = dead_letter_path
+        # Per-process journal, so workers never replace each other's rows
+        self.journal_base = journal_path
+        self.journal_path = f"{journal_path}.{os.getpid()}"
+        self._journal_lock_file = None
+
+        self._sessions: Dict[str, Dict[str, Any]] = {}
+        self._messages: List[Dict[str, Any]] = []
+        self._bumped_sessions: Dict[str, str] = {}  # session_id -> updated_at
+
+        self._journal_lock = threading.Lock()
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._drained: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._retry_delay = FLUSH_INTERVAL_SECONDS
+
+        self.flushed_rows = 0
+        self.failed_flushes = 0
+        self.dead_lettered_rows = 0
+
+    # ========================================================================
+    # Lifecycle
+    # ========================================================================
+
+    async def start(self):
+        """Replay the journal and start the background flusher"""
+        if self._task is not None:
+            return
+
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._drained = asyncio.Event()
+        self._drained.set()
+
+        self._lock_journal()
+        replayed = self._replay_journal(self.journal_path)
+        replayed += self._adopt_orphaned_journals()
+        if replayed:
+            logger.warning(f"Replaying {replayed} journaled chat rows from a previous run")
+            self._wakeup.set()
+
+        self._task = asyncio.create_task(self._run())
+        logger.info("Chat write-behind queue started")
+
+    async def stop(self):
+        """Stop the flusher after writing everything that is still pending"""
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        await self.flush()
+        self._unlock_journal()
+        logger.info("Chat write-behind queue stopped")
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    @property
+    def pending(self) -> int:
+        return len(self._sessions) + len(self._messages)
+
+    # ========================================================================
+    # Enqueue
+    # ========================================================================
+
+    def has_pending_session(self, session_id: str) -> bool:
+        """True if the session was created but not written to the database yet"""
+        return str(session_id) in self._sessions
+
+    async def enqueue_session(
+        self,
+        user_id: Optional[str],
+        title: str,
+        language: str
+    ) -> str:
+        """Queue a new chat session and return its client-side id"""
+        await self._wait_for_capacity()
+
+        now = datetime.utcnow().isoformat()
+        row = {
+            "id": str(uuid4()),
+            "title": title,
+            "language": language,
+            "created_at": now,
+            "updated_at": now,
+            "last_message_at": now
+        }
+        if user_id:
+            row["user_id"] = str(user_id)
+
+        # Added before the journal write, so a flush that rewrites the journal
+        # meanwhile keeps the row
+        self._sessions[row["id"]] = row
+        await asyncio.to_thread(self._journal, "session", row)
+        self._signal()
+        return row["id"]
+
+    async def enqueue_message(
+        self,
+        session_id: str,
+        role: str,
+        content: str,
+        user_id: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Queue a chat message and return its client-side id"""
+        await self._wait_for_capacity()
+
+        row = {
+            "id": str(uuid4()),
+            "session_id": str(session_id),
+            "role": role,
+            "content": content,
+            "metadata": metadata or {},
+            "created_at": datetime.utcnow().isoformat()
+        }
+        if user_id:
+            row["user_id"] = str(user_id)
+
+        self._messages.append(row)
+        self._bumped_sessions[row["session_id"]] = row["created_at"]
+        await asyncio.to_thread(self._journal, "message", row)
+        self._signal()
+        return row["id"]
+
+    # ========================================================================
+    # Flushing
+    # ========================================================================
+
+    async def flush(self) -> bool:
+        """Write all pending rows to the database. Returns True on success."""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+
+        async with self._flush_lock:
+            if not self._sessions and not self._messages:
+                return True
+
+            sessions = list(self._sessions.values())
+            messages = list(self._messages)
+            bumps = dict(self._bumped_sessions)
+            rejected: List[Tuple[str, Dict[str, Any], str]] = []
+
+            try:
+                # supabase-py is blocking; keep it off the event loop
+                await asyncio.to_thread(self._write_batch, sessions, messages, bumps, rejected)
+            except Exception as e:
+                self.failed_flushes += 1
+                logger.error(f"Chat write-behind flush failed ({len(sessions) + len(messages)} rows kept): {e}")
+                if rejected:
+                    # Rows already found bad are not retried with the rest
+                    await self._drop_rejected(rejected)
+                return False
+
+            for session in sessions:
+                self._sessions.pop(session["id"], None)
+            del self._messages[:len(messages)]
+            for session_id, updated_at in bumps.items():
+                if self._bumped_sessions.get(session_id) == updated_at:
+                    del self._bumped_sessions[session_id]
+
+            self.flushed_rows += len(sessions) + len(messages) - len(rejected)
+            if rejected:
+                await asyncio.to_thread(self._dead_letter, rejected)
+                self.dead_lettered_rows += len(rejected)
+            await self._save_journal()
+            if self._drained is not None and self.pending < MAX_PENDING:
+                self._drained.set()
+            return True
+
+    def _write_batch(
+        self,
+        sessions: List[Dict[str, Any]],
+        messages: List[Dict[str, Any]],
+        bumps: Dict[str, str],
+        rejected: List[Tuple[str, Dict[str, Any], str]]
+    ):
+        """Write one batch; rows the database rejects are appended to `rejected` as (kind, row, error)"""
+        # Sessions first so message foreign keys resolve
+        self._upsert("session", "chat_sessions", sessions, rejected)
+        self._upsert("message", "chat_messages", messages, rejected)
+
+        # One call for every session touched in this batch, each with the time
+        # of its own newest message (database migration 020)
+        if bumps:
+            self.supabase.rpc(
+                "bump_chat_sessions",
+                {"p_bumps": [{"id": session_id, "at": at} for session_id, at in bumps.items()]}
+            ).execute()
+
+        logger.info(f"Flushed {len(sessions)} sessions and {len(messages)} messages")
+
+    def _upsert(
+        self,
+        kind: str,
+        table: str,
+        rows: List[Dict[str, Any]],
+        rejected: List[Tuple[str, Dict[str, Any], str]]
+    ):
+        """
+        Upsert rows; when the database rejects the batch, split it in half until
+        the offending rows are found. Other errors are raised so the batch is retried.
+        """
+        if not rows:
+            return
+        try:
+            self.supabase.table(table)\
+                .upsert(rows, on_conflict="id", ignore_duplicates=True)\
+                .execute()
+        except Exception as e:
+            if not _is_rejected_row(e):
+                raise
+            if len(rows) == 1:
+                logger.error(f"Chat write-behind: {table} row {rows[0]['id']} rejected: {e}")
+                rejected.append((kind, rows[0], str(e)))
+                return
+            middle = len(rows) // 2
+            self._upsert(kind, table, rows[:middle], rejected)
+            self._upsert(kind, table, rows[middle:], rejected)
+
+    async def _drop_rejected(self, rejected: List[Tuple[str, Dict[str, Any], str]]):
+        """Move rows the database rejected from the pending batch to the dead-letter file"""
+        rejected_ids = {row["id"] for _, row, _ in rejected}
+        for row_id in rejected_ids:
+            self._sessions.pop(row_id, None)
+        self._messages[:] = [m for m in self._messages if m["id"] not in rejected_ids]
+        await asyncio.to_thread(self._dead_letter, rejected)
+        self.dead_lettered_rows += len(rejected)
+        await self._save_journal()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=FLUSH_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            if await self.flush():
+                self._retry_delay = FLUSH_INTERVAL_SECONDS
+            else:
+                await asyncio.sleep(self._retry_delay)
+                self._retry_delay = min(self._retry_delay * 2, MAX_FLUSH_RETRY_DELAY_SECONDS)
+
+    def _signal(self):
+        if self._wakeup is not None and self.pending >= BATCH_SIZE:
+            self._wakeup.set()
+        if self._drained is not None and self.pending >= MAX_PENDING:
+            self._drained.clear()
+
+    async def _wait_for_capacity(self):
+        if self.pending < MAX_PENDING:
+            return
+        if self._task is None or self._drained is None:
+            # No background flusher (scripts/tests): flush inline
+            await self.flush()
+            return
+        logger.warning(f"Chat write-behind queue full ({self.pending} rows), waiting for flush")
+        self._wakeup.set()
+        await self._drained.wait()
+
+    # ========================================================================
+    # Journal
+    # ========================================================================
+
+    # The journal methods do blocking file I/O; request paths call them through
+    # asyncio.to_thread
+
+    def _journal(self, kind: str, row: Dict[str, Any]):
+        line = json.dumps({"kind": kind, "row": row}, ensure_ascii=False)
+        with self._journal_lock:
+            os.makedirs(os.path.dirname(self.journal_path), exist_ok=True)
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _pending_lines(self) -> List[str]:
+        lines = [json.dumps({"kind": "session", "row": row}, ensure_ascii=False) for row in self._sessions.values()]
+        lines.extend(json.dumps({"kind": "message", "row": row}, ensure_ascii=False) for row in self._messages)
+        return lines
+
+    async def _save_journal(self):
+        # Lines are taken on the event loop, where the pending rows change
+        await asyncio.to_thread(self._rewrite_journal, self._pending_lines())
+
+    def _rewrite_journal(self, lines: Optional[List[str]] = None):
+        """Replace the journal with only the rows that are still pending"""
+        if lines is None:
+            lines = self._pending_lines()
+        tmp_path = f"{self.journal_path}.tmp"
+        with self._journal_lock:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for line in lines:
+                    f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.journal_path)
+
+    def _dead_letter(self, rejected: List[Tuple[str, Dict[str, Any], str]]):
+        """Append rows the database rejected, with the error, for manual repair or replay"""
+        os.makedirs(os.path.dirname(self.dead_letter_path), exist_ok=True)
+        with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+            for kind, row, error in rejected:
+                entry = {"kind": kind, "row": row, "error": error, "rejected_at": datetime.utcnow().isoformat()}
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _lock_journal(self):
+        """Hold this process's journal lock until stop(), so no other worker adopts it"""
+        if fcntl is None or self._journal_lock_file is not None:
+            return
+        os.makedirs(os.path.dirname(self.journal_path), exist_ok=True)
+        self._journal_lock_file = open(f"{self.journal_path}.lock", "w")
+        fcntl.flock(self._journal_lock_file, fcntl.LOCK_EX)
+
+    def _unlock_journal(self):
+        if self._journal_lock_file is None:
+            return
+        lock_path = self._journal_lock_file.name
+        if self.pending == 0:
+            try:
+                os.remove(lock_path)
+            except OSError:
+                pass
+        fcntl.flock(self._journal_lock_file, fcntl.LOCK_UN)
+        self._journal_lock_file.close()
+        self._journal_lock_file = None
+
+    def _adopt_orphaned_journals(self) -> int:
+        """
+        Take over the journals of worker processes that are no longer running
+        (their lock file is free), including the pre-per-process journal file.
+        Adopted rows are written to this process's journal before the
+        orphaned file is removed.
+        """
+        if fcntl is None:
+            return 0
+
+        adopted = 0
+        for path in glob.glob(f"{glob.escape(self.journal_base)}*"):
+            if path == self.journal_path or path.endswith((".lock", ".tmp")):
+                continue
+            with open(f"{path}.lock", "w") as lock_file:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue  # Its worker is still running
+                rows = self._replay_journal(path)
+                if rows:
+                    self._rewrite_journal()
+                for leftover in (path, f"{path}.lock"):
+                    try:
+                        os.remove(leftover)
+                    except FileNotFoundError:
+                        pass  # Another worker adopted it first
+            adopted += rows
+        return adopted
+
+    def _replay_journal(self, path: str) -> int:
+        if not os.path.exists(path):
+            return 0
+
+        replayed = 0
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line from a crash mid-write
+                    continue
+                row = entry.get("row") or {}
+                if entry.get("kind") == "session":
+                    self._sessions[row["id"]] = row
+                elif entry.get("kind") == "message":
+                    self._messages.append(row)
+                    self._bumped_sessions[row["session_id"]] = row["created_at"]
+                replayed += 1
+        return replayed
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "pending_sessions": len(self._sessions),
+            "pending_messages": len(self._messages),
+            "flushed_rows": self.flushed_rows,
+            "failed_flushes": self.failed_flushes,
+            "dead_lettered_rows": self.dead_lettered_rows
+        }
+
+
+# Singleton instance
+_chat_write_queue: Optional[ChatWriteBehindQueue] = None
+
+
+def get_chat_write_queue() -> ChatWriteBehindQueue:
+    """Get or create ChatWriteBehindQueue singleton"""
+    global _chat_write_queue
+
+    if _chat_write_queue is None:
+        url = os.getenv("SUPABASE_URL")
+        key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+        if not url or not key:
+            raise ValueError("Missing Supabase configuration: SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY are required")
+        _chat_write_queue = ChatWriteBehindQueue(create_client(url, key))
+
+    return _chat_write_queue
@@ -20,6 +20,7 @@ from typing import Dict, Any, Optional
 from datetime import datetime, timedelta, timezone
 import httpx
 from services.supabase_service import SupabaseService
+from services.user_status_service import get_user_status_service, invalidate_user_status
 
 logger = logging.getLogger(__name__)
 
@@ -118,60 +119,20 @@ class ConsultationBanService:
         """
         Check if user is eligible to book new consultations.
         
+        Served from the shared user status cache (services/user_status_service.py);
+        elapsed bans are ignored here and cleared by its sweeper.
+        
         Args:
             user_id: UUID of the user
         
         Returns:
             Dict containing:
                 - can_book: bool (True if user can book)
-                - ban_status: 'none', 'active', or 'expired'
+                - ban_status: 'none', 'active', or 'unknown'
                 - ban_end: when ban expires (if active)
                 - message: reason if cannot book
         """
-        try:
-            # Check for expired bans first
-            await self._check_expired_bans(user_id)
-            
-            user_data = await self._get_user_ban_status(user_id)
-            if not user_data:
-                return {
-                    "can_book": True,
-                    "ban_status": "none",
-                    "ban_end": None,
-                    "message": None
-                }
-            
-            consultation_ban_end = user_data.get("consultation_ban_end")
-            
-            if consultation_ban_end:
-                ban_end_dt = datetime.fromisoformat(consultation_ban_end.replace('Z', '+00:00'))
-                if ban_end_dt.tzinfo is None:
-                    ban_end_dt = ban_end_dt.replace(tzinfo=timezone.utc)
-                if ban_end_dt > datetime.now(timezone.utc):
-                    # Ban is still active
-                    return {
-                        "can_book": False,
-                        "ban_status": "active",
-                        "ban_end": consultation_ban_end,
-                        "message": f"You are temporarily banned from booking consultations until {ban_end_dt.strftime('%Y-%m-%d %H:%M UTC')} due to cancelling accepted consultations."
-                    }
-            
-            return {
-                "can_book": True,
-                "ban_status": "none",
-                "ban_end": None,
-                "message": None
-            }
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to check booking eligibility: {str(e)}")
-            # Fail-closed: disallow booking if we cannot verify eligibility
-            return {
-                "can_book": False,
-                "ban_status": "unknown",
-                "ban_end": None,
-                "message": "Unable to verify booking eligibility at the moment. Please try again later."
-            }
+        return await get_user_status_service().check_booking_eligibility(user_id)
     
     async def lift_ban(self, user_id: str, admin_id: str, reason: str = "Admin override") -> Dict[str, Any]:
         """
@@ -284,6 +245,7 @@ class ConsultationBanService:
                     headers=self.supabase._get_headers(use_service_key=True)
                 )
                 
+                invalidate_user_status(user_id)
                 return response.status_code in [200, 204]
         except Exception as e:
             logger.error(f"❌ Failed to update user ban status: {str(e)}")
@@ -313,28 +275,6 @@ class ConsultationBanService:
             logger.error(f"❌ Failed to record consultation cancellation: {str(e)}")
             return False
     
-    async def _check_expired_bans(self, user_id: str) -> bool:
-        """Check and clear expired consultation bans for a user."""
-        try:
-            user_data = await self._get_user_ban_status(user_id)
-            if not user_data:
-                return False
-            
-            consultation_ban_end = user_data.get("consultation_ban_end")
-            if consultation_ban_end:
-                ban_end_dt = datetime.fromisoformat(consultation_ban_end.replace('Z', '+00:00'))
-                if ban_end_dt.tzinfo is None:
-                    ban_end_dt = ban_end_dt.replace(tzinfo=timezone.utc)
-                if ban_end_dt <= datetime.now(timezone.utc):
-                    # Ban has expired, clear it
-                    logger.info(f"⏰ Clearing expired consultation ban for user {user_id[:8]}...")
-                    await self._update_user_ban_status(user_id, None)
-                    return True
-            return False
-        except Exception as e:
-            logger.error(f"❌ Failed to check expired bans: {str(e)}")
-            return False
-    
     def _generate_ban_message(
         self,
         ban_duration_days: int,
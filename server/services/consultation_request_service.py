@@ -6,6 +6,7 @@ from dotenv import load_dotenv
 import logging
 from datetime import datetime
 from supabase import create_client, Client
+from services.consultation_service import release_slot_reservation
 
 load_dotenv()
 logger = logging.getLogger(__name__)
@@ -146,6 +147,9 @@ class ConsultationRequestService:
                 )
                 
                 if response.status_code in [200, 204]:
+                    # return=representation: the updated rows, with their slot
+                    for row in (response.json() if response.content else []):
+                        release_slot_reservation(row, status)
                     return {"success": True, "message": f"Consultation request {status} successfully"}
                 else:
                     error_data = response.json() if response.content else {}
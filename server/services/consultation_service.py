@@ -8,9 +8,89 @@ from supabase import Client
 from services.notification_service import NotificationService
 import logging
 import re
+import threading
+import time as time_module
 
 logger = logging.getLogger(__name__)
 
+# Statuses that occupy a lawyer's slot (must match uq_consultation_requests_active_slot)
+ACTIVE_BOOKING_STATUSES = ["pending", "accepted"]
+
+# Name of the unique partial index from migrations/015_consultation_active_slot_unique_index.sql
+ACTIVE_SLOT_INDEX = "uq_consultation_requests_active_slot"
+
+
+class SlotReservationTable:
+    """
+    In-process table of slots that are being booked, or were just booked, on this node.
+    
+    A second request for a slot that is already reserved fails immediately
+    instead of racing the first one to the database. Reservations expire after
+    ttl_seconds, so the database unique index stays the source of truth across
+    workers and restarts.
+    """
+    
+    SWEEP_THRESHOLD = 1000  # Purge expired entries once the table grows past this
+    
+    def __init__(self, ttl_seconds: float = 15.0):
+        self.ttl_seconds = ttl_seconds
+        self._slots: Dict[tuple, float] = {}  # slot key -> expiry (monotonic)
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def key(lawyer_id: str, consultation_date: str, consultation_time: str) -> tuple:
+        return (str(lawyer_id), str(consultation_date), str(consultation_time)[:5])
+    
+    def try_reserve(self, key: tuple) -> bool:
+        """Reserve a slot; returns False if it is already reserved"""
+        now = time_module.monotonic()
+        with self._lock:
+            expiry = self._slots.get(key)
+            if expiry is not None and expiry > now:
+                return False
+            self._slots[key] = now + self.ttl_seconds
+            if len(self._slots) > self.SWEEP_THRESHOLD:
+                self._slots = {k: v for k, v in self._slots.items() if v > now}
+            return True
+    
+    def mark_booked(self, key: tuple):
+        """Keep a slot reserved for another ttl after a successful (or conflicting) insert"""
+        with self._lock:
+            self._slots[key] = time_module.monotonic() + self.ttl_seconds
+    
+    def release(self, key: tuple):
+        """Free a slot (failed insert, or booking rejected/cancelled/completed)"""
+        with self._lock:
+            self._slots.pop(key, None)
+
+
+# Shared by every ConsultationService instance in this process
+slot_reservations = SlotReservationTable()
+
+
+def release_slot_reservation(consultation: Dict[str, Any], new_status: str):
+    """
+    Free this node's reservation of a consultation's slot once `new_status`
+    no longer holds it. Every path that changes a consultation's status
+    (service, routers) calls this after a successful update.
+    """
+    if new_status in ACTIVE_BOOKING_STATUSES:
+        return
+    if not all(consultation.get(field) for field in ("lawyer_id", "consultation_date", "consultation_time")):
+        return
+    slot_reservations.release(SlotReservationTable.key(
+        consultation["lawyer_id"], consultation["consultation_date"], consultation["consultation_time"]
+    ))
+
+
+def _is_unique_violation(error: Exception) -> bool:
+    """True if a PostgREST error is a unique violation on the active-slot index"""
+    if getattr(error, "code", None) != "23505":
+        return False
+    # Other unique constraints on consultation_requests are not slot conflicts
+    text = " ".join(str(part) for part in (getattr(error, "message", None), getattr(error, "details", None), error) if part)
+    return ACTIVE_SLOT_INDEX in text
+
 
 class ConsultationError(Exception):
     """Base exception for consultation errors"""
@@ -80,6 +160,9 @@ class ConsultationService:
         Check if lawyer already has a booking at this date/time.
         lawyer_id here is lawyer_info.id (the lawyer profile ID)
         
+        Advisory only (e.g. for UI hints). Booking itself relies on the
+        uq_consultation_requests_active_slot index, see create_consultation_request.
+        
         Returns:
             True if conflict exists, False otherwise
         """
@@ -89,13 +172,14 @@ class ConsultationService:
                 .eq("lawyer_id", lawyer_id)\
                 .eq("consultation_date", consultation_date)\
                 .eq("consultation_time", consultation_time)\
-                .in_("status", ["pending", "accepted"])\
+                .in_("status", ACTIVE_BOOKING_STATUSES)\
+                .limit(1)\
                 .execute()
             
             return len(result.data) > 0 if result.data else False
         except Exception as e:
             logger.error(f"Error checking booking conflict: {e}")
-            return False  # Fail open - allow booking if check fails
+            return False
     
     def _validate_time_format(self, time_str: str) -> bool:
         """Validate time is in HH:MM format (24-hour)"""
@@ -148,8 +232,13 @@ class ConsultationService:
         - Time format is valid (HH:MM, 24-hour)
         - Time is within business hours (8 AM - 8 PM)
         - Lawyer exists and is accepting consultations
-        - No booking conflict exists (same lawyer, date, time)
         - User doesn't have duplicate pending consultation with same lawyer
+        - No booking conflict exists (same lawyer, date, time)
+        
+        Conflicts are detected atomically: the insert is attempted directly and
+        a unique violation on uq_consultation_requests_active_slot becomes
+        BookingConflictError. Concurrent requests for the same slot on this
+        node are rejected by the in-process slot reservation table first.
         
         Returns:
             Dict with success status and data/error
@@ -200,15 +289,12 @@ class ConsultationService:
             if has_duplicate:
                 raise DuplicatePendingError(lawyer_name)
             
-            # 6. Check for booking conflict (overlapping time slots)
-            has_conflict = await self.check_booking_conflict(
-                lawyer_id, consultation_date, consultation_time
-            )
-            
-            if has_conflict:
+            # 6. Reserve the slot on this node (concurrent requests fail fast)
+            slot_key = SlotReservationTable.key(lawyer_id, consultation_date, consultation_time)
+            if not slot_reservations.try_reserve(slot_key):
                 raise BookingConflictError(lawyer_name, consultation_time)
             
-            # 7. Create consultation request
+            # 7. Create consultation request (the unique index rejects double-bookings)
             consultation_data = {
                 "user_id": user_id,
                 "lawyer_id": lawyer_id,
@@ -224,13 +310,22 @@ class ConsultationService:
             
             logger.info(f"💾 Inserting consultation: user_id={user_id}, lawyer_id={lawyer_id}")
             
-            result = self.supabase.table("consultation_requests")\
-                .insert(consultation_data)\
-                .execute()
+            try:
+                result = self.supabase.table("consultation_requests")\
+                    .insert(consultation_data)\
+                    .execute()
+            except Exception as insert_error:
+                if _is_unique_violation(insert_error):
+                    # Taken by another node; keep it reserved so retries fail fast
+                    slot_reservations.mark_booked(slot_key)
+                    raise BookingConflictError(lawyer_name, consultation_time)
+                slot_reservations.release(slot_key)
+                raise
             
             logger.info(f"📊 Insert result: {result.data if result.data else 'No data'}")
             
             if result.data:
+                slot_reservations.mark_booked(slot_key)
                 consultation_id = result.data[0]['id']
                 logger.info(f"Consultation created: {consultation_id} for lawyer {lawyer_id}")
                 
@@ -248,6 +343,7 @@ class ConsultationService:
                     "data": result.data[0]
                 }
             else:
+                slot_reservations.release(slot_key)
                 raise ConsultationError(
                     "Failed to create consultation request",
                     "CREATE_FAILED",
@@ -477,6 +573,8 @@ class ConsultationService:
             
             logger.info(f"Consultation {consultation_id} status updated to {new_status}")
             
+            release_slot_reservation(consultation.data[0], new_status)
+            
             return {
                 "success": True,
                 "message": f"Consultation {new_status} successfully"
@@ -0,0 +1,275 @@
+"""
+Conversation Cache for AI.ttorney
+Per-session ring buffer of recent chat turns with a rolling summary of older turns
+
+The chatbot used to refetch the last N messages from chat_messages on every turn
+(twice when the user referenced an earlier answer). This cache keeps the recent
+turns of each active session in memory:
+- save_chat_interaction appends new turns as they are written
+- a session that is not cached is hydrated from the database once, on first read
+- turns that fall out of the ring are folded into a short, token-budgeted summary
+  so long sessions keep their context without growing the prompt
+"""
+
+import logging
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional
+from uuid import UUID
+
+from cachetools import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+RING_SIZE = 24  # Recent messages kept verbatim per session (12 exchanges)
+OPENING_SIZE = 8  # First messages of a session kept for "what did we talk about" answers
+SUMMARY_TOKEN_BUDGET = 400  # Max estimated tokens for the rolling summary
+SUMMARY_LINE_CHARS = 160  # Each evicted turn is condensed to at most this many characters
+MAX_SESSIONS = 2000  # Sessions kept in memory
+SESSION_TTL_SECONDS = 3600  # Idle sessions are dropped after 1 hour
+CHARS_PER_TOKEN = 4  # Rough token estimate used for budgeting
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token for English/Tagalog text)"""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+class CachedTurn:
+    """A single chat message held in the cache"""
+
+    __slots__ = ("role", "content")
+
+    def __init__(self, role: str, content: str):
+        self.role = role
+        self.content = content
+
+
+class _SessionBuffer:
+    """Recent turns, opening turns and rolling summary for one session"""
+
+    def __init__(self, complete: bool):
+        self.recent: Deque[CachedTurn] = deque()
+        # Opening turns are only trustworthy when the buffer saw the session from the start
+        self.opening: Optional[List[CachedTurn]] = [] if complete else None
+        self.summary_lines: Deque[str] = deque()
+        self.summary_tokens = 0
+
+    def append(self, turn: CachedTurn):
+        if self.opening is not None and len(self.opening) < OPENING_SIZE:
+            self.opening.append(turn)
+
+        self.recent.append(turn)
+        while len(self.recent) > RING_SIZE:
+            self._fold_into_summary(self.recent.popleft())
+
+    def _fold_into_summary(self, turn: CachedTurn):
+        """Condense an evicted turn into one summary line, keeping the summary within budget"""
+        line = _summary_line(turn)
+        self.summary_lines.append(line)
+        self.summary_tokens += estimate_tokens(line)
+
+        # Oldest lines go first once the budget is exceeded
+        while self.summary_tokens > SUMMARY_TOKEN_BUDGET and len(self.summary_lines) > 1:
+            dropped = self.summary_lines.popleft()
+            self.summary_tokens -= estimate_tokens(dropped)
+
+    def summary(self, extra: Optional[List[CachedTurn]] = None) -> str:
+        """
+        The rolling summary, followed by `extra` turns (recent turns a caller
+        leaves out of its history window), oldest lines dropped to stay
+        within budget
+        """
+        if not extra:
+            return "\n".join(self.summary_lines)
+
+        lines = list(self.summary_lines) + [_summary_line(turn) for turn in extra]
+        tokens = sum(estimate_tokens(line) for line in lines)
+        start = 0
+        while tokens > SUMMARY_TOKEN_BUDGET and len(lines) - start > 1:
+            tokens -= estimate_tokens(lines[start])
+            start += 1
+        return "\n".join(lines[start:])
+
+
+def _summary_line(turn: CachedTurn) -> str:
+    """One condensed summary line for a turn"""
+    text = " ".join(turn.content.split())
+    if len(text) > SUMMARY_LINE_CHARS:
+        text = text[:SUMMARY_LINE_CHARS].rsplit(" ", 1)[0] + "..."
+
+    speaker = "User" if turn.role == "user" else "Assistant"
+    return f"- {speaker}: {text}"
+
+
+class ConversationCache:
+    """In-memory cache of recent conversation turns per chat session"""
+
+    def __init__(self, max_sessions: int = MAX_SESSIONS, ttl: int = SESSION_TTL_SECONDS):
+        self._sessions: TTLCache = TTLCache(maxsize=max_sessions, ttl=ttl)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # ========================================================================
+    # Writes
+    # ========================================================================
+
+    def start_session(self, session_id: str):
+        """Register a brand-new session so its turns are cached from the first message"""
+        with self._lock:
+            self._sessions[str(session_id)] = _SessionBuffer(complete=True)
+
+    def append(self, session_id: str, role: str, content: str):
+        """
+        Append a turn to a cached session.
+
+        Sessions that are not cached are left alone; they will be hydrated from the
+        database (including this turn) on the next read.
+        """
+        key = str(session_id)
+        with self._lock:
+            buffer = self._sessions.get(key)
+            if buffer is None:
+                return
+            buffer.append(CachedTurn(role, content))
+            # Re-assign to refresh the TTL on activity
+            self._sessions[key] = buffer
+
+    def invalidate(self, session_id: str):
+        """Drop a session (e.g. after it was deleted or archived)"""
+        with self._lock:
+            self._sessions.pop(str(session_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+
+    # ========================================================================
+    # Reads
+    # ========================================================================
+
+    async def get_turns(self, chat_service, session_id: str) -> List[CachedTurn]:
+        """Get the recent turns of a session, hydrating from the database on a miss"""
+        buffer = await self._get_buffer(chat_service, session_id)
+        if buffer is None:
+            return []
+        with self._lock:
+            return list(buffer.recent)
+
+    async def get_history(
+        self,
+        chat_service,
+        session_id: str,
+        limit: int,
+        max_chars: int = 500
+    ) -> List[Dict[str, str]]:
+        """
+        Get conversation history in OpenAI format.
+
+        Returns at most `limit` recent messages. Older turns (those folded into
+        the rolling summary and cached turns beyond `limit`) are prepended as
+        a single summary system message, so no part of the conversation is
+        left out.
+        """
+        buffer = await self._get_buffer(chat_service, session_id)
+        if buffer is None:
+            return []
+
+        with self._lock:
+            turns = list(buffer.recent)
+            cut = max(len(turns) - limit, 0) if limit else 0
+            recent = turns[cut:]
+            summary = buffer.summary(turns[:cut])
+
+        history = []
+        if summary:
+            history.append({
+                "role": "system",
+                "content": f"Summary of earlier messages in this conversation:\n{summary}"
+            })
+        for turn in recent:
+            history.append({"role": turn.role, "content": turn.content[:max_chars]})
+        return history
+
+    def contains(self, session_id: str) -> bool:
+        """True if the session is cached (and therefore known to exist)"""
+        with self._lock:
+            return str(session_id) in self._sessions
+
+    def peek_opening(self, session_id: str) -> Optional[List[CachedTurn]]:
+        """
+        Get the first turns of a session if they are cached.
+
+        Returns None when the cache did not see the session from its first message,
+        so callers can fall back to the database.
+        """
+        with self._lock:
+            buffer = self._sessions.get(str(session_id))
+            if buffer is None or buffer.opening is None:
+                return None
+            return list(buffer.opening)
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+    # ========================================================================
+    # Helper Methods
+    # ========================================================================
+
+    async def _get_buffer(self, chat_service, session_id: str) -> Optional[_SessionBuffer]:
+        if not session_id:
+            return None
+
+        key = str(session_id)
+        with self._lock:
+            buffer = self._sessions.get(key)
+            if buffer is not None:
+                self.hits += 1
+                return buffer
+            self.misses += 1
+
+        try:
+            messages = await chat_service.get_recent_messages(UUID(key), limit=RING_SIZE)
+        except Exception as e:
+            logger.warning(f"Failed to hydrate conversation cache for session {key}: {e}")
+            return None
+
+        if not messages:
+            # Not cached: the session may not exist, and unknown sessions must not look live
+            return _SessionBuffer(complete=True)
+
+        # Fewer messages than the ring holds means we fetched the whole session
+        buffer = _SessionBuffer(complete=len(messages) < RING_SIZE)
+        for msg in messages:
+            buffer.append(CachedTurn(msg.role, msg.content))
+
+        with self._lock:
+            # Another request may have hydrated or started the session meanwhile
+            existing = self._sessions.get(key)
+            if existing is not None:
+                return existing
+            self._sessions[key] = buffer
+
+        logger.debug(f"Hydrated conversation cache for session {key} with {len(messages)} messages")
+        return buffer
+
+
+# Singleton instance
+_conversation_cache: Optional[ConversationCache] = None
+
+
+def get_conversation_cache() -> ConversationCache:
+    """Get or create ConversationCache singleton"""
+    global _conversation_cache
+
+    if _conversation_cache is None:
+        _conversation_cache = ConversationCache()
+
+    return _conversation_cache
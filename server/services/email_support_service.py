@@ -1,12 +1,16 @@
 import os
+import hashlib
 import logging
-import smtplib
-import ssl
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from typing import Dict, Any
 from datetime import datetime
-import asyncio
+
+from services.mail_queue import (
+    MailQueueFullError,
+    OutboundEmail,
+    PrerenderedTemplate,
+    escape_html,
+    get_mail_queue,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +30,16 @@ class EmailSupportService:
         # Validate configuration
         if not self.smtp_username or not self.smtp_password:
             logger.warning("SMTP credentials not configured. Email support will not work.")
+        
+        # Pre-render templates; sending fills in escaped values
+        self._support_template = PrerenderedTemplate(
+            self._get_support_email_template,
+            "sender_name", "sender_email", "subject", "message", "timestamp"
+        )
+        self._confirmation_template = PrerenderedTemplate(
+            self._get_confirmation_email_template,
+            "sender_name", "subject"
+        )
     
     async def send_support_request(
         self,
@@ -64,28 +78,31 @@ class EmailSupportService:
             # Log support request
             logger.info(f"Processing support request from {sender_name} ({sender_email})")
             
-            # Send email to support team
-            email_response = await self._send_support_email(
-                sender_name,
-                sender_email,
-                subject,
-                message
-            )
+            # Queue the email to the support team and the confirmation to the
+            # user; the same request submitted twice is only sent once
+            request_key = hashlib.sha256(
+                f"{sender_email.lower().strip()}\n{subject}\n{message}".encode()
+            ).hexdigest()
+            queue = get_mail_queue()
+            queued = await queue.enqueue(self._build_support_email(
+                sender_name, sender_email, subject, message, f"support:{request_key}"
+            ))
+            if queued:
+                await queue.enqueue(self._build_confirmation_email(
+                    sender_name, sender_email, subject, f"support:{request_key}:confirmation"
+                ))
             
-            if email_response["success"]:
-                # Send confirmation email to user
-                await self._send_confirmation_email(sender_name, sender_email, subject)
-                
-                return {
-                    "success": True,
-                    "message": "Your support request has been sent successfully. Our team will get back to you soon."
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": email_response.get("error", "Failed to send support request")
-                }
+            return {
+                "success": True,
+                "message": "Your support request has been sent successfully. Our team will get back to you soon."
+            }
                 
+        except MailQueueFullError as e:
+            logger.error(f"Send support request error: {str(e)}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
         except Exception as e:
             logger.error(f"Send support request error: {str(e)}")
             return {
@@ -93,124 +110,66 @@ class EmailSupportService:
                 "error": "An error occurred while sending your request. Please try again later."
             }
     
-    async def _send_support_email(
+    def _build_support_email(
         self,
         sender_name: str,
         sender_email: str,
         subject: str,
-        message: str
-    ) -> Dict[str, Any]:
-        """Send support request email to support team"""
-        try:
-            email_subject = f"[Support Request] {subject}"
-            html_content = self._get_support_email_template(
-                sender_name,
-                sender_email,
-                subject,
-                message
-            )
-            
-            # Create message
-            mime_message = MIMEMultipart("alternative")
-            mime_message["Subject"] = email_subject
-            mime_message["From"] = f"{self.from_name} <{self.support_email}>"
-            mime_message["To"] = self.support_email
-            mime_message["Reply-To"] = sender_email
-            
-            # Add HTML content
-            html_part = MIMEText(html_content, "html")
-            mime_message.attach(html_part)
-            
-            # Send email with SSL context that handles certificate issues
-            context = ssl.create_default_context()
-            # For development/local environments, allow unverified certificates
-            context.check_hostname = False
-            context.verify_mode = ssl.CERT_NONE
-            
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls(context=context)
-                if self.smtp_username and self.smtp_password:
-                    server.login(self.smtp_username, self.smtp_password)
-                text = mime_message.as_string()
-                server.sendmail(self.support_email, [self.support_email], text)
-            
-            logger.info(f"Support request email sent successfully from {sender_email}")
-            
-            return {
-                "success": True,
-                "message": "Support email sent successfully"
-            }
-            
-        except Exception as e:
-            logger.error(f"Send support email error: {str(e)}")
-            return {
-                "success": False,
-                "error": str(e)
-            }
+        message: str,
+        idempotency_key: str
+    ) -> OutboundEmail:
+        """Support request email to support team"""
+        html_content = self._support_template.render(
+            sender_name=escape_html(sender_name),
+            sender_email=escape_html(sender_email),
+            subject=escape_html(subject),
+            message=escape_html(message).replace("\n", "<br>"),
+            timestamp=datetime.now().strftime("%B %d, %Y at %I:%M %p")
+        )
+        return OutboundEmail(
+            to=[self.support_email],
+            subject=f"[Support Request] {subject}",
+            html=html_content,
+            from_email=self.support_email,
+            from_name=self.from_name,
+            reply_to=sender_email,
+            idempotency_key=idempotency_key
+        )
     
-    async def _send_confirmation_email(
+    def _build_confirmation_email(
         self,
         sender_name: str,
         sender_email: str,
-        subject: str
-    ) -> Dict[str, Any]:
-        """Send confirmation email to user"""
-        try:
-            email_subject = "We've Received Your Support Request"
-            html_content = self._get_confirmation_email_template(sender_name, subject)
-            
-            # Create message
-            mime_message = MIMEMultipart("alternative")
-            mime_message["Subject"] = email_subject
-            mime_message["From"] = f"{self.from_name} <{self.support_email}>"
-            mime_message["To"] = sender_email
-            
-            # Add HTML content
-            html_part = MIMEText(html_content, "html")
-            mime_message.attach(html_part)
-            
-            # Send email with SSL context that handles certificate issues
-            context = ssl.create_default_context()
-            # For development/local environments, allow unverified certificates
-            context.check_hostname = False
-            context.verify_mode = ssl.CERT_NONE
-            
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls(context=context)
-                if self.smtp_username and self.smtp_password:
-                    server.login(self.smtp_username, self.smtp_password)
-                text = mime_message.as_string()
-                server.sendmail(self.support_email, [sender_email], text)
-            
-            logger.info(f"Confirmation email sent successfully to {sender_email}")
-            
-            return {
-                "success": True,
-                "message": "Confirmation email sent successfully"
-            }
-            
-        except Exception as e:
-            logger.error(f"Send confirmation email error: {str(e)}")
-            # Don't fail the main request if confirmation fails
-            return {
-                "success": False,
-                "error": str(e)
-            }
+        subject: str,
+        idempotency_key: str
+    ) -> OutboundEmail:
+        """Confirmation email to user"""
+        html_content = self._confirmation_template.render(
+            sender_name=escape_html(sender_name),
+            subject=escape_html(subject)
+        )
+        return OutboundEmail(
+            to=[sender_email],
+            subject="We've Received Your Support Request",
+            html=html_content,
+            from_email=self.support_email,
+            from_name=self.from_name,
+            idempotency_key=idempotency_key
+        )
     
     def _get_support_email_template(
         self,
         sender_name: str,
         sender_email: str,
         subject: str,
-        message: str
+        message: str,
+        timestamp: str
     ) -> str:
-        """HTML template for support request email to support team"""
-        timestamp = datetime.now().strftime("%B %d, %Y at %I:%M %p")
-        
-        sender_name_escaped = sender_name.replace("<", "&lt;").replace(">", "&gt;")
-        sender_email_escaped = sender_email.replace("<", "&lt;").replace(">", "&gt;")
-        subject_escaped = subject.replace("<", "&lt;").replace(">", "&gt;")
-        message_escaped = message.replace("<", "&lt;").replace(">", "&gt;").replace("\n", "<br>")
+        """HTML template for support request email to support team (values already escaped)"""
+        sender_name_escaped = sender_name
+        sender_email_escaped = sender_email
+        subject_escaped = subject
+        message_escaped = message
 
         return f"""
         <!DOCTYPE html>
@@ -279,9 +238,9 @@ class EmailSupportService:
         """
 
     def _get_confirmation_email_template(self, sender_name: str, subject: str) -> str:
-        """HTML template for confirmation email to user"""
-        sender_name_escaped = sender_name.replace("<", "&lt;").replace(">", "&gt;")
-        subject_escaped = subject.replace("<", "&lt;").replace(">", "&gt;")
+        """HTML template for confirmation email to user (values already escaped)"""
+        sender_name_escaped = sender_name
+        subject_escaped = subject
         
         return f"""
         <!DOCTYPE html>
@@ -0,0 +1,166 @@
+"""
+Favorites Cache for AI.ttorney
+Per-user sets of favorited glossary terms and bookmarked legal guides
+
+The app used to ask /api/user/favorites/{terms,guides}/check/{id} once per
+visible glossary term or guide card, one database lookup each. This cache
+keeps the IDs a user has favorited (user_glossary_favorites.glossary_id)
+and bookmarked (user_guide_bookmarks.article_id) in memory:
+- a user's set is loaded with one query on first use
+- the add/remove endpoints update the cached set as they write
+- batch checks and the glossary/guide listings are answered from the set
+
+Entries expire after MEMBERSHIP_TTL_SECONDS, which bounds how stale a set
+can be when another server process changed it.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional
+
+import httpx
+from cachetools import TTLCache
+
+from services.supabase_service import SupabaseService
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+MAX_USERS = 5000  # Cached sets per kind
+MEMBERSHIP_TTL_SECONDS = 300  # Sets are reloaded after 5 minutes
+MAX_BATCH_IDS = 200  # IDs accepted by one batch check
+
+# kind -> (table, item column)
+FAVORITE_KINDS = {
+    "terms": ("user_glossary_favorites", "glossary_id"),
+    "guides": ("user_guide_bookmarks", "article_id"),
+}
+
+
+def user_id_from(current_user: Optional[Dict[str, Any]]) -> Optional[str]:
+    """User ID from get_current_user / get_optional_user data"""
+    if not current_user:
+        return None
+    return (current_user.get("user") or {}).get("id") or (current_user.get("profile") or {}).get("id")
+
+
+class FavoritesCache:
+    """In-memory favorite/bookmark membership per user"""
+
+    def __init__(self, max_users: int = MAX_USERS, ttl: int = MEMBERSHIP_TTL_SECONDS):
+        self._sets: Dict[str, TTLCache] = {kind: TTLCache(maxsize=max_users, ttl=ttl) for kind in FAVORITE_KINDS}
+        self._lock = threading.Lock()
+        # Bumped on every write; a load that overlapped a write is not cached
+        self._write_seq = 0
+        self._supabase: Optional[SupabaseService] = None
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+
+    # ============================================
+    # Reads
+    # ============================================
+
+    async def get_ids(self, kind: str, user_id: str) -> FrozenSet[str]:
+        """IDs the user has in `kind` ("terms" or "guides")"""
+        cache = self._sets[kind]
+        key = str(user_id)
+        with self._lock:
+            ids = cache.get(key)
+            if ids is not None:
+                self.hits += 1
+                return ids
+            self.misses += 1
+            write_seq = self._write_seq
+
+        ids = frozenset(await self._fetch(kind, key))
+        with self._lock:
+            if self._write_seq == write_seq:
+                cache[key] = ids
+        return ids
+
+    async def check(self, kind: str, user_id: str, item_ids: Iterable[str]) -> List[str]:
+        """The given IDs that are in the user's set, in request order"""
+        ids = await self.get_ids(kind, user_id)
+        return [item_id for item_id in dict.fromkeys(str(i) for i in item_ids) if item_id in ids]
+
+    async def _fetch(self, kind: str, user_id: str) -> List[str]:
+        """Load one user's set from the database"""
+        table, column = FAVORITE_KINDS[kind]
+        if self._supabase is None:
+            self._supabase = SupabaseService()
+
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            response = await client.get(
+                f"{self._supabase.rest_url}/{table}",
+                params={"user_id": f"eq.{user_id}", "select": column},
+                headers=self._supabase._get_headers()
+            )
+
+        if response.status_code != 200:
+            raise Exception(f"Failed to load {table}: {response.status_code} {response.text}")
+        return [str(row[column]) for row in response.json() if row.get(column) is not None]
+
+    # ============================================
+    # Writes
+    # ============================================
+
+    def _update(self, kind: str, user_id: str, item_id: str, present: bool):
+        key = str(user_id)
+        with self._lock:
+            self._write_seq += 1
+            cache = self._sets[kind]
+            ids = cache.get(key)
+            if ids is None:
+                return  # Loaded fresh on the next read
+            cache[key] = (ids | {str(item_id)}) if present else (ids - {str(item_id)})
+
+    def add(self, kind: str, user_id: str, item_id: str):
+        """Record a favorite/bookmark written by this server"""
+        self._update(kind, user_id, item_id, True)
+
+    def remove(self, kind: str, user_id: str, item_id: str):
+        """Record a removed favorite/bookmark"""
+        self._update(kind, user_id, item_id, False)
+
+    def invalidate(self, kind: str, user_id: str):
+        """Reload the user's set on the next read"""
+        with self._lock:
+            self._write_seq += 1
+            self._sets[kind].pop(str(user_id), None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **{f"cached_{kind}": len(cache) for kind, cache in self._sets.items()},
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+# Singleton instance
+_favorites_cache: Optional[FavoritesCache] = None
+
+
+def get_favorites_cache() -> FavoritesCache:
+    """Get or create FavoritesCache singleton"""
+    global _favorites_cache
+    if _favorites_cache is None:
+        _favorites_cache = FavoritesCache()
+    return _favorites_cache
+
+
+async def get_user_favorites(kind: str, current_user: Optional[Dict[str, Any]]) -> Optional[FrozenSet[str]]:
+    """
+    The signed-in user's set for flagging list responses; None for anonymous
+    requests or when the set cannot be loaded (the listing is still served)
+    """
+    user_id = user_id_from(current_user)
+    if not user_id:
+        return None
+    try:
+        return await get_favorites_cache().get_ids(kind, user_id)
+    except Exception as e:
+        logger.warning(f"Favorite flags unavailable for user {user_id}: {e}")
+        return None
@@ -0,0 +1,266 @@
+"""
+Glossary Index for AI.ttorney
+In-memory index over glossary_terms for glossary browsing and search
+
+The glossary routes used to run a page query plus a count query with an
+ilike filter across four text columns on every request. Terms change
+rarely, so this module keeps the whole glossary per process: a sorted
+prefix index over the English and Filipino terms, substring search over
+terms and definitions, category facets, and every term pre-serialized to
+JSON. Requests are answered without touching the database; the snapshot is
+reloaded when the glossary version stamp (database migration
+018_glossary_version_stamp.sql) changes, see services/versioned_snapshot.py.
+"""
+
+import json
+import logging
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import AbstractSet, Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from services.versioned_snapshot import VersionedSnapshot
+
+logger = logging.getLogger(__name__)
+
+QUERY_CACHE_SIZE = 512  # Recent (search, category) results kept per snapshot
+
+# Columns returned by the listing endpoints, in response order
+TERM_COLUMNS = (
+    "id", "term_en", "term_fil", "definition_en", "definition_fil",
+    "example_en", "example_fil", "category", "created_at",
+)
+
+# Filipino spelling variants treated as the same word ("ng" and "nang" are
+# often used interchangeably in user queries)
+WORD_VARIANTS = {"nang": "ng"}
+
+_JOINERS = re.compile(r"[-'’]")
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+
+# Separates the English and Filipino text of one term, so a match can never
+# span both languages
+_FIELD_SEP = "\t"
+
+
+def normalize(text: Any) -> str:
+    """
+    Fold text for matching: strip accents ("ñ" -> "n"), casefold, join
+    hyphenated Filipino words ("pag-aari" -> "pagaari"), collapse
+    punctuation to single spaces and unify word variants ("nang" -> "ng")
+    """
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", str(text))
+    folded = "".join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold()
+    words = _NON_WORD.sub(" ", _JOINERS.sub("", folded)).split()
+    return " ".join(WORD_VARIANTS.get(word, word) for word in words)
+
+
+class GlossaryIndex(VersionedSnapshot):
+    """Immutable-per-load snapshot of glossary_terms with search indexes"""
+
+    name = "Glossary"
+
+    def __init__(self):
+        super().__init__()
+        self._reset()
+
+        # Stats
+        self.searches = 0
+        self.cache_hits = 0
+
+    def _reset(self):
+        self._rows: List[Dict[str, Any]] = []
+        self._fragments: List[str] = []
+        self._by_id: Dict[str, int] = {}
+        self._by_category: Dict[str, List[int]] = {}
+        self._categories: Dict[str, str] = {}  # folded -> stored value
+        self._term_names: List[Tuple[str, ...]] = []
+        self._prefix_index: List[Tuple[str, int]] = []
+        self._term_texts: List[str] = []
+        self._definition_texts: List[str] = []
+        self._query_cache: "OrderedDict[Tuple[str, str], Tuple[List[int], Dict[str, int]]]" = OrderedDict()
+
+    # ============================================
+    # Loading
+    # ============================================
+
+    def _build(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Index glossary_terms rows"""
+        rows = [row for row in rows if row.get("id") and row.get("term_en")]
+        # Same order as the old "order=term_en.asc", with a stable tie-break
+        rows.sort(key=lambda row: (normalize(row["term_en"]), str(row["id"])))
+
+        self._reset()
+        self._rows = rows
+        self._fragments = [
+            json.dumps({column: row.get(column) for column in TERM_COLUMNS}, separators=(",", ":"), ensure_ascii=False)
+            for row in rows
+        ]
+
+        for idx, row in enumerate(rows):
+            self._by_id[str(row["id"])] = idx
+
+            category = row.get("category")
+            if category:
+                key = str(category).casefold()
+                self._categories.setdefault(key, category)
+                self._by_category.setdefault(key, []).append(idx)
+
+            names = tuple(name for name in (normalize(row.get("term_en")), normalize(row.get("term_fil"))) if name)
+            self._term_names.append(names)
+            for name in set(names):
+                self._prefix_index.append((name, idx))
+
+            self._term_texts.append(_FIELD_SEP.join(names))
+            self._definition_texts.append(
+                _FIELD_SEP.join((normalize(row.get("definition_en")), normalize(row.get("definition_fil"))))
+            )
+
+        self._prefix_index.sort()
+        return len(rows)
+
+    # ============================================
+    # Lookups
+    # ============================================
+
+    def _match_prefix(self, query: str) -> Set[int]:
+        """Entries with an English or Filipino term starting with `query`"""
+        lo = bisect_left(self._prefix_index, (query, -1))
+        hi = bisect_left(self._prefix_index, (query + "\uffff", -1), lo)
+        return {idx for _, idx in self._prefix_index[lo:hi]}
+
+    def _search(self, query: str) -> List[int]:
+        """
+        Matching entries, best first: exact term matches, term prefixes,
+        other term matches, then definition matches; alphabetical within each
+        """
+        prefixed = self._match_prefix(query)
+        exact, prefix, inside = [], [], []
+        # A term prefix is also a term substring, so one pass over the
+        # substring hits classifies everything and keeps alphabetical order
+        for idx, text in enumerate(self._term_texts):
+            if query in text:
+                if idx not in prefixed:
+                    inside.append(idx)
+                elif query in self._term_names[idx]:
+                    exact.append(idx)
+                else:
+                    prefix.append(idx)
+        found = set(exact) | set(prefix) | set(inside)
+        definitions = [
+            idx for idx, text in enumerate(self._definition_texts)
+            if query in text and idx not in found
+        ]
+        return exact + prefix + inside + definitions
+
+    def query(self, search: Optional[str] = None, category: Optional[str] = None) -> Tuple[List[int], Dict[str, int]]:
+        """
+        Matching entry indexes and category facet counts. Without a search
+        entries are alphabetical; with one they are ranked as in _search.
+        Facets count the search matches per category, ignoring `category`.
+        """
+        query = normalize(search)
+        category_key = category.casefold() if category and category.lower() != "all" else ""
+        key = (query, category_key)
+        cached = self._query_cache.get(key)
+        if cached is not None:
+            self._query_cache.move_to_end(key)
+            self.cache_hits += 1
+            return cached
+
+        if query:
+            self.searches += 1
+            matches = self._search(query)
+            facets: Dict[str, int] = {}
+            for idx in matches:
+                value = self._rows[idx].get("category")
+                if value:
+                    facets[value] = facets.get(value, 0) + 1
+        else:
+            matches = list(range(len(self._rows)))
+            facets = self.categories()
+
+        if category_key:
+            members = set(self._by_category.get(category_key, ()))
+            matches = [idx for idx in matches if idx in members]
+
+        self._query_cache[key] = (matches, facets)
+        if len(self._query_cache) > QUERY_CACHE_SIZE:
+            self._query_cache.popitem(last=False)
+        return matches, facets
+
+    def get(self, term_id: str) -> Optional[Dict[str, Any]]:
+        idx = self._by_id.get(str(term_id))
+        return self._rows[idx] if idx is not None else None
+
+    def categories(self) -> Dict[str, int]:
+        """Term counts per category"""
+        return {self._categories[key]: len(idxs) for key, idxs in self._by_category.items()}
+
+    # ============================================
+    # Rendering
+    # ============================================
+
+    def _fragment(self, idx: int, favorites: Optional[AbstractSet[str]]) -> str:
+        """Pre-serialized term, with "is_favorite" when the user's favorites are given"""
+        fragment = self._fragments[idx]
+        if favorites is None:
+            return fragment
+        flag = "true" if str(self._rows[idx]["id"]) in favorites else "false"
+        return fragment[:-1] + ',"is_favorite":' + flag + "}"
+
+    def render_page(
+        self,
+        indexes: List[int],
+        facets: Dict[str, int],
+        page: int,
+        limit: int,
+        favorites: Optional[AbstractSet[str]] = None
+    ) -> str:
+        """Serialize the paginated /glossary/terms body from precomputed fragments"""
+        total = len(indexes)
+        start = (page - 1) * limit
+        meta = json.dumps({
+            "pagination": {
+                "page": page,
+                "limit": limit,
+                "total": total,
+                "pages": (total + limit - 1) // limit if total > 0 else 1,
+            },
+            "facets": {"categories": facets},
+        }, separators=(",", ":"), ensure_ascii=False)
+
+        data = ",".join(self._fragment(idx, favorites) for idx in indexes[start:start + limit])
+        return '{"terms":[' + data + '],' + meta[1:]
+
+    def render_all(self, favorites: Optional[AbstractSet[str]] = None) -> str:
+        """Serialize the /glossary/terms/all body"""
+        if favorites is None:
+            data = ",".join(self._fragments)
+        else:
+            data = ",".join(self._fragment(idx, favorites) for idx in range(len(self._fragments)))
+        return '{"terms":[' + data + '],"total":' + str(len(self._fragments)) + "}"
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "terms": len(self._rows),
+            "categories": len(self._by_category),
+            **self.snapshot_stats(),
+            "searches": self.searches,
+            "cache_hits": self.cache_hits,
+        }
+
+
+# Singleton instance
+_glossary_index: Optional[GlossaryIndex] = None
+
+
+def get_glossary_index() -> GlossaryIndex:
+    """Get or create GlossaryIndex singleton"""
+    global _glossary_index
+    if _glossary_index is None:
+        _glossary_index = GlossaryIndex()
+    return _glossary_index
@@ -0,0 +1,249 @@
+"""
+Legal Guide Cache for AI.ttorney
+Shared in-memory copy of the verified legal guides (legal_articles)
+
+The guide endpoints used to query legal_articles on every request: a count
+request plus a page request for listings, a full category scan for the
+category list, and a per-service-instance cache for single articles only.
+This module keeps one snapshot per process (see
+services/versioned_snapshot.py) with category lists and counts computed
+at load time, every article pre-serialized to JSON, and rendered response
+bodies cached with a strong ETag so an unchanged guide costs the mobile
+app a 304 and the server no query.
+"""
+
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from typing import AbstractSet, Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from models.legal_article import LegalArticle
+from services.glossary_index import normalize
+from services.versioned_snapshot import VersionedSnapshot
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_SIZE = 1024  # Rendered bodies kept per snapshot
+
+# Columns the guide endpoints return
+ARTICLE_COLUMNS = (
+    "id,title_en,title_fil,description_en,description_fil,"
+    "content_en,content_fil,category,image_article,is_verified,created_at,updated_at"
+)
+
+# Category names the app uses for database categories
+CATEGORY_ALIASES = {"work": "labor"}
+
+_SEARCH_FIELDS = ("title_en", "title_fil", "description_en", "description_fil", "content_en", "content_fil")
+
+
+def make_etag(body: str) -> str:
+    """Strong ETag for a response body"""
+    return '"' + hashlib.sha256(body.encode()).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches `etag` (weak comparison, per RFC 9110)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class GuideCache(VersionedSnapshot):
+    """Immutable-per-load snapshot of verified legal_articles with rendered responses"""
+
+    name = "Legal guides"
+
+    def __init__(self):
+        super().__init__()
+        self._reset()
+
+        # Stats
+        self.response_hits = 0
+        self.response_renders = 0
+
+    def _reset(self):
+        self._articles: List[LegalArticle] = []
+        self._fragments: List[str] = []
+        self._by_id: Dict[str, int] = {}
+        self._by_category: Dict[str, List[int]] = {}
+        self._category_counts: Dict[str, int] = {}
+        self._search_texts: List[str] = []
+        self._responses: "OrderedDict[Tuple[Any, ...], Tuple[str, str]]" = OrderedDict()
+
+    # ============================================
+    # Loading
+    # ============================================
+
+    def _build(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Index verified legal_articles rows"""
+        articles = []
+        for row in rows:
+            try:
+                articles.append(LegalArticle.model_validate(row))
+            except Exception as e:
+                logger.warning(f"Skipping legal article {row.get('id')}: {e}")
+
+        # Oldest first, the order the unordered query returned in practice
+        articles.sort(key=lambda a: (a.created_at.timestamp() if a.created_at else 0.0, a.id))
+
+        self._reset()
+        self._articles = articles
+        self._fragments = [article.model_dump_json() for article in articles]
+
+        for idx, article in enumerate(articles):
+            self._by_id[article.id] = idx
+            if article.category:
+                self._by_category.setdefault(article.category.casefold(), []).append(idx)
+                self._category_counts[article.category] = self._category_counts.get(article.category, 0) + 1
+            self._search_texts.append("\t".join(normalize(getattr(article, field)) for field in _SEARCH_FIELDS))
+
+        self._category_counts = dict(sorted(self._category_counts.items()))
+        return len(articles)
+
+    # ============================================
+    # Lookups
+    # ============================================
+
+    def query(self, category: Optional[str] = None, search: Optional[str] = None) -> List[int]:
+        """Indexes of matching articles in listing order"""
+        if category:
+            key = category.casefold()
+            indexes = self._by_category.get(CATEGORY_ALIASES.get(key, key), [])
+        else:
+            indexes = range(len(self._articles))
+
+        text = normalize(search)
+        if text:
+            return [idx for idx in indexes if text in self._search_texts[idx]]
+        return list(indexes)
+
+    def articles(self, indexes: Iterable[int]) -> List[LegalArticle]:
+        return [self._articles[idx] for idx in indexes]
+
+    def get(self, article_id: str) -> Optional[LegalArticle]:
+        idx = self._by_id.get(str(article_id))
+        return self._articles[idx] if idx is not None else None
+
+    def categories(self) -> List[str]:
+        return list(self._category_counts)
+
+    def category_counts(self) -> Dict[str, int]:
+        return dict(self._category_counts)
+
+    # ============================================
+    # Rendered responses
+    # ============================================
+
+    def _respond(self, key: Tuple[Any, ...], render) -> Optional[Tuple[str, str]]:
+        """(body, etag) for `key`, rendered once per snapshot; None if render() has nothing"""
+        cached = self._responses.get(key)
+        if cached is not None:
+            self._responses.move_to_end(key)
+            self.response_hits += 1
+            return cached
+
+        body = render()
+        if body is None:
+            return None
+        self.response_renders += 1
+        entry = (body, make_etag(body))
+        self._responses[key] = entry
+        if len(self._responses) > RESPONSE_CACHE_SIZE:
+            self._responses.popitem(last=False)
+        return entry
+
+    def list_response(
+        self,
+        category: Optional[str],
+        search: Optional[str],
+        limit: int,
+        offset: int,
+        query: Optional[str] = None,
+        bookmarks: Optional[AbstractSet[str]] = None
+    ) -> Tuple[str, str]:
+        """
+        LegalArticleResponse body, or LegalArticleSearchResponse when `query`
+        is given. With the user's `bookmarks`, every article carries
+        "is_bookmarked"; such bodies are cached per set of bookmarked
+        articles on the page, so they are shared between users too.
+        """
+        key = ("list", (category or "").casefold(), normalize(search), limit, offset, query)
+        selected: Optional[List[int]] = None
+        flagged: FrozenSet[int] = frozenset()
+        if bookmarks is not None:
+            selected = self.query(category, search)[offset:offset + limit]
+            flagged = frozenset(idx for idx in selected if self._articles[idx].id in bookmarks)
+            key += ("bookmarks", flagged)
+
+        def render():
+            indexes = selected if selected is not None else self.query(category, search)[offset:offset + limit]
+            meta = {"count": len(indexes), "limit": limit, "offset": offset}
+            if query is not None:
+                meta["query"] = query
+            if bookmarks is None:
+                data = ",".join(self._fragments[idx] for idx in indexes)
+            else:
+                data = ",".join(
+                    self._fragments[idx][:-1] + ',"is_bookmarked":' + ("true" if idx in flagged else "false") + "}"
+                    for idx in indexes
+                )
+            return '{"success":true,"data":[' + data + '],' + json.dumps(meta, ensure_ascii=False)[1:]
+
+        return self._respond(key, render)
+
+    def article_response(self, article_id: str) -> Optional[Tuple[str, str]]:
+        """LegalArticleSingleResponse body, or None if the article is not cached"""
+        idx = self._by_id.get(str(article_id))
+        if idx is None:
+            return None
+        return self._respond(("article", idx), lambda: '{"success":true,"data":' + self._fragments[idx] + "}")
+
+    def categories_response(self) -> Tuple[str, str]:
+        """CategoryResponse body"""
+        def render():
+            return json.dumps({
+                "success": True,
+                "data": self.categories(),
+                "count": len(self._category_counts),
+                "counts": self._category_counts,
+            }, ensure_ascii=False)
+
+        return self._respond(("categories",), render)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "articles": len(self._articles),
+            "categories": len(self._category_counts),
+            **self.snapshot_stats(),
+            "cached_responses": len(self._responses),
+            "response_hits": self.response_hits,
+            "response_renders": self.response_renders,
+        }
+
+
+# Singleton instance
+_guide_cache: Optional[GuideCache] = None
+
+
+def get_guide_cache() -> GuideCache:
+    """Get or create GuideCache singleton"""
+    global _guide_cache
+    if _guide_cache is None:
+        _guide_cache = GuideCache()
+    return _guide_cache
+
+
+def invalidate_guide_cache():
+    """Reload the guides on the next request after legal_articles changes"""
+    if _guide_cache is not None:
+        _guide_cache.invalidate()
@@ -2,14 +2,117 @@
 Lawyer Availability Service - JSONB-based availability management
 Simple and efficient for <5000 users, industry-standard structured data
 """
-from typing import Dict, Any, List, Optional
-from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+from datetime import datetime, date, timedelta
 from supabase import Client
 import logging
 import json
 
 logger = logging.getLogger(__name__)
 
+# Booking statuses that occupy a slot
+ACTIVE_BOOKING_STATUSES = ["pending", "accepted"]
+
+# Limits for the multi-lawyer / multi-day availability API
+MAX_LAWYERS_PER_QUERY = 200
+MAX_DAYS_PER_QUERY = 31
+
+
+def _minute_of_day(time_str: str) -> Optional[int]:
+    """'09:30' or '09:30:00' -> 570. Returns None for malformed times."""
+    try:
+        hour, minute = str(time_str).split(":")[:2]
+        value = int(hour) * 60 + int(minute)
+        return value if 0 <= value < 1440 else None
+    except (ValueError, AttributeError):
+        return None
+
+
+def _mask_from_times(times: Iterable[str]) -> int:
+    """Bitset of minute-of-day offsets (bit n set = a slot starts at minute n)"""
+    mask = 0
+    for time_str in times:
+        minute = _minute_of_day(time_str)
+        if minute is not None:
+            mask |= 1 << minute
+    return mask
+
+
+def _times_from_mask(mask: int) -> List[str]:
+    """Inverse of _mask_from_times, ascending HH:MM"""
+    times = []
+    while mask:
+        low_bit = mask & -mask
+        minute = low_bit.bit_length() - 1
+        times.append(f"{minute // 60:02d}:{minute % 60:02d}")
+        mask ^= low_bit
+    return times
+
+
+def parse_weekly_availability(hours_available: Any) -> Dict[int, int]:
+    """
+    Convert a lawyer_info.hours_available value into {weekday: slot bitset}.
+    
+    Weekday follows date.weekday() (Monday=0). Accepts the JSONB dict or the
+    JSON string written by set_availability; anything else is treated as empty.
+    """
+    if isinstance(hours_available, str):
+        try:
+            hours_available = json.loads(hours_available)
+        except ValueError:
+            return {}
+    
+    if not isinstance(hours_available, dict):
+        return {}
+    
+    weekly = {}
+    for day, times in hours_available.items():
+        if day not in LawyerAvailabilityService.DAYS or not isinstance(times, list):
+            continue
+        # DAYS starts at Sunday; date.weekday() starts at Monday
+        weekday = (LawyerAvailabilityService.DAYS.index(day) - 1) % 7
+        weekly[weekday] = _mask_from_times(times)
+    return weekly
+
+
+def compute_bookable_slots(
+    weekly_availability: Dict[str, Dict[int, int]],
+    bookings: Iterable[Tuple[str, str, str]],
+    start_date: date,
+    days: int
+) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Resolve free slots for many lawyers over a date range, in memory.
+    
+    Args:
+        weekly_availability: {lawyer_id: {weekday: slot bitset}}
+        bookings: (lawyer_id, "YYYY-MM-DD", "HH:MM") of active bookings
+        start_date: First day of the range
+        days: Number of days in the range
+    
+    Returns:
+        {lawyer_id: {"YYYY-MM-DD": ["HH:MM", ...]}} with only days that have free slots
+    """
+    booked: Dict[Tuple[str, str], int] = {}
+    for lawyer_id, booking_date, booking_time in bookings:
+        minute = _minute_of_day(booking_time)
+        if minute is not None:
+            key = (lawyer_id, str(booking_date)[:10])
+            booked[key] = booked.get(key, 0) | (1 << minute)
+    
+    dates = [start_date + timedelta(days=offset) for offset in range(days)]
+    date_keys = [(d.isoformat(), d.weekday()) for d in dates]
+    
+    result = {}
+    for lawyer_id, weekly in weekly_availability.items():
+        lawyer_days = {}
+        for date_key, weekday in date_keys:
+            free = weekly.get(weekday, 0) & ~booked.get((lawyer_id, date_key), 0)
+            if free:
+                lawyer_days[date_key] = _times_from_mask(free)
+        result[lawyer_id] = lawyer_days
+    return result
+
 
 class LawyerAvailabilityService:
     """Service for managing lawyer availability using JSONB column"""
@@ -231,37 +334,80 @@ class LawyerAvailabilityService:
             if not date:
                 return slots
             
-            # Filter out booked slots
-            bookable = []
-            for slot in slots:
-                is_booked = await self._is_slot_booked(lawyer_id, date, slot)
-                if not is_booked:
-                    bookable.append(slot)
+            # One query for every booking that day, then filter in memory
+            booked = self.supabase.table("consultation_requests")\
+                .select("consultation_time")\
+                .eq("lawyer_id", lawyer_id)\
+                .eq("consultation_date", date)\
+                .in_("status", ACTIVE_BOOKING_STATUSES)\
+                .execute()
             
-            return bookable
+            booked_mask = _mask_from_times(row["consultation_time"] for row in booked.data or [])
+            return [slot for slot in slots if not booked_mask & _mask_from_times([slot])]
         
         except Exception as e:
             logger.error(f"Error getting bookable slots: {e}")
             return []
     
-    async def _is_slot_booked(
+    async def get_bookable_slots_range(
         self,
-        lawyer_id: str,
-        date: str,
-        time_slot: str
-    ) -> bool:
-        """Check if a specific slot is already booked"""
+        lawyer_ids: List[str],
+        start_date: date,
+        days: int = 7
+    ) -> Dict[str, Dict[str, List[str]]]:
+        """
+        Get bookable slots for several lawyers over several days.
+        
+        Loads every lawyer's weekly availability in one query and every active
+        booking in the range in a second query, then resolves free slots with
+        bitset operations in memory (see compute_bookable_slots).
+        
+        Args:
+            lawyer_ids: lawyer_info.id values (max MAX_LAWYERS_PER_QUERY)
+            start_date: First day of the range
+            days: Number of days (max MAX_DAYS_PER_QUERY)
+        
+        Returns:
+            {lawyer_id: {"YYYY-MM-DD": ["HH:MM", ...]}}
+        """
+        if not lawyer_ids:
+            return {}
+        if len(lawyer_ids) > MAX_LAWYERS_PER_QUERY:
+            raise ValueError(f"At most {MAX_LAWYERS_PER_QUERY} lawyers per request")
+        if not 1 <= days <= MAX_DAYS_PER_QUERY:
+            raise ValueError(f"days must be between 1 and {MAX_DAYS_PER_QUERY}")
+        
         try:
-            result = self.supabase.table("consultation_requests")\
-                .select("id")\
-                .eq("lawyer_id", lawyer_id)\
-                .eq("consultation_date", date)\
-                .eq("consultation_time", time_slot)\
-                .in_("status", ["pending", "accepted"])\
+            end_date = start_date + timedelta(days=days - 1)
+            
+            lawyers = self.supabase.table("lawyer_info")\
+                .select("id, hours_available")\
+                .in_("id", lawyer_ids)\
                 .execute()
             
-            return len(result.data) > 0 if result.data else False
+            bookings = self.supabase.table("consultation_requests")\
+                .select("lawyer_id, consultation_date, consultation_time")\
+                .in_("lawyer_id", lawyer_ids)\
+                .gte("consultation_date", start_date.isoformat())\
+                .lte("consultation_date", end_date.isoformat())\
+                .in_("status", ACTIVE_BOOKING_STATUSES)\
+                .execute()
+            
+            weekly_availability = {
+                str(row["id"]): parse_weekly_availability(row.get("hours_available"))
+                for row in lawyers.data or []
+            }
+            
+            return compute_bookable_slots(
+                weekly_availability,
+                (
+                    (str(row["lawyer_id"]), row["consultation_date"], row["consultation_time"])
+                    for row in bookings.data or []
+                ),
+                start_date,
+                days
+            )
         
         except Exception as e:
-            logger.error(f"Error checking if slot is booked: {e}")
-            return False
+            logger.error(f"Error getting bookable slots for range: {e}")
+            raise
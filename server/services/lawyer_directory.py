@@ -0,0 +1,279 @@
+"""
+Lawyer Directory Index for AI.ttorney
+In-memory index over lawyer_info for the public lawyer directory
+
+The directory used to cache the full lawyer_info result and build a Pydantic
+model per row, leaving all filtering to the client. This module keeps one
+snapshot per process with lookups by specialization, location, accepting
+status and name prefix, and pre-serializes every entry to compact JSON so a
+listing response is a string join instead of per-request model construction.
+Reloads follow the lawyer_info version stamp (migration 021).
+"""
+
+import json
+import logging
+import time
+import unicodedata
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from services.versioned_snapshot import RowLoader, VersionLoader, VersionedSnapshot
+
+logger = logging.getLogger(__name__)
+
+DIRECTORY_TTL_SECONDS = 120  # Reload interval when lawyer_info has no version stamp
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Honorifics ignored by the name-prefix lookup ("Atty. Juan" matches "juan")
+NAME_STOPWORDS = {"atty", "attorney", "jr", "sr"}
+
+
+def _fold(text: Any) -> str:
+    """Lowercase and strip accents so "Dueñas" matches "duenas" """
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", str(text))
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold().strip()
+
+
+def _name_tokens(name: str) -> List[str]:
+    cleaned = "".join(ch if ch.isalnum() else " " for ch in _fold(name))
+    return [token for token in cleaned.split() if token not in NAME_STOPWORDS]
+
+
+def normalize_specialization(specialization) -> List[str]:
+    """Normalize specialization data from database to frontend format"""
+    if not specialization:
+        return []
+
+    if isinstance(specialization, list):
+        return [spec.strip() for spec in specialization if isinstance(spec, str) and spec.strip()]
+
+    if isinstance(specialization, str):
+        # Split by comma and clean up whitespace
+        return [spec.strip() for spec in specialization.split(',') if spec.strip()]
+
+    return []
+
+
+def to_directory_entry(row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Shape a lawyer_info row like the Lawyer response model, or None if unusable"""
+    if not row.get("id") or not row.get("lawyer_id") or not row.get("created_at"):
+        return None
+
+    return {
+        "id": str(row["id"]),
+        "lawyer_id": str(row["lawyer_id"]),
+        "name": row.get("name") or "Unknown Lawyer",
+        "bio": row.get("bio") or "",
+        "specialization": normalize_specialization(row.get("specialization")),
+        "location": row.get("location"),
+        "hours": row.get("hours"),
+        "days": row.get("days"),
+        "available": bool(row.get("accepting_consultations", False)),
+        "hours_available": row.get("hours_available"),
+        "created_at": row["created_at"],
+    }
+
+
+class LawyerDirectory(VersionedSnapshot):
+    """Immutable-per-load snapshot of lawyer_info with secondary indexes"""
+
+    name = "Lawyer directory"
+    ttl_seconds = DIRECTORY_TTL_SECONDS
+
+    def __init__(self):
+        super().__init__()
+        self._reset()
+        self.hits = 0
+
+    def _reset(self):
+        self._entries: List[Dict[str, Any]] = []
+        self._fragments: List[str] = []
+        self._by_lawyer_id: Dict[str, int] = {}
+        self._by_specialization: Dict[str, List[int]] = {}
+        self._by_location: Dict[str, List[int]] = {}
+        self._accepting: List[int] = []
+        self._name_index: List[Tuple[str, int]] = []
+
+    # ============================================
+    # Loading
+    # ============================================
+
+    def _build(self, rows: Iterable[Dict[str, Any]]) -> int:
+        entries = []
+        for row in rows:
+            entry = to_directory_entry(row)
+            if entry is None:
+                logger.warning(f"Skipping lawyer_info row without id/lawyer_id/created_at: {row.get('id')}")
+                continue
+            entries.append(entry)
+
+        # Stable order so pages do not shift between requests
+        entries.sort(key=lambda e: (_fold(e["name"]), e["id"]))
+
+        self._reset()
+        self._entries = entries
+        self._fragments = [json.dumps(e, separators=(",", ":"), ensure_ascii=False) for e in entries]
+
+        for idx, entry in enumerate(entries):
+            self._by_lawyer_id[entry["lawyer_id"]] = idx
+
+            for spec in {_fold(s) for s in entry["specialization"]}:
+                self._by_specialization.setdefault(spec, []).append(idx)
+
+            location = _fold(entry["location"])
+            if location:
+                keys = {location} | {part.strip() for part in location.split(",") if part.strip()}
+                for key in keys:
+                    self._by_location.setdefault(key, []).append(idx)
+
+            if entry["available"]:
+                self._accepting.append(idx)
+
+            for token in set(_name_tokens(entry["name"])):
+                self._name_index.append((token, idx))
+
+        self._name_index.sort()
+        return len(entries)
+
+    async def ensure_loaded(self, loader: RowLoader, version_loader: VersionLoader, force: bool = False) -> bool:
+        cached = await super().ensure_loaded(loader, version_loader, force)
+        if cached:
+            self.hits += 1
+        return cached
+
+    # ============================================
+    # Lookups
+    # ============================================
+
+    def _match_name_prefix(self, prefix: str) -> Set[int]:
+        """Entries where every query token prefixes some name token"""
+        result: Optional[Set[int]] = None
+        for token in _name_tokens(prefix):
+            matches = set()
+            pos = bisect_left(self._name_index, (token, -1))
+            while pos < len(self._name_index) and self._name_index[pos][0].startswith(token):
+                matches.add(self._name_index[pos][1])
+                pos += 1
+            result = matches if result is None else result & matches
+            if not result:
+                return set()
+        return result if result is not None else set(range(len(self._entries)))
+
+    def _match_location(self, location: str) -> Set[int]:
+        query = _fold(location)
+        exact = self._by_location.get(query)
+        if exact is not None:
+            return set(exact)
+        # Few distinct locations, so a substring pass over the keys is cheap
+        matches = set()
+        for key, idxs in self._by_location.items():
+            if query in key:
+                matches.update(idxs)
+        return matches
+
+    def query(
+        self,
+        specialization: Optional[str] = None,
+        location: Optional[str] = None,
+        accepting: Optional[bool] = None,
+        name_prefix: Optional[str] = None
+    ) -> List[int]:
+        """Indexes of matching entries in directory order"""
+        candidates: Optional[Set[int]] = None
+
+        def narrow(idxs: Set[int]):
+            nonlocal candidates
+            candidates = idxs if candidates is None else candidates & idxs
+
+        if specialization:
+            narrow(set(self._by_specialization.get(_fold(specialization), ())))
+        if location:
+            narrow(self._match_location(location))
+        if accepting is True:
+            narrow(set(self._accepting))
+        elif accepting is False:
+            narrow(set(range(len(self._entries))) - set(self._accepting))
+        if name_prefix and name_prefix.strip():
+            narrow(self._match_name_prefix(name_prefix))
+
+        if candidates is None:
+            return list(range(len(self._entries)))
+        return sorted(candidates)
+
+    def get(self, lawyer_id: str) -> Optional[int]:
+        return self._by_lawyer_id.get(lawyer_id)
+
+    def specializations(self) -> Dict[str, int]:
+        """Facet counts keyed by the folded specialization name"""
+        return {spec: len(idxs) for spec, idxs in self._by_specialization.items()}
+
+    # ============================================
+    # Rendering
+    # ============================================
+
+    def render(
+        self,
+        indexes: List[int],
+        cached: bool,
+        page: Optional[int] = None,
+        page_size: Optional[int] = None
+    ) -> str:
+        """
+        Serialize a LawyerResponse-shaped body from precomputed fragments.
+        Without `page` every match is returned, as the unpaginated API did.
+        """
+        total = len(indexes)
+        if page is not None:
+            size = max(1, min(page_size or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+            start = (max(page, 1) - 1) * size
+            selected = indexes[start:start + size]
+            has_more = start + size < total
+        else:
+            size = None
+            selected = indexes
+            has_more = False
+
+        meta = json.dumps({
+            "error": None,
+            "cached": cached,
+            "timestamp": time.time(),
+            "total": total,
+            "page": page,
+            "page_size": size,
+            "has_more": has_more,
+        }, separators=(",", ":"))
+
+        data = ",".join(self._fragments[idx] for idx in selected)
+        return '{"success":true,"data":[' + data + '],' + meta[1:]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "lawyers": len(self._entries),
+            "specializations": len(self._by_specialization),
+            "locations": len(self._by_location),
+            "accepting": len(self._accepting),
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            **self.snapshot_stats(),
+        }
+
+
+# Singleton instance
+_lawyer_directory: Optional[LawyerDirectory] = None
+
+
+def get_lawyer_directory() -> LawyerDirectory:
+    """Get or create LawyerDirectory singleton"""
+    global _lawyer_directory
+    if _lawyer_directory is None:
+        _lawyer_directory = LawyerDirectory()
+    return _lawyer_directory
+
+
+def invalidate_lawyer_directory():
+    """Drop the directory snapshot after lawyer_info changes"""
+    if _lawyer_directory is not None:
+        _lawyer_directory.invalidate()
@@ -7,6 +7,7 @@ from supabase import Client
 from cachetools import TTLCache
 import logging
 import json
+from services.lawyer_directory import invalidate_lawyer_directory
 
 logger = logging.getLogger(__name__)
 
@@ -222,6 +223,8 @@ class LawyerProfileService:
         """Invalidate cache for a specific lawyer"""
         cache_key = self._get_cache_key(lawyer_id)
         profile_cache.pop(cache_key, None)
+        # Name, specialization, location and availability all show in the directory
+        invalidate_lawyer_directory()
         logger.debug(f"Cache invalidated for lawyer {lawyer_id}")
     
     @staticmethod
@@ -1,95 +1,36 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from services.supabase_service import SupabaseService
 from services.notification_service import NotificationService
+from services.guide_cache import ARTICLE_COLUMNS, GuideCache, get_guide_cache, invalidate_guide_cache
 from models.legal_article import LegalArticle, SearchParams
 import logging
 import httpx
-import time
 from supabase import create_client
 
 logger = logging.getLogger(__name__)
 
+ARTICLE_PAGE_SIZE = 1000  # Rows per request while loading the guides
+
 class LegalArticleService:
     def __init__(self):
         self.supabase_service = SupabaseService()
-        self._article_cache = {}
-        self._cache_duration = 300  # 5 minutes
+    
+    async def get_guide_cache(self) -> GuideCache:
+        """Shared guide cache, loaded on first use and refreshed when legal_articles changes"""
+        cache = get_guide_cache()
+        await cache.ensure_loaded(self._fetch_articles, self._fetch_content_version)
+        return cache
     
     async def get_articles(self, params: SearchParams) -> tuple[List[LegalArticle], int]:
         """
-        Get legal articles with filtering and pagination using HTTP requests
+        Get legal articles with filtering and pagination from the guide cache
         Returns tuple of (articles, total_count)
         """
         try:
-            # Build query parameters
-            query_params = ["is_verified=eq.true"]
-            
-            # Apply category filter
-            if params.category:
-                db_category = "labor" if params.category.lower() == "work" else params.category
-                query_params.append(f"category=eq.{db_category}")
-            
-            # Apply search filter
-            if params.search:
-                search_term = params.search.replace(" ", "%20")
-                search_filter = (
-                    f"or=(title_en.ilike.*{search_term}*,"
-                    f"title_fil.ilike.*{search_term}*,"
-                    f"description_en.ilike.*{search_term}*,"
-                    f"description_fil.ilike.*{search_term}*,"
-                    f"content_en.ilike.*{search_term}*,"
-                    f"content_fil.ilike.*{search_term}*)"
-                )
-                query_params.append(search_filter)
-            
-            # Build the query string
-            query_string = "&".join(query_params)
-            
-            async with httpx.AsyncClient() as client:
-                # Get total count
-                count_url = f"{self.supabase_service.rest_url}/legal_articles?select=id&{query_string}"
-                count_response = await client.get(
-                    count_url,
-                    headers={
-                        **self.supabase_service._get_headers(),
-                        "Prefer": "count=exact"
-                    }
-                )
-                
-                total_count = 0
-                if count_response.status_code == 200:
-                    content_range = count_response.headers.get("content-range", "")
-                    if content_range and "/" in content_range:
-                        total_count = int(content_range.split("/")[-1])
-                
-                # Get articles with pagination
-                select_fields = (
-                    "id,title_en,title_fil,description_en,description_fil,"
-                    "content_en,content_fil,category,image_article,is_verified,created_at,updated_at"
-                )
-                
-                range_header = f"{params.offset}-{params.offset + params.limit - 1}"
-                articles_url = f"{self.supabase_service.rest_url}/legal_articles?select={select_fields}&{query_string}"
-                
-                articles_response = await client.get(
-                    articles_url,
-                    headers={
-                        **self.supabase_service._get_headers(),
-                        "Range": range_header
-                    }
-                )
-                
-                if articles_response.status_code != 200:
-                    logger.error(f"Failed to fetch articles: {articles_response.status_code} - {articles_response.text}")
-                    return [], 0
-                
-                articles_data = articles_response.json()
-                if not articles_data:
-                    return [], total_count
-                
-                # Convert to Pydantic models
-                articles = [LegalArticle(**article) for article in articles_data]
-                return articles, total_count
+            cache = await self.get_guide_cache()
+            matches = cache.query(params.category, params.search)
+            page = matches[params.offset:params.offset + params.limit]
+            return cache.articles(page), len(matches)
             
         except Exception as e:
             logger.error(f"Error fetching articles: {str(e)}")
@@ -111,51 +52,11 @@ class LegalArticleService:
     
     async def get_article_by_id(self, article_id: str) -> Optional[LegalArticle]:
         """
-        Get a specific article by ID using HTTP requests with caching
+        Get a specific article by ID from the guide cache
         """
         try:
-            # Check cache first
-            cache_key = f"article_{article_id}"
-            cached_data = self._get_cached_data(cache_key)
-            if cached_data:
-                logger.info(f"📦 USING CACHED ARTICLE: {article_id}")
-                return LegalArticle(**cached_data)
-            
-            select_fields = (
-                "id,title_en,title_fil,description_en,description_fil,"
-                "content_en,content_fil,category,image_article,is_verified,created_at,updated_at"
-            )
-            
-            async with httpx.AsyncClient() as client:
-                # Sanitize article_id to prevent SQL injection
-                import urllib.parse
-                sanitized_article_id = urllib.parse.quote(str(article_id), safe='')
-                
-                response = await client.get(
-                    f"{self.supabase_service.rest_url}/legal_articles",
-                    params={
-                        "select": select_fields,
-                        "id": f"eq.{sanitized_article_id}",
-                        "is_verified": "eq.true"
-                    },
-                    headers=self.supabase_service._get_headers()
-                )
-                
-                if response.status_code != 200:
-                    logger.error(f"Failed to fetch article {article_id}: {response.status_code} - {response.text}")
-                    return None
-                
-                articles_data = response.json()
-                if not articles_data:
-                    return None
-                
-                article_data = articles_data[0]
-                
-                # Cache the result
-                self._set_cache(cache_key, article_data)
-                logger.info(f"✅ CACHED ARTICLE: {article_id} - {article_data.get('title_en', 'Unknown')}")
-                
-                return LegalArticle(**article_data)
+            cache = await self.get_guide_cache()
+            return cache.get(article_id)
             
         except Exception as e:
             logger.error(f"Error fetching article {article_id}: {str(e)}")
@@ -163,34 +64,11 @@ class LegalArticleService:
     
     async def get_categories(self) -> List[str]:
         """
-        Get all available article categories using HTTP requests
+        Get all available article categories from the guide cache
         """
         try:
-            async with httpx.AsyncClient() as client:
-                url = f"{self.supabase_service.rest_url}/legal_articles?select=category&is_verified=eq.true"
-                
-                response = await client.get(
-                    url,
-                    headers=self.supabase_service._get_headers()
-                )
-                
-                if response.status_code != 200:
-                    logger.error(f"Failed to fetch categories: {response.status_code} - {response.text}")
-                    return []
-                
-                articles_data = response.json()
-                if not articles_data:
-                    return []
-                
-                # Extract unique categories
-                categories = list(set([
-                    article.get("category") 
-                    for article in articles_data 
-                    if article.get("category")
-                ]))
-                categories.sort()
-                
-                return categories
+            cache = await self.get_guide_cache()
+            return cache.categories()
             
         except Exception as e:
             logger.error(f"Error fetching categories: {str(e)}")
@@ -208,31 +86,54 @@ class LegalArticleService:
         )
         return await self.get_articles(params)
     
-    def _get_cached_data(self, cache_key: str):
-        """Get data from cache if not expired"""
-        if cache_key in self._article_cache:
-            cached_item = self._article_cache[cache_key]
-            if time.time() - cached_item['timestamp'] < self._cache_duration:
-                return cached_item['data']
-            else:
-                # Remove expired cache
-                del self._article_cache[cache_key]
-        return None
+    async def _fetch_articles(self) -> List[Dict[str, Any]]:
+        """Every verified legal_articles row, paged by id"""
+        rows: List[Dict[str, Any]] = []
+        async with httpx.AsyncClient(timeout=15.0) as client:
+            while True:
+                response = await client.get(
+                    f"{self.supabase_service.rest_url}/legal_articles",
+                    params={
+                        "select": ARTICLE_COLUMNS,
+                        "is_verified": "eq.true",
+                        "order": "id.asc",
+                        "limit": str(ARTICLE_PAGE_SIZE),
+                        "offset": str(len(rows))
+                    },
+                    headers=self.supabase_service._get_headers()
+                )
+                
+                if response.status_code != 200:
+                    raise Exception(f"Failed to fetch articles: {response.status_code} - {response.text}")
+                
+                page = response.json()
+                rows.extend(page)
+                if len(page) < ARTICLE_PAGE_SIZE:
+                    return rows
     
-    def _set_cache(self, cache_key: str, data):
-        """Set data in cache with timestamp"""
-        self._article_cache[cache_key] = {
-            'data': data,
-            'timestamp': time.time()
-        }
+    async def _fetch_content_version(self) -> Optional[int]:
+        """Current legal_articles version stamp, or None if the database has none"""
+        async with httpx.AsyncClient(timeout=5.0) as client:
+            response = await client.post(
+                f"{self.supabase_service.rest_url}/rpc/get_legal_articles_version",
+                json={},
+                headers=self.supabase_service._get_headers()
+            )
+        
+        if response.status_code != 200:
+            logger.warning(f"Legal articles version stamp unavailable: {response.status_code}")
+            return None
+        version = response.json()
+        return int(version) if version is not None else None
     
     def clear_cache(self):
-        """Clear all cached data"""
-        self._article_cache.clear()
+        """Reload the guide cache on the next request"""
+        invalidate_guide_cache()
         logger.info("🗑️ Article cache cleared")
 
     async def notify_article_published(self, article_id: str, title: str):
         """Notify all users of new article"""
+        self.clear_cache()
         try:
             supabase = create_client(self.supabase_service.url, self.supabase_service.service_key)
             notification_service = NotificationService(supabase)
@@ -252,6 +153,7 @@ class LegalArticleService:
 
     async def notify_article_updated(self, article_id: str, title: str):
         """Notify users who bookmarked the article"""
+        self.clear_cache()
         try:
             supabase = create_client(self.supabase_service.url, self.supabase_service.service_key)
             notification_service = NotificationService(supabase)
@@ -268,3 +170,15 @@ class LegalArticleService:
                 logger.info(f"✅ Sent article updated notifications to {len(user_ids)} users")
         except Exception as e:
             logger.error(f"Failed to send article updated notifications: {e}")
+
+
+# Singleton instance
+_legal_article_service: Optional[LegalArticleService] = None
+
+
+def get_legal_article_service() -> LegalArticleService:
+    """Get or create LegalArticleService singleton"""
+    global _legal_article_service
+    if _legal_article_service is None:
+        _legal_article_service = LegalArticleService()
+    return _legal_article_service
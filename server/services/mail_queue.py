@@ -0,0 +1,481 @@
+"""
+Outbound Mail Queue for AI.ttorney
+Sends OTP and support emails off the request path
+
+OTPService and EmailSupportService used to open a fresh SMTP connection and
+send inline, so signup, forgot-password and support submissions waited on the
+SMTP handshake (and on every fallback strategy when one failed). Messages are
+now rendered, queued here and the request returns; a small pool of workers
+delivers them.
+
+- Each worker keeps one SMTP connection open and reuses it across messages,
+  reconnecting when the server drops it
+- Transient failures are retried with exponential backoff and jitter;
+  permanent ones (bad recipient, auth failure) are not
+- An idempotency key, claimed in the shared state backend, makes a repeated
+  enqueue of the same logical email (double-submit, client retry) a no-op
+- Templates are rendered once into static segments; filling one in is a join
+
+Point SMTP_SERVER/SMTP_PORT at a local sink and set SMTP_SECURITY=none to test
+without a real provider (see test_mail_queue.py).
+"""
+
+import asyncio
+import html
+import logging
+import os
+import random
+import smtplib
+import ssl
+import time
+from dataclasses import dataclass, field
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Any, Callable, Dict, List, Optional
+
+from services.shared_state import SharedStateBackend, get_shared_state
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+MAIL_WORKERS = int(os.getenv("MAIL_WORKERS", "2"))
+MAX_PENDING = 1000  # Refuse new mail beyond this many queued messages
+MAX_ATTEMPTS = 4
+RETRY_BASE_SECONDS = 2.0
+RETRY_MAX_SECONDS = 60.0
+CONNECTION_IDLE_CHECK_SECONDS = 30  # NOOP a reused connection idle for longer than this
+IDEMPOTENCY_KEY_PREFIX = "mail:idem:"
+DEFAULT_IDEMPOTENCY_TTL = 600
+
+
+class MailQueueFullError(Exception):
+    """Raised when the queue already holds MAX_PENDING messages"""
+    pass
+
+
+# ============================================
+# Templates
+# ============================================
+
+class PrerenderedTemplate:
+    """
+    Renders a template function once with placeholder tokens and keeps the
+    static segments, so filling it in is a string join instead of re-running
+    a large f-string. Values are inserted verbatim; escape them first.
+    """
+
+    def __init__(self, render: Callable[..., str], *fields: str):
+        self.fields = fields
+        tokens = {name: f"\x00{name}\x00" for name in fields}
+        rendered = render(**tokens)
+
+        self._parts: List[str] = []
+        self._slots: List[str] = []
+        rest = rendered
+        while True:
+            positions = [(rest.find(token), name) for name, token in tokens.items() if token in rest]
+            if not positions:
+                break
+            pos, name = min(positions)
+            self._parts.append(rest[:pos])
+            self._slots.append(name)
+            rest = rest[pos + len(tokens[name]):]
+        self._parts.append(rest)
+
+    def render(self, **values: Any) -> str:
+        out = [self._parts[0]]
+        for slot, part in zip(self._slots, self._parts[1:]):
+            out.append(str(values[slot]))
+            out.append(part)
+        return "".join(out)
+
+
+def escape_html(text: Any) -> str:
+    """Escape user-supplied text for an HTML email body"""
+    return html.escape(str(text or ""), quote=True)
+
+
+# ============================================
+# Messages and transport
+# ============================================
+
+@dataclass
+class OutboundEmail:
+    """One email waiting for delivery"""
+    to: List[str]
+    subject: str
+    html: str
+    from_email: str
+    from_name: str
+    reply_to: Optional[str] = None
+    idempotency_key: Optional[str] = None
+    attempts: int = 0
+    enqueued_at: float = field(default_factory=time.time)
+
+    def to_mime(self) -> str:
+        message = MIMEMultipart("alternative")
+        message["Subject"] = self.subject
+        message["From"] = f"{self.from_name} <{self.from_email}>"
+        message["To"] = ", ".join(self.to)
+        if self.reply_to:
+            message["Reply-To"] = self.reply_to
+        message.attach(MIMEText(self.html, "html"))
+        return message.as_string()
+
+
+def _is_permanent(error: Exception) -> bool:
+    """5xx replies and rejected addresses will not succeed on retry"""
+    if isinstance(error, (smtplib.SMTPRecipientsRefused, smtplib.SMTPAuthenticationError)):
+        return True
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 500 <= error.smtp_code < 600
+    return False
+
+
+class SMTPTransport:
+    """
+    One reusable SMTP connection (blocking; call from a worker thread).
+
+    SMTP_SECURITY selects how to connect:
+    - auto: SSL on 465, then STARTTLS on SMTP_PORT, then STARTTLS with relaxed
+      ciphers - the same fallbacks OTP mail used - remembering which one worked
+    - ssl / starttls: only that mode, on SMTP_PORT
+    - none: plain SMTP (local sinks and relays)
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        security: str = "auto",
+        timeout: float = 30.0
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.security = security
+        self.timeout = timeout
+
+        self._conn: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+        self._strategy: Optional[str] = None
+        self.connections_opened = 0
+
+    @classmethod
+    def from_env(cls) -> "SMTPTransport":
+        return cls(
+            host=os.getenv("SMTP_SERVER", "smtp.gmail.com"),
+            port=int(os.getenv("SMTP_PORT", "587")),
+            username=os.getenv("SMTP_USERNAME"),
+            password=os.getenv("SMTP_PASSWORD"),
+            security=os.getenv("SMTP_SECURITY", "auto").lower()
+        )
+
+    def _strategies(self) -> List[str]:
+        if self._strategy:
+            return [self._strategy]
+        if self.security == "auto":
+            return ["ssl_465", "starttls", "starttls_compat"]
+        return [self.security]
+
+    @staticmethod
+    def _context(compat: bool = False) -> ssl.SSLContext:
+        context = ssl.create_default_context()
+        # Same relaxed verification the inline senders used
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+        if compat:
+            context.set_ciphers('DEFAULT@SECLEVEL=1')
+            context.minimum_version = ssl.TLSVersion.TLSv1
+        else:
+            context.minimum_version = ssl.TLSVersion.TLSv1_2
+        return context
+
+    def _open(self, strategy: str) -> smtplib.SMTP:
+        if strategy == "ssl_465":
+            conn = smtplib.SMTP_SSL(self.host, 465, context=self._context(), timeout=self.timeout)
+        elif strategy == "ssl":
+            conn = smtplib.SMTP_SSL(self.host, self.port, context=self._context(), timeout=self.timeout)
+        else:
+            conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if strategy in ("starttls", "starttls_compat"):
+                conn.starttls(context=self._context(compat=strategy == "starttls_compat"))
+        try:
+            if self.username and self.password:
+                conn.login(self.username, self.password)
+        except Exception:
+            conn.close()
+            raise
+        return conn
+
+    def _connect(self):
+        last_error: Optional[Exception] = None
+        for strategy in self._strategies():
+            try:
+                self._conn = self._open(strategy)
+                self._strategy = strategy
+                self.connections_opened += 1
+                logger.info(f"📧 SMTP connected to {self.host} ({strategy})")
+                return
+            except smtplib.SMTPAuthenticationError:
+                raise
+            except Exception as e:
+                logger.warning(f"📧 SMTP {strategy} connection to {self.host} failed: {e}")
+                last_error = e
+        # Let the next attempt probe every strategy again
+        self._strategy = None
+        raise last_error or Exception("No SMTP connection strategy configured")
+
+    def _ensure_connection(self):
+        if self._conn is not None and time.monotonic() - self._last_used > CONNECTION_IDLE_CHECK_SECONDS:
+            try:
+                if self._conn.noop()[0] != 250:
+                    self.close()
+            except Exception:
+                self.close()
+        if self._conn is None:
+            self._connect()
+
+    def send(self, email: OutboundEmail):
+        """Deliver one message, reconnecting once if the reused connection dropped"""
+        payload = email.to_mime()
+        self._ensure_connection()
+        try:
+            self._conn.sendmail(email.from_email, email.to, payload)
+        except smtplib.SMTPException as e:
+            if not isinstance(e, smtplib.SMTPServerDisconnected):
+                raise
+            self._reconnect_and_send(email, payload)
+        except OSError:
+            self._reconnect_and_send(email, payload)
+        self._last_used = time.monotonic()
+
+    def _reconnect_and_send(self, email: OutboundEmail, payload: str):
+        self.close()
+        self._connect()
+        self._conn.sendmail(email.from_email, email.to, payload)
+
+    def close(self):
+        if self._conn is not None:
+            try:
+                self._conn.quit()
+            except Exception:
+                pass
+            self._conn = None
+
+
+# ============================================
+# Queue
+# ============================================
+
+class MailQueue:
+    """Worker pool that delivers queued emails with retries"""
+
+    def __init__(
+        self,
+        transport_factory: Callable[[], SMTPTransport] = SMTPTransport.from_env,
+        workers: int = MAIL_WORKERS,
+        state: Optional[SharedStateBackend] = None,
+        max_attempts: int = MAX_ATTEMPTS,
+        retry_base_seconds: float = RETRY_BASE_SECONDS
+    ):
+        self.transport_factory = transport_factory
+        self.worker_count = max(1, workers)
+        self.state = state
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._transports: List[SMTPTransport] = []
+        self._retry_handles: set = set()
+
+        # Stats
+        self.enqueued = 0
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.duplicates = 0
+        self._latency_total = 0.0
+
+    # ============================================
+    # Lifecycle
+    # ============================================
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    async def start(self):
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        for index in range(self.worker_count):
+            transport = self.transport_factory()
+            self._transports.append(transport)
+            self._workers.append(asyncio.create_task(self._worker(index, transport)))
+        logger.info(f"✅ Mail queue started with {self.worker_count} workers")
+
+    async def stop(self, timeout: float = 10.0):
+        """Deliver what is queued (up to timeout), then stop the workers"""
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"⚠️ Mail queue stopped with {self._queue.qsize()} undelivered messages")
+        if self._retry_handles:
+            logger.warning(f"⚠️ Mail queue dropped {len(self._retry_handles)} scheduled retries on shutdown")
+            for handle in self._retry_handles:
+                handle.cancel()
+            self._retry_handles.clear()
+
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        for transport in self._transports:
+            await asyncio.to_thread(transport.close)
+        self._transports = []
+
+    async def join(self):
+        """Wait until every queued message (including retries) is delivered or failed"""
+        while self._queue is not None:
+            await self._queue.join()
+            if not self._retry_handles:
+                return
+            await asyncio.sleep(0.05)
+
+    # ============================================
+    # Enqueue
+    # ============================================
+
+    def _state(self) -> SharedStateBackend:
+        return self.state or get_shared_state()
+
+    async def claim(self, idempotency_key: str, ttl: int = DEFAULT_IDEMPOTENCY_TTL) -> bool:
+        """
+        Claim an idempotency key ahead of enqueue(..., claimed=True), for
+        callers with work to do between the dedup check and queueing.
+        Returns False when the key is already taken.
+        """
+        claimed = await self._state().set(
+            f"{IDEMPOTENCY_KEY_PREFIX}{idempotency_key}", "1",
+            ttl=ttl, only_if_absent=True
+        )
+        if not claimed:
+            self.duplicates += 1
+            logger.info(f"📧 Skipped duplicate email ({idempotency_key})")
+        return claimed
+
+    async def release(self, idempotency_key: str):
+        """Free a claimed idempotency key so the same email can be sent again"""
+        await self._state().delete(f"{IDEMPOTENCY_KEY_PREFIX}{idempotency_key}")
+
+    async def enqueue(
+        self,
+        email: OutboundEmail,
+        idempotency_ttl: int = DEFAULT_IDEMPOTENCY_TTL,
+        claimed: bool = False
+    ) -> bool:
+        """
+        Queue an email for delivery and return immediately.
+
+        Returns False when an email with the same idempotency key was already
+        queued within idempotency_ttl seconds (nothing is queued then).
+        Pass claimed=True when the key was taken with claim() beforehand.
+
+        Raises:
+            MailQueueFullError: if MAX_PENDING messages are already waiting
+        """
+        if not self.running:
+            await self.start()
+        if self._queue.qsize() >= MAX_PENDING:
+            raise MailQueueFullError("Too many emails are waiting to be sent. Please try again later.")
+
+        if email.idempotency_key and not claimed:
+            if not await self.claim(email.idempotency_key, idempotency_ttl):
+                return False
+
+        self._queue.put_nowait(email)
+        self.enqueued += 1
+        return True
+
+    # ============================================
+    # Delivery
+    # ============================================
+
+    async def _worker(self, index: int, transport: SMTPTransport):
+        while True:
+            email = await self._queue.get()
+            try:
+                await self._deliver(transport, email)
+            except Exception as e:
+                logger.error(f"❌ Mail worker {index} error: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    async def _deliver(self, transport: SMTPTransport, email: OutboundEmail):
+        email.attempts += 1
+        try:
+            await asyncio.to_thread(transport.send, email)
+        except Exception as e:
+            if _is_permanent(e) or email.attempts >= self.max_attempts:
+                self.failed += 1
+                logger.error(f"❌ Email to {', '.join(email.to)} failed after {email.attempts} attempts: {e}")
+                # Let the user trigger the same email again
+                if email.idempotency_key:
+                    await self.release(email.idempotency_key)
+                return
+
+            delay = min(RETRY_MAX_SECONDS, self.retry_base_seconds * 2 ** (email.attempts - 1))
+            delay *= random.uniform(0.8, 1.2)
+            self.retried += 1
+            logger.warning(f"⚠️ Email to {', '.join(email.to)} failed ({e}); retry {email.attempts} in {delay:.1f}s")
+            self._schedule_retry(email, delay)
+            return
+
+        self.sent += 1
+        self._latency_total += time.time() - email.enqueued_at
+        logger.info(f"📧 Email sent to {', '.join(email.to)}: {email.subject}")
+
+    def _schedule_retry(self, email: OutboundEmail, delay: float):
+        loop = asyncio.get_running_loop()
+
+        def requeue():
+            self._retry_handles.discard(handle)
+            if self._queue is not None:
+                self._queue.put_nowait(email)
+
+        handle = loop.call_later(delay, requeue)
+        self._retry_handles.add(handle)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "workers": self.worker_count,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "scheduled_retries": len(self._retry_handles),
+            "enqueued": self.enqueued,
+            "sent": self.sent,
+            "failed": self.failed,
+            "retried": self.retried,
+            "duplicates": self.duplicates,
+            "avg_delivery_seconds": round(self._latency_total / self.sent, 3) if self.sent else 0.0,
+            "smtp_connections_opened": sum(t.connections_opened for t in self._transports),
+        }
+
+
+# Singleton instance
+_mail_queue: Optional[MailQueue] = None
+
+
+def get_mail_queue() -> MailQueue:
+    """Get or create MailQueue singleton"""
+    global _mail_queue
+    if _mail_queue is None:
+        _mail_queue = MailQueue()
+    return _mail_queue
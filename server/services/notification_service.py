@@ -50,6 +50,35 @@ class NotificationService:
             logger.error(f"Failed to create notification: {e}")
             return None
     
+    async def create_notifications(self, notifications: List[Dict[str, Any]]) -> int:
+        """Create many notifications with a single insert; returns how many were created"""
+        if not notifications:
+            return 0
+        try:
+            rows = [
+                {
+                    "user_id": n["user_id"],
+                    "type": n["type"],
+                    "title": n["title"],
+                    "message": n["message"],
+                    "data": n.get("data") or {},
+                    "read": False
+                }
+                for n in notifications
+            ]
+            
+            result = self.supabase.table("notifications")\
+                .insert(rows)\
+                .execute()
+            
+            created = len(result.data or [])
+            logger.info(f"✅ {created} notifications created in bulk ({rows[0]['type']}...)")
+            return created
+            
+        except Exception as e:
+            logger.error(f"Failed to create notifications in bulk: {e}")
+            return 0
+    
     async def get_user_notifications(
         self,
         user_id: str,
@@ -266,6 +295,28 @@ class NotificationService:
             }
         )
     
+    async def notify_lawyer_applications_reviewed(self, reviews: List[Dict[str, Any]]) -> int:
+        """Notify applicants of their review decisions (user_id, application_id, status), in one insert"""
+        messages = {
+            "accepted": ("Lawyer Application Approved",
+                         "Your lawyer application was approved. Open the app to activate your lawyer account."),
+            "rejected": ("Lawyer Application Not Approved",
+                         "Your lawyer application was not approved. See the admin notes for details."),
+            "resubmission": ("Lawyer Application Needs Changes",
+                             "Please review the admin notes and resubmit your lawyer application.")
+        }
+        notifications = []
+        for review in reviews:
+            title, message = messages[review["status"]]
+            notifications.append({
+                "user_id": str(review["user_id"]),
+                "type": f"lawyer_application_{review['status']}",
+                "title": title,
+                "message": message,
+                "data": {"application_id": str(review["application_id"])}
+            })
+        return await self.create_notifications(notifications)
+    
     async def notify_content_published(
         self,
         user_ids: List[str],
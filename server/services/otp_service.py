@@ -2,19 +2,23 @@ import os
 import random
 import string
 import hashlib
+import hmac
 from typing import Dict, Any, Optional
 import logging
-import smtplib
-import ssl
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 import json
 import asyncio
 import time
-import threading
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 
+from services.mail_queue import (
+    OutboundEmail,
+    PrerenderedTemplate,
+    escape_html,
+    get_mail_queue,
+)
+from services.shared_state import SharedStateBackend, get_shared_state
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -27,98 +31,70 @@ class OTPData:
     attempts: int = 0
     locked_until: Optional[float] = None
 
-class InMemoryOTPStore:
-    """Thread-safe in-memory OTP storage with automatic cleanup"""
+class OTPStore:
+    """
+    OTP storage on the shared state backend (services/shared_state.py)
     
-    def __init__(self):
-        self._store: Dict[str, OTPData] = {}
-        self._lock = threading.RLock()
-        self._cleanup_thread = None
-        self._stop_cleanup = threading.Event()
-        self._start_cleanup_thread()
+    Each OTP is a hash that expires natively with the code, so any API worker
+    can verify a code another worker sent and nothing needs a cleanup thread.
+    Lockouts live under their own key so they outlast the 2-minute code and
+    are not reset by requesting a new one.
+    """
     
-    def _start_cleanup_thread(self):
-        """Start the background cleanup thread"""
-        if self._cleanup_thread is None or not self._cleanup_thread.is_alive():
-            self._cleanup_thread = threading.Thread(target=self._cleanup_expired, daemon=True)
-            self._cleanup_thread.start()
-            logger.info("OTP cleanup thread started")
+    LOCK_SUFFIX = ":lock"
     
-    def _cleanup_expired(self):
-        """Background thread to clean up expired OTPs"""
-        while not self._stop_cleanup.wait(30):  # Check every 30 seconds
-            current_time = time.time()
-            with self._lock:
-                expired_keys = []
-                for key, otp_data in self._store.items():
-                    if current_time > otp_data.expires_at:
-                        expired_keys.append(key)
-                    elif otp_data.locked_until and current_time > otp_data.locked_until:
-                        # Clear lockout but keep OTP if not expired
-                        otp_data.locked_until = None
-                        otp_data.attempts = 0
-                
-                for key in expired_keys:
-                    del self._store[key]
-                
-                if expired_keys:
-                    logger.info(f"Cleaned up {len(expired_keys)} expired OTPs")
+    def __init__(self, backend: Optional[SharedStateBackend] = None):
+        self.backend = backend or get_shared_state()
     
-    def store_otp(self, key: str, otp_data: OTPData):
-        """Store OTP data with thread safety"""
-        with self._lock:
-            self._store[key] = otp_data
+    async def store_otp(self, key: str, otp_data: OTPData):
+        """Store OTP data; replaces any previous code for the same key"""
+        await self.backend.hset(key, {
+            "hash": otp_data.hash,
+            "email": otp_data.email,
+            "otp_type": otp_data.otp_type,
+            "expires_at": otp_data.expires_at,
+            "attempts": otp_data.attempts
+        }, ttl=max(1.0, otp_data.expires_at - time.time()))
     
-    def get_otp(self, key: str) -> Optional[OTPData]:
+    async def get_otp(self, key: str) -> Optional[OTPData]:
         """Get OTP data if exists and not expired"""
-        with self._lock:
-            otp_data = self._store.get(key)
-            if otp_data and time.time() <= otp_data.expires_at:
-                return otp_data
-            elif otp_data:
-                # Expired, remove it
-                del self._store[key]
+        data = await self.backend.hgetall(key)
+        if not data:
             return None
+        return OTPData(
+            hash=data["hash"],
+            email=data["email"],
+            otp_type=data["otp_type"],
+            expires_at=float(data["expires_at"]),
+            attempts=int(data.get("attempts", 0))
+        )
+    
+    async def delete_otp(self, key: str) -> bool:
+        """Delete OTP data; True only for the caller that actually removed it"""
+        return await self.backend.delete(key)
     
-    def delete_otp(self, key: str):
-        """Delete OTP data"""
-        with self._lock:
-            self._store.pop(key, None)
+    async def increment_attempts(self, key: str) -> Optional[int]:
+        """Atomically count a failed attempt; None if the OTP is gone"""
+        return await self.backend.hincrby(key, "attempts", 1)
     
-    def update_attempts(self, key: str, attempts: int, locked_until: Optional[float] = None):
-        """Update attempt count and lockout status"""
-        with self._lock:
-            if key in self._store:
-                self._store[key].attempts = attempts
-                if locked_until:
-                    self._store[key].locked_until = locked_until
+    async def lock(self, key: str, seconds: int):
+        """Lock verification for this key"""
+        await self.backend.set(f"{key}{self.LOCK_SUFFIX}", "1", ttl=seconds)
     
-    def is_locked(self, key: str) -> tuple[bool, Optional[float]]:
+    async def is_locked(self, key: str) -> tuple[bool, Optional[float]]:
         """Check if OTP is locked and return remaining lockout time"""
-        with self._lock:
-            otp_data = self._store.get(key)
-            if otp_data and otp_data.locked_until:
-                current_time = time.time()
-                if current_time < otp_data.locked_until:
-                    return True, otp_data.locked_until - current_time
-                else:
-                    # Lockout expired, clear it
-                    otp_data.locked_until = None
-                    otp_data.attempts = 0
-            return False, None
+        remaining = await self.backend.ttl(f"{key}{self.LOCK_SUFFIX}")
+        if remaining:
+            return True, remaining
+        return False, None
     
-    def clear_lockout(self, key: str):
-        """Clear lockout and reset attempts"""
-        with self._lock:
-            if key in self._store:
-                self._store[key].locked_until = None
-                self._store[key].attempts = 0
+    async def clear_lockout(self, key: str):
+        """Clear lockout"""
+        await self.backend.delete(f"{key}{self.LOCK_SUFFIX}")
     
     def shutdown(self):
-        """Shutdown the cleanup thread"""
-        self._stop_cleanup.set()
-        if self._cleanup_thread and self._cleanup_thread.is_alive():
-            self._cleanup_thread.join(timeout=5)
+        """Nothing to stop - expiry is handled by the backend"""
+        pass
 
 # Global OTP store singleton
 _global_otp_store = None
@@ -127,7 +103,7 @@ def get_otp_store():
     """Get the global OTP store singleton"""
     global _global_otp_store
     if _global_otp_store is None:
-        _global_otp_store = InMemoryOTPStore()
+        _global_otp_store = OTPStore()
     return _global_otp_store
 
 class OTPService:
@@ -166,6 +142,7 @@ class OTPService:
     # OTP Configuration Constants
     OTP_TTL_SECONDS = 120  # 2 minutes for all OTP types
     OTP_TTL_MINUTES = 2
+    OTP_RESEND_DEDUP_SECONDS = 30  # Repeat requests within this window reuse the queued email
     
     # OTP Type Configuration
     OTP_TYPES = {
@@ -210,26 +187,40 @@ class OTPService:
                 locked_until=None
             )
             
-            # Store in memory
-            self.otp_store.store_otp(otp_key, otp_data)
-            logger.info(f"{config['log_prefix']} OTP stored with key: {otp_key}, expires in: {self.OTP_TTL_SECONDS}s")
-            
-            # Debug: Log current store state
-            with self.otp_store._lock:
-                store_keys = list(self.otp_store._store.keys())
-                logger.info(f"OTP store now contains {len(store_keys)} keys: {store_keys}")
-            
-            # Send email
-            email_response = await self.send_otp_email(email, otp_code, user_name, config["email_template"])
-            
-            if email_response["success"]:
+            # Claim the resend window first: a repeat request inside it keeps
+            # the code that is already on its way instead of replacing it
+            mail_queue = get_mail_queue()
+            outbound = self.build_otp_email(email, otp_code, user_name, config["email_template"])
+            if not await mail_queue.claim(outbound.idempotency_key, ttl=self.OTP_RESEND_DEDUP_SECONDS):
+                logger.info(f"{config['log_prefix']} OTP already sent to {otp_key}; skipping duplicate request")
                 return {
                     "success": True,
                     "message": config["success_message"],
-                    "expires_in_minutes": self.OTP_TTL_MINUTES
+                    "expires_in_minutes": self.OTP_TTL_MINUTES,
+                    "deduplicated": True
                 }
-            else:
-                return {"success": False, "error": email_response["error"]}
+            
+            # Store the code before emailing it, so a user never receives a
+            # code that cannot verify; undo both steps if either one fails
+            try:
+                await self.otp_store.store_otp(otp_key, otp_data)
+            except Exception:
+                await mail_queue.release(outbound.idempotency_key)
+                raise
+            logger.info(f"{config['log_prefix']} OTP stored with key: {otp_key}, expires in: {self.OTP_TTL_SECONDS}s")
+            
+            try:
+                await mail_queue.enqueue(outbound, claimed=True)
+            except Exception:
+                await self.otp_store.delete_otp(otp_key)
+                await mail_queue.release(outbound.idempotency_key)
+                raise
+            
+            return {
+                "success": True,
+                "message": config["success_message"],
+                "expires_in_minutes": self.OTP_TTL_MINUTES
+            }
                 
         except Exception as e:
             logger.error(f"Send {otp_type} OTP error: {str(e)}")
@@ -255,7 +246,7 @@ class OTPService:
             logger.info(f"Verifying OTP with key: {otp_key}, email: {email}, otp_type: {otp_type}")
             
             # Check if user is locked out
-            is_locked, remaining_lockout = self.otp_store.is_locked(otp_key)
+            is_locked, remaining_lockout = await self.otp_store.is_locked(otp_key)
             if is_locked:
                 minutes = int(remaining_lockout // 60)
                 seconds = int(remaining_lockout % 60)
@@ -268,29 +259,26 @@ class OTPService:
                 }
             
             # Get stored OTP data
-            otp_data = self.otp_store.get_otp(otp_key)
+            otp_data = await self.otp_store.get_otp(otp_key)
             
             if not otp_data:
                 logger.error(f"OTP not found in store for key: {otp_key}")
-                # Debug: List all keys in store
-                with self.otp_store._lock:
-                    all_keys = list(self.otp_store._store.keys())
-                    logger.error(f"Available OTP keys in store: {all_keys}")
                 return {"success": False, "error": "OTP not found or expired"}
             
             # Hash the provided OTP
             provided_hash = self.hash_otp(otp_code)
             
             # Compare hashes
-            if otp_data.hash != provided_hash:
-                # Increment attempt counter
-                attempt_count = otp_data.attempts + 1
+            if not hmac.compare_digest(otp_data.hash, provided_hash):
+                # Increment attempt counter (atomic across workers)
+                attempt_count = await self.otp_store.increment_attempts(otp_key)
+                if attempt_count is None:
+                    return {"success": False, "error": "OTP not found or expired"}
                 
                 # Check if max attempts reached
                 if attempt_count >= 5:
                     # Set lockout for 15 minutes
-                    lockout_until = time.time() + 900  # 15 minutes
-                    self.otp_store.update_attempts(otp_key, attempt_count, lockout_until)
+                    await self.otp_store.lock(otp_key, 900)
                     
                     logger.warning(f"User {email} locked out after {attempt_count} failed OTP attempts")
                     
@@ -301,9 +289,6 @@ class OTPService:
                         "retry_after": 900
                     }
                 
-                # Update attempt count
-                self.otp_store.update_attempts(otp_key, attempt_count)
-                
                 remaining_attempts = 5 - attempt_count
                 return {
                     "success": False, 
@@ -311,9 +296,10 @@ class OTPService:
                     "attempts_remaining": remaining_attempts
                 }
             
-            # OTP is correct - delete from memory
-            self.otp_store.delete_otp(otp_key)
-            logger.info(f"OTP verified and deleted from memory: {otp_key}")
+            # OTP is correct - consume it; only one concurrent verify can win
+            if not await self.otp_store.delete_otp(otp_key):
+                return {"success": False, "error": "OTP not found or expired"}
+            logger.info(f"OTP verified and deleted from store: {otp_key}")
             
             return {
                 "success": True,
@@ -324,108 +310,47 @@ class OTPService:
             logger.error(f"Verify OTP error: {str(e)}")
             return {"success": False, "error": str(e)}
     
+    # Subject and template per email kind; templates are pre-rendered once
+    EMAIL_KINDS = {
+        "verification": ("Verify Your AI.ttorney Account", "get_verification_email_template"),
+        "password_reset": ("Reset Your AI.ttorney Password", "get_password_reset_email_template"),
+        "email_change": ("Verify Your New Email Address", "get_email_change_template"),
+    }
+    _prerendered: Dict[str, PrerenderedTemplate] = {}
+    
+    def _template(self, otp_type: str) -> PrerenderedTemplate:
+        template = self._prerendered.get(otp_type)
+        if template is None:
+            render = getattr(self, self.EMAIL_KINDS[otp_type][1])
+            template = PrerenderedTemplate(render, "otp_code", "user_name")
+            self._prerendered[otp_type] = template
+        return template
+    
+    def build_otp_email(self, email: str, otp_code: str, user_name: str, otp_type: str) -> OutboundEmail:
+        """Render an OTP email; the idempotency key dedups repeat sends per address and type"""
+        if otp_type not in self.EMAIL_KINDS:
+            raise ValueError("Invalid OTP type")
+        subject = self.EMAIL_KINDS[otp_type][0]
+        html_content = self._template(otp_type).render(otp_code=otp_code, user_name=escape_html(user_name))
+        return OutboundEmail(
+            to=[email],
+            subject=subject,
+            html=html_content,
+            from_email=self.from_email,
+            from_name=self.from_name,
+            idempotency_key=f"otp:{otp_type}:{email.lower().strip()}"
+        )
+    
     async def send_otp_email(self, email: str, otp_code: str, user_name: str, otp_type: str) -> Dict[str, Any]:
-        """Send OTP email using SMTP"""
+        """Queue an OTP email for delivery; returns once it is queued"""
         try:
-            if otp_type == "verification":
-                subject = "Verify Your AI.ttorney Account"
-                html_content = self.get_verification_email_template(otp_code, user_name)
-            elif otp_type == "password_reset":
-                subject = "Reset Your AI.ttorney Password"
-                html_content = self.get_password_reset_email_template(otp_code, user_name)
-            elif otp_type == "email_change":
-                subject = "Verify Your New Email Address"
-                html_content = self.get_email_change_template(otp_code, user_name)
-            else:
-                return {"success": False, "error": "Invalid OTP type"}
-            
-            # Create message
-            message = MIMEMultipart("alternative")
-            message["Subject"] = subject
-            message["From"] = f"{self.from_name} <{self.from_email}>"
-            message["To"] = email
-            
-            # Add HTML content
-            html_part = MIMEText(html_content, "html")
-            message.attach(html_part)
-            
-            # Send email with Gmail-optimized secure strategies
-            logger.info(f"Attempting to send OTP email to {email} using Gmail SMTP")
-            
-            # Strategy 1: Try Gmail's preferred SSL port 465 first
-            try:
-                logger.info("Strategy 1: Attempting Gmail SMTP_SSL on port 465 (recommended)")
-                
-                # Create SSL context for Gmail
-                context = ssl.create_default_context()
-                # For development, allow self-signed certificates but keep encryption
-                context.check_hostname = False
-                context.verify_mode = ssl.CERT_NONE
-                
-                with smtplib.SMTP_SSL(self.smtp_server, 465, context=context) as server:
-                    server.login(self.smtp_username, self.smtp_password)
-                    text = message.as_string()
-                    server.sendmail(self.from_email, [email], text)
-                    
-                logger.info(f"Strategy 1 SUCCESS: OTP email sent to {email} via secure Gmail SSL")
-                
-            except Exception as strategy1_error:
-                logger.error(f"Strategy 1 FAILED: {strategy1_error}")
-                
-                # Strategy 2: Try STARTTLS on port 587 with relaxed SSL
-                try:
-                    logger.info("Strategy 2: Attempting Gmail STARTTLS on port 587 with relaxed SSL")
-                    
-                    context = ssl.create_default_context()
-                    context.check_hostname = False
-                    context.verify_mode = ssl.CERT_NONE
-                    # Set minimum TLS version for Gmail compatibility
-                    context.minimum_version = ssl.TLSVersion.TLSv1_2
-                    
-                    with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                        server.starttls(context=context)
-                        server.login(self.smtp_username, self.smtp_password)
-                        text = message.as_string()
-                        server.sendmail(self.from_email, [email], text)
-                        
-                    logger.info(f"Strategy 2 SUCCESS: OTP email sent to {email} via Gmail STARTTLS")
-                    
-                except Exception as strategy2_error:
-                    logger.error(f"Strategy 2 FAILED: {strategy2_error}")
-                    
-                    # Strategy 3: Try with even more relaxed SSL settings
-                    try:
-                        logger.info("Strategy 3: Attempting with maximum SSL compatibility")
-                        
-                        context = ssl.create_default_context()
-                        context.check_hostname = False
-                        context.verify_mode = ssl.CERT_NONE
-                        context.set_ciphers('DEFAULT@SECLEVEL=1')
-                        # Allow older TLS versions if needed
-                        context.minimum_version = ssl.TLSVersion.TLSv1
-                        
-                        with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                            server.starttls(context=context)
-                            server.login(self.smtp_username, self.smtp_password)
-                            text = message.as_string()
-                            server.sendmail(self.from_email, [email], text)
-                            
-                        logger.info(f"Strategy 3 SUCCESS: OTP email sent to {email} with maximum compatibility")
-                        
-                    except Exception as strategy3_error:
-                        logger.error(f"Strategy 3 FAILED: {strategy3_error}")
-                        logger.error("ALL SECURE STRATEGIES FAILED")
-                        
-                        # Log the SMTP configuration for debugging
-                        logger.error(f"SMTP Server: {self.smtp_server}:{self.smtp_port}")
-                        logger.error(f"Username: {self.smtp_username}")
-                        logger.error(f"Password configured: {'Yes' if self.smtp_password else 'No'}")
-                        
-                        raise Exception(f"Failed to send email via Gmail SMTP. Please check credentials and network connectivity. Last error: {strategy3_error}")
-            
+            queued = await get_mail_queue().enqueue(
+                self.build_otp_email(email, otp_code, user_name, otp_type),
+                idempotency_ttl=self.OTP_RESEND_DEDUP_SECONDS
+            )
             return {
                 "success": True,
-                "message": "OTP email sent successfully"
+                "message": "OTP email queued" if queued else "OTP email already queued"
             }
             
         except Exception as e:
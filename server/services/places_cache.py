@@ -0,0 +1,383 @@
+"""
+Google Places Cache for AI.ttorney
+Cached, shared-connection access to the Google Maps APIs used by the places proxy
+
+Every places_proxy call used to open a new httpx client and hit Google, so the
+same "law firms near me" search from the same barangay spent Maps quota each
+time. This module keeps:
+
+- One pooled httpx.AsyncClient for all Google calls
+- A nearby-search cache bucketed by geohash cell and radius: searches are run
+  from the cell center, so every request inside the cell shares one result set
+  and distances are then computed from the caller's actual position
+- LRU caches for geocodes, place details and autocomplete suggestions
+- Vectorized (NumPy) Haversine distances and sorting
+
+Only OK / ZERO_RESULTS responses are cached; errors are never cached.
+"""
+
+import asyncio
+import logging
+import math
+import os
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+import httpx
+import numpy as np
+from cachetools import TTLCache
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_MAPS_BASE_URL = "https://maps.googleapis.com/maps/api"
+EARTH_RADIUS_KM = 6371.0
+MAX_NEARBY_RADIUS_METERS = 50000  # Google's limit for nearbysearch
+MAX_PAGES = 3  # Google returns at most 3 pages (60 results) per search
+PAGE_TOKEN_DELAY_SECONDS = 2  # next_page_token is not valid immediately
+
+# Cache sizes and lifetimes
+NEARBY_CACHE_TTL = 6 * 3600
+GEOCODE_CACHE_TTL = 24 * 3600
+DETAILS_CACHE_TTL = 24 * 3600
+AUTOCOMPLETE_CACHE_TTL = 10 * 60
+
+CACHEABLE_STATUSES = {"OK", "ZERO_RESULTS"}
+
+
+class PlacesAPIError(Exception):
+    """Google returned a non-200 HTTP response"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+# ============================================
+# Geohash and distances
+# ============================================
+
+_GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def geohash_encode(latitude: float, longitude: float, precision: int) -> str:
+    """Standard base32 geohash of a point"""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        rng, value = (lng_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            rng[0] = mid
+        else:
+            bits <<= 1
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(chars)
+
+
+def geohash_bounds(geohash: str) -> Tuple[float, float, float, float]:
+    """(min_lat, max_lat, min_lng, max_lng) of a geohash cell"""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = _GEOHASH_ALPHABET.index(char)
+        for shift in range(4, -1, -1):
+            rng = lng_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if (value >> shift) & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return lat_range[0], lat_range[1], lng_range[0], lng_range[1]
+
+
+def geohash_center(geohash: str) -> Tuple[float, float]:
+    min_lat, max_lat, min_lng, max_lng = geohash_bounds(geohash)
+    return (min_lat + max_lat) / 2, (min_lng + max_lng) / 2
+
+
+def precision_for_radius(radius_meters: int) -> int:
+    """
+    Geohash precision whose cells are small next to the search radius:
+    ~4.9 km cells for 20 km+ searches, ~1.2 x 0.6 km (about a barangay)
+    for 3 km+, ~150 m below that.
+    """
+    if radius_meters >= 20000:
+        return 5
+    if radius_meters >= 3000:
+        return 6
+    return 7
+
+
+def haversine_km(lat: float, lng: float, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """Distances in km from one point to arrays of points"""
+    lat1 = math.radians(lat)
+    lat2 = np.radians(lats)
+    dlat = lat2 - lat1
+    dlng = np.radians(lngs) - math.radians(lng)
+    a = np.sin(dlat / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def place_distances_km(results: List[Dict[str, Any]], lat: float, lng: float) -> np.ndarray:
+    """Distance of each Places result from a point; inf where the result has no location"""
+    count = len(results)
+    lats = np.full(count, np.nan)
+    lngs = np.full(count, np.nan)
+    for i, result in enumerate(results):
+        location = result.get("geometry", {}).get("location") or {}
+        if "lat" in location and "lng" in location:
+            lats[i] = location["lat"]
+            lngs[i] = location["lng"]
+    distances = haversine_km(lat, lng, lats, lngs)
+    return np.where(np.isnan(distances), np.inf, distances)
+
+
+def with_distances(
+    results: List[Dict[str, Any]],
+    lat: float,
+    lng: float,
+    sort: bool = True,
+    max_km: Optional[float] = None,
+    limit: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Copies of `results` with distance_km (999 when unknown), optionally
+    filtered to max_km and sorted nearest first (stable for ties).
+    """
+    if not results:
+        return []
+    distances = place_distances_km(results, lat, lng)
+    order = np.argsort(distances, kind="stable") if sort else np.arange(len(results))
+    if max_km is not None:
+        order = order[distances[order] <= max_km]
+    if limit is not None:
+        order = order[:limit]
+
+    annotated = []
+    for i in order.tolist():
+        distance = distances[i]
+        annotated.append({**results[i], "distance_km": round(float(distance), 2) if np.isfinite(distance) else 999})
+    return annotated
+
+
+def _normalize_text(text: str) -> str:
+    return " ".join(text.casefold().split())
+
+
+# ============================================
+# Client
+# ============================================
+
+class PlacesCache:
+    """Google Maps API access with per-endpoint caches and one pooled client"""
+
+    def __init__(self, api_key: Optional[str] = None):
+        self._api_key = api_key
+        self._client: Optional[httpx.AsyncClient] = None
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+        self.nearby_cache = TTLCache(maxsize=2000, ttl=NEARBY_CACHE_TTL)
+        self.geocode_cache = TTLCache(maxsize=5000, ttl=GEOCODE_CACHE_TTL)
+        self.details_cache = TTLCache(maxsize=5000, ttl=DETAILS_CACHE_TTL)
+        self.autocomplete_cache = TTLCache(maxsize=5000, ttl=AUTOCOMPLETE_CACHE_TTL)
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+        self.google_calls = 0
+
+    @property
+    def api_key(self) -> Optional[str]:
+        return self._api_key or os.getenv("GOOGLE_MAPS_API_KEY")
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=GOOGLE_MAPS_BASE_URL,
+                timeout=httpx.Timeout(10.0, connect=5.0),
+                limits=httpx.Limits(max_connections=50, max_keepalive_connections=20)
+            )
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _get(self, path: str, params: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        self.google_calls += 1
+        kwargs = {"timeout": timeout} if timeout is not None else {}
+        response = await self._get_client().get(path, params={**params, "key": self.api_key}, **kwargs)
+        if response.status_code != 200:
+            raise PlacesAPIError(response.status_code, f"Google Maps API error: {response.status_code}")
+        return response.json()
+
+    async def _cached(
+        self,
+        cache: TTLCache,
+        key: Hashable,
+        fetch: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        Serve from cache; concurrent misses for the same key share one fetch.
+
+        The fetch runs as its own task and every caller waits on it through
+        asyncio.shield, so a caller that is cancelled (client disconnect)
+        neither cancels the fetch nor fails the other callers waiting on it.
+        """
+        data = cache.get(key)
+        if data is not None:
+            self.hits += 1
+            return data
+
+        inflight_key = (id(cache), key)
+        task = self._inflight.get(inflight_key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.create_task(self._fetch_into(cache, key, fetch))
+            self._inflight[inflight_key] = task
+            task.add_done_callback(lambda done: self._fetch_done(inflight_key, done))
+        return await asyncio.shield(task)
+
+    async def _fetch_into(
+        self,
+        cache: TTLCache,
+        key: Hashable,
+        fetch: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        data = await fetch()
+        if data.get("status") in CACHEABLE_STATUSES:
+            cache[key] = data
+        return data
+
+    def _fetch_done(self, inflight_key: Hashable, task: asyncio.Task):
+        if self._inflight.get(inflight_key) is task:
+            del self._inflight[inflight_key]
+        if not task.cancelled():
+            task.exception()  # Retrieved here in case every caller was cancelled
+
+    # ============================================
+    # Endpoints
+    # ============================================
+
+    async def geocode(self, address: str) -> Dict[str, Any]:
+        return await self._cached(
+            self.geocode_cache,
+            _normalize_text(address),
+            lambda: self._get("/geocode/json", {"address": address})
+        )
+
+    async def place_details(self, place_id: str, fields: str) -> Dict[str, Any]:
+        return await self._cached(
+            self.details_cache,
+            (place_id, fields),
+            lambda: self._get("/place/details/json", {"place_id": place_id, "fields": fields})
+        )
+
+    async def autocomplete(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        key = (
+            _normalize_text(params["input"]),
+            params.get("location"),
+            params.get("radius") if params.get("location") else None,
+            params.get("components"),
+            params.get("language"),
+        )
+        return await self._cached(
+            self.autocomplete_cache,
+            key,
+            lambda: self._get("/place/autocomplete/json", params, timeout=5.0)
+        )
+
+    async def nearby(
+        self,
+        latitude: float,
+        longitude: float,
+        radius: int,
+        place_type: Optional[str] = None,
+        keyword: Optional[str] = None,
+        all_pages: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Nearby search shared by every caller in the same geohash cell.
+
+        The search runs from the cell center with the radius widened by only
+        the cell's half-diagonal, so it covers the caller's own circle without
+        diluting Google's 20 most prominent results over a much larger area;
+        callers filter by their real position afterwards.
+        """
+        precision = precision_for_radius(radius)
+        cell = geohash_encode(latitude, longitude, precision)
+        center_lat, center_lng = geohash_center(cell)
+        min_lat, max_lat, min_lng, max_lng = geohash_bounds(cell)
+        half_diagonal_m = float(haversine_km(min_lat, min_lng, np.array([max_lat]), np.array([max_lng]))[0]) * 500
+        search_radius = min(math.ceil(radius + half_diagonal_m), MAX_NEARBY_RADIUS_METERS)
+
+        params: Dict[str, Any] = {"location": f"{center_lat:.6f},{center_lng:.6f}", "radius": search_radius}
+        if place_type:
+            params["type"] = place_type
+        if keyword:
+            params["keyword"] = keyword
+
+        key = (cell, search_radius, place_type, keyword, all_pages)
+        return await self._cached(self.nearby_cache, key, lambda: self._fetch_nearby(params, all_pages))
+
+    async def _fetch_nearby(self, params: Dict[str, Any], all_pages: bool) -> Dict[str, Any]:
+        data = await self._get("/place/nearbysearch/json", params)
+        if not all_pages or data.get("status") != "OK":
+            return data
+
+        results = list(data.get("results", []))
+        next_page_token = data.get("next_page_token")
+        pages = 1
+        while next_page_token and pages < MAX_PAGES:
+            # Google requirement: the token becomes valid after a short delay
+            await asyncio.sleep(PAGE_TOKEN_DELAY_SECONDS)
+            try:
+                page = await self._get("/place/nearbysearch/json", {"pagetoken": next_page_token})
+            except PlacesAPIError:
+                break
+            if page.get("status") != "OK" or not page.get("results"):
+                break
+            results.extend(page["results"])
+            next_page_token = page.get("next_page_token")
+            pages += 1
+
+        return {"status": "OK", "results": results}
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "google_calls": self.google_calls,
+            "nearby_entries": len(self.nearby_cache),
+            "geocode_entries": len(self.geocode_cache),
+            "details_entries": len(self.details_cache),
+            "autocomplete_entries": len(self.autocomplete_cache),
+        }
+
+
+# Singleton instance
+_places_cache: Optional[PlacesCache] = None
+
+
+def get_places_cache() -> PlacesCache:
+    """Get or create PlacesCache singleton"""
+    global _places_cache
+    if _places_cache is None:
+        _places_cache = PlacesCache()
+    return _places_cache
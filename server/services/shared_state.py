@@ -0,0 +1,392 @@
+"""
+Shared State Backend for AI.ttorney
+Small key-value abstraction for state that must be shared across API workers
+
+Guest rate limiting and OTP codes used to live in process-local dicts, so
+running uvicorn with several workers multiplied guest quotas and broke OTP
+verification whenever the verify request reached a different worker. Both now
+go through a SharedStateBackend:
+
+- MemoryStateBackend: single-process default, same behavior as before
+- RedisStateBackend: any server speaking the Redis protocol (Redis, Valkey,
+  KeyDB, or a local stand-in for tests), selected with REDIS_URL
+
+Counters are atomic and every key can carry a native expiry, so nothing needs
+a periodic full scan to stay bounded (the memory backend expires keys from a
+heap ordered by deadline).
+"""
+
+import heapq
+import logging
+import os
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SharedStateBackend(ABC):
+    """Async key-value operations the stores need; ttl values are in seconds"""
+
+    name = "abstract"
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: str, ttl: Optional[float] = None, only_if_absent: bool = False) -> bool:
+        """Set a string value; with only_if_absent returns False if the key exists"""
+
+    @abstractmethod
+    async def delete(self, key: str) -> bool:
+        """Delete a key; True if it existed (lets callers consume a key exactly once)"""
+
+    @abstractmethod
+    async def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        """Atomically add to an integer; ttl is applied only when the key is created"""
+
+    @abstractmethod
+    async def ttl(self, key: str) -> Optional[float]:
+        """Seconds until the key expires, or None if it is missing or persistent"""
+
+    @abstractmethod
+    async def hset(self, key: str, mapping: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        """Set hash fields; ttl (if given) replaces the key's expiry"""
+
+    @abstractmethod
+    async def hgetall(self, key: str) -> Dict[str, str]: ...
+
+    @abstractmethod
+    async def hincrby(self, key: str, field: str, amount: int = 1) -> Optional[int]:
+        """Atomically add to a hash field; None if the hash does not exist"""
+
+    async def close(self) -> None:
+        pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": self.name}
+
+
+# ============================================
+# In-memory backend
+# ============================================
+
+class MemoryStateBackend(SharedStateBackend):
+    """
+    Process-local backend; values are strings (or dicts for hashes) like in Redis.
+
+    Expiry is tracked in a min-heap of (expires_at, key). Every operation pops
+    at most REAP_BATCH entries that are already due, so expiry cost is
+    O(log n) per expired key and nothing ever scans the whole keyspace while
+    holding the lock. Heap entries for keys that were deleted or re-expired
+    are skipped when they surface, and the heap is rebuilt when such stale
+    entries outnumber live ones.
+    """
+
+    name = "memory"
+    REAP_BATCH = 64
+
+    def __init__(self):
+        self._data: Dict[str, Any] = {}
+        self._expires: Dict[str, float] = {}
+        self._heap: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+
+        # Stats
+        self.expired = 0
+        self.stale_skipped = 0
+        self.heap_rebuilds = 0
+        self._lag_total = 0.0
+        self._lag_max = 0.0
+
+    def _drop_expired(self, key: str, expires_at: float, now: float):
+        self._data.pop(key, None)
+        self._expires.pop(key, None)
+        lag = now - expires_at
+        self.expired += 1
+        self._lag_total += lag
+        self._lag_max = max(self._lag_max, lag)
+
+    def _reap(self, now: float, limit: Optional[int] = REAP_BATCH) -> int:
+        """Remove keys that are due, oldest first; touches nothing that is not due"""
+        removed = 0
+        heap = self._heap
+        while heap and heap[0][0] <= now and (limit is None or removed < limit):
+            expires_at, key = heapq.heappop(heap)
+            if self._expires.get(key) != expires_at:
+                self.stale_skipped += 1
+                continue
+            self._drop_expired(key, expires_at, now)
+            removed += 1
+        return removed
+
+    def _alive(self, key: str, now: float) -> bool:
+        self._reap(now)
+        expires_at = self._expires.get(key)
+        if expires_at is not None and expires_at <= now:
+            self._drop_expired(key, expires_at, now)
+            return False
+        return key in self._data
+
+    def _set_expiry(self, key: str, ttl: Optional[float], now: float):
+        if ttl is None:
+            self._expires.pop(key, None)
+            return
+        expires_at = now + ttl
+        self._expires[key] = expires_at
+        heapq.heappush(self._heap, (expires_at, key))
+        if len(self._heap) > 2 * len(self._expires) + self.REAP_BATCH:
+            self._heap = [(t, k) for k, t in self._expires.items()]
+            heapq.heapify(self._heap)
+            self.heap_rebuilds += 1
+
+    async def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            if not self._alive(key, time.monotonic()):
+                return None
+            value = self._data[key]
+            return value if isinstance(value, str) else None
+
+    async def set(self, key: str, value: str, ttl: Optional[float] = None, only_if_absent: bool = False) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            if only_if_absent and self._alive(key, now):
+                return False
+            self._reap(now)
+            self._data[key] = str(value)
+            self._set_expiry(key, ttl, now)
+            return True
+
+    async def delete(self, key: str) -> bool:
+        with self._lock:
+            existed = self._alive(key, time.monotonic())
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+            return existed
+
+    async def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        with self._lock:
+            now = time.monotonic()
+            if not self._alive(key, now):
+                self._data[key] = "0"
+                self._set_expiry(key, ttl, now)
+            value = int(self._data[key]) + amount
+            self._data[key] = str(value)
+            return value
+
+    async def ttl(self, key: str) -> Optional[float]:
+        with self._lock:
+            now = time.monotonic()
+            if not self._alive(key, now) or key not in self._expires:
+                return None
+            return self._expires[key] - now
+
+    async def hset(self, key: str, mapping: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if not self._alive(key, now) or not isinstance(self._data[key], dict):
+                self._data[key] = {}
+            self._data[key].update({k: str(v) for k, v in mapping.items()})
+            if ttl is not None:
+                self._set_expiry(key, ttl, now)
+
+    async def hgetall(self, key: str) -> Dict[str, str]:
+        with self._lock:
+            if not self._alive(key, time.monotonic()):
+                return {}
+            value = self._data[key]
+            return dict(value) if isinstance(value, dict) else {}
+
+    async def hincrby(self, key: str, field: str, amount: int = 1) -> Optional[int]:
+        with self._lock:
+            if not self._alive(key, time.monotonic()) or not isinstance(self._data[key], dict):
+                return None
+            value = int(self._data[key].get(field, "0")) + amount
+            self._data[key][field] = str(value)
+            return value
+
+    def purge_expired(self) -> int:
+        """Drop every key that is due; returns how many were removed"""
+        with self._lock:
+            return self._reap(time.monotonic(), limit=None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            overdue = self._heap[0][0] if self._heap and self._heap[0][0] <= now else None
+            approx_bytes = (
+                sys.getsizeof(self._data)
+                + sys.getsizeof(self._expires)
+                + sys.getsizeof(self._heap)
+                + sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in self._data.items())
+            )
+            return {
+                "backend": self.name,
+                "keys": len(self._data),
+                "keys_with_expiry": len(self._expires),
+                "heap_entries": len(self._heap),
+                "approx_bytes": approx_bytes,
+                "expired": self.expired,
+                "stale_heap_entries_skipped": self.stale_skipped,
+                "heap_rebuilds": self.heap_rebuilds,
+                # Time between a key's expiry and its removal
+                "expiry_lag_avg_ms": round(self._lag_total / self.expired * 1000, 2) if self.expired else 0.0,
+                "expiry_lag_max_ms": round(self._lag_max * 1000, 2),
+                "oldest_overdue_ms": round((now - overdue) * 1000, 2) if overdue is not None else 0.0,
+            }
+
+
+# ============================================
+# Redis-protocol backend
+# ============================================
+
+# HINCRBY that never creates the hash: one server-side step, so a hash another
+# worker writes (with its expiry) at the same moment is never touched
+HINCRBY_IF_EXISTS = """
+if redis.call('exists', KEYS[1]) == 1 then
+    return redis.call('hincrby', KEYS[1], ARGV[1], ARGV[2])
+end
+return nil
+"""
+
+
+class RedisStateBackend(SharedStateBackend):
+    """Backend for any Redis-protocol server, via redis.asyncio"""
+
+    name = "redis"
+
+    def __init__(self, url: str, key_prefix: str = "attorney:", client: Any = None):
+        """`client` replaces the connection made from `url` (e.g. a fakeredis client in tests)"""
+        self.url = url
+        self.key_prefix = key_prefix
+        if client is None:
+            # Optional dependency: only needed when REDIS_URL is configured
+            import redis.asyncio as redis_asyncio
+            client = redis_asyncio.from_url(url, decode_responses=True)
+        self._client = client
+        self._hincrby_if_exists = self._client.register_script(HINCRBY_IF_EXISTS)
+
+    def _k(self, key: str) -> str:
+        return f"{self.key_prefix}{key}"
+
+    @staticmethod
+    def _ms(ttl: float) -> int:
+        return max(1, int(ttl * 1000))
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self._client.get(self._k(key))
+
+    async def set(self, key: str, value: str, ttl: Optional[float] = None, only_if_absent: bool = False) -> bool:
+        result = await self._client.set(
+            self._k(key),
+            value,
+            px=self._ms(ttl) if ttl is not None else None,
+            nx=only_if_absent
+        )
+        return bool(result)
+
+    async def delete(self, key: str) -> bool:
+        return bool(await self._client.delete(self._k(key)))
+
+    async def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        k = self._k(key)
+        if ttl is None:
+            return int(await self._client.incrby(k, amount))
+        # MULTI/EXEC: create with expiry if missing, then increment, atomically
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.set(k, 0, px=self._ms(ttl), nx=True)
+            pipe.incrby(k, amount)
+            _, value = await pipe.execute()
+        return int(value)
+
+    async def ttl(self, key: str) -> Optional[float]:
+        remaining = await self._client.pttl(self._k(key))
+        return remaining / 1000 if remaining is not None and remaining >= 0 else None
+
+    async def hset(self, key: str, mapping: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        k = self._k(key)
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.hset(k, mapping={f: str(v) for f, v in mapping.items()})
+            if ttl is not None:
+                pipe.pexpire(k, self._ms(ttl))
+            await pipe.execute()
+
+    async def hgetall(self, key: str) -> Dict[str, str]:
+        return await self._client.hgetall(self._k(key)) or {}
+
+    async def hincrby(self, key: str, field: str, amount: int = 1) -> Optional[int]:
+        value = await self._hincrby_if_exists(keys=[self._k(key)], args=[field, amount])
+        return int(value) if value is not None else None
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, "url": self.url.split("@")[-1]}
+
+
+# ============================================
+# Sliding-window rate limiting
+# ============================================
+
+async def sliding_window_hit(
+    backend: SharedStateBackend,
+    key: str,
+    limit: int,
+    window_seconds: int,
+    now: Optional[float] = None
+) -> Tuple[bool, int, Optional[int]]:
+    """
+    Count one hit against a sliding-window limit and return
+    (allowed, estimated_count, seconds_until_allowed).
+
+    Uses the two-bucket sliding window counter: the previous fixed window's
+    count is weighted by how much of it still overlaps the sliding window.
+    Only INCR/GET with native expiry are needed, so it works on any backend,
+    and a rejected hit is rolled back so it does not count against the caller.
+    """
+    now = time.time() if now is None else now
+    window = int(now // window_seconds)
+    elapsed = (now % window_seconds) / window_seconds
+
+    current_key = f"{key}:{window}"
+    current = await backend.incr(current_key, 1, ttl=window_seconds * 2)
+    previous = int(await backend.get(f"{key}:{window - 1}") or 0)
+
+    estimated = previous * (1 - elapsed) + current
+    if estimated <= limit:
+        return True, int(estimated), None
+
+    await backend.incr(current_key, -1)
+
+    # Time until the previous window's weight decays enough for one more hit
+    if previous > 0:
+        needed = (previous + current - limit) / previous  # fraction of window still to pass
+        retry_after = max(1, int((min(needed, 1.0) - elapsed) * window_seconds) + 1)
+    else:
+        retry_after = max(1, int((1 - elapsed) * window_seconds) + 1)
+    return False, int(estimated - 1), retry_after
+
+
+# Singleton instance
+_shared_state: Optional[SharedStateBackend] = None
+
+
+def get_shared_state() -> SharedStateBackend:
+    """Get or create the shared state backend singleton (Redis when REDIS_URL is set)"""
+    global _shared_state
+    if _shared_state is None:
+        redis_url = os.getenv("REDIS_URL")
+        if redis_url:
+            try:
+                _shared_state = RedisStateBackend(redis_url)
+                logger.info(f"✅ Shared state backend: redis ({redis_url.split('@')[-1]})")
+            except ImportError:
+                logger.error("❌ REDIS_URL is set but the redis package is not installed - "
+                             "falling back to per-process memory state")
+        if _shared_state is None:
+            _shared_state = MemoryStateBackend()
+    return _shared_state
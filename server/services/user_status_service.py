@@ -0,0 +1,339 @@
+"""
+User Status Service for AI.ttorney
+Single cached view of a user's moderation and consultation-ban state
+
+ViolationTrackingService.check_user_status, ConsultationBanService.check_booking_eligibility
+and the permanent-ban / account-status middleware all need the same handful of
+columns from public.users. This service loads them once per user and caches the
+row until the next moment its meaning changes on its own (suspension end or
+consultation ban end), capped at MAX_CACHE_SECONDS so changes made by other
+processes (admin panel) still show up.
+
+Time-based transitions are evaluated at read time, so an expired suspension is
+reported as active immediately; the sweeper persists those transitions in bulk
+instead of every request running a write path.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+import httpx
+from cachetools import TLRUCache
+
+from auth.service import invalidate_user_profile
+from services.supabase_service import SupabaseService
+
+logger = logging.getLogger(__name__)
+
+STATUS_COLUMNS = (
+    "id,account_status,strike_count,suspension_count,suspension_end,"
+    "last_violation_at,banned_at,consultation_ban_end"
+)
+
+MAX_CACHE_SECONDS = 60
+SWEEP_INTERVAL_SECONDS = 60
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+class _CachedStatus:
+    __slots__ = ("row", "expires_at")
+
+    def __init__(self, row: Dict[str, Any], expires_at: float):
+        self.row = row
+        self.expires_at = expires_at
+
+
+def _entry_expiry(key, entry: _CachedStatus, now: float) -> float:
+    return entry.expires_at
+
+
+class UserStatusService:
+    """Cached moderation/ban state per user plus the expiry sweeper"""
+
+    def __init__(self, maxsize: int = 10000):
+        self.supabase = SupabaseService()
+        self._cache: TLRUCache = TLRUCache(maxsize=maxsize, ttu=_entry_expiry)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._sweeper: Optional[asyncio.Task] = None
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+        self.swept_suspensions = 0
+        self.swept_bans = 0
+
+    # ============================================
+    # Loading and caching
+    # ============================================
+
+    async def get_status_row(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the user's status columns, or None if the user does not exist.
+
+        Raises:
+            Exception: if the row could not be loaded (callers decide whether
+                to fail open or closed)
+        """
+        entry = self._cache.get(user_id)
+        if entry is not None:
+            self.hits += 1
+            return entry.row
+
+        # Concurrent requests for the same user share one fetch
+        pending = self._inflight.get(user_id)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[user_id] = future
+        try:
+            row = await self._fetch(user_id)
+            if row is not None:
+                self._cache[user_id] = _CachedStatus(row, self._expiry_for(row))
+            future.set_result(row)
+            return row
+        except BaseException as e:
+            if isinstance(e, Exception):
+                future.set_exception(e)
+                # Mark retrieved so failures without waiters do not warn on GC
+                future.exception()
+            else:
+                future.cancel()
+            raise
+        finally:
+            self._inflight.pop(user_id, None)
+
+    async def _fetch(self, user_id: str) -> Optional[Dict[str, Any]]:
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            response = await client.get(
+                f"{self.supabase.rest_url}/users",
+                params={"id": f"eq.{user_id}", "select": STATUS_COLUMNS},
+                headers=self.supabase._get_headers(use_service_key=True)
+            )
+        if response.status_code != 200:
+            raise Exception(f"User status query failed: {response.status_code}")
+        data = response.json()
+        return data[0] if data else None
+
+    def _expiry_for(self, row: Dict[str, Any]) -> float:
+        """Cache until the next self-changing deadline, capped at MAX_CACHE_SECONDS"""
+        ttl = MAX_CACHE_SECONDS
+        now = datetime.now(timezone.utc)
+        deadlines = [_parse_timestamp(row.get("consultation_ban_end"))]
+        if row.get("account_status") == "suspended":
+            deadlines.append(_parse_timestamp(row.get("suspension_end")))
+        for deadline in deadlines:
+            if deadline and deadline > now:
+                ttl = min(ttl, (deadline - now).total_seconds())
+        return time.monotonic() + ttl
+
+    def invalidate(self, user_id: str):
+        """Drop a user's cached status after a moderation or ban write"""
+        if user_id:
+            self._cache.pop(str(user_id), None)
+
+    # ============================================
+    # Views used by the callers
+    # ============================================
+
+    @staticmethod
+    def effective_account_status(row: Dict[str, Any]) -> str:
+        """account_status with an elapsed suspension already treated as lifted"""
+        account_status = row.get("account_status") or "active"
+        if account_status == "suspended":
+            suspension_end = _parse_timestamp(row.get("suspension_end"))
+            if suspension_end and suspension_end <= datetime.now(timezone.utc):
+                return "active"
+        return account_status
+
+    async def get_account_status(self, user_id: str) -> Optional[str]:
+        row = await self.get_status_row(user_id)
+        return self.effective_account_status(row) if row else None
+
+    async def check_user_status(self, user_id: str) -> Dict[str, Any]:
+        """Posting/interaction eligibility, as ViolationTrackingService.check_user_status returns it"""
+        try:
+            row = await self.get_status_row(user_id)
+            if not row:
+                return {
+                    "is_allowed": False,
+                    "account_status": "unknown",
+                    "reason": "User not found"
+                }
+
+            account_status = self.effective_account_status(row)
+            suspension_end = row.get("suspension_end")
+
+            if account_status == "banned":
+                return {
+                    "is_allowed": False,
+                    "account_status": "banned",
+                    "reason": "Your account has been permanently banned for repeated violations of community guidelines.",
+                    "suspension_end": None
+                }
+
+            if account_status == "suspended" and suspension_end:
+                suspension_end_dt = _parse_timestamp(suspension_end)
+                return {
+                    "is_allowed": False,
+                    "account_status": "suspended",
+                    "reason": f"Your account is temporarily suspended until {suspension_end_dt.strftime('%Y-%m-%d %H:%M UTC')}.",
+                    "suspension_end": suspension_end
+                }
+
+            return {
+                "is_allowed": True,
+                "account_status": "active",
+                "reason": None,
+                "suspension_end": None
+            }
+
+        except Exception as e:
+            logger.error(f"❌ Failed to check user status: {str(e)}")
+            # Fail-open: allow user to post if check fails
+            return {
+                "is_allowed": True,
+                "account_status": "active",
+                "reason": None,
+                "suspension_end": None
+            }
+
+    async def check_booking_eligibility(self, user_id: str) -> Dict[str, Any]:
+        """Consultation booking eligibility, as ConsultationBanService returns it"""
+        try:
+            row = await self.get_status_row(user_id)
+            ban_end = _parse_timestamp(row.get("consultation_ban_end")) if row else None
+
+            if ban_end and ban_end > datetime.now(timezone.utc):
+                return {
+                    "can_book": False,
+                    "ban_status": "active",
+                    "ban_end": row.get("consultation_ban_end"),
+                    "message": f"You are temporarily banned from booking consultations until {ban_end.strftime('%Y-%m-%d %H:%M UTC')} due to cancelling accepted consultations."
+                }
+
+            return {
+                "can_book": True,
+                "ban_status": "none",
+                "ban_end": None,
+                "message": None
+            }
+
+        except Exception as e:
+            logger.error(f"❌ Failed to check booking eligibility: {str(e)}")
+            # Fail-closed: disallow booking if we cannot verify eligibility
+            return {
+                "can_book": False,
+                "ban_status": "unknown",
+                "ban_end": None,
+                "message": "Unable to verify booking eligibility at the moment. Please try again later."
+            }
+
+    # ============================================
+    # Expiry sweeper
+    # ============================================
+
+    async def sweep_expired(self) -> Dict[str, int]:
+        """Persist elapsed suspensions and consultation bans in two bulk updates"""
+        now = datetime.now(timezone.utc).isoformat()
+        headers = {**self.supabase._get_headers(use_service_key=True), "Prefer": "return=representation"}
+
+        async with httpx.AsyncClient(timeout=15.0) as client:
+            # Same reset _check_expired_suspensions used to do per request
+            suspensions = await client.patch(
+                f"{self.supabase.rest_url}/users",
+                params={
+                    "account_status": "eq.suspended",
+                    "suspension_end": f"lte.{now}",
+                    "select": "id"
+                },
+                json={"account_status": "active", "strike_count": 0, "suspension_end": None},
+                headers=headers
+            )
+            bans = await client.patch(
+                f"{self.supabase.rest_url}/users",
+                params={"consultation_ban_end": f"lte.{now}", "select": "id"},
+                json={"consultation_ban_end": None},
+                headers=headers
+            )
+
+        lifted = {"suspensions": 0, "bans": 0}
+        for kind, response in (("suspensions", suspensions), ("bans", bans)):
+            if response.status_code not in (200, 204):
+                logger.error(f"❌ Expired {kind} sweep failed: {response.status_code}")
+                continue
+            rows = response.json() if response.status_code == 200 else []
+            for row in rows:
+                self.invalidate(row["id"])
+                invalidate_user_profile(row["id"])
+            lifted[kind] = len(rows)
+
+        self.swept_suspensions += lifted["suspensions"]
+        self.swept_bans += lifted["bans"]
+        if lifted["suspensions"] or lifted["bans"]:
+            logger.info(f"⏰ Lifted {lifted['suspensions']} expired suspensions and {lifted['bans']} expired consultation bans")
+        return lifted
+
+    async def _sweep_loop(self, interval: float):
+        while True:
+            try:
+                await self.sweep_expired()
+            except Exception as e:
+                logger.error(f"❌ User status sweep error: {str(e)}")
+            await asyncio.sleep(interval)
+
+    def start_sweeper(self, interval: float = SWEEP_INTERVAL_SECONDS):
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_loop(interval))
+            logger.info(f"✅ User status sweeper started (every {interval:.0f}s)")
+
+    async def stop_sweeper(self):
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "cached_users": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "swept_suspensions": self.swept_suspensions,
+            "swept_bans": self.swept_bans,
+            "sweeper_running": self._sweeper is not None and not self._sweeper.done(),
+        }
+
+
+# Singleton instance
+_user_status_service: Optional[UserStatusService] = None
+
+
+def get_user_status_service() -> UserStatusService:
+    """Get or create UserStatusService singleton"""
+    global _user_status_service
+    if _user_status_service is None:
+        _user_status_service = UserStatusService()
+    return _user_status_service
+
+
+def invalidate_user_status(user_id: str):
+    """Drop cached status and profile for a user after their account state changes"""
+    get_user_status_service().invalidate(user_id)
+    invalidate_user_profile(user_id)
@@ -0,0 +1,164 @@
+"""
+Versioned Snapshot for AI.ttorney
+Base class for per-process copies of small, rarely changing tables
+
+A snapshot is built from every row of a table and served from memory. The
+table's version stamp (a counter bumped by a statement trigger, see
+database migrations 018 and 019) is polled in the background at most every
+VERSION_CHECK_SECONDS and the rows are reloaded only when it moved. Without
+a stamp the snapshot is reloaded every `ttl_seconds` instead.
+invalidate() makes the next request reload inline, for writes made by this
+server.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+VERSION_CHECK_SECONDS = 30  # How often the version stamp is polled
+SNAPSHOT_TTL_SECONDS = 600  # Reload interval when no version stamp is available
+
+RowLoader = Callable[[], Awaitable[List[Dict[str, Any]]]]
+VersionLoader = Callable[[], Awaitable[Optional[int]]]
+
+
+class VersionedSnapshot:
+    """In-memory table snapshot refreshed on a database version stamp"""
+
+    name = "Snapshot"  # Used in log messages
+    ttl_seconds = SNAPSHOT_TTL_SECONDS  # Reload interval when no version stamp is available
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self._loaded_at: Optional[float] = None
+        self._checked_at: float = 0.0
+        self._version_stamp: Optional[int] = None
+        self._version = 0
+        self._stale = False
+        # Bumped by invalidate(); a load that overlapped an invalidation stays stale
+        self._invalidation_seq = 0
+        self._refresh_task: Optional[asyncio.Task] = None
+
+        # Stats
+        self.loads = 0
+        self.version_checks = 0
+        self.invalidations = 0
+
+    def _build(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Replace the indexed data with `rows`; returns how many were kept"""
+        raise NotImplementedError
+
+    # ============================================
+    # Loading
+    # ============================================
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    @property
+    def version(self) -> int:
+        """Local build counter; changes on every reload"""
+        return self._version
+
+    def build(
+        self,
+        rows: Iterable[Dict[str, Any]],
+        version_stamp: Optional[int] = None,
+        invalidation_seq: Optional[int] = None
+    ) -> int:
+        """
+        Replace the snapshot with the given rows. `invalidation_seq` is the
+        counter read before the rows were loaded; if invalidate() ran since,
+        the rows may predate that write and the snapshot stays stale.
+        """
+        count = self._build(rows)
+        self._loaded_at = time.monotonic()
+        self._checked_at = self._loaded_at
+        self._version_stamp = version_stamp
+        if invalidation_seq is None or invalidation_seq == self._invalidation_seq:
+            self._stale = False
+        self._version += 1
+        self.loads += 1
+        return count
+
+    async def ensure_loaded(self, loader: RowLoader, version_loader: VersionLoader, force: bool = False) -> bool:
+        """
+        Make sure a snapshot is available. Returns True when the current one
+        was served without a reload.
+
+        The first load, a forced one and the one after invalidate() happen
+        inline. Otherwise the version stamp is checked in the background
+        when due, and requests keep being served from the current snapshot
+        while a reload runs.
+        """
+        if self.loaded and not force and not self._stale:
+            if time.monotonic() - self._checked_at >= VERSION_CHECK_SECONDS and not self._refreshing:
+                self._checked_at = time.monotonic()
+                self._refresh_task = asyncio.create_task(self._refresh(loader, version_loader))
+            return True
+
+        version = self._version
+        async with self._lock:
+            # Another request finished the load while we waited
+            if self._version != version and not force and not self._stale:
+                return True
+            try:
+                await self._reload(loader, await self._get_version_stamp(version_loader))
+                return False
+            except Exception as e:
+                if not self.loaded:
+                    raise
+                logger.warning(f"{self.name} reload failed, serving previous snapshot: {e}")
+                self._stale = False  # Retry on the next version check, not on every request
+                return True
+
+    @property
+    def _refreshing(self) -> bool:
+        return self._refresh_task is not None and not self._refresh_task.done()
+
+    async def _refresh(self, loader: RowLoader, version_loader: VersionLoader):
+        """Reload when the version stamp moved, or after the TTL when there is no stamp"""
+        try:
+            async with self._lock:
+                stamp = await self._get_version_stamp(version_loader)
+                if stamp is not None and stamp == self._version_stamp:
+                    return
+                if stamp is None and time.monotonic() - self._loaded_at < self.ttl_seconds:
+                    return
+                await self._reload(loader, stamp)
+        except Exception as e:
+            logger.warning(f"{self.name} refresh failed, serving previous snapshot: {e}")
+
+    async def _get_version_stamp(self, version_loader: VersionLoader) -> Optional[int]:
+        self.version_checks += 1
+        try:
+            return await version_loader()
+        except Exception as e:
+            logger.warning(f"{self.name} version check failed: {e}")
+            return None
+
+    async def _reload(self, loader: RowLoader, stamp: Optional[int]):
+        start = time.perf_counter()
+        invalidation_seq = self._invalidation_seq
+        count = self.build(await loader(), stamp, invalidation_seq)
+        logger.info(f"{self.name} loaded: {count} rows (version {stamp}) in {time.perf_counter() - start:.2f}s")
+
+    def invalidate(self):
+        """Reload on the next request"""
+        self._stale = True
+        self._invalidation_seq += 1
+        self.invalidations += 1
+
+    def snapshot_stats(self) -> Dict[str, Any]:
+        return {
+            "version": self._version,
+            "version_stamp": self._version_stamp,
+            "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self.loaded else None,
+            "loads": self.loads,
+            "version_checks": self.version_checks,
+            "invalidations": self.invalidations,
+        }
@@ -26,6 +26,7 @@ from typing import Dict, Any, Optional, List, Union
 from datetime import datetime, timedelta
 import httpx
 from services.supabase_service import SupabaseService
+from services.user_status_service import get_user_status_service, invalidate_user_status
 from models.violation_types import ViolationType, SuspensionType, AccountStatus
 
 logger = logging.getLogger(__name__)
@@ -194,6 +195,9 @@ class ViolationTrackingService:
         """
         Check if user is allowed to post/interact.
         
+        Served from the shared user status cache (services/user_status_service.py);
+        elapsed suspensions count as lifted and are persisted by its sweeper.
+        
         Args:
             user_id: UUID of the user
         
@@ -204,55 +208,7 @@ class ViolationTrackingService:
                 - reason: Reason if not allowed
                 - suspension_end: When suspension ends (if suspended)
         """
-        try:
-            # Check for expired suspensions first
-            await self._check_expired_suspensions(user_id)
-            
-            user_data = await self._get_user_status(user_id)
-            if not user_data:
-                return {
-                    "is_allowed": False,
-                    "account_status": "unknown",
-                    "reason": "User not found"
-                }
-            
-            account_status = user_data.get("account_status", "active")
-            suspension_end = user_data.get("suspension_end")
-            
-            if account_status == "banned":
-                return {
-                    "is_allowed": False,
-                    "account_status": "banned",
-                    "reason": "Your account has been permanently banned for repeated violations of community guidelines.",
-                    "suspension_end": None
-                }
-            
-            if account_status == "suspended":
-                if suspension_end:
-                    suspension_end_dt = datetime.fromisoformat(suspension_end.replace('Z', '+00:00'))
-                    return {
-                        "is_allowed": False,
-                        "account_status": "suspended",
-                        "reason": f"Your account is temporarily suspended until {suspension_end_dt.strftime('%Y-%m-%d %H:%M UTC')}.",
-                        "suspension_end": suspension_end
-                    }
-            
-            return {
-                "is_allowed": True,
-                "account_status": "active",
-                "reason": None,
-                "suspension_end": None
-            }
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to check user status: {str(e)}")
-            # Fail-open: allow user to post if check fails
-            return {
-                "is_allowed": True,
-                "account_status": "active",
-                "reason": None,
-                "suspension_end": None
-            }
+        return await get_user_status_service().check_user_status(user_id)
     
     async def get_user_violations(
         self,
@@ -352,6 +308,7 @@ class ViolationTrackingService:
                     headers=self.supabase._get_headers(use_service_key=True)
                 )
                 
+                invalidate_user_status(user_id)
                 return response.status_code in [200, 204]
         except Exception as e:
             logger.error(f"❌ Failed to update user status: {str(e)}")
@@ -445,33 +402,6 @@ class ViolationTrackingService:
             logger.error(f"❌ Failed to create suspension record: {str(e)}")
             return False
     
-    async def _check_expired_suspensions(self, user_id: str) -> bool:
-        """Check and reset expired suspensions for a user."""
-        try:
-            user_data = await self._get_user_status(user_id)
-            if not user_data:
-                return False
-            
-            if user_data.get("account_status") == AccountStatus.SUSPENDED.value:
-                suspension_end = user_data.get("suspension_end")
-                if suspension_end:
-                    suspension_end_dt = datetime.fromisoformat(suspension_end.replace('Z', '+00:00'))
-                    if suspension_end_dt <= datetime.utcnow():
-                        # Suspension has expired, reset user
-                        logger.info(f"⏰ Resetting expired suspension for user {user_id[:8]}...")
-                        await self._update_user_status(
-                            user_id=user_id,
-                            strike_count=0,
-                            suspension_count=user_data.get("suspension_count", 0),
-                            account_status=AccountStatus.ACTIVE,
-                            suspension_end=None
-                        )
-                        return True
-            return False
-        except Exception as e:
-            logger.error(f"❌ Failed to check expired suspensions: {str(e)}")
-            return False
-    
     def _generate_user_message(
         self,
         action_taken: str,
@@ -3,6 +3,7 @@ from fastapi import WebSocket
 import json
 import time
 from typing import List
+from services.lawyer_directory import invalidate_lawyer_directory
 
 class ConnectionManager:
     def __init__(self):
@@ -35,6 +36,7 @@ manager = ConnectionManager()
 
 async def notify_lawyers_update():
     """Notify all connected clients that lawyers data has been updated"""
+    invalidate_lawyer_directory()
     message = json.dumps({
         "type": "DATA_UPDATED",
         "message": "Lawyers data has been updated",
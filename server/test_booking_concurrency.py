@@ -0,0 +1,250 @@
+"""
+Booking Concurrency Stress Test
+
+Fires many simultaneous create_consultation_request calls for a handful of
+slots and verifies that no slot ends up double-booked.
+
+Runs offline: the Supabase client is replaced by an in-memory table that
+enforces the same rule as uq_consultation_requests_active_slot
+(migrations/015) and raises a 23505 error on violation, with a small
+random latency so requests genuinely overlap across threads.
+
+Three phases:
+1. Single node - the in-process slot reservation table absorbs contention
+2. Many nodes  - reservations disabled, every request reaches the "database"
+3. Status changes - a declined or cancelled booking frees its slot on this
+   node right away, an accepted one keeps it
+
+Usage:
+    python test_booking_concurrency.py
+"""
+
+import asyncio
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from uuid import uuid4
+
+import services.consultation_service as consultation_service_module
+from services.consultation_service import (
+    BookingConflictError,
+    ConsultationService,
+    SlotReservationTable,
+    release_slot_reservation,
+)
+
+LAWYER_ID = "lawyer-profile-1"
+SLOTS = ["09:00", "10:00", "11:00", "14:00", "15:00"]
+THREADS = 8
+REQUESTS_PER_THREAD = 40
+
+
+class UniqueViolation(Exception):
+    """Mimics postgrest.exceptions.APIError for a unique violation"""
+    code = "23505"
+
+    def __init__(self):
+        super().__init__('duplicate key value violates unique constraint "uq_consultation_requests_active_slot"')
+
+
+class Result:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeTable:
+    def __init__(self, db, name):
+        self.db = db
+        self.name = name
+        self.filters = []
+        self.payload = None
+        self.changes = None
+
+    def select(self, *args, **kwargs):
+        return self
+
+    def eq(self, column, value):
+        self.filters.append((column, value))
+        return self
+
+    def is_(self, column, value):
+        return self
+
+    def in_(self, column, values):
+        return self
+
+    def limit(self, count):
+        return self
+
+    def insert(self, payload):
+        self.payload = payload
+        return self
+
+    def update(self, changes):
+        self.changes = changes
+        return self
+
+    def execute(self):
+        if self.name == "lawyer_info":
+            return Result([{"name": "Atty. Test", "accepting_consultations": True, "lawyer_id": "lawyer-user-1"}])
+        if self.name == "consultation_requests" and self.payload is not None:
+            return Result([self.db.insert(self.payload)])
+        if self.name == "consultation_requests" and "id" in dict(self.filters):
+            # Status changes: look up the consultation, then update it
+            rows = self.db.find(self.filters)
+            for row in rows:
+                row.update(self.changes or {})
+            return Result(rows)
+        # Duplicate-pending checks and notification lookups find nothing
+        return Result([])
+
+
+class FakeDatabase:
+    """consultation_requests with the active-slot unique index"""
+
+    def __init__(self):
+        self.rows = []
+        self.attempts = 0
+        self.lock = threading.Lock()
+
+    def table(self, name):
+        return FakeTable(self, name)
+
+    def insert(self, payload):
+        time.sleep(random.uniform(0.001, 0.005))  # network + commit latency
+        key = (payload["lawyer_id"], payload["consultation_date"], payload["consultation_time"])
+        with self.lock:
+            self.attempts += 1
+            for row in self.rows:
+                if row["status"] in ("pending", "accepted") and \
+                        (row["lawyer_id"], row["consultation_date"], row["consultation_time"]) == key:
+                    raise UniqueViolation()
+            row = dict(payload, id=str(uuid4()))
+            self.rows.append(row)
+            return row
+
+    def find(self, filters):
+        with self.lock:
+            return [row for row in self.rows if all(row.get(column) == value for column, value in filters)]
+
+
+async def book_many(service: ConsultationService, booking_date: str, count: int) -> Counter:
+    outcomes = Counter()
+
+    async def book(n: int):
+        try:
+            await service.create_consultation_request(
+                user_id=f"user-{uuid4()}",
+                lawyer_id=LAWYER_ID,
+                message="Stress test",
+                email="stress@example.com",
+                mobile_number="09170000000",
+                consultation_date=booking_date,
+                consultation_time=random.choice(SLOTS),
+                consultation_mode="online"
+            )
+            outcomes["booked"] += 1
+        except BookingConflictError:
+            outcomes["conflict"] += 1
+
+    await asyncio.gather(*(book(n) for n in range(count)))
+    return outcomes
+
+
+def run_phase(name: str, reservations: SlotReservationTable) -> bool:
+    consultation_service_module.slot_reservations = reservations
+    db = FakeDatabase()
+    service = ConsultationService(db)
+
+    async def no_notification(**kwargs):
+        return None
+    service._notify_lawyer_new_consultation = no_notification
+
+    booking_date = (date.today() + timedelta(days=3)).isoformat()
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        futures = [
+            pool.submit(asyncio.run, book_many(service, booking_date, REQUESTS_PER_THREAD))
+            for _ in range(THREADS)
+        ]
+        outcomes = sum((f.result() for f in futures), Counter())
+
+    per_slot = Counter(row["consultation_time"] for row in db.rows)
+    double_booked = {slot: n for slot, n in per_slot.items() if n > 1}
+    passed = not double_booked and outcomes["booked"] == len(db.rows) == len(SLOTS)
+
+    print(f"\n{name}")
+    print(f"   requests:      {THREADS * REQUESTS_PER_THREAD}")
+    print(f"   booked:        {outcomes['booked']}")
+    print(f"   conflicts:     {outcomes['conflict']}")
+    print(f"   DB inserts:    {db.attempts}")
+    print(f"   rows per slot: {dict(sorted(per_slot.items()))}")
+    print(f"   {'✅ PASS' if passed else '❌ FAIL'} - double-booked slots: {double_booked or 'none'}")
+    return passed
+
+
+def run_status_phase() -> bool:
+    consultation_service_module.slot_reservations = SlotReservationTable(ttl_seconds=15)
+    db = FakeDatabase()
+    service = ConsultationService(db)
+
+    async def no_notification(**kwargs):
+        return None
+    service._notify_lawyer_new_consultation = no_notification
+
+    booking_date = (date.today() + timedelta(days=3)).isoformat()
+    checks = []
+
+    async def book(user_id: str):
+        try:
+            result = await service.create_consultation_request(
+                user_id=user_id,
+                lawyer_id=LAWYER_ID,
+                message="Status test",
+                email="status@example.com",
+                mobile_number="09170000000",
+                consultation_date=booking_date,
+                consultation_time=SLOTS[0],
+                consultation_mode="online"
+            )
+            return result["data"]
+        except BookingConflictError:
+            return None
+
+    async def scenario():
+        first = await book("user-a")
+        checks.append(("slot is held right after booking", first and await book("user-b") is None))
+
+        # Lawyer declines through the service
+        await service.update_consultation_status(first["id"], "rejected", LAWYER_ID, is_lawyer=True)
+        second = await book("user-b")
+        checks.append(("declined booking frees the slot", second is not None))
+
+        # User cancels through a router: the status is written directly, then the slot released
+        db.find([("id", second["id"])])[0]["status"] = "cancelled"
+        release_slot_reservation(second, "cancelled")
+        third = await book("user-c")
+        checks.append(("cancelled booking frees the slot", third is not None))
+
+        await service.update_consultation_status(third["id"], "accepted", LAWYER_ID, is_lawyer=True)
+        checks.append(("accepted booking keeps the slot", await book("user-d") is None))
+
+    asyncio.run(scenario())
+
+    print("\nPhase 3: status changes release the slot reservation")
+    for name, ok in checks:
+        print(f"   {'✅' if ok else '❌'} {name}")
+    return all(ok for _, ok in checks)
+
+
+if __name__ == "__main__":
+    results = [
+        run_phase("Phase 1: single node (slot reservations enabled)", SlotReservationTable(ttl_seconds=15)),
+        run_phase("Phase 2: many nodes (reservations disabled, index only)", SlotReservationTable(ttl_seconds=0)),
+        run_status_phase(),
+    ]
+    sys.exit(0 if all(results) else 1)
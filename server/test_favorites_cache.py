@@ -0,0 +1,165 @@
+"""
+Favorites Cache Test
+
+Checks services/favorites_cache.py with a fake loader: one load per user,
+batch checks, add/remove keeping the cached sets current, invalidate(),
+loads that overlap a write, and the "is_favorite" / "is_bookmarked" flags
+embedded in the glossary and legal guide listings. No database is needed.
+
+Usage:
+    python test_favorites_cache.py
+"""
+
+import asyncio
+import json
+import sys
+
+import services.favorites_cache as favorites_cache
+from models.legal_article import LegalArticleResponse
+from services.favorites_cache import FavoritesCache, get_user_favorites, user_id_from
+from services.glossary_index import GlossaryIndex
+from services.guide_cache import GuideCache
+
+# user -> kind -> IDs in the database
+DATABASE = {
+    "u1": {"terms": ["t1", "t3"], "guides": ["a2"]},
+    "u2": {"terms": [], "guides": []},
+}
+
+TERMS = [
+    {"id": "t1", "term_en": "Annulment", "term_fil": "Pagpapawalang-bisa", "category": "family"},
+    {"id": "t2", "term_en": "Estafa", "term_fil": "Estafa", "category": "criminal"},
+    {"id": "t3", "term_en": "Legitime", "term_fil": "Lehitima", "category": "family"},
+]
+
+ARTICLES = [
+    {"id": "a1", "title_en": "Filing for Annulment", "category": "family", "content_en": "Grounds...",
+     "created_at": "2025-01-05T08:00:00+00:00"},
+    {"id": "a2", "title_en": "Final Pay", "category": "labor", "content_en": "Within 30 days...",
+     "created_at": "2025-01-02T08:00:00+00:00"},
+]
+
+
+def run() -> bool:
+    results = []
+
+    def expect(name, condition):
+        print(f"   {'✅' if condition else '❌'} {name}")
+        results.append(bool(condition))
+
+    calls = []
+
+    def make_cache():
+        cache = FavoritesCache()
+
+        async def fetch(kind, user_id):
+            calls.append((kind, user_id))
+            return list(DATABASE[user_id][kind])
+
+        cache._fetch = fetch
+        return cache
+
+    print("\n⭐ Membership")
+
+    async def membership():
+        cache = make_cache()
+        first = await cache.get_ids("terms", "u1")
+        second = await cache.get_ids("terms", "u1")
+        expect("a user's set is loaded once", first == second == {"t1", "t3"} and calls == [("terms", "u1")])
+        expect("terms and guides are separate sets", await cache.get_ids("guides", "u1") == {"a2"})
+        expect("batch check keeps request order and drops duplicates",
+               await cache.check("terms", "u1", ["t3", "t2", "t1", "t3"]) == ["t3", "t1"])
+        expect("users do not share sets", await cache.check("terms", "u2", ["t1", "t3"]) == [])
+
+        # The routes write to the database first, then update the cache
+        def write(kind, user_id, item_id, present):
+            stored = DATABASE[user_id][kind]
+            if present:
+                stored.append(item_id)
+                cache.add(kind, user_id, item_id)
+            else:
+                stored.remove(item_id)
+                cache.remove(kind, user_id, item_id)
+
+        write("terms", "u2", "t2", True)
+        write("terms", "u1", "t1", False)
+        expect("add and remove update cached sets without a reload",
+               await cache.get_ids("terms", "u2") == {"t2"} and await cache.get_ids("terms", "u1") == {"t3"}
+               and len(calls) == 3)
+
+        write("guides", "u2", "a1", True)
+        expect("writes for uncached users are left to the next load",
+               await cache.get_ids("guides", "u2") == {"a1"} and calls[-1] == ("guides", "u2"))
+
+        cache.invalidate("terms", "u1")
+        reloaded = await cache.get_ids("terms", "u1")
+        expect("invalidate() reloads on the next read", reloaded == {"t3"} and len(calls) == 5)
+
+        # A bookmark is added while the user's set is being loaded
+        overlapping = make_cache()
+        original = overlapping._fetch
+
+        async def slow_fetch(kind, user_id):
+            rows = await original(kind, user_id)
+            overlapping.add(kind, user_id, "a1")
+            return rows
+
+        overlapping._fetch = slow_fetch
+        await overlapping.get_ids("guides", "u1")
+        overlapping._fetch = original
+        expect("a load that overlapped a write is not cached", await overlapping.get_ids("guides", "u1") == {"a2"}
+               and calls[-1] == ("guides", "u1") and overlapping.misses == 2)
+
+        favorites_cache._favorites_cache = cache
+        expect("listings get the signed-in user's set", await get_user_favorites("terms", {"user": {"id": "u1"}}) == {"t3"})
+        expect("listing flags are skipped for anonymous users",
+               await get_user_favorites("guides", None) is None and user_id_from({"profile": {"id": "u1"}}) == "u1")
+
+        async def failing(kind, user_id):
+            raise Exception("database unavailable")
+
+        cache._fetch = failing
+        cache.invalidate("guides", "u1")
+        expect("listing flags are skipped when the set cannot be loaded",
+               await get_user_favorites("guides", {"user": {"id": "u1"}}) is None)
+        favorites_cache._favorites_cache = None
+
+    asyncio.run(membership())
+
+    print("\n📖 Glossary flags")
+    index = GlossaryIndex()
+    index.build(TERMS)
+    matches, facets = index.query()
+    plain = json.loads(index.render_page(matches, facets, 1, 10))
+    flagged = json.loads(index.render_page(matches, facets, 1, 10, favorites=frozenset({"t1", "t3"})))
+    expect("anonymous listing has no flags", all("is_favorite" not in term for term in plain["terms"]))
+    expect("signed-in listing flags every term",
+           {term["id"]: term["is_favorite"] for term in flagged["terms"]} == {"t1": True, "t2": False, "t3": True})
+    everything = json.loads(index.render_all(frozenset({"t2"})))
+    expect("/terms/all carries flags too",
+           [term["is_favorite"] for term in everything["terms"]] == [False, True, False] and everything["total"] == 3)
+
+    print("\n🔖 Guide flags")
+    guides = GuideCache()
+    guides.build(ARTICLES)
+    anonymous_body, anonymous_etag = guides.list_response(None, None, 10, 0)
+    body, etag = guides.list_response(None, None, 10, 0, bookmarks=frozenset({"a2"}))
+    data = json.loads(body)["data"]
+    expect("anonymous listing has no flags", "is_bookmarked" not in anonymous_body)
+    expect("signed-in listing flags every article", {a["id"]: a["is_bookmarked"] for a in data} == {"a1": False, "a2": True})
+    expect("flagged body still matches LegalArticleResponse",
+           [a.id for a in LegalArticleResponse.model_validate_json(body).data] == ["a2", "a1"])
+    expect("flags change the ETag", etag != anonymous_etag)
+    other_user = guides.list_response(None, None, 10, 0, bookmarks=frozenset({"a2", "not-on-page"}))
+    expect("same bookmarks on the page reuse the rendered body", other_user == (body, etag))
+    expect("different bookmarks get a different ETag",
+           guides.list_response(None, None, 10, 0, bookmarks=frozenset())[1] not in (etag, anonymous_etag))
+
+    return all(results)
+
+
+if __name__ == "__main__":
+    print("\nFavorites cache with a fake database")
+    passed = run()
+    print(f"\n{'✅ PASS' if passed else '❌ FAIL'}")
+    sys.exit(0 if passed else 1)
@@ -0,0 +1,170 @@
+"""
+Glossary Index Test
+
+Checks services/glossary_index.py on a small bilingual glossary:
+normalization (accents, hyphens, "ng"/"nang"), prefix and substring
+search with ranking, category filters and facets, the rendered response
+bodies, version-stamp refresh, and search latency on a synthetic 5,000-term
+glossary. No database is needed.
+
+Usage:
+    python test_glossary_index.py
+"""
+
+import asyncio
+import json
+import sys
+import time
+
+import services.glossary_index as glossary_index
+from services.glossary_index import GlossaryIndex, normalize
+
+TERMS = [
+    {"id": "1", "term_en": "Annulment", "term_fil": "Pagpapawalang-bisa ng Kasal", "category": "family",
+     "definition_en": "A court declaration that a marriage was invalid from the start.",
+     "definition_fil": "Pagpapasya ng korte na walang bisa ang kasal mula sa simula."},
+    {"id": "2", "term_en": "Annual Leave", "term_fil": "Taunang Bakasyon", "category": "labor",
+     "definition_en": "Paid days off an employee earns each year.", "definition_fil": None},
+    {"id": "3", "term_en": "Ownership", "term_fil": "Pag-aari", "category": "civil",
+     "definition_en": "The right to enjoy and dispose of a thing.",
+     "definition_fil": "Karapatang gamitin at ipagbili ang isang bagay."},
+    {"id": "4", "term_en": "Estafa", "term_fil": "Estafa", "category": "criminal",
+     "definition_en": "Swindling; defrauding another by abuse of confidence or deceit.",
+     "definition_fil": "Panloloko nang may pang-aabuso sa tiwala."},
+    {"id": "5", "term_en": "Legitime", "term_fil": "Lehítima", "category": "family",
+     "definition_en": "The part of an estate the law reserves for compulsory heirs.", "definition_fil": None},
+    {"id": "6", "term_en": "Contract", "term_fil": "Kontrata", "category": "civil",
+     "definition_en": "A meeting of minds between two persons; compare annulment of contracts.", "definition_fil": None},
+    {"id": "7", "term_en": "Deed of Sale", "term_fil": None, "category": None,
+     "definition_en": "Document transferring ownership of property.", "definition_fil": None},
+]
+
+
+def run() -> bool:
+    results = []
+
+    def expect(name, condition):
+        print(f"   {'✅' if condition else '❌'} {name}")
+        results.append(bool(condition))
+
+    def ids(indexes):
+        return [index._rows[i]["id"] for i in indexes]
+
+    print("\n🔤 Normalization")
+    expect("accents are stripped", normalize("Lehítima") == "lehitima" and normalize("Niño") == "nino")
+    expect("hyphenated words are joined", normalize("Pag-aari") == "pagaari")
+    expect("'nang' folds to 'ng'", normalize("Panloloko NANG may") == normalize("panloloko ng may"))
+    expect("punctuation collapses to spaces", normalize("  Art. 36,  Family-Code ") == "art 36 familycode")
+
+    print("\n🔎 Search")
+    index = GlossaryIndex()
+    index.build(TERMS, version_stamp=1)
+    matches, facets = index.query()
+    expect("no search lists every term alphabetically", ids(matches) == ["2", "1", "6", "7", "4", "5", "3"])
+    expect("facets count every category", facets == {"family": 2, "labor": 1, "civil": 2, "criminal": 1})
+
+    matches, facets = index.query(search="annul")
+    expect("term prefixes rank above definition matches", ids(matches) == ["1", "6"])
+    expect("facets follow the search", facets == {"family": 1, "civil": 1})
+
+    matches, _ = index.query(search="estafa")
+    expect("exact term comes first", ids(matches)[0] == "4")
+    expect("Filipino terms are searched", ids(index.query(search="kontrata")[0]) == ["6"])
+    expect("accents do not matter", ids(index.query(search="lehitima")[0]) == ["5"])
+    expect("hyphens do not matter", ids(index.query(search="pagaari")[0]) == ["3"])
+    expect("'ng' query finds 'nang' definitions", "4" in ids(index.query(search="panloloko ng")[0]))
+    expect("substring inside a term", ids(index.query(search="leave")[0]) == ["2"])
+    expect("term matches rank above definition matches",
+           ids(index.query(search="ownership")[0]) == ["3", "7"] and ids(index.query(search="owner")[0]) == ["3", "7"])
+    expect("a match cannot span English and Filipino", index.query(search="estafa estafa")[0] == [])
+    expect("category filter narrows the search",
+           ids(index.query(search="annul", category="civil")[0]) == ["6"])
+    expect("'all' is no category filter", len(index.query(category="all")[0]) == len(TERMS))
+
+    print("\n📦 Rendering")
+    matches, facets = index.query(search="a")
+    body = json.loads(index.render_page(matches, facets, page=2, limit=2))
+    expect("page body keeps the old shape",
+           set(body) == {"terms", "pagination", "facets"}
+           and body["pagination"] == {"page": 2, "limit": 2, "total": len(matches), "pages": (len(matches) + 1) // 2})
+    expect("terms carry the listed columns", set(body["terms"][0]) == set(glossary_index.TERM_COLUMNS))
+    everything = json.loads(index.render_all())
+    expect("/terms/all body", everything["total"] == len(TERMS) and len(everything["terms"]) == len(TERMS))
+    expect("lookup by id", index.get("3")["term_fil"] == "Pag-aari" and index.get("missing") is None)
+
+    print("\n🔄 Version stamp refresh")
+    calls = {"rows": 0, "version": 0}
+    state = {"version": 7, "rows": TERMS[:3]}
+
+    async def loader():
+        calls["rows"] += 1
+        return state["rows"]
+
+    async def version_loader():
+        calls["version"] += 1
+        return state["version"]
+
+    async def scenario():
+        live = GlossaryIndex()
+        await live.ensure_loaded(loader, version_loader)
+        first = calls["rows"] == 1 and len(live._rows) == 3
+        served = await live.ensure_loaded(loader, version_loader)
+        no_calls = served and calls == {"rows": 1, "version": 1}
+
+        live._checked_at = 0.0  # Version check due
+        await live.ensure_loaded(loader, version_loader)
+        await live._refresh_task
+        unchanged = calls["rows"] == 1 and calls["version"] == 2
+
+        state.update(version=8, rows=TERMS)
+        live._checked_at = 0.0
+        await live.ensure_loaded(loader, version_loader)
+        stale_served = len(live._rows) == 3
+        await live._refresh_task
+        reloaded = calls["rows"] == 2 and len(live._rows) == len(TERMS)
+        return first, no_calls, unchanged, stale_served, reloaded
+
+    first, no_calls, unchanged, stale_served, reloaded = asyncio.run(scenario())
+    expect("first request loads the glossary", first)
+    expect("later requests make no database calls", no_calls)
+    expect("same version stamp skips the reload", unchanged)
+    expect("current snapshot is served while the check runs", stale_served)
+    expect("new version stamp reloads the terms", reloaded)
+
+    print("\n⏱️  Latency")
+    words = ["kasal", "lupa", "kontrata", "mana", "utang", "trabaho", "ari", "batas", "hukuman", "saksi"]
+    big = [
+        {"id": str(n), "term_en": f"Term {n} {words[n % 10]}", "term_fil": f"Termino {words[(n * 7) % 10]} {n}",
+         "definition_en": f"Definition {n} about {words[(n * 3) % 10]} and {words[(n * 5) % 10]} " * 4,
+         "definition_fil": f"Kahulugan tungkol sa {words[n % 10]}", "category": ("family", "civil", "labor")[n % 3]}
+        for n in range(5000)
+    ]
+    large = GlossaryIndex()
+    start = time.perf_counter()
+    large.build(big)
+    build_ms = (time.perf_counter() - start) * 1000
+    queries = ["kasal", "term 12", "utang", "about lupa", "zzz", "t"]
+    start = time.perf_counter()
+    for query in queries:
+        matches, facets = large.query(search=query, category="civil")
+        large.render_page(matches, facets, 1, 10)
+    per_query_ms = (time.perf_counter() - start) * 1000 / len(queries)
+    start = time.perf_counter()
+    for _ in range(50):
+        for query in queries:
+            matches, facets = large.query(search=query, category="civil")
+            large.render_page(matches, facets, 1, 10)
+    cached_ms = (time.perf_counter() - start) * 1000 / (50 * len(queries))
+    print(f"   📊 {large.get_stats()}")
+    print(f"   ⏱️  build {build_ms:.0f} ms, {per_query_ms:.3f} ms per new search + page render, {cached_ms:.3f} ms repeated")
+    expect("a new search takes under 10 ms on 5,000 terms", per_query_ms < 10)
+    expect("a repeated search takes under 0.1 ms", cached_ms < 0.1)
+
+    return all(results)
+
+
+if __name__ == "__main__":
+    print("\nGlossary index on a sample glossary")
+    passed = run()
+    print(f"\n{'✅ PASS' if passed else '❌ FAIL'}")
+    sys.exit(0 if passed else 1)
@@ -0,0 +1,144 @@
+"""
+Legal Guide Cache Test
+
+Checks services/guide_cache.py on a few sample guides: category lists and
+counts, the "work" category alias, bilingual search, response bodies
+against the legal_article response models, ETag / If-None-Match handling
+and reloads after invalidate(). No database is needed.
+
+Usage:
+    python test_guide_cache.py
+"""
+
+import asyncio
+import sys
+
+from models.legal_article import CategoryResponse, LegalArticleResponse, LegalArticleSearchResponse, LegalArticleSingleResponse
+from services.guide_cache import GuideCache, etag_matches
+
+ARTICLES = [
+    {"id": "a1", "title_en": "Filing for Annulment", "title_fil": "Pag-file ng Annulment", "category": "family",
+     "description_en": "Grounds and steps.", "content_en": "Psychological incapacity under Article 36...",
+     "content_fil": "Ang sikolohikal na kawalan ng kakayahan...", "is_verified": True,
+     "created_at": "2025-01-05T08:00:00+00:00", "updated_at": "2025-02-01T08:00:00+00:00"},
+    {"id": "a2", "title_en": "Final Pay", "title_fil": "Huling Sahod", "category": "labor",
+     "description_en": "When your employer must release your final pay.", "content_en": "Within 30 days...",
+     "content_fil": "Sa loob ng 30 araw nang paghihiwalay...", "is_verified": True,
+     "created_at": "2025-01-02T08:00:00+00:00", "updated_at": None},
+    {"id": "a3", "title_en": "Estafa Complaints", "title_fil": None, "category": "criminal",
+     "description_en": None, "content_en": "How to file an estafa complaint with the prosecutor.",
+     "content_fil": None, "is_verified": True, "created_at": "2025-01-09T08:00:00+00:00", "updated_at": None},
+    {"id": "a4", "title_en": "Overtime Pay", "title_fil": "Bayad sa Overtime", "category": "labor",
+     "description_en": "Premiums for work beyond eight hours.", "content_en": "Add at least 25%...",
+     "content_fil": None, "is_verified": True, "created_at": "2025-01-10T08:00:00+00:00", "updated_at": None},
+    # Missing content_en: not a valid guide, skipped
+    {"id": "bad", "title_en": "Draft", "category": "civil", "is_verified": True},
+]
+
+
+def run() -> bool:
+    results = []
+
+    def expect(name, condition):
+        print(f"   {'✅' if condition else '❌'} {name}")
+        results.append(bool(condition))
+
+    cache = GuideCache()
+    cache.build(ARTICLES, version_stamp=1)
+
+    print("\n🗂️  Categories")
+    expect("invalid rows are skipped", cache.get("bad") is None and cache.get("a1") is not None)
+    expect("category counts", cache.category_counts() == {"criminal": 1, "family": 1, "labor": 2})
+    body, _ = cache.categories_response()
+    categories = CategoryResponse.model_validate_json(body)
+    expect("categories body matches CategoryResponse",
+           categories.data == ["criminal", "family", "labor"] and categories.count == 3 and categories.counts["labor"] == 2)
+
+    print("\n🔎 Listing and search")
+    ids = lambda indexes: [a.id for a in cache.articles(indexes)]
+    expect("listing is oldest first", ids(cache.query()) == ["a2", "a1", "a3", "a4"])
+    expect("'work' means the labor category", ids(cache.query(category="work")) == ["a2", "a4"])
+    expect("category match ignores case", ids(cache.query(category="Labor")) == ["a2", "a4"])
+    expect("search covers Filipino content", ids(cache.query(search="sikolohikal")) == ["a1"])
+    expect("search ignores case, accents and hyphens", ids(cache.query(search="PAG FILE")) == [] and ids(cache.query(search="pagfile")) == ["a1"])
+    expect("'ng' finds 'nang'", ids(cache.query(search="araw ng")) == ["a2"])
+    expect("search within a category", ids(cache.query(category="labor", search="pay")) == ["a2", "a4"])
+
+    body, etag = cache.list_response("labor", None, limit=1, offset=1)
+    page = LegalArticleResponse.model_validate_json(body)
+    expect("list body matches LegalArticleResponse",
+           [a.id for a in page.data] == ["a4"] and (page.count, page.limit, page.offset) == (1, 1, 1))
+    body, _ = cache.list_response(None, "estafa", 20, 0, query="estafa")
+    expect("search body carries the query", LegalArticleSearchResponse.model_validate_json(body).query == "estafa")
+    body, _ = cache.article_response("a1")
+    expect("article body matches LegalArticleSingleResponse",
+           LegalArticleSingleResponse.model_validate_json(body).data.title_fil == "Pag-file ng Annulment")
+    expect("unknown article has no body", cache.article_response("nope") is None)
+
+    print("\n🏷️  ETags")
+    expect("same request, same ETag", cache.list_response("labor", None, 1, 1)[1] == etag)
+    expect("equivalent search spellings share an ETag",
+           cache.list_response(None, "Estafa", 20, 0)[1] == cache.list_response(None, "estafa ", 20, 0)[1])
+    expect("different page, different ETag", cache.list_response("labor", None, 1, 0)[1] != etag)
+    expect("If-None-Match matches exact, weak, listed and * values",
+           etag_matches(etag, etag) and etag_matches(f'W/{etag}', etag)
+           and etag_matches(f'"other", {etag}', etag) and etag_matches("*", etag))
+    expect("If-None-Match rejects other and missing values", not etag_matches('"other"', etag) and not etag_matches(None, etag))
+    expect("repeated requests reuse the rendered body", cache.response_hits >= 2)
+
+    print("\n🔄 Reloads")
+    calls = {"rows": 0}
+    rows = {"data": ARTICLES[:3]}
+
+    async def loader():
+        calls["rows"] += 1
+        return rows["data"]
+
+    async def version_loader():
+        return 1
+
+    async def scenario():
+        live = GuideCache()
+        await live.ensure_loaded(loader, version_loader)
+        before_article = live.article_response("a1")[1]
+        before_list = live.list_response("labor", None, 10, 0)[1]
+        before_other = live.article_response("a2")[1]
+        await live.ensure_loaded(loader, version_loader)
+        cached = calls["rows"] == 1
+
+        # A guide was edited and published through the API
+        rows["data"] = [{**ARTICLES[0], "content_en": "Updated text"}] + ARTICLES[1:4]
+        live.invalidate()
+        await live.ensure_loaded(loader, version_loader)
+        reloaded = calls["rows"] == 2
+        changed = live.article_response("a1")[1] != before_article and live.list_response("labor", None, 10, 0)[1] != before_list
+        unchanged = live.article_response("a2")[1] == before_other
+
+        # A guide is published while a reload is reading the table
+        async def overlapping_loader():
+            loaded = await loader()
+            live.invalidate()
+            return loaded
+
+        live.invalidate()
+        await live.ensure_loaded(overlapping_loader, version_loader)
+        await live.ensure_loaded(loader, version_loader)
+        overlapped = calls["rows"] == 4
+        return cached, reloaded, changed, unchanged, live.category_counts()["labor"], overlapped
+
+    cached, reloaded, changed, unchanged, labor, overlapped = asyncio.run(scenario())
+    expect("second request is served from memory", cached)
+    expect("invalidate() reloads on the next request", reloaded)
+    expect("changed content gets new ETags", changed)
+    expect("unchanged guides keep their ETag across reloads", unchanged)
+    expect("counts are recomputed on reload", labor == 2)
+    expect("a reload that overlapped invalidate() stays stale", overlapped)
+
+    return all(results)
+
+
+if __name__ == "__main__":
+    print("\nLegal guide cache on sample guides")
+    passed = run()
+    print(f"\n{'✅ PASS' if passed else '❌ FAIL'}")
+    sys.exit(0 if passed else 1)
@@ -0,0 +1,120 @@
+"""
+Lawyer Bulk Review Test
+
+Checks the pieces of the bulk review API that do not need a database: the
+review queue cursor, when a stored roll check is redone, validation of
+bulk review requests and the notifications sent for a batch (captured by a
+recording client instead of Supabase). The SQL side is
+database/migrations/017_lawyer_application_bulk_review.sql.
+
+Usage:
+    python test_lawyer_bulk_review.py
+"""
+
+import asyncio
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from pydantic import ValidationError
+
+from lawyer.models import MAX_BULK_REVIEW, BulkReviewRequest
+from lawyer.service import LawyerApplicationService
+from services.notification_service import NotificationService
+
+
+class RecordingClient:
+    """Stands in for the Supabase client; records inserts"""
+
+    def __init__(self):
+        self.inserts = []
+
+    def table(self, name):
+        self.name = name
+        return self
+
+    def insert(self, rows):
+        self.inserts.append((self.name, rows))
+        self.rows = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def execute(self):
+        return type("Result", (), {"data": [{"id": str(uuid.uuid4()), **row} for row in self.rows]})()
+
+
+def run() -> bool:
+    results = []
+
+    def expect(name, condition):
+        print(f"   {'✅' if condition else '❌'} {name}")
+        results.append(bool(condition))
+
+    print("\n📄 Review queue cursor")
+    application_id = str(uuid.uuid4())
+    submitted_at = "2025-06-02T08:15:00.123456+00:00"
+    cursor = LawyerApplicationService._encode_cursor(submitted_at, application_id)
+    expect("cursor round-trips", LawyerApplicationService._decode_cursor(cursor) == (submitted_at, application_id))
+    for bad in ("not-a-cursor", LawyerApplicationService._encode_cursor('x",id.gt.0', application_id),
+                LawyerApplicationService._encode_cursor(submitted_at, "1),or(id.gt.0")):
+        try:
+            LawyerApplicationService._decode_cursor(bad)
+            expect(f"rejects {bad[:24]!r}", False)
+        except ValueError:
+            expect(f"rejects {bad[:24]!r}", True)
+
+    print("\n🧾 Stored roll checks")
+    loaded_at = time.time()
+    before = (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat()
+    after = (datetime.now(timezone.utc) + timedelta(minutes=1)).isoformat()
+    needs = LawyerApplicationService._needs_roll_check
+    expect("unchecked application is scored", needs({"roll_checked_at": None}, loaded_at))
+    expect("EXACT match is kept", not needs({"roll_match_type": "EXACT", "roll_checked_at": before}, loaded_at))
+    expect("NONE checked before the roll was loaded is redone",
+           needs({"roll_match_type": "NONE", "roll_checked_at": before}, loaded_at))
+    expect("NONE checked against the loaded roll is kept",
+           not needs({"roll_match_type": "NONE", "roll_checked_at": after}, loaded_at))
+
+    print("\n📋 Bulk review requests")
+    decisions = [{"application_id": str(uuid.uuid4()), "status": "accepted"} for _ in range(3)]
+    expect("valid request parses", len(BulkReviewRequest(decisions=decisions).decisions) == 3)
+    invalid = {
+        "empty": [],
+        "pending is not a decision": [{"application_id": str(uuid.uuid4()), "status": "pending"}],
+        "duplicate application": [decisions[0], {**decisions[0], "status": "rejected"}],
+        "too many decisions": [{"application_id": str(uuid.uuid4()), "status": "rejected"}
+                               for _ in range(MAX_BULK_REVIEW + 1)],
+    }
+    for name, value in invalid.items():
+        try:
+            BulkReviewRequest(decisions=value)
+            expect(f"rejects {name}", False)
+        except ValidationError:
+            expect(f"rejects {name}", True)
+
+    print("\n🔔 Notifications")
+    client = RecordingClient()
+    reviewed = [
+        {"application_id": str(uuid.uuid4()), "user_id": str(uuid.uuid4()), "status": status}
+        for status in ("accepted", "rejected", "resubmission", "accepted")
+    ]
+    created = asyncio.run(NotificationService(client).notify_lawyer_applications_reviewed(reviewed))
+    expect("one insert for the whole batch", len(client.inserts) == 1 and created == 4)
+    rows = client.inserts[0][1]
+    expect("types follow the decision",
+           [row["type"] for row in rows] == [f"lawyer_application_{r['status']}" for r in reviewed])
+    expect("each applicant gets their application id",
+           all(row["user_id"] == r["user_id"] and row["data"]["application_id"] == r["application_id"]
+               for row, r in zip(rows, reviewed)))
+    expect("empty batch inserts nothing",
+           asyncio.run(NotificationService(client).notify_lawyer_applications_reviewed([])) == 0
+           and len(client.inserts) == 1)
+
+    return all(results)
+
+
+if __name__ == "__main__":
+    print("\nLawyer application bulk review")
+    passed = run()
+    print(f"\n{'✅ PASS' if passed else '❌ FAIL'}")
+    sys.exit(0 if passed else 1)
@@ -0,0 +1,166 @@
+"""
+Lawyer Verification Test
+
+Checks the roll matcher in lawyer/verification.py on a small hand-written
+roll: name splitting and phonetic keys, the batched Levenshtein against a
+plain implementation, and EXACT / PARTIAL / MULTIPLE / NONE classification
+for the applicant kinds the admin test data covers (valid, typo, missing
+middle name, roll "LAST, FIRST MIDDLE" form, namesakes, unknown), plus
+verify() calls made while load() rebuilds the index in a thread. No
+database is needed; see scripts/benchmark_lawyer_verification.py for timing
+on a 70k-record roll.
+
+Usage:
+    python test_lawyer_verification.py
+"""
+
+import random
+import sys
+import threading
+
+from lawyer.verification import (
+    QUERY_PAD,
+    TARGET_PAD,
+    RollRecord,
+    RollVerifier,
+    _encode,
+    batch_levenshtein,
+    phonetic_key,
+    split_full_name,
+)
+
+ROLL = [
+    {"id": 1, "full_name": "DELA CRUZ, JUAN SANTOS", "roll_number": "45012", "roll_signing_date": "2001-05-02"},
+    {"id": 2, "full_name": "REYES, MARIA CLARA BAUTISTA", "roll_number": "61234", "roll_signing_date": "2012-04-30"},
+    {"id": 3, "full_name": "VILLANUEVA, ANTONIO GARCIA", "roll_number": "38901", "roll_signing_date": "1995-03-15"},
+    {"id": 4, "full_name": "SANTOS, JOSE RIZAL", "roll_number": "50001", "roll_signing_date": "2004-05-10"},
+    {"id": 5, "full_name": "SANTOS, JOSE RIZAL", "roll_number": "50777", "roll_signing_date": "2006-05-12"},
+    {"id": 6, "full_name": "QUIAMBAO, CRISTINA MENDOZA", "roll_number": "70321", "roll_signing_date": "2019-06-24"},
+    {"id": 7, "full_name": "DE LOS SANTOS, RAMON AQUINO JR.", "roll_number": "29876", "roll_signing_date": "1988-04-20"},
+    {"id": 8, "full_name": "PEÑA, ROSARIO LIM", "roll_number": "66110", "roll_signing_date": "2015-05-04"},
+    {"id": 9, "full_name": "CASTILLO, MIGUEL TORRES", "roll_number": "71555", "roll_signing_date": "2020-01-13"},
+    {"id": 10, "full_name": "CASTILLO, MIGUELITO TORRES", "roll_number": "71556", "roll_signing_date": "2020-01-13"},
+]
+
+# application -> (match type, id of the best match or None)
+CASES = [
+    ({"full_name": "Juan Santos Dela Cruz", "roll_number": "45012", "roll_signing_date": "2001-05-02"}, ("EXACT", 1)),
+    ({"full_name": "Juan Santos Dela Cruz"}, ("EXACT", 1)),
+    ({"full_name": "Juan Santos Delacruz"}, ("EXACT", 1)),
+    ({"full_name": "Juan Dela Cruz"}, ("EXACT", 1)),
+    ({"full_name": "DELA CRUZ, JUAN SANTOS"}, ("EXACT", 1)),
+    ({"first_name": "Antonio", "middle_name": "Garcia", "last_name": "Vilanueva"}, ("EXACT", 3)),
+    ({"full_name": "Antonio Garcia Bilanueva"}, ("EXACT", 3)),
+    ({"full_name": "Ramon Aquino De los Santos"}, ("EXACT", 7)),
+    ({"full_name": "Rosario Lim Pena"}, ("EXACT", 8)),
+    # Two first names, no middle name: read as first "Maria", middle "Clara"
+    ({"full_name": "Maria Clara Reyes"}, ("PARTIAL", 2)),
+    # Right name, wrong roll number: not verified
+    ({"full_name": "Cristina Mendoza Quiambao", "roll_number": "12345"}, ("PARTIAL", 6)),
+    # Misspelled first letters: different phonetic key or first initial
+    ({"full_name": "Antonio Garcia Fillanueva"}, ("EXACT", 3)),
+    ({"full_name": "Kristina Mendoza Quiambao"}, ("EXACT", 6)),
+    # Namesakes: only the roll number tells them apart
+    ({"full_name": "Jose Rizal Santos"}, ("MULTIPLE", None)),
+    ({"full_name": "Jose Rizal Santos", "roll_number": "50777"}, ("EXACT", 5)),
+    ({"full_name": "Miguel Torres Castillo"}, ("EXACT", 9)),
+    ({"full_name": "Pedro Penduko Magbanua", "roll_number": "99999"}, ("NONE", None)),
+    ({"full_name": ""}, ("NONE", None)),
+]
+
+
+def levenshtein(a: str, b: str) -> int:
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(current[j - 1] + 1, previous[j] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def run() -> bool:
+    results = []
+
+    def expect(name, condition):
+        print(f"   {'✅' if condition else '❌'} {name}")
+        results.append(bool(condition))
+
+    print("\n🔤 Names")
+    expect("roll form splits on the comma", split_full_name("DELA CRUZ, JUAN SANTOS") == ("JUAN", "SANTOS", "DELA CRUZ"))
+    expect("surname particles stay with the surname", split_full_name("Ramon Aquino De los Santos") == ("RAMON", "AQUINO", "DE LOS SANTOS"))
+    expect("suffixes and accents are dropped", split_full_name("Peña, Rosario Lim Jr.") == ("ROSARIO", "LIM", "PENA"))
+    expect("phonetic key folds C/K, V/B and Z/S",
+           phonetic_key("CRUZ") == phonetic_key("KRUS") and phonetic_key("VILLANUEVA") == phonetic_key("BILANUEVA"))
+    expect("phonetic key ignores spaces in surnames", phonetic_key("DELA CRUZ") == phonetic_key("DELACRUZ"))
+
+    print("\n🧮 Batched Levenshtein")
+    rng = random.Random(3)
+    words = ["".join(rng.choice("ABN ") for _ in range(rng.randint(0, 14))) for _ in range(400)]
+    pairs = list(zip(words[:200], words[200:]))
+    queries, query_lengths = _encode([a for a, _ in pairs], QUERY_PAD)
+    targets, target_lengths = _encode([b for _, b in pairs], TARGET_PAD)
+    distances = batch_levenshtein(queries, query_lengths, targets, target_lengths)
+    expect("matches the plain dynamic program on 200 random pairs",
+           all(distances[i] == levenshtein(a, b) for i, (a, b) in enumerate(pairs)))
+
+    print("\n⚖️  Classification")
+    verifier = RollVerifier(RollRecord.from_supreme_court_roll(row) for row in ROLL)
+    for application, (match_type, best_id) in CASES:
+        result = verifier.verify_application(application)
+        best = result.matches[0].record.id if result.matches else None
+        ok = result.match_type == match_type and (best_id is None or best == best_id)
+        label = application.get("full_name") or " ".join(application.get(k, "") for k in ("first_name", "middle_name", "last_name"))
+        expect(f"{label!r} -> {result.match_type} {result.confidence}% (#{best})", ok)
+
+    result = verifier.verify(full_name="Juan Santos Dela Cruz", roll_number="45012")
+    expect("only EXACT is verified", result.is_verified and not verifier.verify(full_name="Jose Rizal Santos").is_verified)
+    expect("namesakes are both returned", {m.record.id for m in verifier.verify(full_name="Jose Rizal Santos").matches} >= {4, 5})
+
+    listed = RollRecord.from_lawyers_list({
+        "Lastname": "Dela Cruz", "Firstname": "Juan", "Middle Name": "Santos",
+        "Address": "Manila", "Roll Signed Date": "05/02/2001", "Roll No.": "45012"
+    })
+    expect("lawyers_list.json entries load like roll rows",
+           (listed.last_name, listed.first_name, listed.middle_name, listed.roll_number, str(listed.roll_signing_date))
+           == ("DELA CRUZ", "JUAN", "SANTOS", "45012", "2001-05-02"))
+    print(f"   📊 {verifier.get_stats()}")
+
+    print("\n🔁 Verifying during a reload")
+    # The second roll puts every record at a different position, so a verify()
+    # mixing old and new index parts returns the wrong record or fails
+    filler = [{"id": 100 + i, "full_name": f"{rng.choice(['GARCIA', 'LOPEZ', 'RAMOS', 'TAN'])}, PERSON{chr(65 + i % 26)} X"}
+              for i in range(2000)]
+    rolls = [
+        [RollRecord.from_supreme_court_roll(row) for row in ROLL],
+        [RollRecord.from_supreme_court_roll(row) for row in filler + ROLL[::-1]],
+    ]
+    reloading = RollVerifier(rolls[0])
+    done = threading.Event()
+
+    def reload():
+        for i in range(20):
+            reloading.load(rolls[(i + 1) % 2])
+        done.set()
+
+    loader = threading.Thread(target=reload)
+    loader.start()
+    wrong, errors, checks = 0, [], 0
+    while not done.is_set() or checks == 0:
+        try:
+            result = reloading.verify(full_name="Juan Santos Dela Cruz", roll_number="45012")
+            checks += 1
+            wrong += not (result.match_type == "EXACT" and result.matches[0].record.id == 1)
+        except Exception as e:
+            errors.append(e)
+    loader.join()
+    expect(f"{checks} verify() calls during 20 reloads all match #1", checks and not wrong and not errors)
+
+    return all(results)
+
+
+if __name__ == "__main__":
+    print("\nLawyer verification against a sample roll")
+    passed = run()
+    print(f"\n{'✅ PASS' if passed else '❌ FAIL'}")
+    sys.exit(0 if passed else 1)
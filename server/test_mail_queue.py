@@ -0,0 +1,178 @@
+"""
+Mail Queue Test
+
+Delivers OTP and support emails through MailQueue to a local SMTP sink and
+checks that the API side returns without waiting for SMTP, that workers
+reuse their connections, that transient failures are retried, and that
+idempotency keys stop duplicate sends.
+
+The sink is a minimal SMTP server started in-process; it can be told to
+answer the first N messages with a temporary 451 error.
+
+Usage:
+    python test_mail_queue.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+os.environ.setdefault("SMTP_SECURITY", "none")
+
+from services import mail_queue as mail_queue_module
+from services.mail_queue import MailQueue, OutboundEmail, SMTPTransport
+from services.shared_state import MemoryStateBackend
+
+
+class SMTPSink:
+    """Accepts mail over plain SMTP and keeps it in memory"""
+
+    def __init__(self, fail_first: int = 0, latency: float = 0.05):
+        self.messages = []
+        self.connections = 0
+        self.fail_first = fail_first
+        self.latency = latency
+        self.server = None
+
+    async def start(self) -> int:
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+
+        def reply(line: str):
+            writer.write(f"{line}\r\n".encode())
+
+        reply("220 sink ready")
+        envelope = {"to": []}
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            command = line.decode().strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                reply("250 sink")
+            elif verb == "MAIL":
+                envelope = {"from": command, "to": []}
+                reply("250 OK")
+            elif verb == "RCPT":
+                envelope["to"].append(command)
+                reply("250 OK")
+            elif verb == "DATA":
+                reply("354 End data with <CR><LF>.<CR><LF>")
+                body = []
+                while True:
+                    data = await reader.readline()
+                    if data in (b".\r\n", b""):
+                        break
+                    body.append(data.decode())
+                await asyncio.sleep(self.latency)  # provider latency
+                if self.fail_first > 0:
+                    self.fail_first -= 1
+                    reply("451 Temporary failure, try again")
+                else:
+                    self.messages.append("".join(body))
+                    reply("250 Queued")
+            elif verb in ("NOOP", "RSET"):
+                reply("250 OK")
+            elif verb == "QUIT":
+                reply("221 Bye")
+                await writer.drain()
+                break
+            else:
+                reply("502 Not implemented")
+            await writer.drain()
+        writer.close()
+
+
+async def run() -> bool:
+    sink = SMTPSink(fail_first=2)
+    port = await sink.start()
+    results = []
+
+    def expect(name, condition):
+        print(f"   {'✅' if condition else '❌'} {name}")
+        results.append(condition)
+
+    queue = MailQueue(
+        transport_factory=lambda: SMTPTransport("127.0.0.1", port, security="none"),
+        workers=2,
+        state=MemoryStateBackend(),
+        retry_base_seconds=0.1
+    )
+    mail_queue_module._mail_queue = queue
+
+    # Enqueue returns without waiting on SMTP
+    start = time.perf_counter()
+    for i in range(20):
+        await queue.enqueue(OutboundEmail(
+            to=[f"user{i}@example.com"], subject=f"Message {i}", html="<p>hi</p>",
+            from_email="noreply@example.com", from_name="AI.ttorney",
+            idempotency_key=f"test:{i}"
+        ))
+    enqueue_ms = (time.perf_counter() - start) * 1000
+    expect(f"20 enqueues took {enqueue_ms:.1f} ms (no SMTP wait)", enqueue_ms < 20 * sink.latency * 1000 / 4)
+
+    duplicate = await queue.enqueue(OutboundEmail(
+        to=["user0@example.com"], subject="Message 0", html="<p>hi</p>",
+        from_email="noreply@example.com", from_name="AI.ttorney", idempotency_key="test:0"
+    ))
+    expect("same idempotency key is not queued twice", duplicate is False)
+
+    # OTP and support services go through the same queue
+    from services.otp_service import OTPService
+    from services.email_support_service import EmailSupportService
+
+    otp = OTPService()
+    first = await otp.send_verification_otp("Person@Example.com", "Juan <script>")
+    second = await otp.send_verification_otp("person@example.com", "Juan <script>")
+    expect("OTP send returns success immediately", first["success"] and "deduplicated" not in first)
+    expect("repeat OTP request inside the window is deduplicated", second.get("deduplicated") is True)
+
+    # A code that could not be stored is never emailed, and does not block a resend
+    broken = OTPService()
+
+    async def store_fails(key, data):
+        raise ConnectionError("state backend unavailable")
+
+    broken.otp_store.store_otp = store_fails
+    failed = await broken.send_password_reset_otp("person@example.com", "Juan")
+    del broken.otp_store.store_otp  # The store is shared by every OTPService
+    expect("OTP that fails to store is not sent", not failed["success"] and queue.enqueued == 21)
+    retried = await otp.send_password_reset_otp("person@example.com", "Juan")
+    expect("resend after a failed store is not deduplicated", retried["success"] and "deduplicated" not in retried)
+
+    support = EmailSupportService()
+    for _ in range(3):
+        response = await support.send_support_request("Maria", "maria@example.com", "Help", "Line 1\nLine 2")
+    expect("support request returns success", response["success"])
+
+    await asyncio.wait_for(queue.join(), 30)
+    stats = queue.get_stats()
+    print(f"   📊 {stats}")
+
+    expect("all unique emails delivered (20 + 2 OTP + support + confirmation)", len(sink.messages) == 24)
+    expect("transient 451s were retried", stats["retried"] == 2 and stats["failed"] == 0)
+    expect("workers reused their SMTP connections", sink.connections <= 2)
+    otp_mail = next(m for m in sink.messages if "Verify Your AI.ttorney Account" in m)
+    expect("user name is HTML-escaped in the template", "&lt;script&gt;" in otp_mail and "<script>" not in otp_mail)
+    support_mail = next(m for m in sink.messages if "[Support Request] Help" in m)
+    expect("support message newlines become <br>", "Line 1<br>Line 2" in support_mail)
+
+    await queue.stop()
+    await sink.stop()
+    return all(results)
+
+
+if __name__ == "__main__":
+    print("\nMail queue against a local SMTP sink")
+    passed = asyncio.run(run())
+    print(f"\n{'✅ PASS' if passed else '❌ FAIL'}")
+    sys.exit(0 if passed else 1)
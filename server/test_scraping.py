@@ -0,0 +1,152 @@
+"""
+Statute Scraping Test
+
+Runs every parser over the saved fixtures and checks change detection (an
+unchanged run writes nothing, an edited article is reported as changed, the
+manifest bootstraps from existing JSON), resume after a failed source, and
+the fetcher's conditional requests, retries and per-host pacing against an
+in-process mock transport. No network access is needed.
+
+Usage:
+    python test_scraping.py
+"""
+
+import asyncio
+import json
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from scripts.scraping import FixtureFetcher, HTTPCache, OutputStore, PoliteFetcher, run_scrape
+from scripts.scraping.output import STATE_DIRNAME
+
+FIXTURES_DIR = Path(__file__).parent / "scripts" / "scraping" / "fixtures"
+
+
+async def run() -> bool:
+    results = []
+
+    def expect(name, condition):
+        print(f"   {'✅' if condition else '❌'} {name}")
+        results.append(bool(condition))
+
+    work = Path(tempfile.mkdtemp(prefix="scrape_test_"))
+    fixtures = work / "fixtures"
+    shutil.copytree(FIXTURES_DIR, fixtures)
+    store_dir = work / "raw"
+
+    try:
+        print("\n📄 Parsers")
+        first = {r.source: r for r in await run_scrape(
+            ["civil_code", "consumer_act", "family_code", "labor_code", "revised_penal_code"],
+            FixtureFetcher(fixtures), OutputStore(store_dir)
+        )}
+        expect("all sources parsed", all(r.error is None for r in first.values()))
+        expect("first run reports every article as added", all(len(r.changes.added) == r.changes.total for r in first.values()))
+
+        family = json.loads((store_dir / "family_code.json").read_text(encoding="utf-8"))
+        expect("family code: 4 articles + 3 RA 9262 sections",
+               family["statistics"]["family_code_articles"] == 4 and family["statistics"]["ra_9262_sections"] == 3)
+        expect("RA 9262 sections are VAWC", len(family["topics"]["VAWC"]) == 3)
+
+        labor = json.loads((store_dir / "labor_code.json").read_text(encoding="utf-8"))
+        definitions = next(a for arts in labor["topics"].values() for a in arts if a["number"] == "13")
+        expect("labor article continuation paragraphs appear once",
+               definitions["content"].count('"Worker" means') == 1 and '"Recruitment and placement"' in definitions["content"])
+        expect("labor footnote artifacts are stripped", "LABOR CODE" not in json.dumps(labor["topics"]))
+
+        civil = json.loads((store_dir / "civil_code.json").read_text(encoding="utf-8"))
+        article_26 = civil["sections"][2]["articles"][1]
+        expect("civil code numbered items become subsections", len(article_26["subsections"]) == 2)
+
+        penal = json.loads((store_dir / "revised_penal_code.json").read_text(encoding="utf-8"))
+        by_number = {a["article_number"]: a for a in penal}
+        expect("penal code drops articles too short to be real", 400 not in by_number)
+        expect("penal code extracts penalties", by_number[294]["penalties"] == "reclusion perpetua; death")
+        expect("penal code categories", by_number[11]["category"] == "Self-Defense" and by_number[308]["category"] == "Theft")
+
+        print("\n🔁 Change detection")
+        json_path = store_dir / "labor_code.json"
+        written_at = json_path.stat().st_mtime_ns
+        second = {r.source: r for r in await run_scrape(["labor_code", "revised_penal_code"], FixtureFetcher(fixtures), OutputStore(store_dir))}
+        expect("unchanged run reports no changes", not any(r.changes.has_changes for r in second.values()))
+        expect("unchanged run leaves the JSON untouched", json_path.stat().st_mtime_ns == written_at)
+
+        page = fixtures / "labor_code" / "main.html"
+        page.write_text(page.read_text(encoding="utf-8").replace("bargain collectively.", "bargain collectively in good faith."), encoding="utf-8")
+        third = (await run_scrape(["labor_code"], FixtureFetcher(fixtures), OutputStore(store_dir)))[0]
+        expect("edited article is reported as changed", third.changes.changed == ["Article:251"] and not third.changes.added)
+        expect("edited article is written", "in good faith" in json_path.read_text(encoding="utf-8"))
+
+        (store_dir / STATE_DIRNAME / "manifest.json").unlink()
+        fourth = (await run_scrape(["labor_code"], FixtureFetcher(fixtures), OutputStore(store_dir)))[0]
+        expect("manifest bootstraps from the existing JSON", not fourth.changes.has_changes)
+
+        print("\n⏯️  Resume")
+        (fixtures / "consumer_act" / "main.html").unlink()
+        failed = {r.source: r for r in await run_scrape(["consumer_act", "family_code"], FixtureFetcher(fixtures), OutputStore(store_dir))}
+        expect("missing page fails only its source", failed["consumer_act"].error and failed["family_code"].error is None)
+        shutil.copy(FIXTURES_DIR / "consumer_act" / "main.html", fixtures / "consumer_act" / "main.html")
+        resumed = {r.source: r for r in await run_scrape(["consumer_act", "family_code"], FixtureFetcher(fixtures), OutputStore(store_dir), resume=True)}
+        expect("resume skips the finished source", resumed["family_code"].skipped and not resumed["consumer_act"].skipped)
+        expect("checkpoint is cleared after a clean run", not (store_dir / STATE_DIRNAME / "checkpoint.json").exists())
+
+        print("\n🌐 Fetcher")
+        seen = []
+        in_flight = {"now": 0, "max": 0}
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            seen.append((time.monotonic(), request.url.path, request.headers.get("if-none-match")))
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            await asyncio.sleep(0.05)
+            in_flight["now"] -= 1
+            if request.url.path == "/flaky" and sum(1 for _, path, _ in seen if path == "/flaky") == 1:
+                return httpx.Response(503, headers={"Retry-After": "0"})
+            if request.headers.get("if-none-match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, text=f"<p>{request.url.path}</p>", headers={"ETag": '"v1"', "Content-Type": "text/html; charset=utf-8"})
+
+        fetcher = PoliteFetcher(
+            cache=HTTPCache(work / "http"), per_host=2, min_interval=0.1, fresh_for=0,
+            transport=httpx.MockTransport(handler)
+        )
+        fetched = await fetcher.fetch("https://lawphil.example/law")
+        revalidated = await fetcher.fetch("https://lawphil.example/law")
+        expect("first fetch downloads the page", fetched.status == "fetched")
+        expect("second fetch sends If-None-Match and gets a 304", revalidated.status == "not_modified" and seen[-1][2] == '"v1"')
+        expect("304 serves the cached body", revalidated.text == fetched.text)
+
+        flaky = await fetcher.fetch("https://lawphil.example/flaky")
+        expect("503 is retried", flaky.status == "fetched" and fetcher.retries == 1)
+
+        seen.clear()
+        await asyncio.gather(*(fetcher.fetch(f"https://lawphil.example/page{i}") for i in range(5)))
+        starts = sorted(t for t, _, _ in seen)
+        gaps = [b - a for a, b in zip(starts, starts[1:])]
+        expect("request starts to one host are spaced by min_interval", min(gaps) >= 0.09)
+        expect("no more than per_host requests in flight", in_flight["max"] <= 2)
+
+        cached = PoliteFetcher(cache=HTTPCache(work / "http"), fresh_for=3600, transport=httpx.MockTransport(handler))
+        before = len(seen)
+        hit = await cached.fetch("https://lawphil.example/law")
+        expect("fresh cache entry skips the network", hit.status == "cached" and len(seen) == before)
+        print(f"   📊 {fetcher.get_stats()}")
+
+        await fetcher.close()
+        await cached.close()
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    return all(results)
+
+
+if __name__ == "__main__":
+    print("\nStatute scraping against saved fixtures")
+    passed = asyncio.run(run())
+    print(f"\n{'✅ PASS' if passed else '❌ FAIL'}")
+    sys.exit(0 if passed else 1)
@@ -0,0 +1,167 @@
+"""
+Shared State Backend Test
+
+Runs the same contract against MemoryStateBackend and RedisStateBackend:
+atomic counters under concurrency, native expiry, exactly-once deletes, the
+sliding-window limiter and the OTP store. The Redis backend runs against an
+in-process fakeredis server (with Lua, see requirements.txt) by default, or
+against a real server given with --redis-url.
+
+Usage:
+    python test_shared_state.py
+    python test_shared_state.py --redis-url redis://localhost:6379/15
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+
+from services.shared_state import MemoryStateBackend, RedisStateBackend, sliding_window_hit
+from services.otp_service import OTPData, OTPStore
+
+
+async def check_backend(backend) -> list:
+    failures = []
+    prefix = f"test:{uuid.uuid4().hex[:8]}"
+
+    def expect(name, condition):
+        print(f"   {'✅' if condition else '❌'} {name}")
+        if not condition:
+            failures.append(name)
+
+    # Atomic counters
+    results = await asyncio.gather(*(backend.incr(f"{prefix}:n", 1, ttl=10) for _ in range(200)))
+    expect("200 concurrent incr give distinct values", sorted(results) == list(range(1, 201)))
+    expect("incr keeps the expiry set at creation", (await backend.ttl(f"{prefix}:n") or 0) > 0)
+
+    # Hashes
+    await backend.hset(f"{prefix}:h", {"count": 0, "ip": "1.2.3.4"}, ttl=10)
+    counts = await asyncio.gather(*(backend.hincrby(f"{prefix}:h", "count", 1) for _ in range(50)))
+    expect("concurrent hincrby is atomic", sorted(counts) == list(range(1, 51)))
+    expect("hgetall returns strings", (await backend.hgetall(f"{prefix}:h")) == {"count": "50", "ip": "1.2.3.4"})
+    expect("hincrby on a missing hash returns None", await backend.hincrby(f"{prefix}:missing", "count", 1) is None)
+    expect("hincrby does not create the hash", await backend.hgetall(f"{prefix}:missing") == {})
+    # A hash written while increments race for it keeps its fields and expiry
+    racing = await asyncio.gather(
+        *(backend.hincrby(f"{prefix}:late", "count", 1) for _ in range(20)),
+        backend.hset(f"{prefix}:late", {"count": 0, "ip": "5.6.7.8"}, ttl=10),
+        *(backend.hincrby(f"{prefix}:late", "count", 1) for _ in range(20)),
+    )
+    late = await backend.hgetall(f"{prefix}:late")
+    counted = sum(1 for value in racing if value is not None)
+    expect("a hash created during increments is kept with its expiry",
+           late.get("ip") == "5.6.7.8" and int(late["count"]) == counted and (await backend.ttl(f"{prefix}:late") or 0) > 0)
+
+    # Exactly-once delete
+    await backend.set(f"{prefix}:once", "1", ttl=10)
+    deleted = await asyncio.gather(*(backend.delete(f"{prefix}:once") for _ in range(10)))
+    expect("only one concurrent delete wins", deleted.count(True) == 1)
+
+    # Native expiry
+    await backend.set(f"{prefix}:short", "1", ttl=0.2)
+    expect("only_if_absent refuses an existing key", not await backend.set(f"{prefix}:short", "2", ttl=1, only_if_absent=True))
+    await asyncio.sleep(0.3)
+    expect("key expires natively", await backend.get(f"{prefix}:short") is None)
+
+    # Sliding window: full quota, then rejection, then weighted carry-over
+    now = 1_000_000 * 60 + 30  # middle of a window
+    hits = [await sliding_window_hit(backend, f"{prefix}:ip", 5, 60, now=now) for _ in range(7)]
+    expect("sliding window allows the limit", all(h[0] for h in hits[:5]))
+    expect("sliding window rejects past the limit", not hits[5][0] and not hits[6][0] and hits[5][2])
+    next_window = await sliding_window_hit(backend, f"{prefix}:ip", 5, 60, now=now + 35)
+    expect("previous window still weighs on the next one", not next_window[0])
+    later = await sliding_window_hit(backend, f"{prefix}:ip", 5, 60, now=now + 75)
+    expect("quota recovers as the window slides", later[0])
+
+    # OTP store
+    store = OTPStore(backend)
+    key = f"{prefix}:otp"
+    await store.store_otp(key, OTPData(hash="h", email="a@b.c", otp_type="email_verification",
+                                       expires_at=time.time() + 10))
+    expect("OTP round trip", (await store.get_otp(key)).hash == "h")
+    attempts = await asyncio.gather(*(store.increment_attempts(key) for _ in range(5)))
+    expect("OTP attempts are counted atomically", max(attempts) == 5)
+    await store.lock(key, 5)
+    locked, remaining = await store.is_locked(key)
+    expect("OTP lockout reports remaining time", locked and 0 < remaining <= 5)
+    consumed = await asyncio.gather(*(store.delete_otp(key) for _ in range(5)))
+    expect("OTP can be consumed once", consumed.count(True) == 1)
+    await store.clear_lockout(key)
+    expect("OTP lockout cleared", not (await store.is_locked(key))[0])
+
+    return failures
+
+
+async def check_memory_expiry() -> list:
+    """Expiry touches only due keys and reports lag"""
+    failures = []
+    backend = MemoryStateBackend()
+
+    def expect(name, condition):
+        print(f"   {'✅' if condition else '❌'} {name}")
+        if not condition:
+            failures.append(name)
+
+    for i in range(20000):
+        await backend.set(f"long:{i}", "1", ttl=3600)
+    for i in range(500):
+        await backend.hset(f"short:{i}", {"count": 0}, ttl=0.05)
+    await asyncio.sleep(0.1)
+
+    start = time.perf_counter()
+    removed = backend.purge_expired()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    stats = backend.get_stats()
+    expect(f"purge removed only the 500 due keys ({elapsed_ms:.2f} ms)", removed == 500 and stats["keys"] == 20000)
+    expect("expiry lag is reported", stats["expired"] == 500 and stats["expiry_lag_max_ms"] > 0)
+
+    # Re-expiring the same key leaves stale heap entries that get compacted
+    for _ in range(50000):
+        await backend.hset("otp:resend", {"hash": "x"}, ttl=120)
+    stats = backend.get_stats()
+    expect("heap stays bounded under repeated re-expiry", stats["heap_entries"] < 2 * stats["keys_with_expiry"] + 2 * MemoryStateBackend.REAP_BATCH)
+    print(f"   📊 {stats}")
+    return failures
+
+
+def fake_redis_backend():
+    """RedisStateBackend on an in-process fakeredis server, or None if fakeredis is not installed"""
+    try:
+        import fakeredis
+    except ImportError:
+        print("\n⚠️  fakeredis not installed (pip install 'fakeredis[lua]'); skipping the Redis backend")
+        return None
+    return RedisStateBackend("redis://fakeredis", key_prefix="attorney-test:",
+                             client=fakeredis.FakeAsyncRedis(decode_responses=True, max_connections=1000))
+
+
+async def main_async(redis_url: str = None) -> int:
+    backends = [MemoryStateBackend()]
+    redis_backend = RedisStateBackend(redis_url, key_prefix="attorney-test:") if redis_url else fake_redis_backend()
+    if redis_backend is not None:
+        backends.append(redis_backend)
+
+    failures = 0
+    for backend in backends:
+        print(f"\n{backend.name} backend")
+        failures += len(await check_backend(backend))
+        await backend.close()
+
+    print("\nmemory backend expiry")
+    failures += len(await check_memory_expiry())
+
+    print(f"\n{'✅ PASS' if not failures else f'❌ FAIL ({failures} checks)'}")
+    return 1 if failures else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Shared state backend contract test")
+    parser.add_argument("--redis-url", help="Test a Redis-protocol server at this URL instead of fakeredis")
+    args = parser.parse_args()
+    return asyncio.run(main_async(args.redis_url))
+
+
+if __name__ == "__main__":
+    sys.exit(main())